@@ -25,7 +25,13 @@ from codeweaver.backends.config import (
     get_provider_specific_config,
 )
 from codeweaver.backends.factory import BackendFactory
-from codeweaver.backends.providers import DOCARRAY_AVAILABLE, QdrantBackend, QdrantHybridBackend
+from codeweaver.backends.providers import (
+    DOCARRAY_AVAILABLE,
+    LocalIVFBackend,
+    LocalVectorBackend,
+    QdrantBackend,
+    QdrantHybridBackend,
+)
 from codeweaver.cw_types import (
     BackendAuthError,
     BackendCollectionNotFoundError,
@@ -58,6 +64,8 @@ __all__ = [
     "DistanceMetric",
     "FilterCondition",
     "HybridSearchBackend",
+    "LocalIVFBackend",
+    "LocalVectorBackend",
     "QdrantBackend",
     "QdrantHybridBackend",
     "SearchResult",
@@ -50,7 +50,10 @@ class VectorBackend(Protocol):
             name: Collection name
             dimension: Vector dimension
             distance_metric: Distance metric for similarity computation
-            **kwargs: Backend-specific options
+            **kwargs: Backend-specific options. ``quantization`` (a
+                ``QuantizationConfig``, or a ``QuantizationMode`` name) requests
+                quantized vector storage; backends that can't quantize raise
+                ``BackendUnsupportedOperationError`` rather than ignore it.
 
         Backend Compatibility:
         - Qdrant: Uses VectorParams with Distance enum conversion
@@ -98,7 +101,9 @@ class VectorBackend(Protocol):
             limit: Maximum number of results
             search_filter: Optional filtering conditions
             score_threshold: Minimum similarity score
-            **kwargs: Backend-specific search options
+            **kwargs: Backend-specific search options. On quantized collections,
+                ``rescore`` and ``oversampling`` control rescoring of candidates
+                against the full-precision vectors.
 
         Backend Compatibility:
         - Qdrant: Converts SearchFilter to Filter with FieldCondition
@@ -136,7 +141,8 @@ class VectorBackend(Protocol):
             name: Collection name
 
         Returns:
-            Collection information including capabilities
+            Collection information including capabilities, dimension and
+            quantization mode
 
         Backend Compatibility:
         - Qdrant: Gets collection info and config
@@ -217,7 +223,7 @@ class HybridSearchBackend(VectorBackend, Protocol):
         self,
         collection_name: str,
         dense_vector: list[float],
-        sparse_query: dict[str, float] | str,
+        sparse_query: dict[int, float] | str,
         limit: int = 10,  # TODO: NEEDS to be configurable
         hybrid_strategy: HybridStrategy = HybridStrategy.RRF,
         alpha: float = 0.5,  # TODO: NEEDS to be configurable
@@ -230,7 +236,8 @@ class HybridSearchBackend(VectorBackend, Protocol):
         Args:
             collection_name: Target collection
             dense_vector: Dense query embedding
-            sparse_query: Sparse query (keywords/BM25 vector)
+            sparse_query: Query text, encoded with the backend's BM25 encoder, or
+                a sparse vector mapping token IDs to weights
             limit: Maximum results
             hybrid_strategy: Fusion strategy
             alpha: Dense/sparse balance (0.0-1.0)
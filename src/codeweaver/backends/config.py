@@ -18,7 +18,13 @@ from uuid import uuid4
 from pydantic import ConfigDict, Field, field_validator
 
 from codeweaver.backends.base_config import BackendConfig
-from codeweaver.cw_types import BackendProvider, HybridFusionStrategy, ProviderKind, SparseIndexType
+from codeweaver.cw_types import (
+    BackendProvider,
+    HybridFusionStrategy,
+    ProviderKind,
+    QuantizationConfig,
+    SparseIndexType,
+)
 
 
 class BackendConfigExtended(BackendConfig):
@@ -92,6 +98,15 @@ class BackendConfigExtended(BackendConfig):
         ),
     ]
 
+    # Vector storage
+    quantization: Annotated[
+        QuantizationConfig,
+        Field(
+            default_factory=QuantizationConfig,
+            description="Quantized storage of dense vectors (none, scalar or product)",
+        ),
+    ]
+
     # Performance and scaling
     batch_size: Annotated[
         int, Field(default=100, ge=1, le=1000, description="Batch size for operations (1-1000)")
@@ -255,6 +270,10 @@ def get_provider_specific_config(
             "enable_sparse_vectors": base_config.enable_sparse_vectors,
             "sparse_on_disk": base_config.prefer_disk,
             "timeout": base_config.request_timeout,
+            "max_connections": base_config.connection_pool_size,
+            "upsert_batch_size": base_config.batch_size,
+            "upsert_retries": base_config.retry_count,
+            "quantization": base_config.quantization,
             "prefer_grpc": base_config.enable_request_compression,
         }
 
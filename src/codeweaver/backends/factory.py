@@ -51,6 +51,8 @@ class BackendFactory(CapabilityQueryMixin):
                 "custom",
                 "faiss",
                 "lancedb",
+                "local",
+                "local_ivf",
                 "marqo",
                 "milvus",
                 "opensearch",
@@ -126,6 +128,10 @@ class BackendFactory(CapabilityQueryMixin):
                 "enable_sparse_vectors": config.enable_sparse_vectors,
                 "sparse_on_disk": config.prefer_disk,
                 "timeout": config.request_timeout,
+                "max_connections": config.max_connections,
+                "upsert_batch_size": getattr(config, "batch_size", None),
+                "upsert_retries": config.retry_count,
+                "quantization": getattr(config, "quantization", None),
             }
         if config.provider_options:
             args |= config.provider_options
@@ -229,6 +235,15 @@ def _register_default_backends() -> None:
         logger.info("Registered Qdrant backend")
     except ImportError as e:
         logger.warning("Failed to register Qdrant backend: %s", e)
+    try:
+        from codeweaver.backends.providers.local import LocalVectorBackend
+        from codeweaver.backends.providers.local_ivf import LocalIVFBackend
+
+        BackendFactory.register_backend("local", LocalVectorBackend)
+        BackendFactory.register_backend("local_ivf", LocalIVFBackend)
+        logger.info("Registered local backends")
+    except ImportError as e:
+        logger.warning("Failed to register local backends: %s", e)
 
 
 _register_default_backends()
@@ -0,0 +1,177 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""
+Client-side fusion of dense and sparse search results.
+
+Backends without server-side hybrid search run their dense and sparse
+retrievals with :func:`fused_search`, which awaits both concurrently and fuses
+the two ranked lists with one of:
+
+- ``rrf``: Reciprocal Rank Fusion, ``sum(w / (k + rank))``
+- ``dbsf``: Distribution-Based Score Fusion; each list's scores are normalized
+  over ``mean ± 3 std`` (as Qdrant does) and then combined
+- ``linear``/``convex``: min-max normalized scores blended as
+  ``alpha * dense + (1 - alpha) * sparse``
+
+``alpha`` weights the dense list against the sparse list for every strategy,
+and ``alpha=0.5`` weighs them equally. Fused scores are scaled to ``[0, 1]``.
+"""
+
+import asyncio
+import heapq
+import math
+
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any
+
+from codeweaver.cw_types import HybridStrategy, SearchResult
+
+
+DEFAULT_RRF_K = 60
+
+
+def fuse_results(
+    dense_results: Sequence[SearchResult],
+    sparse_results: Sequence[SearchResult],
+    *,
+    strategy: HybridStrategy | str = HybridStrategy.RRF,
+    limit: int = 10,
+    alpha: float = 0.5,
+    rrf_k: int = DEFAULT_RRF_K,
+) -> list[SearchResult]:
+    """Fuse two ranked result lists into one.
+
+    Args:
+        dense_results: Dense retrieval results, best first
+        sparse_results: Sparse retrieval results, best first
+        strategy: Fusion strategy
+        limit: Maximum number of fused results
+        alpha: Weight of the dense list (0.0-1.0); the sparse list gets ``1 - alpha``
+        rrf_k: Rank offset for reciprocal rank fusion
+
+    Returns:
+        Fused results, best first. Each result's ``backend_metadata`` records its
+        dense and sparse rank and score.
+
+    Raises:
+        ValueError: If the strategy or ``alpha`` is not supported
+    """
+    strategy = HybridStrategy(strategy)
+    if not 0.0 <= alpha <= 1.0:
+        raise ValueError(f"alpha must be between 0 and 1, got {alpha}")
+    weights = (alpha, 1.0 - alpha)
+    if strategy == HybridStrategy.RRF:
+        fused = _rrf_scores((dense_results, sparse_results), weights, rrf_k)
+    elif strategy == HybridStrategy.DBSF:
+        fused = _weighted_sum((dense_results, sparse_results), weights, _distribution_normalize)
+    elif strategy in (HybridStrategy.LINEAR, HybridStrategy.CONVEX):
+        fused = _weighted_sum((dense_results, sparse_results), weights, _min_max_normalize)
+    else:
+        raise ValueError(f"Unsupported fusion strategy: {strategy.value}")
+    top = heapq.nlargest(limit, fused.items(), key=lambda item: item[1])
+    return _build_results(top, dense_results, sparse_results, strategy)
+
+
+async def fused_search(
+    dense_search: Awaitable[list[SearchResult]],
+    sparse_search: Awaitable[list[SearchResult]],
+    **options: Any,
+) -> list[SearchResult]:
+    """Run a dense and a sparse retrieval concurrently and fuse their results.
+
+    Args:
+        dense_search: Pending dense retrieval
+        sparse_search: Pending sparse retrieval
+        **options: Options for :func:`fuse_results`
+
+    Returns:
+        Fused results, best first
+    """
+    dense_results, sparse_results = await asyncio.gather(dense_search, sparse_search)
+    return fuse_results(dense_results, sparse_results, **options)
+
+
+def _rrf_scores(
+    result_lists: tuple[Sequence[SearchResult], ...], weights: tuple[float, ...], k: int
+) -> dict[str | int, float]:
+    """Weighted reciprocal rank fusion, scaled so a top hit in every list scores 1."""
+    total = sum(weights) / (k + 1) or 1.0
+    scores: dict[str | int, float] = {}
+    for results, weight in zip(result_lists, weights, strict=True):
+        for rank, result in enumerate(results, start=1):
+            scores[result.id] = scores.get(result.id, 0.0) + weight / (k + rank) / total
+    return scores
+
+
+def _weighted_sum(
+    result_lists: tuple[Sequence[SearchResult], ...],
+    weights: tuple[float, ...],
+    normalize: Callable[[Sequence[SearchResult]], list[float]],
+) -> dict[str | int, float]:
+    """Weighted sum of per-list normalized scores."""
+    total = sum(weights) or 1.0
+    scores: dict[str | int, float] = {}
+    for results, weight in zip(result_lists, weights, strict=True):
+        for result, score in zip(results, normalize(results), strict=True):
+            scores[result.id] = scores.get(result.id, 0.0) + weight * score / total
+    return scores
+
+
+def _min_max_normalize(results: Sequence[SearchResult]) -> list[float]:
+    """Scale scores to ``[0, 1]`` over the list's range."""
+    if not results:
+        return []
+    scores = [result.score for result in results]
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
+
+
+def _distribution_normalize(results: Sequence[SearchResult]) -> list[float]:
+    """Scale scores to ``[0, 1]`` over ``mean ± 3 std``, clipping outliers."""
+    if not results:
+        return []
+    scores = [result.score for result in results]
+    mean = sum(scores) / len(scores)
+    std = math.sqrt(sum((score - mean) ** 2 for score in scores) / len(scores))
+    if std == 0.0:
+        return [0.5] * len(scores)
+    low, span = mean - 3 * std, 6 * std
+    return [min(1.0, max(0.0, (score - low) / span)) for score in scores]
+
+
+def _build_results(
+    top: list[tuple[str | int, float]],
+    dense_results: Sequence[SearchResult],
+    sparse_results: Sequence[SearchResult],
+    strategy: HybridStrategy,
+) -> list[SearchResult]:
+    """Create result objects for the fused top hits only."""
+    wanted = {point_id for point_id, _ in top}
+    dense = {r.id: (rank, r) for rank, r in enumerate(dense_results, 1) if r.id in wanted}
+    sparse = {r.id: (rank, r) for rank, r in enumerate(sparse_results, 1) if r.id in wanted}
+    fused = []
+    for point_id, score in top:
+        dense_hit, sparse_hit = dense.get(point_id), sparse.get(point_id)
+        source = (dense_hit or sparse_hit)[1]
+        fused.append(
+            SearchResult(
+                id=point_id,
+                score=min(1.0, score),
+                payload=source.payload,
+                vector=source.vector,
+                backend_metadata={
+                    **(source.backend_metadata or {}),
+                    "fusion": strategy.value,
+                    "dense_rank": dense_hit[0] if dense_hit else None,
+                    "dense_score": dense_hit[1].score if dense_hit else None,
+                    "sparse_rank": sparse_hit[0] if sparse_hit else None,
+                    "sparse_score": sparse_hit[1].score if sparse_hit else None,
+                },
+            )
+        )
+    return fused
@@ -4,6 +4,8 @@
 # SPDX-License-Identifier: MIT OR Apache-2.0
 """Backend providers for CodeWeaver."""
 
+from codeweaver.backends.providers.local import LocalVectorBackend
+from codeweaver.backends.providers.local_ivf import LocalIVFBackend
 from codeweaver.backends.providers.qdrant import QdrantBackend, QdrantHybridBackend
 
 
@@ -34,6 +36,8 @@ if DOCARRAY_AVAILABLE:
             "DocArrayConfigFactory",
             "DocArrayHybridAdapter",
             "DocumentSchemaGenerator",
+            "LocalIVFBackend",
+            "LocalVectorBackend",
             "QdrantBackend",
             "QdrantDocArrayBackend",
             "QdrantHybridBackend",
@@ -44,6 +48,18 @@ if DOCARRAY_AVAILABLE:
         )
     except ImportError:
         DOCARRAY_AVAILABLE = False
-        __all__ = ("DOCARRAY_AVAILABLE", "QdrantBackend", "QdrantHybridBackend")
+        __all__ = (
+            "DOCARRAY_AVAILABLE",
+            "LocalIVFBackend",
+            "LocalVectorBackend",
+            "QdrantBackend",
+            "QdrantHybridBackend",
+        )
 else:
-    __all__ = ("DOCARRAY_AVAILABLE", "QdrantBackend", "QdrantHybridBackend")
+    __all__ = (
+        "DOCARRAY_AVAILABLE",
+        "LocalIVFBackend",
+        "LocalVectorBackend",
+        "QdrantBackend",
+        "QdrantHybridBackend",
+    )
@@ -5,12 +5,20 @@
 
 """Universal adapter for DocArray backends to CodeWeaver protocols."""
 
+import asyncio
 import logging
+import math
+import operator
+import re
+import threading
 
 from abc import ABC, abstractmethod
 from itertools import starmap
+from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 
 try:
     from docarray import BaseDoc, DocList
@@ -32,9 +40,21 @@ except ImportError:
 
 
 from codeweaver.backends.base import HybridSearchBackend, VectorBackend
+from codeweaver.backends.fusion import fused_search
+from codeweaver.backends.quantization import (
+    QuantizedIndex,
+    exact_scores,
+    prepare_vectors,
+    resolve_quantization,
+    similarity,
+)
+from codeweaver.backends.sparse import BM25Encoder, SparseIndex
 from codeweaver.cw_types import (
     CollectionInfo,
     DistanceMetric,
+    FilterCondition,
+    HybridStrategy,
+    QuantizationMode,
     SearchFilter,
     SearchResult,
     VectorPoint,
@@ -43,6 +63,55 @@ from codeweaver.cw_types import (
 
 logger = logging.getLogger(__name__)
 
+_COMPARISONS = {
+    "eq": operator.eq,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "lt": operator.lt,
+    "le": operator.le,
+}
+# Widening factor of a filtered dense search that returned too few matches
+_FILTER_WIDENING = 4
+
+
+def _matches_filter(payload: dict[str, Any], search_filter: SearchFilter) -> bool:
+    """Evaluate a search filter against a result payload."""
+    return (
+        all(_matches_condition(payload, condition) for condition in search_filter.conditions or [])
+        and all(_matches_filter(payload, sub_filter) for sub_filter in search_filter.must or [])
+        and (
+            not search_filter.should
+            or any(_matches_filter(payload, sub_filter) for sub_filter in search_filter.should)
+        )
+        and not any(
+            _matches_filter(payload, sub_filter) for sub_filter in search_filter.must_not or []
+        )
+    )
+
+
+def _matches_condition(payload: dict[str, Any], condition: FilterCondition) -> bool:
+    """Evaluate one filter condition; missing fields only match negations."""
+    value = payload.get(condition.field)
+    operator_name = str(getattr(condition.operator, "value", condition.operator))
+    if operator_name == "ne":
+        return value != condition.value
+    if operator_name == "nin":
+        return value not in condition.value
+    if value is None:
+        return False
+    if operator_name in _COMPARISONS:
+        try:
+            return _COMPARISONS[operator_name](value, condition.value)
+        except TypeError:
+            return False
+    if operator_name == "in":
+        return value in condition.value
+    if operator_name == "contains":
+        return str(condition.value) in str(value)
+    if operator_name == "regex":
+        return re.search(str(condition.value), str(value)) is not None
+    raise ValueError(f"Unsupported filter operator: {operator_name}")
+
 
 class DocArrayAdapterError(Exception):
     """Errors specific to DocArray adapter operations."""
@@ -122,6 +191,12 @@ class BaseDocArrayAdapter(VectorBackend, ABC):
         self.collection_name = collection_name
         self.converter = VectorConverter(doc_class)
         self._initialized = False
+        self._quantized: QuantizedIndex | None = None
+        # Guards the quantized codes, which are searched in worker threads
+        self._quantized_lock = threading.Lock()
+        # Directory holding the quantized codes of each collection; set by the server
+        # to a directory under the index dir
+        self.quantization_dir: Path | None = None
 
     async def create_collection(
         self,
@@ -130,17 +205,50 @@ class BaseDocArrayAdapter(VectorBackend, ABC):
         distance_metric: DistanceMetric = DistanceMetric.COSINE,
         **kwargs: Any,
     ) -> None:
-        """Create a new vector collection."""
+        """Create a new vector collection.
+
+        A ``quantization`` keyword enables client-side scalar or product
+        quantization: searches scan the codes, then rescore the best candidates
+        against the full-precision vectors in the document index. The codes are
+        kept in memory, and also in ``quantization_path``, which defaults to the
+        collection's directory under :attr:`quantization_dir`.
+        """
+        quantization = resolve_quantization(kwargs.pop("quantization", None))
+        quantization_path = kwargs.pop("quantization_path", None)
+        if quantization_path is None and self.quantization_dir is not None:
+            quantization_path = self.quantization_dir / name
+        current = self._quantized.config.mode if self._quantized else QuantizationMode.NONE
+        if self._initialized and name == self.collection_name and current != quantization.mode:
+            raise DocArrayAdapterError(
+                f"Collection '{name}' uses {current.value} quantization, "
+                f"not {quantization.mode.value}"
+            )
         self.collection_name = name
         self._dimension = dimension
         self._distance_metric = distance_metric
         self._collection_config = {
             "dimension": dimension,
             "distance_metric": distance_metric,
+            "quantization": quantization,
             **kwargs,
         }
+        self._quantized = (
+            QuantizedIndex(
+                dimension,
+                distance_metric,
+                quantization,
+                Path(quantization_path) if quantization_path else None,
+            )
+            if quantization.mode.is_quantized
+            else None
+        )
         self._initialized = True
-        logger.info("Created collection '%s' with dimension %s", name, dimension)
+        logger.info(
+            "Created collection '%s' with dimension %s (quantization: %s)",
+            name,
+            dimension,
+            quantization.mode.value,
+        )
 
     async def upsert_vectors(self, collection_name: str, vectors: list[VectorPoint]) -> None:
         """Insert or update vectors in the collection."""
@@ -150,6 +258,13 @@ class BaseDocArrayAdapter(VectorBackend, ABC):
             docs = [self.converter.vector_to_doc(vector) for vector in vectors]
             all_docs = DocList[self.doc_class](docs)
             self.doc_index.index(all_docs)
+            if self._quantized is not None:
+                await asyncio.to_thread(
+                    self._locked_quantized,
+                    self._quantized.add,
+                    [str(vector.id) for vector in vectors],
+                    np.asarray([vector.vector for vector in vectors], dtype=np.float32),
+                )
             logger.debug("Upserted %s vectors to collection '%s'", len(vectors), collection_name)
         except Exception as e:
             logger.exception("Failed to upsert vectors")
@@ -164,20 +279,29 @@ class BaseDocArrayAdapter(VectorBackend, ABC):
         score_threshold: float | None = None,
         **kwargs: Any,
     ) -> list[SearchResult]:
-        """Search for similar vectors."""
+        """Search for similar vectors.
+
+        Filters are applied to the results' payloads; a filtered search is widened
+        until ``limit`` results match or the index is exhausted.
+        """
         if not self._initialized:
             raise DocArrayAdapterError("Collection not initialized")
+        if self._quantized is not None:
+            return await asyncio.to_thread(
+                self._quantized_search,
+                query_vector,
+                limit,
+                score_threshold,
+                search_filter,
+                **kwargs,
+            )
         try:
             query_doc = self.converter.create_query_doc(query_vector, **kwargs)
-            results, scores = self.doc_index.find(query_doc, search_field="embedding", limit=limit)
-            search_results = []
-            search_results.extend(
-                (
-                    self.converter.doc_to_search_result(doc, score)
-                    for doc, score in zip(results, scores, strict=False)
-                    if score_threshold is None or score >= score_threshold
-                )
-            )
+            search_results = [
+                result
+                for result in await self._find(query_doc, limit, search_filter)
+                if score_threshold is None or result.score >= score_threshold
+            ]
             logger.debug("Found %s results for query", len(search_results))
         except Exception as e:
             logger.exception("Search failed")
@@ -185,9 +309,113 @@ class BaseDocArrayAdapter(VectorBackend, ABC):
         else:
             return search_results
 
+    async def _find(
+        self, query_doc: BaseDoc, limit: int, search_filter: SearchFilter | None
+    ) -> list[SearchResult]:
+        """Run a dense search of the document index."""
+        fetch = limit
+        while True:
+            docs, scores = await asyncio.to_thread(
+                self.doc_index.find, query_doc, search_field="embedding", limit=fetch
+            )
+            results = list(
+                starmap(self.converter.doc_to_search_result, zip(docs, scores, strict=False))
+            )
+            if search_filter is None:
+                return results
+            matching = [
+                result for result in results if _matches_filter(result.payload, search_filter)
+            ]
+            if len(matching) >= limit or len(results) < fetch:
+                return matching[:limit]
+            fetch *= _FILTER_WIDENING
+
+    def _locked_quantized(self, func: Any, *args: Any) -> Any:
+        """Run an operation on the quantized codes under their lock."""
+        with self._quantized_lock:
+            return func(*args)
+
+    def _quantized_search(
+        self,
+        query_vector: list[float],
+        limit: int,
+        score_threshold: float | None,
+        search_filter: SearchFilter | None = None,
+        *,
+        rescore: bool | None = None,
+        oversampling: float | None = None,
+        **kwargs: Any,
+    ) -> list[SearchResult]:
+        """Search the quantized codes, then rescore candidates at full precision.
+
+        Runs in a worker thread. Like the unquantized search, a filtered search is
+        widened until ``limit`` candidates match.
+        """
+        config = self._quantized.config
+        rescore = config.rescore if rescore is None else rescore
+        oversampling = oversampling or config.oversampling
+        fetch = math.ceil(limit * oversampling) if rescore else limit
+        try:
+            while True:
+                candidates = self._locked_quantized(self._quantized.search, query_vector, fetch)
+                results = self._rank_candidates(candidates, query_vector, rescore=rescore)
+                if search_filter is None:
+                    break
+                results = [
+                    result for result in results if _matches_filter(result.payload, search_filter)
+                ]
+                if len(results) >= limit or len(candidates) < fetch:
+                    break
+                fetch *= _FILTER_WIDENING
+            search_results = [
+                result
+                for result in results[:limit]
+                if score_threshold is None or result.score >= score_threshold
+            ]
+            logger.debug(
+                "Found %s results for query from %s quantized candidates",
+                len(search_results),
+                len(candidates),
+            )
+        except Exception as e:
+            logger.exception("Quantized search failed")
+            raise DocArrayAdapterError(f"Search failed: {e}") from e
+        else:
+            return search_results
+
+    def _rank_candidates(
+        self, candidates: list[tuple[str | int, float]], query_vector: list[float], *, rescore: bool
+    ) -> list[SearchResult]:
+        """Turn quantized candidates into results, best first."""
+        if not candidates:
+            return []
+        metric = self._distance_metric
+        docs = {
+            str(doc.id): doc for doc in self.doc_index[[point_id for point_id, _ in candidates]]
+        }
+        candidates = [candidate for candidate in candidates if candidate[0] in docs]
+        if rescore and candidates:
+            vectors = prepare_vectors(
+                np.stack([np.asarray(docs[point_id].embedding) for point_id, _ in candidates]),
+                metric,
+            )
+            query = prepare_vectors(np.asarray(query_vector), metric)
+            raw_scores = exact_scores(vectors, query, metric)
+        else:
+            raw_scores = np.asarray([score for _, score in candidates], dtype=np.float32)
+        scores = similarity(raw_scores, metric)
+        return [
+            self.converter.doc_to_search_result(docs[candidates[index][0]], float(scores[index]))
+            for index in np.argsort(-scores, kind="stable")
+        ]
+
     async def delete_vectors(self, collection_name: str, ids: list[str | int]) -> None:
         """Delete vectors by IDs."""
         try:
+            if self._quantized is not None:
+                await asyncio.to_thread(
+                    self._locked_quantized, self._quantized.remove, [str(id_) for id_ in ids]
+                )
             if hasattr(self.doc_index, "delete"):
                 self.doc_index.delete([str(id_) for id_ in ids])
             else:
@@ -214,6 +442,10 @@ class BaseDocArrayAdapter(VectorBackend, ABC):
                 supports_hybrid_search=self._supports_hybrid_search(),
                 supports_filtering=True,
                 supports_sparse_vectors=self._supports_sparse_vectors(),
+                quantization=(
+                    self._quantized.config.mode if self._quantized else QuantizationMode.NONE
+                ),
+                backend_info=self._quantized.statistics() if self._quantized else None,
             )
 
     async def list_collections(self) -> list[str]:
@@ -226,6 +458,7 @@ class BaseDocArrayAdapter(VectorBackend, ABC):
             if hasattr(self.doc_index, "drop"):
                 self.doc_index.drop()
             self._initialized = False
+            self._quantized = None
             logger.info("Deleted collection '%s'", name)
         except Exception as e:
             logger.exception("Failed to delete collection")
@@ -247,6 +480,60 @@ class BaseDocArrayAdapter(VectorBackend, ABC):
 class DocArrayHybridAdapter(BaseDocArrayAdapter, HybridSearchBackend):
     """DocArray adapter with hybrid search capabilities."""
 
+    def __init__(self, *args: Any, sparse_encoder: BM25Encoder | None = None, **kwargs: Any):
+        """Initialize the hybrid adapter.
+
+        Args:
+            *args: Positional arguments for :class:`BaseDocArrayAdapter`
+            sparse_encoder: BM25 encoder holding the corpus statistics used for text
+                queries
+            **kwargs: Keyword arguments for :class:`BaseDocArrayAdapter`
+        """
+        super().__init__(*args, **kwargs)
+        self._sparse_index = SparseIndex()
+        self.sparse_encoder = sparse_encoder or BM25Encoder()
+
+    @property
+    def sparse_encoder(self) -> BM25Encoder:
+        """BM25 encoder weighting text queries."""
+        return self._sparse_encoder
+
+    @sparse_encoder.setter
+    def sparse_encoder(self, encoder: BM25Encoder) -> None:
+        """Use an encoder, opening the sparse index persisted next to its statistics."""
+        self._sparse_encoder = encoder
+        self._sparse_index.close()
+        self._sparse_index = SparseIndex(
+            encoder.path.with_suffix(".index.jsonl") if encoder.path else None
+        )
+
+    @property
+    def _native_hybrid(self) -> bool:
+        """Whether the document index fuses dense and sparse results itself."""
+        return hasattr(self.doc_index, "hybrid_search")
+
+    async def upsert_vectors(self, collection_name: str, vectors: list[VectorPoint]) -> None:
+        """Insert or update vectors, indexing their sparse vectors for fusion."""
+        await super().upsert_vectors(collection_name, vectors)
+        if not self._native_hybrid:
+            self._sparse_index.add(
+                [vector.id for vector in vectors], [vector.sparse_vector for vector in vectors]
+            )
+
+    async def delete_vectors(self, collection_name: str, ids: list[str | int]) -> None:
+        """Delete vectors by IDs."""
+        await super().delete_vectors(collection_name, ids)
+        self._sparse_index.remove(ids)
+
+    async def delete_collection(self, name: str) -> None:
+        """Delete a collection entirely."""
+        await super().delete_collection(name)
+        self._sparse_index.clear()
+
+    async def close(self) -> None:
+        """Close the sparse index journal."""
+        self._sparse_index.close()
+
     async def create_sparse_index(
         self, collection_name: str, fields: list[str], index_type: str = "bm25", **kwargs: Any
     ) -> None:
@@ -265,65 +552,78 @@ class DocArrayHybridAdapter(BaseDocArrayAdapter, HybridSearchBackend):
         self,
         collection_name: str,
         dense_vector: list[float],
-        sparse_query: dict[str, float] | str,
+        sparse_query: dict[int, float] | str,
         limit: int = 10,
-        hybrid_strategy: str = "rrf",
+        hybrid_strategy: HybridStrategy | str = HybridStrategy.RRF,
         alpha: float = 0.5,
         search_filter: SearchFilter | None = None,
         **kwargs: Any,
     ) -> list[SearchResult]:
-        """Perform hybrid search combining dense and sparse retrieval."""
+        """Perform hybrid search combining dense and sparse retrieval.
+
+        Indexes without native hybrid search run the dense search and a search of
+        the adapter's inverted sparse index concurrently, then fuse the results
+        client-side. Both retrievals apply ``search_filter`` before fusion.
+        ``prefetch_limit`` sets how many candidates each retrieval contributes
+        (default ``2 * limit``).
+        """
         try:
             if isinstance(sparse_query, str):
                 sparse_vector = self._text_to_sparse_vector(sparse_query)
             else:
                 sparse_vector = sparse_query
-            query_doc = self.converter.create_query_doc(
-                dense_vector, sparse_vector=sparse_vector, **kwargs
-            )
-            if hasattr(self.doc_index, "hybrid_search"):
+            if self._native_hybrid:
+                query_doc = self.converter.create_query_doc(
+                    dense_vector, sparse_vector=sparse_vector, **kwargs
+                )
                 results, scores = self.doc_index.hybrid_search(query_doc, alpha=alpha, limit=limit)
-            else:
-                results, scores = await self._fallback_hybrid_search(
-                    dense_vector, sparse_vector, limit, alpha
+                return list(
+                    starmap(self.converter.doc_to_search_result, zip(results, scores, strict=False))
                 )
+            candidates = kwargs.pop("prefetch_limit", limit * 2)
+            return await fused_search(
+                self.search_vectors(
+                    collection_name, dense_vector, candidates, search_filter, **kwargs
+                ),
+                asyncio.to_thread(self._sparse_search, sparse_vector, candidates, search_filter),
+                strategy=hybrid_strategy,
+                limit=limit,
+                alpha=alpha,
+            )
         except Exception as e:
             logger.exception("Hybrid search failed")
             raise DocArrayAdapterError(f"Hybrid search failed: {e}") from e
-        else:
-            return list(
-                starmap(self.converter.doc_to_search_result, zip(results, scores, strict=False))
-            )
 
-    def _text_to_sparse_vector(self, text: str) -> dict[str, float]:
-        """Convert text to sparse vector representation."""
-        words = text.lower().split()
-        term_freq = {}
-        for word in words:
-            term_freq[word] = term_freq.get(word, 0) + 1
-        max_freq = max(term_freq.values()) if term_freq else 1
-        return {word: freq / max_freq for word, freq in term_freq.items()}
-
-    async def _fallback_hybrid_search(
-        self, dense_vector: list[float], sparse_vector: dict[str, float], limit: int, alpha: float
-    ) -> tuple[list[BaseDoc], list[float]]:
-        """Fallback hybrid search using RRF fusion."""
-        dense_results = await self.search_vectors(self.collection_name, dense_vector, limit * 2)
-        sparse_results = dense_results
-        return self._apply_rrf_fusion(sparse_results, sparse_results, limit)
-
-    def _apply_rrf_fusion(
-        self,
-        dense_results: list[SearchResult],
-        sparse_results: list[SearchResult],
-        limit: int,
-        k: int = 60,
-    ) -> tuple[list[BaseDoc], list[float]]:
-        """Apply Reciprocal Rank Fusion to combine results."""
-        scores = {}
-        for rank, result in enumerate(dense_results):
-            scores[result.id] = scores.get(result.id, 0) + 1 / (rank + k)
-        for rank, result in enumerate(sparse_results):
-            scores[result.id] = scores.get(result.id, 0) + 1 / (rank + k)
-        sorted(scores.keys(), key=lambda x: scores[x], reverse=True)[:limit]
-        return ([], [])
+    def _text_to_sparse_vector(self, text: str) -> dict[int, float]:
+        """Encode query text as BM25 weights over the indexed corpus."""
+        return self.sparse_encoder.encode_query(text)
+
+    def _sparse_search(
+        self, sparse_vector: dict[int, float], limit: int, search_filter: SearchFilter | None = None
+    ) -> list[SearchResult]:
+        """Search the inverted sparse index.
+
+        Scores are divided by the best hit's score to fit the ``[0, 1]`` range of
+        search results; fusion only depends on ranks and relative scores. With a
+        filter, all hits are ranked and their documents are fetched a page at a
+        time until ``limit`` of them match.
+        """
+        hits = self._sparse_index.search(
+            sparse_vector, len(self._sparse_index) if search_filter else limit
+        )
+        if not hits:
+            return []
+        top = hits[0][1] or 1.0
+        results: list[SearchResult] = []
+        for start in range(0, len(hits), limit):
+            page = hits[start : start + limit]
+            docs = {str(doc.id): doc for doc in self.doc_index[[point_id for point_id, _ in page]]}
+            for point_id, score in page:
+                if point_id not in docs:
+                    continue
+                result = self.converter.doc_to_search_result(docs[point_id], score / top)
+                if search_filter is None or _matches_filter(result.payload, search_filter):
+                    results.append(result)
+            if len(results) >= limit:
+                break
+        return results[:limit]
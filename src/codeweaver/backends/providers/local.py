@@ -0,0 +1,664 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""
+Embedded, in-process vector backend built on NumPy.
+
+Meant for single-developer and CI deployments that shouldn't need a vector
+database server. Each collection is a directory holding:
+
+- ``vectors.bin``: a contiguous float32 or float16 matrix, memory-mapped from disk
+- ``alive.bin``: one byte per row; deleted rows are tombstoned here
+- ``points.sqlite3``: the sidecar store mapping rows to point IDs and payloads
+- ``meta.json``: dimension, distance metric and dtype
+
+Opening a collection maps the files without reading them, so startup time does
+not depend on the collection size. Search is an exact, blocked matrix-vector
+product with ``argpartition`` top-k selection. Payload filters are evaluated by
+the sidecar store. Deletes only tombstone rows. Once the share of dead rows
+passes ``compaction_threshold``, the collection is compacted.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+
+from pathlib import Path
+from typing import Any, Literal
+
+import numpy as np
+
+from codeweaver.backends.quantization import resolve_quantization
+from codeweaver.cw_types import (
+    BackendCollectionNotFoundError,
+    BackendError,
+    BackendUnsupportedOperationError,
+    CollectionInfo,
+    DistanceMetric,
+    FilterCondition,
+    IndexType,
+    SearchFilter,
+    SearchResult,
+    StorageType,
+    VectorPoint,
+)
+
+
+logger = logging.getLogger(__name__)
+
+LocalDType = Literal["float32", "float16"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    row INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS compaction (
+    rows INTEGER NOT NULL
+);
+"""
+
+_COMPARISONS = {"eq": "=", "gt": ">", "ge": ">=", "lt": "<", "le": "<="}
+
+
+def _regexp(pattern: str, value: Any) -> bool:
+    """SQLite REGEXP implementation."""
+    return value is not None and re.search(pattern, str(value)) is not None
+
+
+class _LocalCollection:
+    """Storage and exact search for one collection."""
+
+    index_type = IndexType.FLAT
+    # When False, updated points move to a new row, so row-based indexes stay valid
+    overwrite_in_place = True
+
+    def __init__(self, path: Path):
+        self.path = path
+        meta = json.loads((path / "meta.json").read_text())
+        self.dimension: int = meta["dimension"]
+        self.distance = DistanceMetric(meta["distance"])
+        self.dtype = np.dtype(meta["dtype"])
+        self.vectors_path = path / "vectors.bin"
+        self.alive_path = path / "alive.bin"
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(path / "points.sqlite3", check_same_thread=False)
+        self.db.create_function("regexp", 2, _regexp, deterministic=True)
+        self.db.executescript(_SCHEMA)
+        self._recover_compaction()
+        self._map()
+
+    @staticmethod
+    def initialize(path: Path, dimension: int, distance: DistanceMetric, dtype: LocalDType) -> None:
+        """Create an empty collection directory."""
+        path.mkdir(parents=True)
+        (path / "vectors.bin").touch()
+        (path / "alive.bin").touch()
+        (path / "meta.json").write_text(
+            json.dumps({"dimension": dimension, "distance": distance.value, "dtype": dtype})
+        )
+
+    def _map(self) -> None:
+        """Memory-map the vector matrix and the alive mask."""
+        row_bytes = self.dimension * self.dtype.itemsize
+        # Rows past the shorter file are from an interrupted append; cutting them
+        # off keeps later appends aligned across both files
+        self.rows = min(
+            self.vectors_path.stat().st_size // row_bytes, self.alive_path.stat().st_size
+        )
+        for path, size in (
+            (self.vectors_path, self.rows * row_bytes),
+            (self.alive_path, self.rows),
+        ):
+            if path.stat().st_size != size:
+                os.truncate(path, size)
+        if self.rows:
+            self.matrix = np.memmap(
+                self.vectors_path, dtype=self.dtype, mode="r+", shape=(self.rows, self.dimension)
+            )
+            self.alive = np.memmap(self.alive_path, dtype=np.uint8, mode="r+", shape=(self.rows,))
+        else:
+            self.matrix = np.empty((0, self.dimension), dtype=self.dtype)
+            self.alive = np.empty(0, dtype=np.uint8)
+
+    @property
+    def live_count(self) -> int:
+        return int(self.db.execute("SELECT COUNT(*) FROM points").fetchone()[0])
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        """Normalize vectors for cosine distance, so scoring is a dot product."""
+        if self.distance == DistanceMetric.COSINE:
+            norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+        return vectors
+
+    def upsert(self, points: list[VectorPoint]) -> None:
+        """Overwrite existing points in place and append new ones."""
+        # The last occurrence of a repeated ID wins
+        points = list({_id_key(point.id): point for point in points}.values())
+        vectors = self._prepare(np.asarray([point.vector for point in points], dtype=np.float32))
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Expected vectors of dimension {self.dimension}, got {vectors.shape[1]}"
+            )
+        keys = [_id_key(point.id) for point in points]
+        existing = self._rows_for(keys)
+        if existing and not self.overwrite_in_place:
+            self.alive[sorted(existing.values())] = 0
+            self.alive.flush()
+            existing = {}
+        new_positions = [i for i, key in enumerate(keys) if key not in existing]
+        rows: list[int] = []
+        next_row = self.rows
+        for key in keys:
+            if key in existing:
+                rows.append(existing[key])
+            else:
+                rows.append(next_row)
+                next_row += 1
+        if existing:
+            positions = [i for i, key in enumerate(keys) if key in existing]
+            targets = [existing[keys[i]] for i in positions]
+            self.matrix[targets] = vectors[positions].astype(self.dtype)
+            self.alive[targets] = 1
+            self.matrix.flush()
+            self.alive.flush()
+        if new_positions:
+            with self.vectors_path.open("ab") as handle:
+                handle.write(vectors[new_positions].astype(self.dtype).tobytes())
+            with self.alive_path.open("ab") as handle:
+                handle.write(np.ones(len(new_positions), dtype=np.uint8).tobytes())
+            self._map()
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO points (row, id, payload) VALUES (?, ?, ?)",
+                [
+                    (row, key, json.dumps(point.payload or {}, default=str))
+                    for row, key, point in zip(rows, keys, points, strict=True)
+                ],
+            )
+
+    def delete(self, ids: list[str | int]) -> int:
+        """Tombstone points; returns the number of points deleted."""
+        existing = self._rows_for([_id_key(point_id) for point_id in ids])
+        if not existing:
+            return 0
+        rows = sorted(existing.values())
+        self.alive[rows] = 0
+        self.alive.flush()
+        with self.db:
+            self.db.executemany("DELETE FROM points WHERE row = ?", [(row,) for row in rows])
+        return len(rows)
+
+    @property
+    def dead_fraction(self) -> float:
+        return 1 - self.live_count / self.rows if self.rows else 0.0
+
+    def compact(self) -> int:
+        """Rewrite the matrix without tombstoned rows; returns rows reclaimed.
+
+        The compacted files are written next to the originals first. The row
+        renumbering commits together with a pending-compaction marker, and the
+        files are swapped afterwards, so a crash at any point is either rolled
+        back or finished by :meth:`_recover_compaction` on the next open.
+        """
+        live = np.flatnonzero(self.alive)
+        reclaimed = self.rows - len(live)
+        if not reclaimed:
+            return 0
+        vectors_tmp, alive_tmp = self._compaction_files()
+        with vectors_tmp.open("wb") as handle:
+            for start in range(0, len(live), 65536):
+                block = self.matrix[live[start : start + 65536]]
+                handle.write(np.ascontiguousarray(block).tobytes())
+        alive_tmp.write_bytes(np.ones(len(live), dtype=np.uint8).tobytes())
+        # Rows only move down, so renumbering in ascending order never collides
+        with self.db:
+            self.db.executemany(
+                "UPDATE points SET row = ? WHERE row = ?",
+                [(new, int(old)) for new, old in enumerate(live) if new != old],
+            )
+            self.db.execute("DELETE FROM points WHERE row >= ?", (len(live),))
+            self.db.execute("INSERT INTO compaction (rows) VALUES (?)", (len(live),))
+        self._release()
+        self._finish_compaction()
+        self._map()
+        return reclaimed
+
+    def _compaction_files(self) -> tuple[Path, Path]:
+        """Files holding the compacted vectors and alive mask until they are swapped in."""
+        return self.vectors_path.with_suffix(".compact"), self.alive_path.with_suffix(".compact")
+
+    def _finish_compaction(self) -> None:
+        """Swap in the compacted files, then clear the pending-compaction marker."""
+        for tmp, path in zip(
+            self._compaction_files(), (self.vectors_path, self.alive_path), strict=True
+        ):
+            if tmp.exists():
+                tmp.replace(path)
+        with self.db:
+            self.db.execute("DELETE FROM compaction")
+
+    def _recover_compaction(self) -> None:
+        """Finish a committed compaction, or drop the files of an uncommitted one."""
+        if self.db.execute("SELECT 1 FROM compaction").fetchone():
+            logger.info("Finishing interrupted compaction of %s", self.path)
+            self._finish_compaction()
+            return
+        for tmp in self._compaction_files():
+            tmp.unlink(missing_ok=True)
+
+    def allowed_rows(self, search_filter: SearchFilter) -> np.ndarray:
+        """Boolean mask of rows whose payload matches a filter."""
+        clause, params = _filter_sql(search_filter)
+        mask = np.zeros(self.rows, dtype=bool)
+        query = f"SELECT row FROM points WHERE {clause}"  # noqa: S608
+        rows = [row for (row,) in self.db.execute(query, params)]
+        mask[np.asarray(rows, dtype=np.int64)] = True
+        return mask
+
+    def scores(self, block: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Similarity of each row in a block to the query (higher is better)."""
+        block = block.astype(np.float32, copy=False)
+        if self.distance in (DistanceMetric.COSINE, DistanceMetric.DOT_PRODUCT):
+            return block @ query
+        if self.distance == DistanceMetric.MANHATTAN:
+            return -np.abs(block - query).sum(axis=1)
+        # Squared euclidean distance, expanded to avoid a block-sized temporary
+        return -(np.einsum("ij,ij->i", block, block) - 2 * (block @ query) + query @ query)
+
+    def search(
+        self,
+        query: np.ndarray,
+        limit: int,
+        allowed: np.ndarray | None,
+        block_rows: int,
+        **options: Any,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Exact top-k search; returns rows and raw scores, best first."""
+        query = self._prepare(query.astype(np.float32))
+        best_rows: list[np.ndarray] = []
+        best_scores: list[np.ndarray] = []
+        for start in range(0, self.rows, block_rows):
+            stop = min(start + block_rows, self.rows)
+            valid = self.alive[start:stop].astype(bool)
+            if allowed is not None:
+                valid &= allowed[start:stop]
+            count = int(valid.sum())
+            if not count:
+                continue
+            scores = np.where(valid, self.scores(self.matrix[start:stop], query), -np.inf)
+            k = min(limit, count)
+            top = np.argpartition(-scores, k - 1)[:k]
+            best_rows.append(top + start)
+            best_scores.append(scores[top])
+        if not best_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        rows = np.concatenate(best_rows)
+        scores = np.concatenate(best_scores)
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return rows[order], scores[order]
+
+    def describe(self) -> dict[str, Any]:
+        """Index details reported in collection info."""
+        return {}
+
+    def similarity(self, raw_scores: np.ndarray) -> np.ndarray:
+        """Map raw scores onto the 0-1 range reported in search results."""
+        if self.distance == DistanceMetric.MANHATTAN:
+            return 1 / (1 - raw_scores)
+        if self.distance == DistanceMetric.EUCLIDEAN:
+            return 1 / (1 + np.sqrt(np.maximum(-raw_scores, 0)))
+        return np.clip(raw_scores, 0.0, 1.0)
+
+    def points_for(self, rows: list[int]) -> dict[int, tuple[str | int, dict[str, Any]]]:
+        """Look up point IDs and payloads for rows."""
+        found: dict[int, tuple[str | int, dict[str, Any]]] = {}
+        for start in range(0, len(rows), 500):
+            chunk = rows[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row, key, payload in self.db.execute(
+                f"SELECT row, id, payload FROM points WHERE row IN ({placeholders})",  # noqa: S608
+                chunk,
+            ):
+                found[row] = (json.loads(key), json.loads(payload))
+        return found
+
+    def _rows_for(self, keys: list[str]) -> dict[str, int]:
+        found: dict[str, int] = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(
+                self.db.execute(
+                    f"SELECT id, row FROM points WHERE id IN ({placeholders})",  # noqa: S608
+                    chunk,
+                ).fetchall()
+            )
+        return found
+
+    def _release(self) -> None:
+        """Flush and drop the memory maps before their files are replaced."""
+        for mapped in (self.matrix, self.alive):
+            if isinstance(mapped, np.memmap):
+                mapped.flush()
+        self.matrix = np.empty((0, self.dimension), dtype=self.dtype)
+        self.alive = np.empty(0, dtype=np.uint8)
+
+    def close(self) -> None:
+        self._release()
+        self.db.close()
+
+
+def _id_key(point_id: str | int) -> str:
+    """Sidecar key for a point ID, keeping int and str IDs distinct."""
+    return json.dumps(point_id)
+
+
+def _filter_sql(search_filter: SearchFilter) -> tuple[str, list[Any]]:
+    """Translate a SearchFilter into a SQL condition over payload JSON."""
+    clauses: list[str] = []
+    params: list[Any] = []
+
+    def add(clause: str, clause_params: list[Any]) -> None:
+        clauses.append(clause)
+        params.extend(clause_params)
+
+    for condition in search_filter.conditions or []:
+        add(*_condition_sql(condition))
+    for sub_filter in search_filter.must or []:
+        add(*_filter_sql(sub_filter))
+    if search_filter.should:
+        parts = [_filter_sql(sub_filter) for sub_filter in search_filter.should]
+        add(
+            "(" + " OR ".join(clause for clause, _ in parts) + ")",
+            [param for _, sub_params in parts for param in sub_params],
+        )
+    for sub_filter in search_filter.must_not or []:
+        clause, sub_params = _filter_sql(sub_filter)
+        add(f"NOT ({clause})", sub_params)
+    return ("(" + " AND ".join(clauses) + ")" if clauses else "1", params)
+
+
+def _condition_sql(condition: FilterCondition) -> tuple[str, list[Any]]:
+    """Translate one filter condition."""
+    field = "json_extract(payload, ?)"
+    path = "$." + json.dumps(condition.field)
+    operator = str(getattr(condition.operator, "value", condition.operator))
+    value = condition.value
+    if operator in _COMPARISONS:
+        return f"{field} {_COMPARISONS[operator]} ?", [path, value]
+    if operator == "ne":
+        return f"({field} IS NULL OR {field} != ?)", [path, path, value]
+    if operator in ("in", "nin"):
+        values = list(value)
+        placeholders = ",".join("?" * len(values)) or "NULL"
+        clause = f"{field} IN ({placeholders})"
+        if operator == "nin":
+            clause = f"({field} IS NULL OR {field} NOT IN ({placeholders}))"
+            return clause, [path, path, *values]
+        return clause, [path, *values]
+    if operator == "contains":
+        return f"instr({field}, ?) > 0", [path, str(value)]
+    if operator == "regex":
+        return f"regexp(?, {field})", [str(value), path]
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+class LocalVectorBackend:
+    """Embedded vector backend storing collections as memory-mapped NumPy matrices."""
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        dtype: LocalDType = "float32",
+        compaction_threshold: float = 0.25,
+        search_block_rows: int = 65536,
+        **kwargs: Any,
+    ):
+        """Initialize the local backend.
+
+        Args:
+            path: Directory holding the collections (defaults to ``.codeweaver/vectors``
+                in the working directory)
+            dtype: Storage precision for new collections
+            compaction_threshold: Share of tombstoned rows that triggers compaction
+            search_block_rows: Rows scored per block, bounding search memory
+            **kwargs: Ignored backend options (e.g. ``url``)
+        """
+        self.path = Path(path) if path else Path.cwd() / ".codeweaver" / "vectors"
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dtype = dtype
+        self.compaction_threshold = compaction_threshold
+        self.search_block_rows = max(1, search_block_rows)
+        self._collections: dict[str, _LocalCollection] = {}
+        logger.info("Local vector backend at %s", self.path)
+
+    def _collection(self, name: str) -> _LocalCollection:
+        """Open a collection, raising if it does not exist."""
+        if (collection := self._collections.get(name)) is not None:
+            return collection
+        path = self.path / name
+        if not (path / "meta.json").exists():
+            raise BackendCollectionNotFoundError(
+                f"Collection {name} not found", backend_type="local"
+            )
+        collection = self._collections[name] = self._open_collection(path)
+        return collection
+
+    def _open_collection(self, path: Path) -> _LocalCollection:
+        """Open the storage for a collection directory."""
+        return _LocalCollection(path)
+
+    def _search_options(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Index-specific search options taken from ``search_vectors`` kwargs."""
+        return {}
+
+    async def create_collection(
+        self,
+        name: str,
+        dimension: int,
+        distance_metric: DistanceMetric = DistanceMetric.COSINE,
+        **kwargs: Any,
+    ) -> None:
+        """Create a new collection."""
+        if distance_metric not in (
+            DistanceMetric.COSINE,
+            DistanceMetric.DOT_PRODUCT,
+            DistanceMetric.EUCLIDEAN,
+            DistanceMetric.MANHATTAN,
+        ):
+            raise BackendError(
+                f"Unsupported distance metric for local backend: {distance_metric}",
+                backend_type="local",
+            )
+        if resolve_quantization(kwargs.get("quantization")).mode.is_quantized:
+            raise BackendUnsupportedOperationError(
+                "Local collections don't support quantization",
+                backend_type="local",
+                recovery_suggestions=["Use dtype='float16' to halve vector storage"],
+            )
+        path = self.path / name
+        if (path / "meta.json").exists():
+            raise BackendError(f"Collection {name} already exists", backend_type="local")
+        _LocalCollection.initialize(
+            path, dimension, distance_metric, kwargs.get("dtype", self.dtype)
+        )
+        self._collections[name] = self._open_collection(path)
+        logger.info("Created local collection: %s (dimension: %d)", name, dimension)
+
+    async def upsert_vectors(self, collection_name: str, vectors: list[VectorPoint]) -> None:
+        """Insert or update vectors in the collection."""
+        if not vectors:
+            return
+        collection = self._collection(collection_name)
+        try:
+            await asyncio.to_thread(self._locked, collection, collection.upsert, vectors)
+            if not collection.overwrite_in_place:
+                # Updates tombstone the rows they move away from
+                await self._compact_if_needed(collection_name, collection)
+        except Exception as e:
+            raise BackendError(
+                f"Failed to upsert vectors to {collection_name}",
+                backend_type="local",
+                original_error=e,
+            ) from e
+        logger.debug("Upserted %d vectors to collection %s", len(vectors), collection_name)
+
+    async def search_vectors(
+        self,
+        collection_name: str,
+        query_vector: list[float],
+        limit: int = 10,
+        search_filter: SearchFilter | None = None,
+        score_threshold: float | None = None,
+        **kwargs: Any,
+    ) -> list[SearchResult]:
+        """Search for similar vectors with an exact, blocked scan."""
+        collection = self._collection(collection_name)
+        try:
+            return await asyncio.to_thread(
+                self._locked,
+                collection,
+                self._search,
+                collection,
+                np.asarray(query_vector, dtype=np.float32),
+                limit,
+                search_filter,
+                score_threshold,
+                self._search_options(kwargs),
+            )
+        except Exception as e:
+            raise BackendError(
+                f"Failed to search collection {collection_name}",
+                backend_type="local",
+                original_error=e,
+            ) from e
+
+    def _search(
+        self,
+        collection: _LocalCollection,
+        query: np.ndarray,
+        limit: int,
+        search_filter: SearchFilter | None,
+        score_threshold: float | None,
+        options: dict[str, Any],
+    ) -> list[SearchResult]:
+        allowed = collection.allowed_rows(search_filter) if search_filter else None
+        rows, raw_scores = collection.search(
+            query, limit, allowed, self.search_block_rows, **options
+        )
+        scores = collection.similarity(raw_scores)
+        points = collection.points_for([int(row) for row in rows])
+        results = []
+        for row, score in zip(rows.tolist(), scores.tolist(), strict=True):
+            if score_threshold is not None and score < score_threshold:
+                break
+            # Rows appended by an interrupted upsert have no sidecar entry
+            if row not in points:
+                continue
+            point_id, payload = points[row]
+            results.append(
+                SearchResult(
+                    id=point_id, score=score, payload=payload, backend_metadata={"row": row}
+                )
+            )
+        return results
+
+    async def delete_vectors(self, collection_name: str, ids: list[str | int]) -> None:
+        """Delete vectors by IDs, compacting once enough rows are dead."""
+        collection = self._collection(collection_name)
+        try:
+            deleted = await asyncio.to_thread(self._locked, collection, collection.delete, ids)
+            if deleted:
+                await self._compact_if_needed(collection_name, collection)
+        except Exception as e:
+            raise BackendError(
+                f"Failed to delete vectors from {collection_name}",
+                backend_type="local",
+                original_error=e,
+            ) from e
+        logger.debug("Deleted %d vectors from collection %s", deleted, collection_name)
+
+    async def _compact_if_needed(self, collection_name: str, collection: _LocalCollection) -> None:
+        """Compact a collection once its share of dead rows passes the threshold."""
+        dead_fraction = self._locked(collection, lambda: collection.dead_fraction)
+        if dead_fraction > self.compaction_threshold:
+            await self.compact(collection_name)
+
+    async def compact(self, collection_name: str) -> int:
+        """Drop tombstoned rows from a collection; returns rows reclaimed."""
+        collection = self._collection(collection_name)
+        reclaimed = await asyncio.to_thread(self._locked, collection, collection.compact)
+        logger.info("Compacted local collection %s: %d rows reclaimed", collection_name, reclaimed)
+        return reclaimed
+
+    async def get_collection_info(self, name: str) -> CollectionInfo:
+        """Get collection metadata and capabilities."""
+        collection = self._collection(name)
+        with collection.lock:
+            live_count = collection.live_count
+            dead_fraction = collection.dead_fraction
+        return CollectionInfo(
+            name=name,
+            dimension=collection.dimension,
+            points_count=live_count,
+            distance_metric=collection.distance,
+            indexed=True,
+            supports_sparse_vectors=False,
+            supports_hybrid_search=False,
+            supports_filtering=True,
+            supports_updates=True,
+            storage_type=StorageType.DISK,
+            index_type=collection.index_type,
+            backend_info={
+                "path": str(collection.path),
+                "dtype": str(collection.dtype),
+                "rows": collection.rows,
+                "dead_fraction": dead_fraction,
+                **collection.describe(),
+            },
+        )
+
+    async def list_collections(self) -> list[str]:
+        """List all available collections."""
+        return sorted(path.parent.name for path in self.path.glob("*/meta.json"))
+
+    async def delete_collection(self, name: str) -> None:
+        """Delete a collection entirely."""
+        collection = self._collections.pop(name, None)
+        if collection is not None:
+            collection.close()
+        if not (self.path / name).exists():
+            raise BackendCollectionNotFoundError(
+                f"Collection {name} not found", backend_type="local"
+            )
+        await asyncio.to_thread(shutil.rmtree, self.path / name)
+        logger.info("Deleted local collection: %s", name)
+
+    async def health_check(self) -> bool:
+        """Check that the storage directory is usable."""
+        return self.path.is_dir() and os.access(self.path, os.W_OK)
+
+    async def close(self) -> None:
+        """Close all open collections."""
+        for collection in self._collections.values():
+            with contextlib.suppress(Exception):
+                collection.close()
+        self._collections.clear()
+
+    @staticmethod
+    def _locked(collection: _LocalCollection, func: Any, *args: Any) -> Any:
+        """Run a collection operation under its lock."""
+        with collection.lock:
+            return func(*args)
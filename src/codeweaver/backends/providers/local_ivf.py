@@ -0,0 +1,406 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""
+Approximate nearest-neighbour search for the local backend, using an IVF index.
+
+``LocalIVFBackend`` stores vectors exactly like ``LocalVectorBackend``. On top of
+that storage it keeps an inverted file index: k-means centroids partition the rows
+into ``nlist`` lists, and a search scores only the rows of the ``nprobe`` lists
+closest to the query. ``nprobe`` trades recall for latency, and can be set per
+call.
+
+Index files, all in the collection's ``ivf`` directory:
+
+- ``centroids.npy``: the coarse quantizer
+- ``assignments.bin``: the list of every row (int32), appended as rows arrive
+- ``order.npy`` / ``offsets.npy``: rows grouped by list, loaded with mmap
+
+Rows inserted after the last list rebuild form a tail that is always scanned
+exactly. Once the tail passes ``max_tail_rows`` the lists are regrouped, which is
+a sort of the assignments and needs no retraining. The quantizer is trained once
+the collection reaches ``min_train_rows``. It is retrained whenever the collection
+grows by ``retrain_factor``, so the number of lists keeps up with the data.
+Training runs outside the collection lock on a snapshot of the rows, so searches
+and upserts continue meanwhile; the new lists are swapped in once trained, and
+rows added in the meantime are assigned to them.
+"""
+
+import asyncio
+import json
+import logging
+import math
+
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from codeweaver.backends.providers.local import LocalVectorBackend, _LocalCollection
+from codeweaver.cw_types import DistanceMetric, IndexType, VectorPoint
+
+
+logger = logging.getLogger(__name__)
+
+_BLOCK_ROWS = 65536
+
+
+def _save_array(path: Path, array: np.ndarray) -> None:
+    """Write an ``.npy`` file atomically."""
+    tmp = path.with_suffix(".tmp.npy")
+    np.save(tmp, array)
+    tmp.replace(path)
+
+
+class _TrainingJob(NamedTuple):
+    """Snapshot of a collection that its quantizer is trained on."""
+
+    matrix: np.ndarray
+    rows: int
+    sample: np.ndarray
+    nlist: int
+    live: int
+    generation: int
+
+
+class _IVFCollection(_LocalCollection):
+    """Local collection with an inverted file index over its rows."""
+
+    index_type = IndexType.IVF_FLAT
+    # Moved points get a new row, so their list assignment is always current
+    overwrite_in_place = False
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        nlist: int | None = None,
+        min_train_rows: int = 4096,
+        max_tail_rows: int = 20_000,
+        retrain_factor: float = 4.0,
+        kmeans_iterations: int = 10,
+    ):
+        self.ivf_path = path / "ivf"
+        self.fixed_nlist = nlist
+        self.min_train_rows = min_train_rows
+        self.max_tail_rows = max_tail_rows
+        self.retrain_factor = retrain_factor
+        self.kmeans_iterations = kmeans_iterations
+        # Bumped when compaction renumbers rows, invalidating running training
+        self.generation = 0
+        super().__init__(path)
+        self.ivf_path.mkdir(exist_ok=True)
+        self._load_index()
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def _load_index(self) -> None:
+        """Load the index, assigning rows appended after it was last written."""
+        meta_path = self.ivf_path / "meta.json"
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+        self.trained_rows: int = meta.get("trained_rows", 0)
+        self.sorted_rows: int = meta.get("sorted_rows", 0)
+        self.centroids: np.ndarray | None = None
+        if not meta:
+            return
+        self.centroids = np.load(self.ivf_path / "centroids.npy")
+        self.order = np.load(self.ivf_path / "order.npy", mmap_mode="r")
+        self.offsets = np.load(self.ivf_path / "offsets.npy")
+        assigned = (self.ivf_path / "assignments.bin").stat().st_size // 4
+        if assigned < self.rows:
+            self._assign_rows(assigned, self.rows)
+        elif assigned > self.rows:
+            # Assignments of rows lost in an interrupted append
+            with (self.ivf_path / "assignments.bin").open("r+b") as handle:
+                handle.truncate(self.rows * 4)
+        self.sorted_rows = min(self.sorted_rows, self.rows)
+
+    def _save_meta(self) -> None:
+        (self.ivf_path / "meta.json").write_text(
+            json.dumps({
+                "nlist": len(self.centroids),
+                "trained_rows": self.trained_rows,
+                "sorted_rows": self.sorted_rows,
+            })
+        )
+
+    def _assignments(self) -> np.ndarray:
+        if not self.rows:
+            return np.empty(0, dtype=np.int32)
+        return np.memmap(
+            self.ivf_path / "assignments.bin", dtype=np.int32, mode="r", shape=(self.rows,)
+        )
+
+    def _centroid_scores(
+        self, vectors: np.ndarray, centroids: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Closeness of each vector to each centroid (higher is closer)."""
+        centroids = self.centroids if centroids is None else centroids
+        vectors = vectors.astype(np.float32, copy=False)
+        if self.distance in (DistanceMetric.COSINE, DistanceMetric.DOT_PRODUCT):
+            return vectors @ centroids.T
+        # Squared euclidean distance, less the constant query norm
+        return 2 * (vectors @ centroids.T) - np.einsum("ij,ij->i", centroids, centroids)
+
+    def _nearest_lists(
+        self, vectors: np.ndarray, centroids: np.ndarray | None = None
+    ) -> np.ndarray:
+        """The closest list for each vector."""
+        return self._centroid_scores(vectors, centroids).argmax(axis=1)
+
+    def _assign_rows(self, start: int, stop: int) -> None:
+        """Append list assignments for rows ``start:stop``."""
+        with (self.ivf_path / "assignments.bin").open("ab") as handle:
+            for block in range(start, stop, _BLOCK_ROWS):
+                end = min(block + _BLOCK_ROWS, stop)
+                lists = self._nearest_lists(self.matrix[block:end])
+                handle.write(lists.astype(np.int32).tobytes())
+
+    @property
+    def training_due(self) -> bool:
+        """Whether the collection grew enough to (re)train its quantizer."""
+        live = self.live_count
+        if not self.trained:
+            return live >= self.min_train_rows
+        return live > self.trained_rows * self.retrain_factor
+
+    def train(self) -> None:
+        """Train the coarse quantizer with k-means and assign every row."""
+        if (job := self.start_training()) is not None:
+            self.finish_training(job, *self.fit(job))
+
+    def start_training(self) -> _TrainingJob | None:
+        """Snapshot the rows to train on; ``None`` if the collection is empty.
+
+        Call under the collection lock. :meth:`fit` then needs no lock.
+        """
+        live = np.flatnonzero(self.alive)
+        if not len(live):
+            return None
+        nlist = self.fixed_nlist or int(np.clip(2 * math.sqrt(len(live)), 8, 65536))
+        nlist = max(1, min(nlist, len(live) // 8))
+        rng = np.random.default_rng(len(live))
+        sample_size = min(len(live), nlist * 32)
+        sample_rows = np.sort(rng.choice(live, size=sample_size, replace=False))
+        return _TrainingJob(
+            matrix=self.matrix,
+            rows=self.rows,
+            sample=np.asarray(self.matrix[sample_rows], dtype=np.float32),
+            nlist=nlist,
+            live=len(live),
+            generation=self.generation,
+        )
+
+    def fit(self, job: _TrainingJob) -> tuple[np.ndarray, np.ndarray]:
+        """Train centroids on a snapshot and assign its rows to them.
+
+        Appends don't move existing rows, so the snapshot's rows can be read while
+        the collection keeps changing.
+
+        Returns:
+            The centroids and the list of each snapshot row
+        """
+        centroids = self._kmeans(job.sample, job.nlist, np.random.default_rng(job.live))
+        assignments = np.empty(job.rows, dtype=np.int32)
+        for block in range(0, job.rows, _BLOCK_ROWS):
+            end = min(block + _BLOCK_ROWS, job.rows)
+            assignments[block:end] = self._nearest_lists(job.matrix[block:end], centroids)
+        return centroids, assignments
+
+    def finish_training(
+        self, job: _TrainingJob, centroids: np.ndarray, assignments: np.ndarray
+    ) -> bool:
+        """Swap trained lists in, assigning rows added since the snapshot.
+
+        Call under the collection lock.
+
+        Returns:
+            False if compaction renumbered the rows meanwhile and the result was
+            discarded
+        """
+        if job.generation != self.generation:
+            logger.debug("Discarding IVF training of %s, rows were compacted", self.path.name)
+            return False
+        self.centroids = centroids
+        (self.ivf_path / "assignments.bin").write_bytes(assignments.tobytes())
+        self._assign_rows(job.rows, self.rows)
+        self.trained_rows = job.live
+        _save_array(self.ivf_path / "centroids.npy", self.centroids)
+        self.rebuild_lists()
+        logger.info(
+            "Trained IVF index for %s: %d lists over %d rows", self.path.name, job.nlist, job.live
+        )
+        return True
+
+    def _kmeans(self, sample: np.ndarray, nlist: int, rng: np.random.Generator) -> np.ndarray:
+        """Lloyd's k-means; spherical for cosine distance."""
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            assignment = self._nearest_lists(sample, centroids)
+            order = np.argsort(assignment, kind="stable")
+            lists, starts = np.unique(assignment[order], return_index=True)
+            counts = np.diff(np.append(starts, len(order)))
+            centroids[lists] = np.add.reduceat(sample[order], starts, axis=0) / counts[:, None]
+            empty = np.setdiff1d(np.arange(nlist), lists)
+            if empty.size:
+                # Reseed empty lists with random sample points
+                centroids[empty] = sample[rng.choice(len(sample), size=len(empty))]
+            if self.distance == DistanceMetric.COSINE:
+                norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+                centroids /= np.where(norms == 0, 1, norms)
+        return centroids
+
+    def rebuild_lists(self) -> None:
+        """Group rows by list, folding the tail into the lists."""
+        assignments = np.asarray(self._assignments())
+        order = np.argsort(assignments, kind="stable").astype(np.int64)
+        counts = np.bincount(assignments, minlength=len(self.centroids))
+        _save_array(self.ivf_path / "order.npy", order)
+        _save_array(self.ivf_path / "offsets.npy", np.concatenate([[0], np.cumsum(counts)]))
+        self.order = np.load(self.ivf_path / "order.npy", mmap_mode="r")
+        self.offsets = np.load(self.ivf_path / "offsets.npy")
+        self.sorted_rows = self.rows
+        self._save_meta()
+
+    def upsert(self, points: list[VectorPoint]) -> None:
+        start = self.rows
+        super().upsert(points)
+        if self.trained:
+            self._assign_rows(start, self.rows)
+            if self.rows - self.sorted_rows > self.max_tail_rows:
+                self.rebuild_lists()
+
+    def compact(self) -> int:
+        if not self.trained:
+            reclaimed = super().compact()
+        else:
+            assignments = np.asarray(self._assignments()[np.flatnonzero(self.alive)])
+            reclaimed = super().compact()
+            if reclaimed:
+                (self.ivf_path / "assignments.bin").write_bytes(assignments.tobytes())
+                self.rebuild_lists()
+        if reclaimed:
+            self.generation += 1
+        return reclaimed
+
+    def search(
+        self,
+        query: np.ndarray,
+        limit: int,
+        allowed: np.ndarray | None,
+        block_rows: int,
+        **options: Any,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Score the rows of the ``nprobe`` nearest lists plus the unsorted tail."""
+        nprobe = options.get("nprobe") or 16
+        if not self.trained or nprobe >= len(self.centroids):
+            return super().search(query, limit, allowed, block_rows)
+        query = self._prepare(query.astype(np.float32))
+        probes = np.argpartition(-self._centroid_scores(query[None, :])[0], nprobe - 1)[:nprobe]
+        candidates = np.concatenate([
+            *(self.order[self.offsets[probe] : self.offsets[probe + 1]] for probe in probes),
+            np.arange(self.sorted_rows, self.rows),
+        ])
+        valid = self.alive[candidates].astype(bool)
+        if allowed is not None:
+            valid &= allowed[candidates]
+        # Sorted rows turn random reads of the memory map into forward scans
+        candidates = np.sort(candidates[valid])
+        if not len(candidates):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = self.scores(self.matrix[candidates], query)
+        k = min(limit, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return candidates[top], scores[top]
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "ivf_trained": self.trained,
+            "ivf_nlist": len(self.centroids) if self.trained else 0,
+            "ivf_tail_rows": self.rows - self.sorted_rows if self.trained else self.rows,
+        }
+
+
+class LocalIVFBackend(LocalVectorBackend):
+    """Local backend with approximate (IVF) search."""
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        nlist: int | None = None,
+        nprobe: int = 16,
+        min_train_rows: int = 4096,
+        max_tail_rows: int = 20_000,
+        retrain_factor: float = 4.0,
+        **kwargs: Any,
+    ):
+        """Initialize the IVF backend.
+
+        Args:
+            path: Directory holding the collections
+            nlist: Number of IVF lists (defaults to about ``2 * sqrt(rows)``)
+            nprobe: Lists scanned per search; higher is slower with better recall.
+                Can be overridden per ``search_vectors`` call.
+            min_train_rows: Rows needed before the index is trained; smaller
+                collections are searched exactly
+            max_tail_rows: Unsorted rows tolerated before the lists are regrouped
+            retrain_factor: Growth since the last training that triggers retraining
+            **kwargs: Options of :class:`LocalVectorBackend`
+        """
+        super().__init__(path, **kwargs)
+        # Collections whose quantizer is being trained
+        self._training: set[str] = set()
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_rows = min_train_rows
+        self.max_tail_rows = max_tail_rows
+        self.retrain_factor = retrain_factor
+
+    def _open_collection(self, path: Path) -> _IVFCollection:
+        return _IVFCollection(
+            path,
+            nlist=self.nlist,
+            min_train_rows=self.min_train_rows,
+            max_tail_rows=self.max_tail_rows,
+            retrain_factor=self.retrain_factor,
+        )
+
+    def _search_options(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        return {"nprobe": kwargs.get("nprobe", self.nprobe)}
+
+    async def upsert_vectors(self, collection_name: str, vectors: list[VectorPoint]) -> None:
+        """Insert or update vectors, training the index once the collection grew enough."""
+        await super().upsert_vectors(collection_name, vectors)
+        collection = self._collection(collection_name)
+        if collection_name not in self._training and await asyncio.to_thread(
+            self._locked, collection, lambda: collection.training_due
+        ):
+            await self.train(collection_name)
+
+    async def train(self, collection_name: str) -> None:
+        """Train (or retrain) a collection's index now.
+
+        The quantizer is fitted outside the collection lock, which is only held to
+        snapshot the rows and to swap the new lists in. A collection already being
+        trained is left to that run.
+        """
+        if collection_name in self._training:
+            return
+        collection = self._collection(collection_name)
+        self._training.add(collection_name)
+        try:
+            job = await asyncio.to_thread(self._locked, collection, collection.start_training)
+            if job is None:
+                return
+            centroids, assignments = await asyncio.to_thread(collection.fit, job)
+            await asyncio.to_thread(
+                self._locked, collection, collection.finish_training, job, centroids, assignments
+            )
+        finally:
+            self._training.discard(collection_name)
@@ -8,15 +8,36 @@ Qdrant vector database backend implementation.
 
 Provides both basic and hybrid search capabilities using Qdrant's
 native sparse vector support introduced in v1.10+.
+
+By default the backend uses ``AsyncQdrantClient`` so network round-trips never
+block the event loop. Every request goes through a shared connection pool, an
+in-flight limit and a per-call timeout. In ``"sync"`` mode the blocking
+``QdrantClient`` runs in worker threads instead.
+
+Upserts are split into batches that are serialized and sent in parallel with
+bounded concurrency; failed batches are retried on their own.
+
+Collections can store scalar (int8) or product-quantized vectors. The quantized
+codes are searched first, then the top candidates are rescored against the
+full-precision vectors, which are kept on disk.
+
+Sparse vectors are BM25 weights from :class:`~codeweaver.backends.sparse.BM25Encoder`;
+text queries to :meth:`QdrantHybridBackend.hybrid_search` are encoded with the same
+corpus statistics the indexed chunks were encoded with.
 """
 
+import asyncio
 import logging
+import math
+import time
 
-from contextlib import suppress
-from typing import Any
+from typing import Any, Literal
 
-from qdrant_client import QdrantClient
+import httpx
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.models import (
+    CompressionRatio,
     Distance,
     FieldCondition,
     Filter,
@@ -25,11 +46,21 @@ from qdrant_client.models import (
     MatchValue,
     PointStruct,
     Prefetch,
+    ProductQuantization,
+    ProductQuantizationConfig,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
     SparseIndexParams,
+    SparseVector,
     SparseVectorParams,
     VectorParams,
 )
 
+from codeweaver.backends.quantization import resolve_quantization
+from codeweaver.backends.sparse import BM25Encoder
 from codeweaver.cw_types import (
     BackendCollectionNotFoundError,
     BackendConnectionError,
@@ -38,6 +69,8 @@ from codeweaver.cw_types import (
     DistanceMetric,
     FilterCondition,
     HybridStrategy,
+    QuantizationConfig,
+    QuantizationMode,
     SearchFilter,
     SearchResult,
     VectorPoint,
@@ -46,6 +79,8 @@ from codeweaver.cw_types import (
 
 logger = logging.getLogger(__name__)
 
+ClientMode = Literal["async", "sync"]
+
 
 class QdrantBackend:
     """
@@ -57,11 +92,22 @@ class QdrantBackend:
 
     def __init__(
         self,
-        url: str,
+        url: str | None,
         api_key: str | None = None,
         *,
         enable_sparse_vectors: bool = False,
         sparse_on_disk: bool = False,
+        client_mode: ClientMode = "async",
+        max_connections: int = 10,
+        max_in_flight: int | None = None,
+        timeout: float | None = None,
+        upsert_batch_size: int = 256,
+        upsert_parallelism: int | None = None,
+        upsert_wait: bool = True,
+        upsert_retries: int = 3,
+        retry_backoff: float = 0.5,
+        quantization: QuantizationConfig | QuantizationMode | str | None = None,
+        sparse_encoder: BM25Encoder | None = None,
         **kwargs: Any,
     ):
         """
@@ -72,18 +118,103 @@ class QdrantBackend:
             api_key: Optional API key for authentication
             enable_sparse_vectors: Enable sparse vector support for hybrid search
             sparse_on_disk: Store sparse vectors on disk (vs memory)
+            client_mode: ``"async"`` for ``AsyncQdrantClient``, ``"sync"`` for
+                ``QdrantClient`` calls run in worker threads
+            max_connections: Size of the HTTP connection pool
+            max_in_flight: Maximum concurrent requests (defaults to ``max_connections``)
+            timeout: Per-call timeout in seconds
+            upsert_batch_size: Points per upsert request
+            upsert_parallelism: Maximum concurrent upsert batches (defaults to half the
+                in-flight limit, leaving room for searches)
+            upsert_wait: Wait for every batch to be applied; when ``False`` batches are
+                sent with ``wait=False`` and only the final batch waits, as a barrier
+            upsert_retries: Retries for a failed batch
+            retry_backoff: Initial delay in seconds between retries, doubled each attempt
+            quantization: Default quantization for new collections, and the rescoring
+                settings for searches
+            sparse_encoder: BM25 encoder holding the corpus statistics used for text
+                queries (an encoder without statistics weights query tokens equally)
             **kwargs: Additional Qdrant client options
         """
+        self.url = url
+        self.enable_sparse_vectors = enable_sparse_vectors
+        self.sparse_on_disk = sparse_on_disk
+        self.client_mode = client_mode
+        self.max_in_flight = max_in_flight or max_connections
+        self.timeout = timeout
+        self.upsert_batch_size = max(1, upsert_batch_size)
+        self.upsert_parallelism = upsert_parallelism or max(1, self.max_in_flight // 2)
+        self.upsert_wait = upsert_wait
+        self.upsert_retries = upsert_retries
+        self.retry_backoff = retry_backoff
+        self.quantization = resolve_quantization(quantization)
+        self.sparse_encoder = sparse_encoder or BM25Encoder()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._upsert_slots = asyncio.Semaphore(self.upsert_parallelism)
+        self.upsert_stats: dict[str, float] = {
+            "points": 0,
+            "batches": 0,
+            "retries": 0,
+            "seconds": 0.0,
+            "points_per_second": 0.0,
+        }
+        if timeout is not None:
+            kwargs.setdefault("timeout", math.ceil(timeout))
         try:
-            self.client = QdrantClient(url=url, api_key=api_key, **kwargs)
-            self.enable_sparse_vectors = enable_sparse_vectors
-            self.sparse_on_disk = sparse_on_disk
-            self.client.get_collections()
-            logger.info("Connected to Qdrant at %s", url)
+            if client_mode == "async":
+                kwargs.setdefault(
+                    "limits",
+                    httpx.Limits(
+                        max_connections=max_connections, max_keepalive_connections=max_connections
+                    ),
+                )
+                self.client = AsyncQdrantClient(url=url, api_key=api_key, **kwargs)
+                # Connectivity is verified on first use, since this can't await
+                self._connected = False
+            else:
+                self.client = QdrantClient(url=url, api_key=api_key, **kwargs)
+                self.client.get_collections()
+                self._connected = True
+                logger.info("Connected to Qdrant at %s", url)
         except Exception as e:
             raise BackendConnectionError(
                 f"Failed to connect to Qdrant at {url}", backend_type="qdrant", original_error=e
             ) from e
+        self._connect_lock = asyncio.Lock()
+
+    async def _call(self, method: str, /, **kwargs: Any) -> Any:
+        """Run a client method within the in-flight limit and call timeout."""
+        if not self._connected:
+            await self._connect()
+        async with self._in_flight:
+            if self.client_mode == "async":
+                call = getattr(self.client, method)(**kwargs)
+            else:
+                call = asyncio.to_thread(getattr(self.client, method), **kwargs)
+            return await asyncio.wait_for(call, self.timeout)
+
+    async def _connect(self) -> None:
+        """Verify connectivity of the async client once."""
+        async with self._connect_lock:
+            if self._connected:
+                return
+            try:
+                await asyncio.wait_for(self.client.get_collections(), self.timeout)
+            except Exception as e:
+                raise BackendConnectionError(
+                    f"Failed to connect to Qdrant at {self.url}",
+                    backend_type="qdrant",
+                    original_error=e,
+                ) from e
+            self._connected = True
+            logger.info("Connected to Qdrant at %s (async client)", self.url)
+
+    async def close(self) -> None:
+        """Close the client and its connection pool."""
+        if self.client_mode == "async":
+            await self.client.close()
+        else:
+            await asyncio.to_thread(self.client.close)
 
     def _convert_distance_metric(self, metric: DistanceMetric) -> Distance:
         """Convert universal distance metric to Qdrant Distance."""
@@ -139,11 +270,19 @@ class QdrantBackend:
         distance_metric: DistanceMetric = DistanceMetric.COSINE,
         **kwargs: Any,
     ) -> None:
-        """Create a new collection with optional sparse vector support."""
+        """Create a new collection with optional sparse vectors and quantization.
+
+        A ``quantization`` keyword (a config, a mode name, or a dict of settings)
+        overrides the backend default. Quantized collections keep their
+        full-precision vectors on disk for rescoring.
+        """
+        quantization = resolve_quantization(kwargs.pop("quantization", self.quantization))
         try:
             vectors_config = {
                 "dense": VectorParams(
-                    size=dimension, distance=self._convert_distance_metric(distance_metric)
+                    size=dimension,
+                    distance=self._convert_distance_metric(distance_metric),
+                    on_disk=True if quantization.mode.is_quantized else None,
                 )
             }
             sparse_vectors_config = None
@@ -154,39 +293,145 @@ class QdrantBackend:
                     )
                 }
                 logger.info("Enabling sparse vectors for collection %s", name)
-            self.client.create_collection(
+            await self._call(
+                "create_collection",
                 collection_name=name,
                 vectors_config=vectors_config,
                 sparse_vectors_config=sparse_vectors_config,
+                quantization_config=self._quantization_config(quantization),
                 **kwargs,
             )
-            logger.info("Created Qdrant collection: %s (dimension: %d)", name, dimension)
+            logger.info(
+                "Created Qdrant collection: %s (dimension: %d, quantization: %s)",
+                name,
+                dimension,
+                quantization.mode.value,
+            )
         except Exception as e:
             raise BackendError(
                 f"Failed to create collection {name}", backend_type="qdrant", original_error=e
             ) from e
 
+    @staticmethod
+    def _quantization_config(
+        quantization: QuantizationConfig,
+    ) -> ScalarQuantization | ProductQuantization | None:
+        """Convert a quantization config to Qdrant's collection setting."""
+        if quantization.mode == QuantizationMode.SCALAR:
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    quantile=quantization.quantile,
+                    always_ram=quantization.always_ram,
+                )
+            )
+        if quantization.mode == QuantizationMode.PRODUCT:
+            return ProductQuantization(
+                product=ProductQuantizationConfig(
+                    compression=CompressionRatio(f"x{quantization.compression}"),
+                    always_ram=quantization.always_ram,
+                )
+            )
+        return None
+
+    def _search_params(self, kwargs: dict[str, Any]) -> SearchParams:
+        """Rescoring settings for a search; ignored by Qdrant for unquantized collections."""
+        return SearchParams(
+            quantization=QuantizationSearchParams(
+                rescore=kwargs.pop("rescore", self.quantization.rescore),
+                oversampling=kwargs.pop("oversampling", self.quantization.oversampling),
+            )
+        )
+
     async def upsert_vectors(self, collection_name: str, vectors: list[VectorPoint]) -> None:
-        """Insert or update vectors in the collection."""
+        """Insert or update vectors in the collection.
+
+        Vectors are serialized and sent in batches of ``upsert_batch_size``, at most
+        ``upsert_parallelism`` at a time; new batches are only started when a slot
+        frees up. A failed batch is retried on its own. Without ``upsert_wait``, the
+        final batch is sent with ``wait=True`` once all others are acknowledged, so
+        the call returns only after the whole write has been applied.
+        """
+        if not vectors:
+            return
+        started = time.monotonic()
+        retries = self.upsert_stats["retries"]
+        step = self.upsert_batch_size
+        batches = [vectors[start : start + step] for start in range(0, len(vectors), step)]
+        barrier = None if self.upsert_wait else batches.pop()
         try:
-            points = []
-            for vector_point in vectors:
-                point_data = {
-                    "id": vector_point.id,
-                    "vector": {"dense": vector_point.vector},
-                    "payload": vector_point.payload or {},
-                }
-                if vector_point.sparse_vector and self.enable_sparse_vectors:
-                    point_data["vector"]["sparse"] = vector_point.sparse_vector
-                points.append(PointStruct(**point_data))
-            self.client.upsert(collection_name=collection_name, points=points)
-            logger.debug("Upserted %d vectors to collection %s", len(vectors), collection_name)
-        except Exception as e:
+            async with asyncio.TaskGroup() as group:
+                for batch in batches:
+                    await self._upsert_slots.acquire()
+                    task = group.create_task(
+                        self._upsert_batch(collection_name, batch, wait=self.upsert_wait)
+                    )
+                    task.add_done_callback(lambda _: self._upsert_slots.release())
+            if barrier is not None:
+                await self._upsert_batch(collection_name, barrier, wait=True)
+        except* Exception as group:
+            error = group.exceptions[0]
             raise BackendError(
                 f"Failed to upsert vectors to {collection_name}",
                 backend_type="qdrant",
-                original_error=e,
-            ) from e
+                original_error=error,
+            ) from error
+        elapsed = time.monotonic() - started
+        self.upsert_stats["points"] += len(vectors)
+        self.upsert_stats["seconds"] += elapsed
+        self.upsert_stats["points_per_second"] = (
+            self.upsert_stats["points"] / self.upsert_stats["seconds"]
+            if self.upsert_stats["seconds"]
+            else 0.0
+        )
+        logger.debug(
+            "Upserted %d vectors to collection %s in %d batches (%.0f points/s, %d retries)",
+            len(vectors),
+            collection_name,
+            len(batches) + (barrier is not None),
+            len(vectors) / elapsed if elapsed else 0.0,
+            self.upsert_stats["retries"] - retries,
+        )
+
+    async def _upsert_batch(
+        self, collection_name: str, batch: list[VectorPoint], *, wait: bool
+    ) -> None:
+        """Serialize and send one upsert batch, retrying it on failure."""
+        points = [self._to_point_struct(vector_point) for vector_point in batch]
+        for attempt in range(self.upsert_retries + 1):
+            try:
+                await self._call(
+                    "upsert", collection_name=collection_name, points=points, wait=wait
+                )
+            except Exception as e:
+                if attempt == self.upsert_retries:
+                    raise
+                delay = self.retry_backoff * 2**attempt
+                self.upsert_stats["retries"] += 1
+                logger.warning(
+                    "Upsert batch of %d points failed (attempt %d/%d), retrying in %.1fs: %s",
+                    len(points),
+                    attempt + 1,
+                    self.upsert_retries + 1,
+                    delay,
+                    e,
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.upsert_stats["batches"] += 1
+                return
+
+    def _to_point_struct(self, vector_point: VectorPoint) -> PointStruct:
+        """Convert a VectorPoint to a Qdrant PointStruct."""
+        vector = {"dense": vector_point.vector}
+        if vector_point.sparse_vector and self.enable_sparse_vectors:
+            vector["sparse"] = self._to_sparse_vector(vector_point.sparse_vector)
+        return PointStruct(id=vector_point.id, vector=vector, payload=vector_point.payload or {})
+
+    @staticmethod
+    def _to_sparse_vector(weights: dict[int, float]) -> SparseVector:
+        """Convert a sparse weight mapping to a Qdrant SparseVector."""
+        return SparseVector(indices=list(weights), values=list(weights.values()))
 
     async def search_vectors(
         self,
@@ -197,9 +442,15 @@ class QdrantBackend:
         score_threshold: float | None = None,
         **kwargs: Any,
     ) -> list[SearchResult]:
-        """Search for similar vectors using dense embeddings."""
+        """Search for similar vectors using dense embeddings.
+
+        On quantized collections, ``rescore`` and ``oversampling`` keywords override
+        the backend's rescoring settings.
+        """
         try:
             qdrant_filter = self._convert_filter(search_filter) if search_filter else None
+            if "search_params" not in kwargs:
+                kwargs["search_params"] = self._search_params(kwargs)
             search_params = {
                 "collection_name": collection_name,
                 "query_vector": ("dense", query_vector),
@@ -208,7 +459,7 @@ class QdrantBackend:
                 "score_threshold": score_threshold,
                 **kwargs,
             }
-            results = self.client.search(**search_params)
+            results = await self._call("search", **search_params)
         except Exception as e:
             raise BackendError(
                 f"Failed to search collection {collection_name}",
@@ -221,7 +472,7 @@ class QdrantBackend:
     async def delete_vectors(self, collection_name: str, ids: list[str | int]) -> None:
         """Delete vectors by IDs."""
         try:
-            self.client.delete(collection_name=collection_name, points_selector=ids)
+            await self._call("delete", collection_name=collection_name, points_selector=ids)
             logger.debug("Deleted %d vectors from collection %s", len(ids), collection_name)
         except Exception as e:
             raise BackendError(
@@ -233,15 +484,19 @@ class QdrantBackend:
     async def get_collection_info(self, name: str) -> CollectionInfo:
         """Get collection metadata and capabilities."""
         try:
-            collection = self.client.get_collection(name)
+            collection = await self._call("get_collection", collection_name=name)
             vectors_config = collection.config.params.vectors
             if isinstance(vectors_config, dict):
                 dense_config = vectors_config.get("dense")
                 dimension = dense_config.size if dense_config else 0
-                supports_sparse = "sparse" in vectors_config
             else:
                 dimension = vectors_config.size
-                supports_sparse = False
+                dense_config = vectors_config
+            supports_sparse = "sparse" in (collection.config.params.sparse_vectors or {})
+            quantization = self._convert_quantization(
+                getattr(dense_config, "quantization_config", None)
+                or collection.config.quantization_config
+            )
         except Exception as e:
             if "not found" in str(e).lower():
                 raise BackendCollectionNotFoundError(
@@ -263,13 +518,23 @@ class QdrantBackend:
                 supports_updates=True,
                 storage_type="hybrid",
                 index_type="hnsw",
+                quantization=quantization,
                 backend_info={
                     "qdrant_version": getattr(collection, "version", None),
                     "optimizer_status": collection.optimizer_status,
-                    "payload_schema": collection.config.params.payload_schema,
+                    "payload_schema": collection.payload_schema,
                 },
             )
 
+    @staticmethod
+    def _convert_quantization(quantization_config: Any) -> QuantizationMode:
+        """Convert Qdrant's quantization setting to a quantization mode."""
+        if isinstance(quantization_config, ScalarQuantization):
+            return QuantizationMode.SCALAR
+        if isinstance(quantization_config, ProductQuantization):
+            return QuantizationMode.PRODUCT
+        return QuantizationMode.NONE
+
     def _convert_qdrant_distance(self, vectors_config: Any) -> DistanceMetric:
         """Convert Qdrant Distance to universal DistanceMetric."""
         if isinstance(vectors_config, dict):
@@ -288,7 +553,7 @@ class QdrantBackend:
     async def list_collections(self) -> list[str]:
         """List all available collections."""
         try:
-            collections = self.client.get_collections()
+            collections = await self._call("get_collections")
         except Exception as e:
             raise BackendError(
                 "Failed to list collections", backend_type="qdrant", original_error=e
@@ -299,7 +564,7 @@ class QdrantBackend:
     async def delete_collection(self, name: str) -> None:
         """Delete a collection entirely."""
         try:
-            self.client.delete_collection(name)
+            await self._call("delete_collection", collection_name=name)
             logger.info("Deleted Qdrant collection: %s", name)
         except Exception as e:
             raise BackendError(
@@ -352,7 +617,7 @@ class QdrantHybridBackend(QdrantBackend):
         self,
         collection_name: str,
         dense_vector: list[float],
-        sparse_query: dict[str, float] | str,
+        sparse_query: dict[int, float] | str,
         limit: int = 10,
         hybrid_strategy: HybridStrategy = HybridStrategy.RRF,
         alpha: float = 0.5,
@@ -363,23 +628,33 @@ class QdrantHybridBackend(QdrantBackend):
         Perform hybrid search using Qdrant's Query API.
 
         Combines dense vector search with sparse keyword matching
-        using server-side fusion for optimal performance.
+        using server-side fusion for optimal performance. A text ``sparse_query`` is
+        encoded with the backend's BM25 encoder.
         """
         try:
             if isinstance(sparse_query, str):
-                tokens = sparse_query.lower().split()
-                sparse_vector = {hash(token) % 10000: 1.0 for token in tokens}
+                sparse_vector = self.sparse_encoder.encode_query(sparse_query)
             else:
-                sparse_vector = sparse_query
-            prefetch_queries = [Prefetch(query=dense_vector, using="dense", limit=limit * 2)]
+                sparse_vector = {int(index): value for index, value in sparse_query.items()}
+            prefetch_queries = [
+                Prefetch(
+                    query=dense_vector,
+                    using="dense",
+                    limit=limit * 2,
+                    params=self._search_params(kwargs),
+                )
+            ]
             if sparse_vector:
                 prefetch_queries.append(
-                    Prefetch(query=sparse_vector, using="sparse", limit=limit * 2)
+                    Prefetch(
+                        query=self._to_sparse_vector(sparse_vector), using="sparse", limit=limit * 2
+                    )
                 )
             fusion_mapping = {HybridStrategy.RRF: Fusion.RRF, HybridStrategy.DBSF: Fusion.DBSF}
             fusion = fusion_mapping.get(hybrid_strategy, Fusion.RRF)
             qdrant_filter = self._convert_filter(search_filter) if search_filter else None
-            result = self.client.query_points(
+            result = await self._call(
+                "query_points",
                 collection_name=collection_name,
                 prefetch=prefetch_queries,
                 query=FusionQuery(fusion=fusion),
@@ -408,14 +683,8 @@ class QdrantHybridBackend(QdrantBackend):
     async def health_check(self) -> bool:
         """Check backend health and connectivity."""
         try:
-            health_info = self.client.get_cluster_info()
-            if not health_info:
-                return False
             # Check collections are accessible
-            self.client.get_collections()
-            # Try to get telemetry for comprehensive health check
-            with suppress(Exception):
-                self.client.get_telemetry()
+            await self._call("get_collections")
         except Exception:
             return False
         else:
@@ -426,9 +695,13 @@ class QdrantHybridBackend(QdrantBackend):
         try:
             return {
                 "backend_type": "qdrant",
-                "url": getattr(self.client, "_client", {}).get("url", "unknown"),
+                "url": self.url or "unknown",
+                "client_mode": self.client_mode,
+                "max_in_flight": self.max_in_flight,
+                "timeout": self.timeout,
                 "sparse_vectors_enabled": self.enable_sparse_vectors,
                 "sparse_on_disk": getattr(self, "sparse_on_disk", False),
+                "quantization": self.quantization.mode.value,
             }
         except Exception:
             return {"backend_type": "qdrant", "status": "connection_info_unavailable"}
@@ -436,14 +709,17 @@ class QdrantHybridBackend(QdrantBackend):
     async def get_performance_metrics(self) -> dict[str, Any]:
         """Get performance metrics for monitoring."""
         try:
-            collections = self.client.get_collections()
+            collections = await self._call("get_collections")
             metrics = {
                 "total_collections": len(collections.collections) if collections else 0,
                 "collections": [],
+                "upsert": dict(self.upsert_stats),
             }
             for collection in collections.collections if collections else []:
                 try:
-                    collection_info = self.client.get_collection(collection.name)
+                    collection_info = await self._call(
+                        "get_collection", collection_name=collection.name
+                    )
                     metrics["collections"].append({
                         "name": collection.name,
                         "points_count": collection_info.points_count if collection_info else 0,
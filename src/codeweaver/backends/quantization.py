@@ -0,0 +1,449 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""
+Client-side vector quantization for backends without native support.
+
+``ScalarQuantizer`` stores each dimension as a uint8 between per-dimension
+quantile bounds (4x smaller than float32). ``ProductQuantizer`` splits vectors
+into subvectors and stores the index of the nearest of 256 centroids for each
+(``compression`` times smaller). Both score queries directly against the codes.
+
+``QuantizedIndex`` keeps the codes for a collection and returns approximate
+candidates. Callers rescore those against the full-precision vectors held by the
+backend. Codes are appended to files in an optional directory, so the index
+survives restarts without re-reading the backend.
+"""
+
+import json
+import logging
+
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from codeweaver.cw_types import DistanceMetric, QuantizationConfig, QuantizationMode
+
+
+logger = logging.getLogger(__name__)
+
+_BLOCK_ROWS = 65536
+
+
+def resolve_quantization(
+    value: QuantizationConfig | QuantizationMode | str | dict[str, Any] | None,
+) -> QuantizationConfig:
+    """Build a quantization config from a config, a mode, or a dict of settings."""
+    if value is None:
+        return QuantizationConfig()
+    if isinstance(value, QuantizationConfig):
+        return value
+    if isinstance(value, dict):
+        return QuantizationConfig.model_validate(value)
+    return QuantizationConfig(mode=QuantizationMode(value))
+
+
+def prepare_vectors(vectors: np.ndarray, metric: DistanceMetric) -> np.ndarray:
+    """Normalize vectors for cosine distance, so scoring is a dot product."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if metric == DistanceMetric.COSINE:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+    return vectors
+
+
+def exact_scores(vectors: np.ndarray, query: np.ndarray, metric: DistanceMetric) -> np.ndarray:
+    """Similarity of prepared vectors to a prepared query (higher is better)."""
+    if metric == DistanceMetric.MANHATTAN:
+        return -np.abs(vectors - query).sum(axis=1)
+    if metric == DistanceMetric.EUCLIDEAN:
+        return -((vectors - query) ** 2).sum(axis=1)
+    return vectors @ query
+
+
+def similarity(raw_scores: np.ndarray, metric: DistanceMetric) -> np.ndarray:
+    """Map raw scores from ``exact_scores`` onto the 0-1 range of search results."""
+    if metric == DistanceMetric.MANHATTAN:
+        return 1 / (1 - raw_scores)
+    if metric == DistanceMetric.EUCLIDEAN:
+        return 1 / (1 + np.sqrt(np.maximum(-raw_scores, 0)))
+    return np.clip(raw_scores, 0.0, 1.0)
+
+
+def _kmeans(
+    sample: np.ndarray, clusters: int, rng: np.random.Generator, iterations: int = 12
+) -> np.ndarray:
+    """Lloyd's k-means with squared euclidean distance."""
+    centroids = sample[rng.choice(len(sample), size=clusters, replace=False)].copy()
+    for _ in range(iterations):
+        distances = np.einsum("ij,ij->i", centroids, centroids)[None, :] - 2 * (
+            sample @ centroids.T
+        )
+        assignment = distances.argmin(axis=1)
+        counts = np.bincount(assignment, minlength=clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        if not filled.all():
+            # Reseed empty clusters with random sample points
+            centroids[~filled] = sample[rng.choice(len(sample), size=int((~filled).sum()))]
+    return centroids
+
+
+class ScalarQuantizer:
+    """int8 scalar quantization with per-dimension bounds."""
+
+    def __init__(self, lower: np.ndarray, scale: np.ndarray):
+        """Initialize from per-dimension lower bounds and step sizes."""
+        self.lower = lower.astype(np.float32)
+        self.scale = scale.astype(np.float32)
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, config: QuantizationConfig) -> "ScalarQuantizer":
+        """Fit bounds that clip the tails beyond ``config.quantile``."""
+        lower = np.quantile(vectors, 1 - config.quantile, axis=0)
+        upper = np.quantile(vectors, config.quantile, axis=0)
+        return cls(lower, np.maximum(upper - lower, 1e-12) / 255)
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return len(self.lower)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Quantize vectors to one uint8 per dimension."""
+        codes = np.rint((vectors - self.lower) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Approximate vectors from their codes."""
+        return codes.astype(np.float32) * self.scale + self.lower
+
+    def scores(self, codes: np.ndarray, query: np.ndarray, metric: DistanceMetric) -> np.ndarray:
+        """Approximate similarity of coded vectors to a query."""
+        if metric in (DistanceMetric.COSINE, DistanceMetric.DOT_PRODUCT):
+            # The dot product distributes over the affine decoding
+            return codes @ (query * self.scale) + self.lower @ query
+        return exact_scores(self.decode(codes), query, metric)
+
+    def state(self) -> dict[str, np.ndarray]:
+        """Arrays needed to restore the quantizer."""
+        return {"lower": self.lower, "scale": self.scale}
+
+
+class ProductQuantizer:
+    """Product quantization with 256 centroids per subvector."""
+
+    def __init__(self, centroids: np.ndarray):
+        """Initialize from trained codebooks."""
+        # Shape (subvectors, centroids per subvector, subvector dimension)
+        self.centroids = centroids.astype(np.float32)
+
+    @staticmethod
+    def subvector_count(dimension: int, compression: int) -> int:
+        """The largest divisor of ``dimension`` within the requested compression."""
+        target = max(1, dimension * 4 // compression)
+        return next(m for m in range(min(target, dimension), 0, -1) if dimension % m == 0)
+
+    @classmethod
+    def fit(
+        cls, vectors: np.ndarray, config: QuantizationConfig, seed: int = 0
+    ) -> "ProductQuantizer":
+        """Train one k-means codebook per subvector."""
+        count = cls.subvector_count(vectors.shape[1], config.compression)
+        rng = np.random.default_rng(seed)
+        clusters = min(256, len(vectors))
+        sample = vectors[rng.choice(len(vectors), size=min(len(vectors), 256 * 40), replace=False)]
+        parts = np.split(sample, count, axis=1)
+        return cls(np.stack([_kmeans(part, clusters, rng) for part in parts]))
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector, one per subvector."""
+        return self.centroids.shape[0]
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Replace each subvector with the index of its nearest centroid."""
+        codes = np.empty((len(vectors), self.code_size), dtype=np.uint8)
+        for index, part in enumerate(np.split(vectors, self.code_size, axis=1)):
+            book = self.centroids[index]
+            distances = np.einsum("ij,ij->i", book, book)[None, :] - 2 * (part @ book.T)
+            codes[:, index] = distances.argmin(axis=1)
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Approximate vectors by concatenating the coded centroids."""
+        return np.concatenate(
+            [self.centroids[index][codes[:, index]] for index in range(self.code_size)], axis=1
+        )
+
+    def scores(self, codes: np.ndarray, query: np.ndarray, metric: DistanceMetric) -> np.ndarray:
+        """Approximate similarity using per-subvector lookup tables."""
+        parts = np.split(query, self.code_size)
+        if metric in (DistanceMetric.COSINE, DistanceMetric.DOT_PRODUCT):
+            table = np.einsum("mkd,md->mk", self.centroids, np.stack(parts))
+        elif metric == DistanceMetric.MANHATTAN:
+            table = -np.abs(self.centroids - np.stack(parts)[:, None, :]).sum(axis=2)
+        else:
+            table = -((self.centroids - np.stack(parts)[:, None, :]) ** 2).sum(axis=2)
+        return table[np.arange(self.code_size), codes].sum(axis=1)
+
+    def state(self) -> dict[str, np.ndarray]:
+        """Arrays needed to restore the quantizer."""
+        return {"centroids": self.centroids}
+
+
+Quantizer = ScalarQuantizer | ProductQuantizer
+
+
+class QuantizedIndex:
+    """Quantized codes for one collection, searched for rescoring candidates.
+
+    Vectors added before ``min_train_rows`` are reached are kept in full precision
+    and scanned exactly; the quantizer is then trained on them and they are encoded.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        metric: DistanceMetric,
+        config: QuantizationConfig,
+        path: Path | None = None,
+        *,
+        min_train_rows: int = 4096,
+    ):
+        """Initialize the index, loading existing codes from ``path``.
+
+        Args:
+            dimension: Vector dimension
+            metric: Distance metric of the collection
+            config: Quantization settings; ``mode`` must be a quantized mode
+            path: Directory for the codes; ``None`` keeps them in memory only
+            min_train_rows: Vectors collected before the quantizer is trained
+        """
+        if not config.mode.is_quantized:
+            raise ValueError("QuantizedIndex needs a quantized mode")
+        self.dimension = dimension
+        self.metric = metric
+        self.config = config
+        self.path = path
+        self.min_train_rows = min_train_rows
+        self.quantizer: Quantizer | None = None
+        self.ids: list[str | int] = []
+        self.rows: dict[str | int, int] = {}
+        # Row storage grows geometrically; rows past ``_count`` are spare capacity
+        self._code_rows = np.empty((0, 0), dtype=np.uint8)
+        self._alive_rows = np.empty(0, dtype=bool)
+        self._count = 0
+        self._pending: dict[str | int, np.ndarray] = {}
+        if path is not None:
+            path.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def __len__(self) -> int:
+        """Number of live vectors, quantized or pending."""
+        return len(self.rows) + len(self._pending)
+
+    @property
+    def trained(self) -> bool:
+        """Whether the quantizer has been trained."""
+        return self.quantizer is not None
+
+    @property
+    def _codes(self) -> np.ndarray:
+        return self._code_rows[: self._count]
+
+    @property
+    def _alive(self) -> np.ndarray:
+        return self._alive_rows[: self._count]
+
+    def _set_rows(self, codes: np.ndarray, alive: np.ndarray) -> None:
+        self._code_rows = codes
+        self._alive_rows = alive
+        self._count = len(alive)
+
+    def _reserve(self, rows: int) -> None:
+        """Make room for ``rows`` more codes, doubling the capacity when it runs out."""
+        needed = self._count + rows
+        if needed <= len(self._alive_rows):
+            return
+        capacity = max(needed, 2 * len(self._alive_rows), 1024)
+        codes = np.empty((capacity, self._code_rows.shape[1]), dtype=np.uint8)
+        codes[: self._count] = self._codes
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: self._count] = self._alive
+        self._code_rows = codes
+        self._alive_rows = alive
+
+    def _load(self) -> None:
+        state_path = self.path / "quantizer.npz"
+        if state_path.exists():
+            with np.load(state_path) as state:
+                self.quantizer = self._restore(dict(state))
+            codes = np.fromfile(self.path / "codes.bin", dtype=np.uint8)
+            code_size = self.quantizer.code_size
+            with (self.path / "ids.jsonl").open() as handle:
+                ids = [json.loads(line) for line in handle]
+            # Rows past the shorter file are from an interrupted append
+            count = min(len(ids), len(codes) // code_size)
+            self._set_rows(
+                codes[: count * code_size].reshape(count, code_size), np.ones(count, dtype=bool)
+            )
+            self.ids = ids[:count]
+            for row, point_id in enumerate(self.ids):
+                if point_id in self.rows:
+                    self._alive[self.rows[point_id]] = False
+                self.rows[point_id] = row
+            deleted_path = self.path / "deleted.jsonl"
+            if deleted_path.exists():
+                with deleted_path.open() as handle:
+                    for line in handle:
+                        point_id, row = json.loads(line)
+                        if self.rows.get(point_id) == row:
+                            del self.rows[point_id]
+                            self._alive[row] = False
+        pending_path = self.path / "pending.npz"
+        if pending_path.exists() and not self.trained:
+            with np.load(pending_path) as pending:
+                ids = json.loads(str(pending["ids"]))
+                self._pending = dict(zip(ids, pending["vectors"], strict=True))
+
+    def _restore(self, state: dict[str, np.ndarray]) -> Quantizer:
+        if self.config.mode == QuantizationMode.SCALAR:
+            return ScalarQuantizer(state["lower"], state["scale"])
+        return ProductQuantizer(state["centroids"])
+
+    def add(self, ids: list[str | int], vectors: np.ndarray) -> None:
+        """Add or replace vectors."""
+        vectors = prepare_vectors(vectors, self.metric)
+        if not self.trained:
+            # Nothing is encoded yet, so replacing only touches the pending vectors
+            self._pending.update(zip(ids, vectors, strict=True))
+            if len(self._pending) >= self.min_train_rows:
+                self.train()
+            elif self.path is not None:
+                self._save_pending()
+            return
+        self.remove(ids)
+        self._append(ids, self.quantizer.encode(vectors))
+
+    def train(self) -> None:
+        """Train the quantizer on the pending vectors and encode them."""
+        if not self._pending:
+            return
+        ids = list(self._pending)
+        vectors = np.stack(list(self._pending.values()))
+        if self.config.mode == QuantizationMode.SCALAR:
+            self.quantizer = ScalarQuantizer.fit(vectors, self.config)
+        else:
+            self.quantizer = ProductQuantizer.fit(vectors, self.config)
+        self._pending = {}
+        self._set_rows(
+            np.empty((0, self.quantizer.code_size), dtype=np.uint8), np.empty(0, dtype=bool)
+        )
+        if self.path is not None:
+            np.savez(self.path / "quantizer.npz", **self.quantizer.state())
+            (self.path / "pending.npz").unlink(missing_ok=True)
+        self._append(ids, self.quantizer.encode(vectors))
+        logger.info(
+            "Trained %s quantizer on %d vectors (%d bytes per vector)",
+            self.config.mode.value,
+            len(ids),
+            self.quantizer.code_size,
+        )
+
+    def _append(self, ids: list[str | int], codes: np.ndarray) -> None:
+        start = self._count
+        self._reserve(len(ids))
+        self._code_rows[start : start + len(ids)] = codes
+        self._alive_rows[start : start + len(ids)] = True
+        self._count += len(ids)
+        self.ids.extend(ids)
+        self.rows.update((point_id, start + offset) for offset, point_id in enumerate(ids))
+        if self.path is not None:
+            with (self.path / "codes.bin").open("ab") as handle:
+                handle.write(codes.tobytes())
+            with (self.path / "ids.jsonl").open("a") as handle:
+                handle.writelines(f"{json.dumps(point_id)}\n" for point_id in ids)
+
+    def _save_pending(self) -> None:
+        if not self._pending:
+            (self.path / "pending.npz").unlink(missing_ok=True)
+            return
+        np.savez(
+            self.path / "pending.npz",
+            ids=np.asarray(json.dumps(list(self._pending))),
+            vectors=np.stack(list(self._pending.values())),
+        )
+
+    def remove(self, ids: list[str | int]) -> None:
+        """Drop vectors; unknown IDs are ignored."""
+        removed: list[tuple[str | int, int]] = []
+        removed_pending = False
+        for point_id in ids:
+            if self._pending.pop(point_id, None) is not None:
+                removed_pending = True
+            elif (row := self.rows.pop(point_id, None)) is not None:
+                self._alive[row] = False
+                removed.append((point_id, row))
+        if removed_pending and self.path is not None:
+            self._save_pending()
+        if removed and self.path is not None:
+            with (self.path / "deleted.jsonl").open("a") as handle:
+                handle.writelines(f"{json.dumps(entry)}\n" for entry in removed)
+        if len(self._alive) > 1024 and len(self.rows) < len(self._alive) // 2:
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop the codes of removed and replaced vectors."""
+        live = np.flatnonzero(self._alive)
+        self._set_rows(self._codes[live], np.ones(len(live), dtype=bool))
+        self.ids = [self.ids[row] for row in live]
+        self.rows = {point_id: row for row, point_id in enumerate(self.ids)}
+        if self.path is not None:
+            (self.path / "codes.tmp").write_bytes(self._codes.tobytes())
+            (self.path / "ids.tmp").write_text(
+                "".join(f"{json.dumps(point_id)}\n" for point_id in self.ids)
+            )
+            (self.path / "codes.tmp").replace(self.path / "codes.bin")
+            (self.path / "ids.tmp").replace(self.path / "ids.jsonl")
+            (self.path / "deleted.jsonl").unlink(missing_ok=True)
+
+    def search(self, query: list[float] | np.ndarray, limit: int) -> list[tuple[str | int, float]]:
+        """Approximate top-k candidates as ``(id, raw score)``, best first."""
+        query = prepare_vectors(np.asarray(query), self.metric)
+        ids: list[str | int] = []
+        scores: list[np.ndarray] = []
+        if self._pending:
+            ids.extend(self._pending)
+            scores.append(exact_scores(np.stack(list(self._pending.values())), query, self.metric))
+        for start in range(0, len(self._codes), _BLOCK_ROWS):
+            stop = min(start + _BLOCK_ROWS, len(self._codes))
+            alive = np.flatnonzero(self._alive[start:stop]) + start
+            if not len(alive):
+                continue
+            block = self.quantizer.scores(self._codes[alive], query, self.metric)
+            k = min(limit, len(alive))
+            top = np.argpartition(-block, k - 1)[:k]
+            ids.extend(self.ids[row] for row in alive[top])
+            scores.append(block[top])
+        if not ids:
+            return []
+        merged = np.concatenate(scores)
+        order = np.argsort(-merged, kind="stable")[:limit]
+        return [(ids[index], float(merged[index])) for index in order]
+
+    def statistics(self) -> dict[str, Any]:
+        """Size of the index, for collection info."""
+        code_size = self.quantizer.code_size if self.trained else 0
+        return {
+            "quantization": self.config.mode.value,
+            "quantized_vectors": len(self.rows),
+            "pending_vectors": len(self._pending),
+            "bytes_per_vector": code_size,
+            "compression_ratio": self.dimension * 4 / code_size if code_size else 1.0,
+        }
@@ -0,0 +1,393 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""
+Code-aware BM25 sparse encoder for hybrid search.
+
+Identifiers are split on underscores and camelCase boundaries, so ``parseHttpRequest``
+and ``parse_http_request`` both index as ``parse``, ``http`` and ``request`` (plus the
+whole identifier). Token IDs are 32-bit BLAKE2b digests of the token, which are stable
+across processes and runs, unlike Python's salted ``hash()``.
+
+Document vectors carry the BM25 term-frequency component and are computed once per
+chunk at index time; query vectors carry the IDF weights, so the dot product of the
+two is the BM25 score. Corpus statistics are kept per document ID, which makes
+re-adding a document idempotent and removing one exact, and are persisted next to
+the collection's other index state.
+
+:class:`SparseIndex` is an inverted index over the document vectors, for backends
+that have no sparse search of their own. It journals its changes to a file next to
+the encoder's statistics and replays the journal on open.
+"""
+
+import hashlib
+import heapq
+import json
+import logging
+import math
+import re
+
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Any, TextIO
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+SparseVector = dict[int, float]
+
+_WORD = re.compile(r"[A-Za-z0-9_]+")
+_WORD_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+_MIN_TOKEN_LENGTH = 2
+_MAX_TOKEN_LENGTH = 64
+# Rewrite a sparse index journal on open once it has this many records per document
+_JOURNAL_COMPACTION_RATIO = 4
+
+
+def tokenize(text: str) -> list[str]:
+    """Split source text into lowercase, code-aware tokens.
+
+    Compound identifiers yield their parts and the whole identifier, so a query for
+    either the exact name or one of its words matches.
+
+    Args:
+        text: Source code or query text
+
+    Returns:
+        Tokens in order of appearance, including repeats
+    """
+    tokens: list[str] = []
+    for word in _WORD.findall(text):
+        parts = [part.lower() for part in _WORD_PART.findall(word)]
+        compound = word.strip("_").lower()
+        if len(parts) > 1 and _MIN_TOKEN_LENGTH <= len(compound) <= _MAX_TOKEN_LENGTH:
+            tokens.append(compound)
+        tokens.extend(part for part in parts if _MIN_TOKEN_LENGTH <= len(part) <= _MAX_TOKEN_LENGTH)
+    return tokens
+
+
+def token_id(token: str) -> int:
+    """Get the stable 32-bit sparse index for a token."""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+class BM25Encoder:
+    """Incremental BM25 encoder with persisted corpus statistics.
+
+    Each document's length and distinct token IDs are tracked by document ID, and
+    document frequencies are derived from them. Memory therefore grows with the
+    number of distinct tokens per chunk (four bytes each), not with chunk size.
+
+    Document weights use the average document length at the time they are
+    encoded; as the corpus grows this drifts slightly from textbook BM25, which
+    is the usual trade-off for encoding each chunk only once.
+    """
+
+    def __init__(self, path: Path | None = None, *, k1: float = 1.2, b: float = 0.75):
+        """Initialize the encoder, loading saved statistics from ``path`` if present.
+
+        Args:
+            path: Optional file the corpus statistics are persisted to
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._documents: dict[str, tuple[int, np.ndarray]] = {}
+        self._df: Counter[int] = Counter()
+        self._total_length = 0
+        self._dirty = False
+        if path is not None and path.exists():
+            self._load(path)
+
+    @property
+    def document_count(self) -> int:
+        """Number of documents in the corpus statistics."""
+        return len(self._documents)
+
+    @property
+    def average_length(self) -> float:
+        """Average document length in tokens."""
+        return self._total_length / len(self._documents) if self._documents else 0.0
+
+    def document_frequency(self, token: str) -> int:
+        """Number of documents containing ``token``."""
+        return self._df[token_id(token)]
+
+    def idf(self, term: int) -> float:
+        """BM25 inverse document frequency of a token ID."""
+        df = self._df[term]
+        return math.log(1.0 + (len(self._documents) - df + 0.5) / (df + 0.5))
+
+    def add_documents(self, ids: Sequence[str | int], texts: Sequence[str]) -> list[SparseVector]:
+        """Add documents to the corpus statistics and encode them.
+
+        Re-adding an existing ID replaces its previous contribution.
+
+        Args:
+            ids: Document (vector point) IDs
+            texts: Document texts, aligned with ``ids``
+
+        Returns:
+            Sparse document vectors, aligned with ``texts``
+        """
+        counts = [Counter(token_id(token) for token in tokenize(text)) for text in texts]
+        for doc_id, tf in zip(ids, counts, strict=True):
+            key = str(doc_id)
+            self._forget(key)
+            terms = np.fromiter(tf.keys(), dtype=np.uint32, count=len(tf))
+            length = sum(tf.values())
+            self._documents[key] = (length, terms)
+            self._df.update(tf.keys())
+            self._total_length += length
+        if counts:
+            self._dirty = True
+        return [self._document_weights(tf) for tf in counts]
+
+    def remove_documents(self, ids: Iterable[str | int]) -> int:
+        """Remove documents from the corpus statistics.
+
+        Args:
+            ids: Document IDs; unknown IDs are ignored
+
+        Returns:
+            Number of documents removed
+        """
+        removed = sum(self._forget(str(doc_id)) for doc_id in ids)
+        if removed:
+            self._dirty = True
+        return removed
+
+    def encode_document(self, text: str) -> SparseVector:
+        """Encode a document without changing the corpus statistics."""
+        return self._document_weights(Counter(token_id(token) for token in tokenize(text)))
+
+    def encode_query(self, text: str) -> SparseVector:
+        """Encode a query as IDF weights.
+
+        Tokens no document contains are dropped. Without any corpus statistics every
+        token gets weight 1.0, so queries still match on term overlap.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Sparse query vector
+        """
+        counts = Counter(token_id(token) for token in tokenize(text))
+        if not self._documents:
+            return {term: float(count) for term, count in counts.items()}
+        return {term: count * self.idf(term) for term, count in counts.items() if self._df[term]}
+
+    def save(self) -> None:
+        """Persist the corpus statistics, if they changed since the last save."""
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        ids = list(self._documents)
+        lengths = np.array([self._documents[key][0] for key in ids], dtype=np.int64)
+        sizes = np.array([len(self._documents[key][1]) for key in ids], dtype=np.int64)
+        terms = (
+            np.concatenate([self._documents[key][1] for key in ids])
+            if ids
+            else np.empty(0, dtype=np.uint32)
+        )
+        temp = self.path.with_name(f"{self.path.name}.tmp")
+        with temp.open("wb") as handle:
+            np.savez(
+                handle, ids=np.array(ids, dtype=np.str_), lengths=lengths, sizes=sizes, terms=terms
+            )
+        temp.replace(self.path)
+        self._dirty = False
+        logger.debug("Saved BM25 statistics for %d documents to %s", len(ids), self.path)
+
+    def statistics(self) -> dict[str, Any]:
+        """Get corpus statistics for monitoring."""
+        return {
+            "documents": len(self._documents),
+            "vocabulary": len(self._df),
+            "average_length": self.average_length,
+            "k1": self.k1,
+            "b": self.b,
+        }
+
+    def _document_weights(self, tf: Counter[int]) -> SparseVector:
+        """BM25 term-frequency weights of one document."""
+        length = sum(tf.values())
+        average = self.average_length or length or 1
+        norm = self.k1 * (1.0 - self.b + self.b * length / average)
+        return {term: count * (self.k1 + 1.0) / (count + norm) for term, count in tf.items()}
+
+    def _forget(self, key: str) -> bool:
+        """Drop a document's contribution to the statistics."""
+        document = self._documents.pop(key, None)
+        if document is None:
+            return False
+        length, terms = document
+        self._total_length -= length
+        self._df.subtract(terms.tolist())
+        for term in terms.tolist():
+            if self._df[term] <= 0:
+                del self._df[term]
+        return True
+
+    def _load(self, path: Path) -> None:
+        """Load corpus statistics saved by :meth:`save`."""
+        with np.load(path) as data:
+            ids = data["ids"].tolist()
+            lengths = data["lengths"].tolist()
+            terms = data["terms"]
+            offsets = np.concatenate(([0], np.cumsum(data["sizes"])))
+        for index, key in enumerate(ids):
+            self._documents[key] = (lengths[index], terms[offsets[index] : offsets[index + 1]])
+        self._total_length = sum(lengths)
+        if terms.size:
+            unique, counts = np.unique(terms, return_counts=True)
+            self._df = Counter(dict(zip(unique.tolist(), counts.tolist(), strict=True)))
+        logger.debug("Loaded BM25 statistics for %d documents from %s", len(ids), path)
+
+
+class SparseIndex:
+    """Inverted index over sparse document vectors.
+
+    Used for sparse retrieval by backends that have no native sparse search.
+    Scores are dot products, so with BM25 document and query vectors they are
+    BM25 scores.
+
+    The index is held in memory. With a ``path``, every change is appended to a
+    JSON-lines journal there, which is replayed when the index is opened again;
+    a partial record left by a crash is dropped, and the journal is rewritten
+    once replaced and removed documents dominate it.
+    """
+
+    def __init__(self, path: Path | None = None):
+        """Initialize the index, replaying the journal at ``path`` if present.
+
+        Args:
+            path: Optional journal file the index is persisted to
+        """
+        self.path = path
+        self._postings: dict[int, dict[str, float]] = {}
+        self._terms: dict[str, tuple[int, ...]] = {}
+        self._journal: TextIO | None = None
+        if path is not None:
+            self._open_journal(path)
+
+    def __len__(self) -> int:
+        """Number of indexed documents."""
+        return len(self._terms)
+
+    def add(self, ids: Sequence[str | int], vectors: Sequence[SparseVector | None]) -> None:
+        """Index sparse vectors, replacing those already stored under the same IDs.
+
+        Args:
+            ids: Document IDs
+            vectors: Sparse vectors, aligned with ``ids``; ``None`` entries are skipped
+        """
+        documents = {str(doc_id): vector or {} for doc_id, vector in zip(ids, vectors, strict=True)}
+        self._add(documents)
+        if documents:
+            self._append({"add": documents})
+
+    def remove(self, ids: Iterable[str | int]) -> None:
+        """Remove documents from the index."""
+        keys = [str(doc_id) for doc_id in ids]
+        for key in keys:
+            self._discard(key)
+        if keys:
+            self._append({"remove": keys})
+
+    def clear(self) -> None:
+        """Remove all documents, emptying the journal too."""
+        self._postings.clear()
+        self._terms.clear()
+        if self._journal is not None:
+            self._journal.truncate(0)
+
+    def close(self) -> None:
+        """Close the journal."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def search(self, query: SparseVector, limit: int) -> list[tuple[str, float]]:
+        """Find the documents with the highest dot product with ``query``.
+
+        Args:
+            query: Sparse query vector
+            limit: Maximum number of hits
+
+        Returns:
+            (document ID, score) pairs, best first
+        """
+        scores: dict[str, float] = {}
+        for term, weight in query.items():
+            for key, value in self._postings.get(int(term), {}).items():
+                scores[key] = scores.get(key, 0.0) + weight * value
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def _add(self, documents: dict[str, SparseVector]) -> None:
+        """Index documents without journaling them."""
+        for key, vector in documents.items():
+            self._discard(key)
+            if not vector:
+                continue
+            for term, weight in vector.items():
+                self._postings.setdefault(int(term), {})[key] = weight
+            self._terms[key] = tuple(int(term) for term in vector)
+
+    def _discard(self, key: str) -> None:
+        """Drop a document's postings."""
+        for term in self._terms.pop(key, ()):
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+
+    def _append(self, record: dict[str, Any]) -> None:
+        """Append a change to the journal."""
+        if self._journal is not None:
+            self._journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._journal.flush()
+
+    def _open_journal(self, path: Path) -> None:
+        """Replay the journal, compacting it when needed, and open it for appending."""
+        records = 0
+        intact = True
+        if path.exists():
+            with path.open(encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Only the last record can be partial
+                        intact = False
+                        break
+                    if "add" in record:
+                        self._add(record["add"])
+                    else:
+                        for key in record["remove"]:
+                            self._discard(key)
+                    records += 1
+        if not intact or records > _JOURNAL_COMPACTION_RATIO * max(len(self), 1):
+            self._rewrite_journal(path)
+            logger.debug("Rewrote sparse index journal %s (%d records)", path, records)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._journal = path.open("a", encoding="utf-8")
+
+    def _rewrite_journal(self, path: Path) -> None:
+        """Replace the journal with a single record of the indexed documents."""
+        documents = {
+            key: {term: self._postings[term][key] for term in terms}
+            for key, terms in self._terms.items()
+        }
+        temp = path.with_name(f"{path.name}.tmp")
+        with temp.open("w", encoding="utf-8") as journal:
+            journal.write(json.dumps({"add": documents}, separators=(",", ":")) + "\n")
+        temp.replace(path)
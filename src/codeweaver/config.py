@@ -55,12 +55,32 @@ class ChunkingConfig(BaseModel):
     min_chunk_size: Annotated[int, Field(default=50, ge=10, le=500)] = Field(
         description="Minimum chunk size in characters"
     )
+    max_chunk_tokens: Annotated[int | None, Field(default=None, ge=16, le=32768)] = Field(
+        description="Chunk size budget in embedding-model tokens; replaces max_chunk_size when set"
+    )
     max_file_size_mb: Annotated[int, Field(default=1, ge=1, le=100)] = Field(
         description="Skip files larger than this (MB)"
     )
     language_settings: dict[str, dict[str, Any]] = Field(
         default_factory=dict, description="Language-specific chunking settings"
     )
+    nested_chunk_policy: Literal["outermost", "innermost", "all"] = Field(
+        default="outermost",
+        description="Keep the outermost, innermost or all of nested AST matches (e.g. class and its methods)",
+    )
+    split_oversized_nodes: bool = Field(
+        default=True,
+        description="Split AST nodes larger than max_chunk_size into pieces instead of skipping them",
+    )
+    parallel_mode: Literal["off", "process", "thread"] = Field(
+        default="process", description="Run chunking on a process or thread pool during indexing"
+    )
+    parallel_workers: Annotated[int | None, Field(default=None, ge=1, le=256)] = Field(
+        description="Chunking workers (defaults to the CPU count)"
+    )
+    files_per_task: Annotated[int, Field(default=8, ge=1, le=256)] = Field(
+        description="Files sent to a chunking worker per task"
+    )
 
     @model_validator(mode="after")
     def validate_chunk_sizes(self) -> "ChunkingConfig":
@@ -92,6 +112,7 @@ class IndexingConfig(BaseModel):
             ".mypy_cache",
             ".vscode",
             ".idea",
+            ".codeweaver",
         ],
         description="Additional patterns to ignore during indexing",
     )
@@ -107,6 +128,23 @@ class IndexingConfig(BaseModel):
     max_concurrent_files: Annotated[int, Field(default=10, ge=1, le=50)] = Field(
         description="Maximum concurrent files to process"
     )
+    pipeline_window_size: Annotated[int, Field(default=64, ge=1, le=4096)] = Field(
+        description="Chunks per embedding/upsert window; bounds items buffered between indexing stages"
+    )
+    incremental: bool = Field(
+        default=True, description="Skip unchanged files when reindexing, using the file manifest"
+    )
+    index_dir: Path | None = Field(
+        default=None,
+        description="Directory for index state such as the file manifest (defaults to <path>/.codeweaver/index)",
+    )
+    embedding_cache: bool = Field(
+        default=True,
+        description="Persist embeddings per chunk text so unchanged code is never re-embedded",
+    )
+    embedding_cache_dtype: Literal["float32", "float16"] = Field(
+        default="float32", description="On-disk precision of cached embeddings"
+    )
 
 
 class RateLimitConfig(BaseModel):
@@ -157,6 +195,21 @@ class ServerConfig(BaseModel):
     max_search_results: Annotated[int, Field(default=50, ge=1, le=1000)] = Field(
         description="Maximum search results to return"
     )
+    query_cache_size: Annotated[int, Field(default=1024, ge=0, le=100000)] = Field(
+        description="Maximum cached query embeddings (0 disables the cache)"
+    )
+    query_cache_ttl_seconds: Annotated[int, Field(default=3600, ge=1, le=86400)] = Field(
+        description="Time to live of cached query embeddings"
+    )
+    search_cache_size: Annotated[int, Field(default=256, ge=0, le=100000)] = Field(
+        description="Maximum cached search results (0 disables the cache)"
+    )
+    query_batch_window_ms: Annotated[float, Field(default=5.0, ge=0.0, le=1000.0)] = Field(
+        description="Time concurrent queries wait to share an embedding call (0 disables)"
+    )
+    query_batch_size: Annotated[int, Field(default=32, ge=1, le=1024)] = Field(
+        description="Maximum queries embedded in one call"
+    )
 
 
 class ProviderConfig(BaseModel):
@@ -10,6 +10,7 @@ This module provides a single import point for all commonly used types,
 classes, and functions from the _types subpackage, eliminating circular
 dependency issues and simplifying import statements.
 """
+
 from __future__ import annotations
 
 from typing import TYPE_CHECKING, Literal
@@ -32,6 +33,8 @@ from codeweaver.cw_types.backends import (
     HybridStrategy,
     IndexType,
     ProviderInfo,
+    QuantizationConfig,
+    QuantizationMode,
     RerankProviderBase,
     SearchFilter,
     SearchResult,
@@ -250,8 +253,9 @@ from codeweaver.cw_types.sources import (
 )
 
 
-CodeWeaver = FastMCP[Literal["CodeWeaver"]]
-CodeWeaverClient = Client[FastMCPTransport]
+# Lazily evaluated, so fastmcp is only imported for type checking
+type CodeWeaver = FastMCP[Literal["CodeWeaver"]]
+type CodeWeaverClient = Client[FastMCPTransport]
 
 
 # Configuration exceptions - define locally to avoid circular imports
@@ -434,6 +438,8 @@ __all__ = (
     "ProviderResourceError",
     "ProviderStatus",
     "ProviderType",
+    "QuantizationConfig",
+    "QuantizationMode",
     "RateLimitingService",
     "RateLimitingServiceConfig",
     "ReconfigurationError",
@@ -7,6 +7,7 @@
 from codeweaver.cw_types.backends.base import (
     CollectionInfo,
     FilterCondition,
+    QuantizationConfig,
     SearchFilter,
     SearchResult,
     VectorPoint,
@@ -22,6 +23,7 @@ from codeweaver.cw_types.backends.enums import (
     HybridFusionStrategy,
     HybridStrategy,
     IndexType,
+    QuantizationMode,
     SparseIndexType,
     StorageType,
 )
@@ -46,6 +48,8 @@ __all__ = [
     "HybridStrategy",
     "IndexType",
     "ProviderInfo",
+    "QuantizationConfig",
+    "QuantizationMode",
     "RerankProviderBase",
     "SearchFilter",
     "SearchResult",
@@ -7,7 +7,7 @@
 Commons types for Backend sources (like vector databases).
 """
 
-from typing import Annotated, Any
+from typing import Annotated, Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -15,6 +15,7 @@ from codeweaver.cw_types.backends.enums import (
     DistanceMetric,
     FilterOperator,
     IndexType,
+    QuantizationMode,
     StorageType,
 )
 
@@ -61,6 +62,42 @@ class SearchResult(BaseModel):
     ]
 
 
+class QuantizationConfig(BaseModel):
+    """Quantized storage of dense vectors, with full-precision rescoring."""
+
+    model_config = ConfigDict(extra="allow", validate_assignment=True)
+
+    mode: Annotated[
+        QuantizationMode, Field(default=QuantizationMode.NONE, description="Quantization mode")
+    ]
+    compression: Annotated[
+        Literal[4, 8, 16, 32, 64],
+        Field(default=16, description="Product quantization compression ratio over float32"),
+    ]
+    quantile: Annotated[
+        float,
+        Field(
+            default=0.99,
+            gt=0.5,
+            le=1.0,
+            description="Scalar quantization quantile; outliers beyond it are clipped",
+        ),
+    ]
+    always_ram: Annotated[bool, Field(default=True, description="Keep quantized codes in memory")]
+    rescore: Annotated[
+        bool, Field(default=True, description="Rescore candidates against full-precision vectors")
+    ]
+    oversampling: Annotated[
+        float,
+        Field(
+            default=2.0,
+            ge=1.0,
+            le=16.0,
+            description="Candidates fetched from the quantized index per requested result",
+        ),
+    ]
+
+
 class CollectionInfo(BaseModel):
     """Collection metadata structure for introspection."""
 
@@ -95,6 +132,10 @@ class CollectionInfo(BaseModel):
     index_type: Annotated[
         IndexType | None, Field(default=None, description="Index type used by the collection")
     ]
+    quantization: Annotated[
+        QuantizationMode,
+        Field(default=QuantizationMode.NONE, description="Quantization of stored vectors"),
+    ]
     backend_info: Annotated[
         dict[str, Any] | None, Field(default=None, description="Backend-specific information")
     ]
@@ -317,6 +317,38 @@ def get_all_backend_capabilities() -> dict[str, BackendCapabilities]:
             requires_api_key=True,
             is_cloud_native=True,
         ),
+        "local": BackendCapabilities(
+            supports_hybrid_search=False,
+            supports_sparse_vectors=False,
+            supports_filtering=True,
+            supports_updates=True,
+            supports_deletes=True,
+            supported_distance_metrics=[
+                DistanceMetric.COSINE,
+                DistanceMetric.EUCLIDEAN,
+                DistanceMetric.DOT_PRODUCT,
+                DistanceMetric.MANHATTAN,
+            ],
+            supported_index_types=[IndexType.FLAT],
+            storage_type=StorageType.DISK,
+            supports_persistence=True,
+        ),
+        "local_ivf": BackendCapabilities(
+            supports_hybrid_search=False,
+            supports_sparse_vectors=False,
+            supports_filtering=True,
+            supports_updates=True,
+            supports_deletes=True,
+            supported_distance_metrics=[
+                DistanceMetric.COSINE,
+                DistanceMetric.EUCLIDEAN,
+                DistanceMetric.DOT_PRODUCT,
+                DistanceMetric.MANHATTAN,
+            ],
+            supported_index_types=[IndexType.IVF_FLAT, IndexType.FLAT],
+            storage_type=StorageType.DISK,
+            supports_persistence=True,
+        ),
 
         "redis": BackendCapabilities(
             supports_hybrid_search=False,
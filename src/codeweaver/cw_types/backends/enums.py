@@ -148,6 +148,8 @@ class BackendProvider(BaseEnum):
     VEARCH = "vearch"
     VESPA = "vespa"
     TYPESENSE = "typesense"
+    LOCAL = "local"  # Embedded NumPy backend
+    LOCAL_IVF = "local_ivf"  # Embedded NumPy backend with an IVF index
     CUSTOM = "custom"
 
     @property
@@ -271,3 +273,16 @@ class IndexType(BaseEnum):
     def is_graph_based(self) -> bool:
         """Check if this is a graph-based index."""
         return self in {self.HNSW, self.DPG}
+
+
+class QuantizationMode(BaseEnum):
+    """Storage quantization of dense vectors."""
+
+    NONE = "none"  # Full-precision float32
+    SCALAR = "scalar"  # int8 per dimension, 4x smaller
+    PRODUCT = "product"  # Product quantization codes, 4-64x smaller
+
+    @property
+    def is_quantized(self) -> bool:
+        """Check if vectors are stored as quantized codes."""
+        return self != self.NONE
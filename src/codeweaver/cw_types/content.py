@@ -11,6 +11,7 @@ providing validation, serialization, and type safety.
 """
 
 import hashlib
+import uuid
 
 from typing import Annotated, Any
 
@@ -20,6 +21,22 @@ from codeweaver.cw_types.backends.base import SearchResult
 from codeweaver.cw_types.factories.data_structures import ContentItem, ContentType
 
 
+# Namespace for chunk point IDs; changing it changes every stored ID
+CHUNK_ID_NAMESPACE = uuid.UUID("6f1c1d56-0c7e-5b8e-9a43-3c2f7b1de0a4")
+
+
+def chunk_point_id(file_path: str, start_line: int, end_line: int, content_hash: str) -> str:
+    """Get the vector point ID for a chunk.
+
+    IDs are UUIDv5 values derived from the chunk's location and content hash, so
+    they are identical across processes and re-indexing the same chunk overwrites
+    its existing point instead of adding a duplicate.
+    """
+    return str(
+        uuid.uuid5(CHUNK_ID_NAMESPACE, f"{file_path}:{start_line}-{end_line}:{content_hash}")
+    )
+
+
 class CodeChunk(BaseModel):
     """
     Pydantic model representing a semantic chunk of code.
@@ -67,6 +84,11 @@ class CodeChunk(BaseModel):
         """Get a unique identifier for this chunk."""
         return f"{self.file_path}:{self.start_line}-{self.end_line}:{self.hash}"
 
+    @property
+    def point_id(self) -> str:
+        """Get the stable vector point ID for this chunk."""
+        return chunk_point_id(self.file_path, self.start_line, self.end_line, self.hash)
+
     def to_metadata(self) -> dict[str, Any]:
         """Convert to metadata format for vector database storage.
 
@@ -7,7 +7,7 @@
 """Service configuration types for CodeWeaver."""
 
 from pathlib import Path
-from typing import Annotated, Any
+from typing import Annotated, Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -39,7 +39,19 @@ class ChunkingServiceConfig(ServiceConfig):
     max_chunk_size: Annotated[int, Field(gt=0, le=10000, description="Max chunk size")] = 1500
     min_chunk_size: Annotated[int, Field(gt=0, le=1000, description="Min chunk size")] = 50
     overlap_size: Annotated[int, Field(ge=0, description="Chunk overlap size")] = 100
+    max_chunk_tokens: Annotated[
+        int | None, Field(gt=0, description="Chunk size budget in model tokens")
+    ] = None
+    chars_per_token: Annotated[
+        dict[str, float], Field(description="Chars-per-token ratio by language")
+    ] = Field(default_factory=dict)
     ast_grep_enabled: Annotated[bool, Field(description="Enable AST chunking")] = True
+    nested_chunk_policy: Annotated[
+        Literal["outermost", "innermost", "all"], Field(description="Nested AST match handling")
+    ] = "outermost"
+    split_oversized_nodes: Annotated[
+        bool, Field(description="Split oversized AST nodes instead of skipping them")
+    ] = True
     fallback_strategy: Annotated[ChunkingStrategy, Field(description="Fallback strategy")] = (
         ChunkingStrategy.SIMPLE
     )
@@ -77,6 +89,9 @@ class FilteringServiceConfig(ServiceConfig):
     use_gitignore: Annotated[bool, Field(description="Respect .gitignore")] = True
     parallel_scanning: Annotated[bool, Field(description="Enable parallel scanning")] = True
     max_concurrent_scans: Annotated[int, Field(gt=0, description="Max concurrent scans")] = 10
+    stream_buffer_size: Annotated[
+        int, Field(gt=0, description="Discovered paths buffered ahead of a stream consumer")
+    ] = 256
 
     # File type filtering
     allowed_extensions: Annotated[list[str], Field(description="Allowed file extensions")] = Field(
@@ -400,6 +415,9 @@ class AutoIndexingConfig(ServiceConfig):
     debounce_delay: Annotated[float, Field(ge=0, description="Debounce delay for file changes")] = (
         1.0
     )
+    max_batch_delay: Annotated[
+        float, Field(gt=0, description="Longest a change batch is held while events keep arriving")
+    ] = 10.0
     max_file_size: Annotated[int, Field(gt=0, description="Maximum file size to index")] = (
         1048576  # 1MB
     )
@@ -414,6 +432,9 @@ class AutoIndexingConfig(ServiceConfig):
     # Performance settings
     max_concurrent_indexing: Annotated[int, Field(gt=0, description="Max concurrent indexing")] = 5
     indexing_batch_size: Annotated[int, Field(gt=0, description="Indexing batch size")] = 10
+    embedding_batch_size: Annotated[
+        int, Field(gt=0, description="Max chunks per embedding call (capped by the provider)")
+    ] = 128
     indexing_queue_size: Annotated[int, Field(gt=0, description="Max indexing queue size")] = 1000
 
     # Error handling
@@ -10,11 +10,14 @@ Provides intelligent code chunking using ast-grep's tree-sitter parsers
 with fallback parsing, integrated as FastMCP middleware for service injection.
 """
 
+import asyncio
+import copy
 import logging
 
+from functools import cache
 from pathlib import Path
 from types import MappingProxyType
-from typing import Any, ClassVar
+from typing import Any, ClassVar, Literal, NamedTuple
 
 from fastmcp.server.middleware import Middleware, MiddlewareContext
 from fastmcp.server.middleware.middleware import CallNext
@@ -29,7 +32,7 @@ from codeweaver.language_constants import (
 
 # ast-grep for proper tree-sitter parsing
 try:
-    from ast_grep_py import SgRoot
+    from ast_grep_py import SgNode, SgRoot
 
     AST_GREP_AVAILABLE = True
 except ImportError:
@@ -38,6 +41,71 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# How matches nested inside other matches (a method inside a class) are handled:
+# "outermost" keeps the enclosing match, "innermost" keeps the nested ones and
+# "all" keeps both.
+NestedChunkPolicy = Literal["outermost", "innermost", "all"]
+
+
+class _Span(NamedTuple):
+    """A region of a file selected as a chunk (lines are 0-based)."""
+
+    start_line: int
+    end_line: int
+    start_index: int
+    end_index: int
+    chunk_type: str
+    node_kind: str
+    content: str
+    split: bool = False
+
+    @classmethod
+    def from_node(cls, node: "SgNode", chunk_type: str) -> "_Span":
+        """Create a span covering a whole node."""
+        span = node.range()
+        return cls(
+            start_line=span.start.line,
+            end_line=span.end.line,
+            start_index=span.start.index,
+            end_index=span.end.index,
+            chunk_type=chunk_type,
+            node_kind=node.kind(),
+            content=node.text(),
+        )
+
+
+class _FileLines:
+    """Line access with O(1) size lookups for line ranges."""
+
+    def __init__(self, content: str):
+        self.lines = content.split("\n")
+        self._offsets = [0]
+        for line in self.lines:
+            self._offsets.append(self._offsets[-1] + len(line) + 1)
+
+    def __getitem__(self, line: int) -> str:
+        return self.lines[line]
+
+    def offset(self, line: int) -> int:
+        """Character offset at which a line starts."""
+        return self._offsets[min(line, len(self.lines))]
+
+    def size(self, start_line: int, end_line: int) -> int:
+        """Number of characters in a line range (inclusive)."""
+        return self.offset(end_line + 1) - self.offset(start_line)
+
+    def text(self, start_line: int, end_line: int) -> str:
+        """Text of a line range (inclusive)."""
+        return "\n".join(self.lines[start_line : end_line + 1])
+
+
+def _last_line(node: "SgNode") -> int:
+    """Last line a node has content on (its end may sit at column 0 of the next line)."""
+    span = node.range()
+    if span.end.column == 0 and span.end.line > span.start.line:
+        return span.end.line - 1
+    return span.end.line
+
 
 class ChunkingMiddleware(Middleware):
     """FastMCP middleware providing intelligent code chunking services."""
@@ -97,12 +165,21 @@ class ChunkingMiddleware(Middleware):
         self.max_chunk_size = self.config.get("max_chunk_size", 1500)
         self.min_chunk_size = self.config.get("min_chunk_size", 50)
         self.ast_grep_enabled = self.config.get("ast_grep_enabled", True) and AST_GREP_AVAILABLE
+        self.nested_chunk_policy: NestedChunkPolicy = self.config.get(
+            "nested_chunk_policy", "outermost"
+        )
+        self.split_oversized_nodes = self.config.get("split_oversized_nodes", True)
+        # Token budget; when set, max_chunk_size is derived per language from it
+        self.max_chunk_tokens: int | None = self.config.get("max_chunk_tokens")
+        self.chars_per_token: dict[str, float] = dict(self.config.get("chars_per_token") or {})
+        self._language_chunkers: dict[str, ChunkingMiddleware] = {}
 
         logger.info(
-            "ChunkingMiddleware initialized: max_size=%d, min_size=%d, ast_grep=%s",
+            "ChunkingMiddleware initialized: max_size=%d, min_size=%d, ast_grep=%s, nested=%s",
             self.max_chunk_size,
             self.min_chunk_size,
             self.ast_grep_enabled,
+            self.nested_chunk_policy,
         )
 
     async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
@@ -126,6 +203,22 @@ class ChunkingMiddleware(Middleware):
     async def chunk_file(self, file_path: Path, content: str) -> list[CodeChunk]:
         """Chunk file content using AST-grep or fallback methods.
 
+        Parsing is CPU-bound, so it runs in a worker thread to keep the event loop
+        responsive. Use :class:`~codeweaver.services.chunking_executor.ChunkingExecutor`
+        to spread chunking across processes.
+
+        Args:
+            file_path: Path to the file being chunked
+            content: File content to chunk
+
+        Returns:
+            List of CodeChunk objects representing chunks
+        """
+        return await asyncio.to_thread(self.chunk_file_sync, file_path, content)
+
+    def chunk_file_sync(self, file_path: Path, content: str) -> list[CodeChunk]:
+        """Chunk file content synchronously.
+
         Args:
             file_path: Path to the file being chunked
             content: File content to chunk
@@ -134,11 +227,12 @@ class ChunkingMiddleware(Middleware):
             List of CodeChunk objects representing chunks
         """
         language = self._detect_language(file_path)
+        chunker = self._for_language(language)
 
         if self.ast_grep_enabled and language in self.CHUNK_PATTERNS:
-            chunks = await self._chunk_with_ast_grep(content, language, file_path)
+            chunks = chunker._ast_grep_chunks(content, language, file_path)
         else:
-            chunks = await self._chunk_with_fallback(content, file_path, language)
+            chunks = chunker._fallback_chunks(content, file_path, language)
 
         logger.debug(
             "Chunked %s: %d chunks (language: %s, ast_grep: %s)",
@@ -150,55 +244,312 @@ class ChunkingMiddleware(Middleware):
 
         return chunks
 
+    def max_chunk_size_for(self, language: str) -> int:
+        """Get the character budget for chunks of a language.
+
+        With a token budget, the budget is converted using the language's
+        chars-per-token ratio so chunks are packed toward the model's limit.
+        """
+        if not self.max_chunk_tokens:
+            return self.max_chunk_size
+        ratio = self.chars_per_token.get(language) or self.chars_per_token.get("default", 3.2)
+        return max(self.min_chunk_size + 1, int(self.max_chunk_tokens * ratio))
+
+    def _for_language(self, language: str) -> "ChunkingMiddleware":
+        """Get a chunker whose ``max_chunk_size`` matches the language's budget."""
+        if not self.max_chunk_tokens:
+            return self
+        if (chunker := self._language_chunkers.get(language)) is None:
+            chunker = copy.copy(self)
+            chunker.max_chunk_size = self.max_chunk_size_for(language)
+            self._language_chunkers[language] = chunker
+        return chunker
+
     def _detect_language(self, file_path: Path) -> str:
         """Detect programming language from file extension."""
-        suffix = file_path.suffix.lower()
+        suffix = file_path.suffix.lower().lstrip(".")
+        language = self.SUPPORTED_LANGUAGES.get(suffix)
+
+        return language.value if language else "unknown"
 
-        return self.SUPPORTED_LANGUAGES.get(suffix, "unknown")
+    @classmethod
+    @cache
+    def node_kinds(cls, language: str) -> MappingProxyType[str, str]:
+        """Get the node-kind -> chunk-type table for a language.
+
+        When several patterns name the same node kind, the first one wins.
+        """
+        table: dict[str, str] = {}
+        for kind, chunk_type in cls.CHUNK_PATTERNS.get(language, ()):
+            table.setdefault(kind, chunk_type)
+        return MappingProxyType(table)
 
     async def _chunk_with_ast_grep(
         self, content: str, language: str, file_path: Path
     ) -> list[CodeChunk]:
         """Chunk content using AST-grep patterns."""
-        try:
-            root = SgRoot(content, language)
-            patterns = self.CHUNK_PATTERNS[language]
-            chunks = []
-
-            for pattern, chunk_type in patterns:
-                matches = root.root().find_all(pattern)
-                for match in matches:
-                    chunk_content = match.text()
+        return self._for_language(language)._ast_grep_chunks(content, language, file_path)
 
-                    # Filter by size constraints
-                    if not (self.min_chunk_size <= len(chunk_content) <= self.max_chunk_size):
-                        continue
+    def _ast_grep_chunks(self, content: str, language: str, file_path: Path) -> list[CodeChunk]:
+        """Chunk content using AST-grep patterns (synchronous).
 
-                    # Create CodeChunk for this chunk
-                    chunk = CodeChunk.create_with_hash(
-                        content=chunk_content,
-                        file_path=str(file_path),
-                        start_line=match.start_pos().line,
-                        end_line=match.end_pos().line,
-                        chunk_type=chunk_type,
-                        language=language,
-                        node_kind=pattern,
-                        metadata={"ast_grep_used": True},
-                    )
-                    chunks.append(chunk)
+        The syntax tree is walked once; each node is classified against the
+        language's node-kind table and chunks are emitted in document order.
+        """
+        try:
+            root = SgRoot(content, language).root()
+            lines = _FileLines(content)
+            chunks = [
+                CodeChunk.create_with_hash(
+                    content=span.content,
+                    file_path=str(file_path),
+                    start_line=span.start_line + 1,
+                    end_line=span.end_line + 1,
+                    chunk_type=span.chunk_type,
+                    language=language,
+                    node_kind=span.node_kind,
+                    metadata={"ast_grep_used": True, "split": True}
+                    if span.split
+                    else {"ast_grep_used": True},
+                )
+                for span in self._select_spans(root, self.node_kinds(language), lines)
+            ]
 
         except Exception as e:
             logger.warning("AST-grep chunking failed for %s: %s", file_path, e)
             # Fall back to simple chunking
-            return await self._chunk_with_fallback(content, file_path, language)
+            return self._fallback_chunks(content, file_path, language)
 
         else:
             return chunks
 
+    def _select_spans(
+        self, root: "SgNode", kinds: MappingProxyType[str, str], lines: "_FileLines"
+    ) -> list["_Span"]:
+        """Select chunk spans in a single pre-order traversal.
+
+        Nodes smaller than ``min_chunk_size`` are not descended into, since none of
+        their descendants can be large enough either. Nodes larger than
+        ``max_chunk_size`` are split into pieces when ``split_oversized_nodes`` is
+        set, and searched for smaller matches otherwise.
+        """
+        selected: list[_Span] = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if (chunk_type := kinds.get(node.kind())) is not None:
+                size = len(node.text())
+                if size < self.min_chunk_size:
+                    continue
+                if size <= self.max_chunk_size:
+                    selected.append(_Span.from_node(node, chunk_type))
+                    if self.nested_chunk_policy == "outermost":
+                        continue
+                elif self.split_oversized_nodes:
+                    selected.extend(self._split_node(node, chunk_type, kinds, lines, ()))
+                    if self.nested_chunk_policy == "outermost":
+                        continue
+            stack.extend(reversed(node.children()))
+        # Split pieces are emitted before the descendants they contain
+        selected.sort(key=lambda span: (span.start_index, -span.end_index))
+        if self.nested_chunk_policy == "innermost":
+            return self._drop_enclosing(selected)
+        return selected
+
+    @staticmethod
+    def _drop_enclosing(selected: list["_Span"]) -> list["_Span"]:
+        """Drop selected spans that enclose another selected span."""
+        keep = [True] * len(selected)
+        open_spans: list[tuple[int, int]] = []  # (end offset, index) of enclosing candidates
+        for index, span in enumerate(selected):
+            while open_spans and open_spans[-1][0] <= span.start_index:
+                open_spans.pop()
+            for _, enclosing in open_spans:
+                keep[enclosing] = False
+            open_spans.append((span.end_index, index))
+        return [span for span, kept in zip(selected, keep, strict=True) if kept]
+
+    def _split_node(
+        self,
+        node: "SgNode",
+        chunk_type: str,
+        kinds: MappingProxyType[str, str],
+        lines: "_FileLines",
+        header: tuple[str, ...],
+    ) -> list["_Span"]:
+        """Split an oversized node into pieces headed by its signature line.
+
+        Adjacent children are grouped up to the size budget; children that are
+        still too large are split recursively, nesting their own signature under
+        the parent's.
+        """
+        signature_line = node.range().start.line
+        header = (*header, lines[signature_line].rstrip())
+        # Keep at least half the budget for the body itself
+        while len(header) > 1 and sum(len(h) + 1 for h in header) > self.max_chunk_size // 2:
+            header = header[1:]
+        budget = max(self.min_chunk_size, self.max_chunk_size - sum(len(h) + 1 for h in header))
+        return self._group_children(
+            node.children(), node, chunk_type, kinds, lines, header, budget, signature_line
+        )
+
+    def _group_children(
+        self,
+        children: list["SgNode"],
+        parent: "SgNode",
+        chunk_type: str,
+        kinds: MappingProxyType[str, str],
+        lines: "_FileLines",
+        header: tuple[str, ...],
+        budget: int,
+        covered_line: int,
+    ) -> list["_Span"]:
+        """Group sibling nodes into spans of at most ``budget`` characters.
+
+        Spans never share a line: lines up to ``covered_line`` already belong to
+        the header or to an earlier span.
+        """
+        spans: list[_Span] = []
+        group: list[SgNode] = []
+        group_start = covered_line + 1
+
+        def flush() -> None:
+            nonlocal group, covered_line
+            if group:
+                end_line = _last_line(group[-1])
+                if lines.size(group_start, end_line) >= self.min_chunk_size:
+                    spans.append(
+                        self._group_span(
+                            group, group_start, end_line, parent, chunk_type, kinds, lines, header
+                        )
+                    )
+                covered_line = end_line
+            group = []
+
+        for child in children:
+            child_start, child_end = child.range().start.line, _last_line(child)
+            if child_end <= covered_line:
+                continue
+            if group and child_start <= _last_line(group[-1]):
+                # Shares a line with the group, so it can't be separated from it
+                group.append(child)
+                continue
+            if child_start <= covered_line or lines.size(child_start, child_end) > budget:
+                flush()
+                spans.extend(
+                    self._split_ungroupable(
+                        child, parent, chunk_type, kinds, lines, header, budget, covered_line
+                    )
+                )
+                covered_line = child_end
+                continue
+            if group and lines.size(group_start, child_end) > budget:
+                flush()
+            if not group:
+                group_start = child_start
+            group.append(child)
+        flush()
+        return spans
+
+    def _split_ungroupable(
+        self,
+        child: "SgNode",
+        parent: "SgNode",
+        chunk_type: str,
+        kinds: MappingProxyType[str, str],
+        lines: "_FileLines",
+        header: tuple[str, ...],
+        budget: int,
+        covered_line: int,
+    ) -> list["_Span"]:
+        """Split a child that can't join a group of its siblings.
+
+        That is a child opening on a covered line (e.g. a class body starting on
+        the signature line), whose own children are grouped instead, or one that
+        doesn't fit the budget on its own.
+        """
+        if child.range().start.line <= covered_line:
+            return self._group_children(
+                child.children(), parent, chunk_type, kinds, lines, header, budget, covered_line
+            )
+        return self._split_child(child, chunk_type, kinds, lines, header, budget, covered_line)
+
+    def _split_child(
+        self,
+        child: "SgNode",
+        chunk_type: str,
+        kinds: MappingProxyType[str, str],
+        lines: "_FileLines",
+        header: tuple[str, ...],
+        budget: int,
+        covered_line: int,
+    ) -> list["_Span"]:
+        """Split a child that doesn't fit the budget on its own."""
+        if (child_type := kinds.get(child.kind())) is not None:
+            return self._split_node(child, child_type, kinds, lines, header)
+        if grandchildren := child.children():
+            return self._group_children(
+                grandchildren, child, chunk_type, kinds, lines, header, budget, covered_line
+            )
+        # A leaf spanning many lines (e.g. a long string); fall back to line windows
+        spans: list[_Span] = []
+        start_line = max(child.range().start.line, covered_line + 1)
+        end_line = _last_line(child)
+        while start_line <= end_line:
+            stop = start_line
+            while stop < end_line and lines.size(start_line, stop + 1) <= budget:
+                stop += 1
+            spans.append(
+                _Span(
+                    start_line=start_line,
+                    end_line=stop,
+                    start_index=lines.offset(start_line),
+                    end_index=lines.offset(stop + 1),
+                    chunk_type=chunk_type,
+                    node_kind=child.kind(),
+                    content="\n".join((*header, lines.text(start_line, stop))),
+                    split=True,
+                )
+            )
+            start_line = stop + 1
+        return spans
+
+    def _group_span(
+        self,
+        group: list["SgNode"],
+        start_line: int,
+        end_line: int,
+        parent: "SgNode",
+        chunk_type: str,
+        kinds: MappingProxyType[str, str],
+        lines: "_FileLines",
+        header: tuple[str, ...],
+    ) -> "_Span":
+        """Build the span for a group of siblings."""
+        node_kind = parent.kind()
+        if len(group) == 1 and (child_type := kinds.get(group[0].kind())) is not None:
+            chunk_type, node_kind = child_type, group[0].kind()
+        return _Span(
+            start_line=start_line,
+            end_line=end_line,
+            start_index=max(group[0].range().start.index, lines.offset(start_line)),
+            end_index=group[-1].range().end.index,
+            chunk_type=chunk_type,
+            node_kind=node_kind,
+            content="\n".join((*header, lines.text(start_line, end_line))),
+            split=True,
+        )
+
     async def _chunk_with_fallback(
         self, content: str, file_path: Path, language: str = "unknown"
     ) -> list[CodeChunk]:
         """Fallback chunking using line-based approach."""
+        return self._for_language(language)._fallback_chunks(content, file_path, language)
+
+    def _fallback_chunks(
+        self, content: str, file_path: Path, language: str = "unknown"
+    ) -> list[CodeChunk]:
+        """Fallback chunking using line-based approach (synchronous)."""
         chunks = []
         lines = content.split("\n")
         current_chunk = []
@@ -256,7 +607,7 @@ class ChunkingMiddleware(Middleware):
         return {
             "ast_grep_available": AST_GREP_AVAILABLE,
             "ast_grep_enabled": self.ast_grep_enabled,
-            "supported_languages": list(set(self.SUPPORTED_LANGUAGES.values())),
+            "supported_languages": list({lang.value for lang in self.SUPPORTED_LANGUAGES.values()}),
             "language_extensions": self.SUPPORTED_LANGUAGES,
             "chunk_patterns": {
                 lang: [pattern for pattern, _ in patterns]
@@ -265,5 +616,8 @@ class ChunkingMiddleware(Middleware):
             "config": {
                 "max_chunk_size": self.max_chunk_size,
                 "min_chunk_size": self.min_chunk_size,
+                "nested_chunk_policy": self.nested_chunk_policy,
+                "split_oversized_nodes": self.split_oversized_nodes,
+                "max_chunk_tokens": self.max_chunk_tokens,
             },
         }
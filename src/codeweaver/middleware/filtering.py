@@ -8,11 +8,21 @@ FastMCP middleware for file filtering services.
 
 Provides intelligent file discovery and filtering using rignore.walk()
 with gitignore support, integrated as FastMCP middleware for service injection.
+
+Discovery prunes excluded directories before descending into them. Include and
+ignore globs are each compiled into one regular expression, and files are
+checked by name before they are stat'ed, at most once.
 """
 
+import asyncio
 import fnmatch
+import functools
 import logging
+import os
+import re
+import stat
 
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 from typing import Any
 
@@ -25,6 +35,21 @@ from fastmcp.server.middleware.middleware import CallNext
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=64)
+def compile_globs(patterns: tuple[str, ...]) -> re.Pattern[str] | None:
+    """Compile glob patterns into one regular expression matching any of them.
+
+    Args:
+        patterns: fnmatch-style glob patterns
+
+    Returns:
+        Compiled expression, or None when there are no patterns
+    """
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns))
+
+
 class FileFilteringMiddleware(Middleware):
     """FastMCP middleware providing file filtering and discovery services."""
 
@@ -58,6 +83,7 @@ class FileFilteringMiddleware(Middleware):
         extensions = self.config.get("included_extensions")
         self.included_extensions = set(extensions) if extensions else None
         self.additional_ignore_patterns = self.config.get("additional_ignore_patterns", [])
+        self._ignore_regex = compile_globs(tuple(self.additional_ignore_patterns))
         logger.info(
             "FileFilteringMiddleware initialized: gitignore=%s, max_size=%s, excluded_dirs=%d",
             self.use_gitignore,
@@ -84,6 +110,8 @@ class FileFilteringMiddleware(Middleware):
     ) -> list[Path]:
         """Find files using rignore.walk() with filtering criteria.
 
+        The walk runs in a worker thread, so it doesn't block the event loop.
+
         Args:
             base_path: Base directory to search in
             patterns: Optional glob patterns to match (defaults to all files)
@@ -92,106 +120,105 @@ class FileFilteringMiddleware(Middleware):
         Returns:
             List of filtered file paths
         """
-        patterns = patterns or ["*"]
-        found_files = []
         if not base_path.exists():
             logger.warning("Base path does not exist: %s", base_path)
-            return found_files
-        try:
-            if self.use_gitignore:
-                walker = rignore.walk(str(base_path))
-                for entry in walker:
-                    if entry.is_file():
-                        file_path = Path(entry)
-                        if await self._should_include_file(
-                            file_path, base_path
-                        ) and self._matches_patterns(file_path, patterns):
-                            found_files.append(file_path)
-            else:
-                logger.warning("rignore not available, using fallback file discovery")
-                found_files = await self._fallback_file_discovery(
-                    base_path, patterns, recursive=recursive
-                )
-        except Exception:
-            logger.exception("File discovery error")
-            found_files = await self._fallback_file_discovery(
-                base_path, patterns, recursive=recursive
-            )
+            return []
+        found_files = await asyncio.to_thread(
+            lambda: list(self.iter_files(base_path, patterns, recursive=recursive))
+        )
         logger.debug("Found %d files in %s (patterns: %s)", len(found_files), base_path, patterns)
         return found_files
 
-    async def _fallback_file_discovery(
-        self, base_path: Path, patterns: list[str], *, recursive: bool
-    ) -> list[Path]:
-        """Fallback file discovery using Path.rglob()."""
-        found_files = []
+    def iter_files(
+        self, base_path: Path, patterns: list[str] | None = None, *, recursive: bool = True
+    ) -> Iterator[Path]:
+        """Walk a directory, yielding the files that pass the filters as they are found.
+
+        Excluded directories are pruned rather than walked. With gitignore support,
+        rignore does the walk; otherwise, or if rignore fails before yielding
+        anything, an ``os.scandir`` walk is used.
+
+        Args:
+            base_path: Base directory to search in
+            patterns: Optional glob patterns to match (defaults to all files)
+            recursive: Whether to search recursively
+
+        Yields:
+            Filtered file paths
+        """
+        include = compile_globs(tuple(patterns or ()))
+        if not self.use_gitignore:
+            yield from self._scan_files(base_path, include, recursive=recursive)
+            return
+        yielded = False
         try:
-            for pattern in patterns:
-                matches = base_path.rglob(pattern) if recursive else base_path.glob(pattern)
-                found_files.extend(
-                    file_path
-                    for file_path in matches
-                    if file_path.is_file() and await self._should_include_file(file_path, base_path)
-                )
+            for path in self._walk_gitignored(base_path, recursive=recursive):
+                if self._passes_name_filters(path, include) and self._is_valid_file_size(path):
+                    yielded = True
+                    yield path
         except Exception:
-            logger.exception("Fallback file discovery error")
-        return found_files
+            logger.exception("File discovery error")
+            if not yielded:
+                yield from self._scan_files(base_path, include, recursive=recursive)
 
-    async def _should_include_file(self, file_path: Path, base_path: Path) -> bool:
-        """Check if file should be included based on filtering criteria."""
-        if not self._is_valid_file_size(file_path):
-            return False
-        if not self._is_under_base_path(file_path, base_path):
+    def _walk_gitignored(self, base_path: Path, *, recursive: bool) -> Iterable[Path]:
+        """Walk with rignore, pruning excluded directories and oversized files."""
+        excluded_dirs = self.excluded_dirs
+
+        def should_exclude_entry(path: Path) -> bool:
+            return path.name in excluded_dirs and path.is_dir()
+
+        return rignore.walk(
+            str(base_path),
+            max_depth=None if recursive else 1,
+            max_filesize=self.max_file_size,
+            should_exclude_entry=should_exclude_entry,
+        )
+
+    def _scan_files(
+        self, base_path: Path, include: re.Pattern[str] | None, *, recursive: bool
+    ) -> Iterator[Path]:
+        """Walk with ``os.scandir``, reusing each entry's type and stat information."""
+        directories = [base_path]
+        while directories:
+            directory = directories.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive and entry.name not in self.excluded_dirs:
+                                directories.append(Path(entry.path))
+                            continue
+                        path = Path(entry.path)
+                        if self._passes_name_filters(path, include) and self._is_valid_file_size(
+                            path, entry
+                        ):
+                            yield path
+            except OSError as e:
+                logger.debug("Cannot scan directory %s: %s", directory, e)
+
+    def _passes_name_filters(self, path: Path, include: re.Pattern[str] | None) -> bool:
+        """Check extension, include patterns and ignore patterns, without touching disk."""
+        if self.included_extensions and path.suffix.lower() not in self.included_extensions:
             return False
-        if not self._has_allowed_extension(file_path):
+        path_str = str(path)
+        if include is not None and not (include.match(path.name) or include.match(path_str)):
             return False
-        return not self._matches_ignore_patterns(file_path)
+        return self._ignore_regex is None or not self._ignore_regex.match(path_str)
 
-    def _is_valid_file_size(self, file_path: Path) -> bool:
-        """Check if file has valid size (not empty and not too large)."""
+    def _is_valid_file_size(self, file_path: Path, entry: os.DirEntry | None = None) -> bool:
+        """Check that the path is a regular file that is neither empty nor too large."""
         try:
-            file_size = file_path.stat().st_size
-            if file_size > self.max_file_size:
-                logger.debug("File too large (%s): %s", self._format_size(file_size), file_path)
-                return False
+            file_stat = entry.stat() if entry is not None else file_path.stat()
         except OSError as e:
             logger.debug("Cannot stat file %s: %s", file_path, e)
             return False
-        else:
-            return file_size != 0
-
-    def _is_under_base_path(self, file_path: Path, base_path: Path) -> bool:
-        """Check if file is under base path and not in excluded directories."""
-        try:
-            relative_path = file_path.relative_to(base_path)
-        except ValueError:
-            logger.debug("File not under base path: %s", file_path)
+        if not stat.S_ISREG(file_stat.st_mode):
             return False
-        else:
-            return all(part not in self.excluded_dirs for part in relative_path.parts[:-1])
-
-    def _has_allowed_extension(self, file_path: Path) -> bool:
-        """Check if file has an allowed extension."""
-        if not self.included_extensions:
-            return True
-        return file_path.suffix.lower() in self.included_extensions
-
-    def _matches_ignore_patterns(self, file_path: Path) -> bool:
-        """Check if file matches any additional ignore patterns."""
-        if not self.additional_ignore_patterns:
+        if file_stat.st_size > self.max_file_size:
+            logger.debug("File too large (%s): %s", self._format_size(file_stat.st_size), file_path)
             return False
-        return any(
-            fnmatch.fnmatch(str(file_path), pattern) for pattern in self.additional_ignore_patterns
-        )
-
-    def _matches_patterns(self, file_path: Path, patterns: list[str]) -> bool:
-        """Check if file matches any of the given patterns."""
-        for pattern in patterns:
-            if fnmatch.fnmatch(file_path.name, pattern):
-                return True
-            if fnmatch.fnmatch(str(file_path), pattern):
-                return True
-        return False
+        return file_stat.st_size != 0
 
     def _get_size_unit(self, parsed_size: str) -> str:
         """Extract size unit from a string like '1MB'."""
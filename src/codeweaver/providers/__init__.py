@@ -18,6 +18,7 @@ from codeweaver.cw_types import (
     RerankResult,
 )
 from codeweaver.providers.base import EmbeddingProvider, RerankProvider
+from codeweaver.providers.batching import QueryBatcher, dispatch_batches
 from codeweaver.providers.custom import (
     EnhancedProviderRegistry,
     ProviderSDK,
@@ -50,12 +51,14 @@ __all__ = [
     "ProviderRegistry",
     "ProviderSDK",
     "ProviderType",
+    "QueryBatcher",
     "RerankProvider",
     "RerankResult",
     "SentenceTransformersProvider",
     "SpaCyProvider",
     "ValidationResult",
     "VoyageAIProvider",
+    "dispatch_batches",
     "get_provider_factory",
     "register_combined_provider",
     "register_embedding_provider",
@@ -187,6 +187,14 @@ class EmbeddingProviderBase(ABC):
         """Generate embedding for a single query."""
         ...
 
+    async def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for several queries in one call.
+
+        Queries embed like documents by default. Providers that embed queries
+        differently (e.g. with a query input type) override this.
+        """
+        return await self.embed_documents(texts)
+
     @property
     @abstractmethod
     def provider_name(self) -> str:
@@ -0,0 +1,182 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""
+Batching helpers for embedding providers.
+
+:class:`QueryBatcher` sits in front of a provider's ``embed_query``. While the
+provider is idle, a query is sent right away, so a lone caller waits no longer
+than before. While a batch is in flight, new queries are collected until the
+batching window closes or the batch is full, then embedded with one
+``embed_queries`` call and the vectors are handed back to their callers.
+Identical queries in a batch are embedded once.
+
+:func:`dispatch_batches` runs a provider's batch requests concurrently, with
+bounded concurrency and per-batch retries, and returns results in input order.
+"""
+
+import asyncio
+import logging
+
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+
+async def dispatch_batches(
+    batches: Sequence[Any],
+    embed_batch: Callable[[Any], Awaitable[list[Any]]],
+    *,
+    max_concurrency: int = 4,
+    max_retries: int = 0,
+    retry_delay: float = 1.0,
+    retry_on: tuple[type[Exception], ...] = (Exception,),
+) -> list[Any]:
+    """Run batch requests concurrently and concatenate their results in input order.
+
+    A batch that fails with one of ``retry_on`` is retried on its own with
+    exponential backoff, keeping its concurrency slot while it waits. An error
+    with a ``retry_after`` attribute (seconds) waits at least that long. If a
+    batch still fails, the remaining batches are cancelled and the error is raised.
+
+    Args:
+        batches: Batches to send, in input order
+        embed_batch: Coroutine function sending one batch
+        max_concurrency: Maximum batches in flight at once
+        max_retries: Retries per batch after its first attempt
+        retry_delay: Delay before the first retry; doubled on every retry
+        retry_on: Exception types worth retrying
+
+    Returns:
+        The batches' results, concatenated in input order
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def send(index: int, batch: Any) -> list[Any]:
+        attempt = 0
+        async with semaphore:
+            while True:
+                try:
+                    return await embed_batch(batch)
+                except retry_on as e:
+                    if attempt >= max_retries:
+                        raise
+                    delay = max(retry_delay * 2**attempt, getattr(e, "retry_after", 0.0))
+                    logger.warning(
+                        "Batch %d failed (attempt %d of %d), retrying in %.1fs: %s",
+                        index,
+                        attempt + 1,
+                        max_retries + 1,
+                        delay,
+                        e,
+                    )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    tasks = [asyncio.create_task(send(index, batch)) for index, batch in enumerate(batches)]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return [item for result in results for item in result]
+
+
+class QueryBatcher:
+    """Batches concurrent query embeddings into single provider calls."""
+
+    def __init__(self, provider: Any, *, max_wait_ms: float = 5.0, max_batch_size: int = 32):
+        """Initialize the batcher.
+
+        Args:
+            provider: Embedding provider with an ``embed_queries`` method
+            max_wait_ms: Longest time a query waits for a batch to fill up
+            max_batch_size: Maximum queries per batch; capped at the provider's
+                ``max_batch_size``
+        """
+        self.provider = provider
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max(1, min(max_batch_size, provider.max_batch_size or max_batch_size))
+        self._pending: list[tuple[str, asyncio.Future[list[float]]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._in_flight: set[asyncio.Task] = set()
+        self._stats = {"queries": 0, "batches": 0, "provider_texts": 0}
+
+    @staticmethod
+    def supports(provider: Any) -> bool:
+        """Whether a provider can embed several queries in one call."""
+        return callable(getattr(provider, "embed_queries", None))
+
+    async def embed_query(self, text: str) -> list[float]:
+        """Embed a query as part of the next batch.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Query embedding
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        self._stats["queries"] += 1
+        if len(self._pending) >= self.max_batch_size or not self._in_flight:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Send the pending queries as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [(text, future) for text, future in self._pending if not future.done()]
+        self._pending.clear()
+        while batch:
+            chunk, batch = batch[: self.max_batch_size], batch[self.max_batch_size :]
+            task = asyncio.create_task(self._embed_batch(chunk))
+            self._in_flight.add(task)
+            task.add_done_callback(self._batch_done)
+
+    def _batch_done(self, task: asyncio.Task) -> None:
+        """Send queries that arrived while the batch was in flight."""
+        self._in_flight.discard(task)
+        if self._pending and not self._in_flight:
+            self._flush()
+
+    async def _embed_batch(self, batch: list[tuple[str, asyncio.Future[list[float]]]]) -> None:
+        """Embed a batch and resolve its callers' futures."""
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        self._stats["batches"] += 1
+        self._stats["provider_texts"] += len(texts)
+        try:
+            vectors = dict(zip(texts, await self.provider.embed_queries(texts), strict=True))
+        except Exception as e:
+            logger.debug("Query batch of %d failed: %s", len(texts), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, future in batch:
+            if not future.done():
+                future.set_result(list(vectors[text]))
+
+    async def close(self) -> None:
+        """Send pending queries and wait for all batches to finish."""
+        if self._pending:
+            self._flush()
+        await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def get_statistics(self) -> dict[str, Any]:
+        """Get batching statistics."""
+        batches = self._stats["batches"]
+        return {
+            **self._stats,
+            "average_batch_size": self._stats["provider_texts"] / batches if batches else 0.0,
+        }
@@ -72,6 +72,17 @@ class ProviderConfig(BaseModel):
         ),
     ]
 
+    max_concurrent_requests: Annotated[
+        int,
+        Field(
+            default=4,
+            ge=1,
+            le=64,
+            description="Maximum API requests in flight at once; capped by the rate "
+            "limiter's burst capacity where one is used",
+        ),
+    ]
+
     # Rate limiting
     rate_limiter: Annotated[
         Any | None,
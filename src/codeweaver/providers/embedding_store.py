@@ -0,0 +1,285 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""
+Persistent, content-addressed embedding store.
+
+Embeddings are keyed by (provider, model, dimension, input type, sha256(text)),
+so each text is looked up on its own: a batch with one changed chunk only sends
+that chunk to the API, and re-indexing unchanged code costs no API calls at all.
+
+Each namespace (provider, model, dimension, input type) is stored as two
+append-only files:
+
+- ``<namespace>.vectors``: fixed-size float32 or float16 records, read through mmap
+- ``<namespace>.index``: (sha256 digest, slot) records, loaded into a dict on open
+
+The index is written after the vector it points to. On open, a partial record at
+the end of either file, index entries pointing past the last complete vector and
+vectors no entry points to are truncated away, so new records always land at the
+offset their slot says and a crash loses at most the interrupted write. The store
+is meant for a single writer process.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import struct
+
+from collections.abc import Awaitable, Callable, Sequence
+from pathlib import Path
+from typing import Any, BinaryIO, Literal
+
+from pydantic.dataclasses import dataclass
+
+
+logger = logging.getLogger(__name__)
+
+VectorDType = Literal["float32", "float16"]
+
+_STRUCT_CODES: dict[str, str] = {"float32": "f", "float16": "e"}
+_INDEX_RECORD = struct.Struct("<32sQ")
+
+
+@dataclass(frozen=True)
+class EmbeddingNamespace:
+    """Identifies which model produced a set of embeddings."""
+
+    provider: str
+    model: str
+    dimension: int
+    input_type: str = "document"
+
+    @classmethod
+    def for_provider(cls, provider: Any, input_type: str = "document") -> "EmbeddingNamespace":
+        """Build the namespace for an embedding provider."""
+        return cls(
+            provider=str(provider.provider_name),
+            model=str(provider.model_name),
+            dimension=int(provider.dimension),
+            input_type=input_type,
+        )
+
+    @property
+    def slug(self) -> str:
+        """Stable file-name-safe identifier."""
+        key = json.dumps([self.provider, self.model, self.dimension, self.input_type])
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def text_digest(text: str) -> bytes:
+    """Content address of a text."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class _VectorFile:
+    """Append-only vector records plus their digest index for one namespace."""
+
+    def __init__(self, directory: Path, namespace: EmbeddingNamespace, dtype: VectorDType):
+        self.namespace = namespace
+        self.record = struct.Struct(f"<{namespace.dimension}{_STRUCT_CODES[dtype]}")
+        self.vectors_path = directory / f"{namespace.slug}.{dtype}.vectors"
+        self.index_path = directory / f"{namespace.slug}.{dtype}.index"
+        self._vectors: BinaryIO = self.vectors_path.open("a+b")
+        self._index: BinaryIO = self.index_path.open("a+b")
+        self._map: mmap.mmap | None = None
+        self._mapped_size = 0
+        self.slots: dict[bytes, int] = {}
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Load digest -> slot entries that point at complete vectors.
+
+        Both files are cut back to what the loaded entries cover, so appends made
+        after an interrupted write stay aligned with their slots.
+        """
+        vectors_size = self._vectors_size()
+        count = vectors_size // self.record.size
+        self._index.seek(0)
+        data = self._index.read()
+        usable = len(data) - len(data) % _INDEX_RECORD.size
+        valid = []
+        for digest, slot in _INDEX_RECORD.iter_unpack(data[:usable]):
+            if slot < count:
+                self.slots[digest] = slot
+                valid.append(_INDEX_RECORD.pack(digest, slot))
+        if len(valid) * _INDEX_RECORD.size != len(data):
+            logger.warning("Dropping incomplete index records from %s", self.index_path)
+            self._index.truncate(0)
+            self._index.write(b"".join(valid))
+            self._index.flush()
+        kept_size = (max(self.slots.values(), default=-1) + 1) * self.record.size
+        if kept_size != vectors_size:
+            logger.warning("Dropping unindexed vector data from %s", self.vectors_path)
+            self._vectors.truncate(kept_size)
+
+    def _vectors_size(self) -> int:
+        self._vectors.seek(0, 2)
+        return self._vectors.tell()
+
+    def get(self, digest: bytes) -> list[float] | None:
+        """Read the vector stored for a digest."""
+        if (slot := self.slots.get(digest)) is None:
+            return None
+        offset = slot * self.record.size
+        if offset + self.record.size > self._mapped_size:
+            self._remap()
+        return list(self.record.unpack_from(self._map, offset))
+
+    def append(self, items: Sequence[tuple[bytes, Sequence[float]]]) -> None:
+        """Append vectors, then index them."""
+        items = [(digest, vector) for digest, vector in items if digest not in self.slots]
+        if not items:
+            return
+        first_slot = self._vectors_size() // self.record.size
+        self._vectors.write(b"".join(self.record.pack(*vector) for _, vector in items))
+        self._vectors.flush()
+        records = []
+        for offset, (digest, _) in enumerate(items):
+            self.slots[digest] = first_slot + offset
+            records.append(_INDEX_RECORD.pack(digest, first_slot + offset))
+        self._index.write(b"".join(records))
+        self._index.flush()
+
+    def _remap(self) -> None:
+        """Map the vector file again after it has grown."""
+        if self._map is not None:
+            self._map.close()
+        size = self._vectors_size()
+        self._map = mmap.mmap(self._vectors.fileno(), size, access=mmap.ACCESS_READ)
+        self._mapped_size = size
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._vectors.close()
+        self._index.close()
+
+
+class EmbeddingStore:
+    """Persistent per-text embedding cache."""
+
+    def __init__(self, directory: Path, dtype: VectorDType = "float32"):
+        """Open (or create) an embedding store.
+
+        Args:
+            directory: Directory holding the store's files
+            dtype: On-disk vector precision; float16 halves the size at a small
+                precision cost
+        """
+        self.directory = directory
+        self.dtype = dtype
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._files: dict[EmbeddingNamespace, _VectorFile] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _file(self, namespace: EmbeddingNamespace) -> _VectorFile:
+        if (vector_file := self._files.get(namespace)) is None:
+            vector_file = _VectorFile(self.directory, namespace, self.dtype)
+            self._files[namespace] = vector_file
+        return vector_file
+
+    def get_many(
+        self, namespace: EmbeddingNamespace, texts: Sequence[str]
+    ) -> list[list[float] | None]:
+        """Look up each text's embedding (``None`` for misses)."""
+        vector_file = self._file(namespace)
+        return [vector_file.get(text_digest(text)) for text in texts]
+
+    def put_many(
+        self,
+        namespace: EmbeddingNamespace,
+        texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+    ) -> None:
+        """Store embeddings for texts."""
+        self._file(namespace).append([
+            (text_digest(text), embedding)
+            for text, embedding in zip(texts, embeddings, strict=True)
+        ])
+
+    async def embed(
+        self,
+        namespace: EmbeddingNamespace,
+        texts: Sequence[str],
+        embed: Callable[[list[str]], Awaitable[list[list[float]]]],
+    ) -> list[list[float]]:
+        """Embed texts, calling ``embed`` only for texts not in the store.
+
+        Duplicate texts in a batch are embedded once. Results are returned in the
+        order of ``texts``.
+        """
+        results = self.get_many(namespace, texts)
+        missing = list(dict.fromkeys(t for t, r in zip(texts, results, strict=True) if r is None))
+        self.hits += len(texts) - sum(r is None for r in results)
+        self.misses += len(missing)
+        if missing:
+            embeddings = await embed(missing)
+            self.put_many(namespace, missing, embeddings)
+            fresh = dict(zip(missing, embeddings, strict=True))
+            results = [
+                result if result is not None else list(fresh[text])
+                for text, result in zip(texts, results, strict=True)
+            ]
+            logger.debug(
+                "Embedding store: %d hits, %d misses", len(texts) - len(missing), len(missing)
+            )
+        return results
+
+    def get_statistics(self) -> dict[str, Any]:
+        """Get hit/miss statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "namespaces": len(self._files),
+            "vectors": sum(len(f.slots) for f in self._files.values()),
+            "dtype": self.dtype,
+        }
+
+    def close(self) -> None:
+        """Close all open files."""
+        for vector_file in self._files.values():
+            vector_file.close()
+        self._files.clear()
+
+
+async def embed_with_cache(
+    texts: list[str],
+    embed: Callable[[list[str]], Awaitable[list[list[float]]]],
+    namespace: EmbeddingNamespace,
+    context: dict[str, Any],
+) -> list[list[float]]:
+    """Embed texts through the per-text caches available in a service context.
+
+    Uses the persistent ``embedding_store`` when present, otherwise the in-memory
+    ``caching_service`` keyed per text, and otherwise calls ``embed`` directly.
+    """
+    if (store := context.get("embedding_store")) is not None:
+        return await store.embed(namespace, texts, embed)
+    if (cache_service := context.get("caching_service")) is None:
+        return await embed(texts)
+    keys = [
+        {
+            "provider": namespace.provider,
+            "model": namespace.model,
+            "dimension": namespace.dimension,
+            "input_type": namespace.input_type,
+            "text_sha256": text_digest(text).hex(),
+        }
+        for text in texts
+    ]
+    results = [await cache_service.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        embeddings = await embed([texts[i] for i in missing])
+        for i, embedding in zip(missing, embeddings, strict=True):
+            results[i] = embedding
+            await cache_service.set(keys[i], embedding, ttl=3600)
+    return results
@@ -219,6 +219,34 @@ class CohereProvider(CombinedProvider):
         else:
             return embedding
 
+    async def embed_queries(
+        self, texts: list[str], context: dict[str, Any] | None = None
+    ) -> list[list[float]]:
+        """Generate embeddings for several search queries in one API call."""
+        context = context or {}
+        if rate_limiter := context.get("rate_limiting_service"):
+            await rate_limiter.acquire("cohere", len(texts))
+        try:
+            response = self.client.embed(
+                texts=texts, model=self._embedding_model, input_type="search_query"
+            )
+        except Exception as e:
+            logger.exception("Error generating Cohere query embeddings")
+            raise EmbeddingProviderError(
+                "Failed to generate Cohere query embeddings",
+                provider_name="cohere",
+                operation="embed_queries",
+                model_name=self._embedding_model,
+                original_error=e,
+                recovery_suggestions=[
+                    "Check API key validity and network connectivity",
+                    "Verify query text length is within limits",
+                    "Check Cohere service status",
+                ],
+            ) from e
+        else:
+            return response.embeddings
+
     @property
     def max_documents(self) -> int | None:
         """Cohere reranking has document limits."""
@@ -8,6 +8,10 @@ HuggingFace provider implementation for embeddings.
 
 Provides HuggingFace Inference API and local transformers models using the unified provider interface.
 Supports both cloud inference and local model loading with GPU acceleration.
+
+In API mode, texts are sent in batches over one pooled, keep-alive HTTP client,
+with bounded concurrency. Batches answered with 429 (rate limited) or 503 (model
+loading) are retried with exponential backoff.
 """
 
 import logging
@@ -24,6 +28,7 @@ from codeweaver.cw_types import (
     register_provider_class,
 )
 from codeweaver.providers.base import EmbeddingProviderBase
+from codeweaver.providers.batching import dispatch_batches
 from codeweaver.providers.config import HuggingFaceConfig
 from codeweaver.utils.decorators import feature_flag_required
 
@@ -46,6 +51,129 @@ except ImportError:
     torch = None
 logger = logging.getLogger(__name__)
 
+INFERENCE_API_URL = "https://api-inference.huggingface.co/pipeline/feature-extraction/{model}"
+_RETRYABLE_STATUS_CODES = frozenset({429, 503})
+_MAX_RETRY_AFTER_SECONDS = 60.0
+
+
+class TransientAPIError(Exception):
+    """A rate-limited or model-loading response from the Inference API."""
+
+    def __init__(self, status_code: int, message: str, retry_after: float = 0.0):
+        """Initialize the error.
+
+        Args:
+            status_code: HTTP status code of the response
+            message: Error message
+            retry_after: Seconds the API asked us to wait before retrying
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class HuggingFaceInferenceClient:
+    """Batched, pooled client for the HuggingFace feature-extraction Inference API."""
+
+    def __init__(
+        self,
+        model_name: str,
+        api_key: str | None = None,
+        *,
+        batch_size: int = 32,
+        max_concurrent_requests: int = 4,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        timeout: float = 30.0,
+        transport: Any = None,
+    ):
+        """Initialize the client.
+
+        Args:
+            model_name: Model to run feature extraction with
+            api_key: HuggingFace API token
+            batch_size: Texts per request
+            max_concurrent_requests: Requests in flight at once; also the
+                connection pool size
+            max_retries: Retries per batch on 429/503 and connection errors
+            retry_delay: Delay before the first retry; doubled on every retry
+            timeout: Request timeout in seconds
+            transport: Optional httpx transport
+        """
+        self.api_url = INFERENCE_API_URL.format(model=model_name)
+        self.batch_size = max(1, batch_size)
+        self.max_concurrent_requests = max(1, max_concurrent_requests)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._client = httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrent_requests,
+                max_keepalive_connections=self.max_concurrent_requests,
+            ),
+            transport=transport,
+        )
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts, returning one vector per text in input order.
+
+        Raises:
+            TransientAPIError: If a batch is still rate limited or loading after
+                all retries
+            httpx.HTTPError: On other HTTP or connection failures
+        """
+        batches = [texts[i : i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        return await dispatch_batches(
+            batches,
+            self._embed_batch,
+            max_concurrency=self.max_concurrent_requests,
+            max_retries=self.max_retries,
+            retry_delay=self.retry_delay,
+            retry_on=(TransientAPIError, httpx.TransportError),
+        )
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed one batch with a single request."""
+        response = await self._client.post(self.api_url, json={"inputs": texts})
+        if response.status_code in _RETRYABLE_STATUS_CODES:
+            raise TransientAPIError(
+                response.status_code,
+                f"HuggingFace API error: {response.status_code} - {response.text}",
+                _retry_after(response),
+            )
+        response.raise_for_status()
+        embeddings = response.json()
+        if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+            raise TypeError(f"Unexpected API response format: {type(embeddings)}")
+        return [_sentence_vector(embedding) for embedding in embeddings]
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self._client.aclose()
+
+
+def _retry_after(response: Any) -> float:
+    """Seconds to wait from a Retry-After header or a model-loading estimate."""
+    retry_after = response.headers.get("retry-after")
+    if retry_after is None:
+        try:
+            retry_after = response.json().get("estimated_time")
+        except (ValueError, AttributeError):
+            retry_after = None
+    try:
+        return min(float(retry_after or 0.0), _MAX_RETRY_AFTER_SECONDS)
+    except ValueError:
+        return 0.0
+
+
+def _sentence_vector(embedding: list[Any]) -> list[float]:
+    """A text's vector; for token-level output, the first token's vector."""
+    if embedding and isinstance(embedding[0], list):
+        return embedding[0]
+    return embedding
+
 
 @feature_flag_required("huggingface", dependencies=["torch", "transformers"])
 class HuggingFaceProvider(EmbeddingProviderBase):
@@ -152,12 +280,15 @@ class HuggingFaceProvider(EmbeddingProviderBase):
                 operation="api_client_initialization",
                 recovery_suggestions=["Install with: uv add httpx"],
             )
-        self._api_url = (
-            f"https://api-inference.huggingface.co/pipeline/feature-extraction/{self._model_name}"
+        self._api_client = HuggingFaceInferenceClient(
+            self._model_name,
+            self._api_key,
+            batch_size=self._batch_size,
+            max_concurrent_requests=self._config.max_concurrent_requests,
+            max_retries=self._config.max_retries,
+            retry_delay=self._config.retry_delay_seconds,
+            timeout=self._config.timeout_seconds,
         )
-        self._headers = {}
-        if self._api_key:
-            self._headers["Authorization"] = f"Bearer {self._api_key}"
         logger.info("Initialized HuggingFace API client for: %s", self._model_name)
 
     @property
@@ -177,8 +308,8 @@ class HuggingFaceProvider(EmbeddingProviderBase):
 
     @property
     def max_batch_size(self) -> int | None:
-        """Batch size depends on mode."""
-        return self._batch_size if self._use_local else 1
+        """Texts per local forward pass or API request."""
+        return self._batch_size
 
     @property
     def max_input_length(self) -> int | None:
@@ -274,33 +405,27 @@ class HuggingFaceProvider(EmbeddingProviderBase):
                 operation="embed_api",
                 recovery_suggestions=["Install with: uv add httpx"],
             )
-        embeddings = []
-        for text in texts:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self._api_url, headers=self._headers, json={"inputs": text}, timeout=30
-                )
-                if response.status_code != 200:
-                    raise EmbeddingProviderError(
-                        f"HuggingFace API error: {response.status_code} - {response.text}",
-                        provider_name="huggingface",
-                        operation="embed_api",
-                        model_name=self._model_name,
-                        recovery_suggestions=[
-                            "Check API key validity and permissions",
-                            "Verify model name is correct and accessible",
-                            "Check HuggingFace Inference API status",
-                            "Ensure input text is properly formatted",
-                        ],
-                    )
-            embedding = response.json()
-            if isinstance(embedding, list) and isinstance(embedding[0], list):
-                embeddings.append(embedding[0])
-            elif isinstance(embedding, list):
-                embeddings.append(embedding)
-            else:
-                raise TypeError(f"Unexpected API response format: {type(embedding)}")
-        return embeddings
+        try:
+            return await self._api_client.embed(texts)
+        except (TransientAPIError, httpx.HTTPError) as e:
+            raise EmbeddingProviderError(
+                f"HuggingFace API error: {e}",
+                provider_name="huggingface",
+                operation="embed_api",
+                model_name=self._model_name,
+                original_error=e,
+                recovery_suggestions=[
+                    "Check API key validity and permissions",
+                    "Verify model name is correct and accessible",
+                    "Check HuggingFace Inference API status",
+                    "Ensure input text is properly formatted",
+                ],
+            ) from e
+
+    async def close(self) -> None:
+        """Close the pooled API connections."""
+        if api_client := getattr(self, "_api_client", None):
+            await api_client.aclose()
 
     def get_provider_info(self) -> EmbeddingProviderInfo:
         """Get information about HuggingFace capabilities from centralized registry."""
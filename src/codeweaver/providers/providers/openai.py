@@ -29,7 +29,9 @@ from codeweaver.cw_types import (
     register_provider_class,
 )
 from codeweaver.providers.base import EmbeddingProviderBase
+from codeweaver.providers.batching import dispatch_batches
 from codeweaver.providers.config import OpenAICompatibleConfig, OpenAIConfig
+from codeweaver.providers.embedding_store import EmbeddingNamespace, embed_with_cache
 from codeweaver.utils.decorators import feature_flag_required
 
 
@@ -37,9 +39,15 @@ try:
     import openai
 
     OPENAI_AVAILABLE = True
+    _RETRYABLE_ERRORS: tuple[type[Exception], ...] = (
+        openai.APIConnectionError,
+        openai.InternalServerError,
+        openai.RateLimitError,
+    )
 except ImportError:
     OPENAI_AVAILABLE = False
     openai = None
+    _RETRYABLE_ERRORS = ()
 logger = logging.getLogger(__name__)
 
 
@@ -72,6 +80,8 @@ class OpenAICompatibleProvider(EmbeddingProviderBase):
         if self.config.get("custom_headers"):
             client_kwargs["default_headers"] = self.config["custom_headers"]
         self.client = openai.AsyncOpenAI(**client_kwargs)
+        # Batches are retried individually by dispatch_batches
+        self._batch_client = self.client.with_options(max_retries=0)
         self._last_request_time = 0.0
         self._min_request_interval = 0.1
         self._model = self.config.get("model", OpenAIModel.TEXT_EMBEDDING_3_SMALL)
@@ -79,6 +89,7 @@ class OpenAICompatibleProvider(EmbeddingProviderBase):
         self._auto_discover_dimensions = self.config.get("auto_discover_dimensions", True)
         self._max_batch_size = self.config.get("max_batch_size")
         self._max_input_length = self.config.get("max_input_length")
+        self._max_concurrent_requests = self.config.get("max_concurrent_requests", 4)
         self._initialize_dimensions()
 
     def _validate_config(self) -> None:
@@ -160,13 +171,16 @@ class OpenAICompatibleProvider(EmbeddingProviderBase):
         return asyncio.run(_discover())
 
     async def _apply_rate_limit(self) -> None:
-        """Apply basic rate limiting between API requests."""
+        """Apply basic rate limiting between API requests.
+
+        Each request reserves the next free start time before sleeping, so
+        concurrent requests are spaced out too.
+        """
         current_time = time.time()
-        time_since_last = current_time - self._last_request_time
-        if time_since_last < self._min_request_interval:
-            sleep_time = self._min_request_interval - time_since_last
-            await asyncio.sleep(sleep_time)
-        self._last_request_time = time.time()
+        start_time = max(current_time, self._last_request_time + self._min_request_interval)
+        self._last_request_time = start_time
+        if start_time > current_time:
+            await asyncio.sleep(start_time - current_time)
 
     @property
     def provider_name(self) -> str:
@@ -204,38 +218,40 @@ class OpenAICompatibleProvider(EmbeddingProviderBase):
     async def embed_documents(
         self, texts: list[str], context: dict[str, Any] | None = None
     ) -> list[list[float]]:
-        """Generate embeddings for documents with service layer integration."""
+        """Generate embeddings for documents with service layer integration.
+
+        Each text is cached on its own, so only texts missing from the cache are
+        sent to the API.
+        """
         context = context or {}
-        cache_service = context.get("caching_service")
-        if cache_service:
-            cache_key = {
-                "provider": "openai",
-                "model": self._model,
-                "texts": texts,
-                "dimension": self._dimension,
-            }
-            cached_result = await cache_service.get(cache_key)
-            if cached_result:
-                logger.debug("Cache hit for %s OpenAI embeddings", len(texts))
-                return cached_result
-        if rate_limiter := context.get("rate_limiting_service"):
-            await rate_limiter.acquire("openai", len(texts))
-        else:
-            await self._apply_rate_limit()
+        namespace = EmbeddingNamespace.for_provider(self)
+        return await embed_with_cache(
+            texts, lambda missing: self._embed_texts(missing, context), namespace, context
+        )
+
+    async def _embed_texts(self, texts: list[str], context: dict[str, Any]) -> list[list[float]]:
+        """Embed texts with the API, in concurrent batches of at most ``max_batch_size``.
+
+        Up to ``max_concurrent_requests`` batches are in flight at once, and no more
+        than the rate limiter's burst capacity for this provider. A batch that fails
+        with a transient error is retried on its own; embeddings are returned in
+        input order.
+        """
+        rate_limiter = context.get("rate_limiting_service")
+        concurrency = self._max_concurrent_requests
+        if rate_limiter and hasattr(rate_limiter, "max_concurrency"):
+            concurrency = min(concurrency, rate_limiter.max_concurrency("openai"))
+        batch_size = self.max_batch_size or len(texts)
+        batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
         try:
-            batch_size = min(self.max_batch_size or len(texts), len(texts))
-            embeddings = []
-            for i in range(0, len(texts), batch_size):
-                batch_texts = texts[i : i + batch_size]
-                embedding_kwargs = {"input": batch_texts, "model": self._model}
-                if self._dimension and self._supports_custom_dimensions():
-                    embedding_kwargs["dimensions"] = self._dimension
-                response = await self.client.embeddings.create(**embedding_kwargs)
-                batch_embeddings = [data.embedding for data in response.data]
-                embeddings.extend(batch_embeddings)
-            if cache_service:
-                await cache_service.set(cache_key, embeddings, ttl=3600)
-                logger.debug("Cached %s OpenAI embeddings", len(texts))
+            return await dispatch_batches(
+                batches,
+                lambda batch: self._embed_batch(batch, rate_limiter),
+                max_concurrency=concurrency,
+                max_retries=self.config.get("max_retries", 3),
+                retry_delay=self.config.get("retry_delay_seconds", 1.0),
+                retry_on=_RETRYABLE_ERRORS,
+            )
         except Exception as e:
             logger.exception("Error generating embeddings from %s", self._service_name)
             raise EmbeddingProviderError(
@@ -251,8 +267,18 @@ class OpenAICompatibleProvider(EmbeddingProviderBase):
                     "Ensure model name is supported by the service",
                 ],
             ) from e
+
+    async def _embed_batch(self, texts: list[str], rate_limiter: Any) -> list[list[float]]:
+        """Embed one batch with a single API request."""
+        if rate_limiter:
+            await rate_limiter.acquire("openai")
         else:
-            return embeddings
+            await self._apply_rate_limit()
+        embedding_kwargs = {"input": texts, "model": self._model}
+        if self._dimension and self._supports_custom_dimensions():
+            embedding_kwargs["dimensions"] = self._dimension
+        response = await self._batch_client.embeddings.create(**embedding_kwargs)
+        return [data.embedding for data in sorted(response.data, key=lambda data: data.index)]
 
     async def embed_query(self, text: str, context: dict[str, Any] | None = None) -> list[float]:
         """Generate embedding for search query with service layer integration."""
@@ -29,6 +29,7 @@ from codeweaver.cw_types import (
 )
 from codeweaver.providers.base import CombinedProvider
 from codeweaver.providers.config import VoyageConfig
+from codeweaver.providers.embedding_store import EmbeddingNamespace, embed_with_cache
 
 
 try:
@@ -147,21 +148,27 @@ class VoyageAIProvider(CombinedProvider):
     async def embed_documents(
         self, texts: list[str], context: dict[str, Any] | None = None
     ) -> list[list[float]]:
-        """Generate embeddings for documents with service layer integration."""
+        """Generate embeddings for documents with service layer integration.
+
+        Each text is cached on its own, so only texts missing from the cache are
+        sent to the API.
+        """
         context = context or {}
-        cache_service = context.get("caching_service")
-        if cache_service:
-            cache_key = {
-                "provider": "voyage_ai",
-                "model": self._embedding_model,
-                "texts": texts,
-                "input_type": "document",
-                "dimension": self._dimension,
-            }
-            cached_result = await cache_service.get(cache_key)
-            if cached_result:
-                logger.debug("Cache hit for %s VoyageAI embeddings", len(texts))
-                return cached_result
+        namespace = EmbeddingNamespace.for_provider(self, input_type="document")
+        return await embed_with_cache(
+            texts, lambda missing: self._embed_texts(missing, context), namespace, context
+        )
+
+    async def embed_queries(
+        self, texts: list[str], context: dict[str, Any] | None = None
+    ) -> list[list[float]]:
+        """Generate embeddings for several search queries in one API call."""
+        return await self._embed_texts(texts, context or {}, input_type="query")
+
+    async def _embed_texts(
+        self, texts: list[str], context: dict[str, Any], input_type: str = "document"
+    ) -> list[list[float]]:
+        """Embed documents or queries with the VoyageAI API."""
         if rate_limiter := context.get("rate_limiting_service"):
             await rate_limiter.acquire("voyage_ai", len(texts))
         else:
@@ -170,19 +177,15 @@ class VoyageAIProvider(CombinedProvider):
             result = self.client.embed(
                 texts=texts,
                 model=self._embedding_model,
-                input_type="document",
+                input_type=input_type,
                 output_dimension=self._dimension,
             )
-            embeddings = result.embeddings
-            if cache_service:
-                await cache_service.set(cache_key, embeddings, ttl=3600)
-                logger.debug("Cached %s VoyageAI embeddings", len(texts))
         except Exception as e:
             logger.exception("Error generating VoyageAI embeddings")
             raise EmbeddingProviderError(
                 "Failed to generate VoyageAI embeddings",
                 provider_name="voyage_ai",
-                operation="embed_documents",
+                operation="embed_queries" if input_type == "query" else "embed_documents",
                 model_name=self._embedding_model,
                 original_error=e,
                 recovery_suggestions=[
@@ -191,7 +194,7 @@ class VoyageAIProvider(CombinedProvider):
                     "Check VoyageAI service status",
                 ],
             ) from e
-        return embeddings
+        return result.embeddings
 
     async def embed_query(self, text: str, context: dict[str, Any] | None = None) -> list[float]:
         """Generate embedding for search query with service layer integration."""
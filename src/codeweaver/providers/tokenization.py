@@ -0,0 +1,240 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""
+Token estimation for embedding providers.
+
+Chunk sizes are budgeted in characters, while embedding models limit their input
+in tokens. ``TokenEstimator`` converts between the two with a chars-per-token
+ratio per language. When the provider's tokenizer is available, the ratios are
+calibrated once against a fixed set of code samples, so they are deterministic
+for a given model; otherwise conservative defaults are used. Estimators are
+cached per provider and model.
+"""
+
+import logging
+
+from collections.abc import Callable
+from types import MappingProxyType
+from typing import Any
+
+from codeweaver.cw_types import ProviderType
+
+
+logger = logging.getLogger(__name__)
+
+TokenCounter = Callable[[str], int]
+
+# Chars-per-token for code with common BPE vocabularies, rounded down so chunks
+# stay within budget
+DEFAULT_CHARS_PER_TOKEN: MappingProxyType[str, float] = MappingProxyType({
+    "default": 3.2,
+    "c": 3.0,
+    "cpp": 3.0,
+    "go": 3.1,
+    "java": 3.5,
+    "javascript": 3.2,
+    "python": 3.4,
+    "rust": 3.0,
+    "typescript": 3.2,
+    "unknown": 3.6,
+})
+
+# Representative snippets used to calibrate ratios against a real tokenizer
+_CALIBRATION_SAMPLES: MappingProxyType[str, str] = MappingProxyType({
+    "python": (
+        "class RateLimiter:\n"
+        '    """Token bucket limiting requests per second."""\n\n'
+        "    def __init__(self, rate: float, burst: int = 10) -> None:\n"
+        "        self.rate = rate\n"
+        "        self.tokens = float(burst)\n\n"
+        "    async def acquire(self) -> None:\n"
+        "        while self.tokens < 1:\n"
+        "            await asyncio.sleep(1 / self.rate)\n"
+        "        self.tokens -= 1\n"
+    ),
+    "javascript": (
+        "export class RateLimiter {\n"
+        "  constructor(rate, burst = 10) {\n"
+        "    this.rate = rate;\n"
+        "    this.tokens = burst;\n"
+        "  }\n\n"
+        "  async acquire() {\n"
+        "    while (this.tokens < 1) {\n"
+        "      await new Promise((resolve) => setTimeout(resolve, 1000 / this.rate));\n"
+        "    }\n"
+        "    this.tokens -= 1;\n"
+        "  }\n"
+        "}\n"
+    ),
+    "typescript": (
+        "export interface Limiter { acquire(): Promise<void>; }\n\n"
+        "export class RateLimiter implements Limiter {\n"
+        "  private tokens: number;\n"
+        "  constructor(private readonly rate: number, burst: number = 10) {\n"
+        "    this.tokens = burst;\n"
+        "  }\n"
+        "  async acquire(): Promise<void> {\n"
+        "    while (this.tokens < 1) await sleep(1000 / this.rate);\n"
+        "    this.tokens -= 1;\n"
+        "  }\n"
+        "}\n"
+    ),
+    "go": (
+        "type RateLimiter struct {\n"
+        "\trate   float64\n"
+        "\ttokens float64\n"
+        "}\n\n"
+        "func (r *RateLimiter) Acquire(ctx context.Context) error {\n"
+        "\tfor r.tokens < 1 {\n"
+        "\t\tselect {\n"
+        "\t\tcase <-ctx.Done():\n"
+        "\t\t\treturn ctx.Err()\n"
+        "\t\tcase <-time.After(time.Duration(float64(time.Second) / r.rate)):\n"
+        "\t\t}\n"
+        "\t}\n"
+        "\tr.tokens--\n"
+        "\treturn nil\n"
+        "}\n"
+    ),
+    "rust": (
+        "pub struct RateLimiter {\n"
+        "    rate: f64,\n"
+        "    tokens: f64,\n"
+        "}\n\n"
+        "impl RateLimiter {\n"
+        "    pub async fn acquire(&mut self) {\n"
+        "        while self.tokens < 1.0 {\n"
+        "            tokio::time::sleep(Duration::from_secs_f64(1.0 / self.rate)).await;\n"
+        "        }\n"
+        "        self.tokens -= 1.0;\n"
+        "    }\n"
+        "}\n"
+    ),
+    "java": (
+        "public final class RateLimiter {\n"
+        "    private final double rate;\n"
+        "    private double tokens;\n\n"
+        "    public RateLimiter(double rate, int burst) {\n"
+        "        this.rate = rate;\n"
+        "        this.tokens = burst;\n"
+        "    }\n\n"
+        "    public synchronized void acquire() throws InterruptedException {\n"
+        "        while (tokens < 1) {\n"
+        "            Thread.sleep((long) (1000 / rate));\n"
+        "        }\n"
+        "        tokens -= 1;\n"
+        "    }\n"
+        "}\n"
+    ),
+    "c": (
+        "struct rate_limiter {\n"
+        "    double rate;\n"
+        "    double tokens;\n"
+        "};\n\n"
+        "int rate_limiter_acquire(struct rate_limiter *limiter) {\n"
+        "    while (limiter->tokens < 1.0) {\n"
+        "        usleep((useconds_t)(1000000.0 / limiter->rate));\n"
+        "    }\n"
+        "    limiter->tokens -= 1.0;\n"
+        "    return 0;\n"
+        "}\n"
+    ),
+})
+
+
+class TokenEstimator:
+    """Per-language chars-per-token estimator for one embedding model."""
+
+    _cache: dict[tuple[str, str], "TokenEstimator"] = {}  # noqa: RUF012
+
+    def __init__(self, counter: TokenCounter | None = None):
+        """Initialize the estimator.
+
+        Args:
+            counter: Function returning the exact token count of a text; when given,
+                per-language ratios are calibrated with it
+        """
+        self.counter = counter
+        self._ratios = dict(DEFAULT_CHARS_PER_TOKEN)
+        if counter is not None:
+            self._calibrate()
+
+    @classmethod
+    def for_provider(cls, provider: Any) -> "TokenEstimator":
+        """Get the (cached) estimator for an embedding provider."""
+        key = (str(provider.provider_name), str(provider.model_name))
+        if key not in cls._cache:
+            cls._cache[key] = cls(_load_counter(provider))
+        return cls._cache[key]
+
+    @property
+    def chars_per_token(self) -> MappingProxyType[str, float]:
+        """Chars-per-token ratio by language (``"default"`` for other languages)."""
+        return MappingProxyType(self._ratios)
+
+    def ratio(self, language: str) -> float:
+        """Get the chars-per-token ratio for a language."""
+        return self._ratios.get(language, self._ratios["default"])
+
+    def estimate(self, text: str, language: str = "default") -> int:
+        """Estimate the number of tokens in a text."""
+        if self.counter is not None:
+            return self.counter(text)
+        return max(1, round(len(text) / self.ratio(language)))
+
+    def chars_for(self, tokens: int, language: str = "default") -> int:
+        """Convert a token budget to a character budget."""
+        return int(tokens * self.ratio(language))
+
+    def _calibrate(self) -> None:
+        """Measure ratios against the calibration samples."""
+        try:
+            measured = {
+                language: len(sample) / max(1, self.counter(sample))
+                for language, sample in _CALIBRATION_SAMPLES.items()
+            }
+        except Exception as e:
+            logger.warning("Tokenizer calibration failed, using default ratios: %s", e)
+            return
+        self._ratios.update(measured)
+        self._ratios["default"] = min(measured.values())
+        logger.debug("Calibrated chars-per-token ratios: %s", measured)
+
+
+def token_budget(provider: Any, max_chunk_tokens: int) -> int:
+    """Cap a chunk token budget by the provider's input limit."""
+    limit = getattr(provider, "max_input_length", None)
+    return min(max_chunk_tokens, limit) if limit else max_chunk_tokens
+
+
+def _load_counter(provider: Any) -> TokenCounter | None:
+    """Find an exact token counter for a provider, if one is available locally."""
+    if callable(count_tokens := getattr(provider, "count_tokens", None)):
+        return count_tokens
+    provider_name = str(provider.provider_name)
+    if provider_name in (ProviderType.OPENAI.value, ProviderType.OPENAI_COMPATIBLE.value):
+        return _tiktoken_counter(str(provider.model_name))
+    if provider_name == ProviderType.SENTENCE_TRANSFORMERS.value:
+        tokenizer = getattr(getattr(provider, "_model", None), "tokenizer", None)
+        if tokenizer is not None:
+            return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+    return None
+
+
+def _tiktoken_counter(model_name: str) -> TokenCounter | None:
+    """Get a tiktoken-based counter for an OpenAI model."""
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Encodings are downloaded on first use, which fails offline
+        logger.debug("tiktoken unavailable for %s: %s", model_name, e)
+        return None
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
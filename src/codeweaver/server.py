@@ -13,6 +13,9 @@ This is the new clean server implementation that integrates:
 - Integrated FilesystemSource with AST-grep support
 """
 
+import hashlib
+import inspect
+import json
 import logging
 
 from pathlib import Path
@@ -20,10 +23,30 @@ from typing import TYPE_CHECKING, Any, Literal
 
 from fastmcp import Context, FastMCP
 
-from codeweaver.cw_types import ContentSearchResult, ExtensibilityConfig
+from codeweaver.backends.sparse import BM25Encoder
+from codeweaver.cw_types import (
+    BackendError,
+    BackendVectorDimensionMismatchError,
+    CollectionInfo,
+    ContentSearchResult,
+    ExtensibilityConfig,
+    QuantizationMode,
+)
 from codeweaver.factories.extensibility_manager import ExtensibilityManager
 from codeweaver.middleware import ChunkingMiddleware, FileFilteringMiddleware
-from codeweaver.services import ServicesManager
+from codeweaver.providers.batching import QueryBatcher
+from codeweaver.providers.embedding_store import EmbeddingStore
+from codeweaver.providers.tokenization import TokenEstimator, token_budget
+from codeweaver.services import (
+    CachingService,
+    ChunkingExecutor,
+    FileManifest,
+    IndexingPipeline,
+    PipelineConfig,
+    QueryEmbeddingCache,
+    SearchResultCache,
+    ServicesManager,
+)
 
 
 if TYPE_CHECKING:
@@ -77,6 +100,7 @@ class CodeWeaverServer:
         await self.services_manager.initialize()
         await self._setup_domain_middleware()
         await self._initialize_components()
+        self._configure_auto_indexing()
         self._register_tools()
         self._initialized = True
         logger.info("CodeWeaver server initialization complete")
@@ -133,36 +157,148 @@ class CodeWeaverServer:
 
             filesystem_source = FileSystemSource()
         self._components["filesystem_source"] = filesystem_source
+        self._components["query_batcher"] = self._create_query_batcher()
+        self._components["query_cache"] = self._create_query_cache()
+        self._components["search_cache"] = self._create_search_cache()
         await self._ensure_collection()
+        # Text queries need the persisted corpus statistics before anything is reindexed
+        self._open_sparse_encoder(self._workspace_root())
         logger.info("Plugin system components initialized")
 
+    def _configure_auto_indexing(self) -> None:
+        """Have background indexing write to the collection the server searches.
+
+        The backend is the instance the search cache tracks, so writes made by the
+        auto-indexer invalidate cached results. With incremental indexing, the
+        auto-indexer shares the workspace manifest, so after a restart it only
+        processes files that changed and removes the points of deleted files. It
+        also shares the embedding cache and the BM25 encoder with the indexing
+        pipeline, so its points carry the same sparse vectors.
+        """
+        root = self._workspace_root()
+        manifest = self._open_manifest(root) if self.config.indexing.incremental else None
+        self._components["manifest"] = manifest
+        self._components["embedding_store"] = (
+            self._open_embedding_store(root) if self.config.indexing.embedding_cache else None
+        )
+        self.services_manager.configure_auto_indexing(
+            embedding_provider=self._components["embedding_provider"],
+            backend=self._components["backend"],
+            collection_name=self.config.backend.collection_name,
+            manifest=manifest,
+            embedding_store=self._components["embedding_store"],
+            sparse_encoder=self._open_sparse_encoder(root),
+        )
+
+    def _shared_cache_service(self) -> CachingService | None:
+        """The services manager's caching service, if one runs."""
+        cache_service = self.services_manager and self.services_manager.get_cache_service()
+        return cache_service if isinstance(cache_service, CachingService) else None
+
+    def _create_query_batcher(self) -> QueryBatcher | None:
+        """Create the query micro-batcher if the provider can embed query batches."""
+        server_config = self.config.server
+        embedding_provider = self._components["embedding_provider"]
+        if server_config.query_batch_window_ms == 0 or not QueryBatcher.supports(
+            embedding_provider
+        ):
+            return None
+        return QueryBatcher(
+            embedding_provider,
+            max_wait_ms=server_config.query_batch_window_ms,
+            max_batch_size=server_config.query_batch_size,
+        )
+
+    def _create_query_cache(self) -> QueryEmbeddingCache | None:
+        """Create the query embedding cache, sharing the cache service if one runs."""
+        server_config = self.config.server
+        if server_config.query_cache_size == 0:
+            return None
+        return QueryEmbeddingCache(
+            self._components["embedding_provider"],
+            self._shared_cache_service(),
+            batcher=self._components["query_batcher"],
+            max_items=server_config.query_cache_size,
+            ttl_seconds=server_config.query_cache_ttl_seconds,
+        )
+
+    def _create_search_cache(self) -> SearchResultCache | None:
+        """Create the search result cache and let backend writes invalidate it."""
+        if self.config.server.search_cache_size == 0:
+            return None
+        search_cache = SearchResultCache(
+            self._shared_cache_service(), max_items=self.config.server.search_cache_size
+        )
+        search_cache.track(self._components["backend"])
+        return search_cache
+
     async def _ensure_collection(self) -> None:
-        """Ensure the vector collection exists."""
+        """Ensure the vector collection exists and matches the configured storage.
+
+        An existing collection must have the current embedding dimension and
+        quantization mode; vectors stored in different modes can't share a collection.
+        """
         backend = self._components["backend"]
         embedding_provider = self._components["embedding_provider"]
         collection_name = self.config.backend.collection_name
+        quantization = self.config.backend.quantization
+        if hasattr(backend, "quantization_dir"):
+            # Backends quantizing client-side keep their codes with the other index state
+            backend.quantization_dir = self._index_dir(self._workspace_root()) / "quantized"
         try:
             collections = await backend.list_collections()
             if collection_name not in collections:
                 logger.info("Creating collection: %s", collection_name)
+                options = {"quantization": quantization} if quantization.mode.is_quantized else {}
                 await backend.create_collection(
                     name=collection_name,
                     dimension=embedding_provider.dimension,
                     distance_metric="cosine",
+                    **options,
                 )
             else:
+                info = await backend.get_collection_info(collection_name)
+                self._check_collection(info, embedding_provider.dimension, quantization.mode)
                 logger.info("Collection %s already exists", collection_name)
         except Exception:
             logger.exception("Error ensuring collection")
             raise
 
+    def _check_collection(
+        self, info: CollectionInfo, dimension: int, quantization: QuantizationMode
+    ) -> None:
+        """Refuse a collection created with another dimension or quantization mode."""
+        backend_type = str(self.config.backend.provider)
+        if info.dimension != dimension:
+            raise BackendVectorDimensionMismatchError(
+                f"Collection {info.name} stores {info.dimension}-d vectors, but the "
+                f"embedding provider produces {dimension}-d vectors",
+                backend_type=backend_type,
+                recovery_suggestions=["Use a new collection name for the new embedding model"],
+            )
+        if info.quantization != quantization:
+            raise BackendError(
+                f"Collection {info.name} stores {info.quantization.value}-quantized vectors, "
+                f"but {quantization.value} quantization is configured",
+                backend_type=backend_type,
+                operation="ensure_collection",
+                recovery_suggestions=[
+                    "Set backend.quantization to the collection's mode",
+                    "Use a new collection name for the new quantization mode",
+                ],
+            )
+
     async def _index_codebase_handler(
         self, path: str, ctx: Context | None = None
     ) -> dict[str, Any]:
-        """Index a codebase using middleware services and plugin system."""
-        filesystem_source = self._components["filesystem_source"]
-        backend = self._components["backend"]
-        embedding_provider = self._components["embedding_provider"]
+        """Index a codebase using middleware services and plugin system.
+
+        Files are streamed through the bounded indexing pipeline, so vectors are
+        stored window by window instead of after the whole tree has been chunked.
+        With incremental indexing enabled, only added, changed or deleted files
+        are processed on a reindex, and the embedding cache keeps unchanged chunk
+        texts from being embedded again.
+        """
         source_context = {
             "chunking_service": self.services_manager.get_chunking_service()
             if self.services_manager
@@ -171,22 +307,52 @@ class CodeWeaverServer:
             if self.services_manager
             else None,
         }
-        chunks = await filesystem_source.index_content(Path(path), source_context)
-        if chunks:
-            embeddings = await embedding_provider.embed_batch([c.content for c in chunks])
-            vector_points = []
-            for chunk, embedding in zip(chunks, embeddings, strict=False):
-                vector_point = {
-                    "id": hash(chunk.unique_id) & (1 << 63) - 1,
-                    "vector": embedding,
-                    "payload": chunk.to_metadata(),
-                }
-                vector_points.append(vector_point)
-            await backend.upsert_vectors(self.config.backend.collection_name, vector_points)
+        manifest = self._open_manifest(Path(path)) if self.config.indexing.incremental else None
+        embedding_store = (
+            self._open_embedding_store(Path(path)) if self.config.indexing.embedding_cache else None
+        )
+        sparse_encoder = self._open_sparse_encoder(Path(path))
+        executor = self._create_chunking_executor()
+        chunker = executor or source_context["chunking_service"]
+        if chunker is None or (executor is None and self.config.chunking.max_chunk_tokens):
+            chunker = ChunkingMiddleware(self._chunker_config())
+        pipeline = IndexingPipeline(
+            embedding_provider=self._components["embedding_provider"],
+            backend=self._components["backend"],
+            collection_name=self.config.backend.collection_name,
+            chunking_service=chunker,
+            filtering_service=source_context["filtering_service"],
+            config=PipelineConfig(
+                window_size=self.config.indexing.pipeline_window_size,
+                max_concurrent_files=self.config.indexing.max_concurrent_files,
+                max_chunk_size=self.config.chunking.max_chunk_size,
+                min_chunk_size=self.config.chunking.min_chunk_size,
+            ),
+            manifest=manifest,
+            embedding_store=embedding_store,
+            sparse_encoder=sparse_encoder,
+        )
+        try:
+            stats = await pipeline.run(Path(path))
+            if sparse_encoder is not None:
+                sparse_encoder.save()
+            if manifest is not None and (auto_indexing := await self._get_auto_indexing_service()):
+                # Pick up what the pipeline recorded in the shared manifest
+                auto_indexing.load_manifest()
+        finally:
+            if executor is not None:
+                await executor.shutdown()
+            if manifest is not None:
+                manifest.close()
+            # The auto-indexer's store stays open until shutdown
+            shared_store = self._components.get("embedding_store")
+            if embedding_store is not None and embedding_store is not shared_store:
+                embedding_store.close()
         return {
             "status": "success",
-            "indexed_chunks": len(chunks),
+            "indexed_chunks": stats.chunks_created,
             "collection": self.config.backend.collection_name,
+            "pipeline": stats.to_dict(),
             "services_used": {
                 "chunking": source_context["chunking_service"] is not None,
                 "filtering": source_context["filtering_service"] is not None,
@@ -196,6 +362,98 @@ class CodeWeaverServer:
             },
         }
 
+    def _chunker_config(self) -> dict[str, Any]:
+        """Build the chunking middleware configuration used for indexing.
+
+        With a token budget, chunk sizes are derived from the embedding model's
+        chars-per-token ratios, calibrated once per provider.
+        """
+        chunking = self.config.chunking
+        config: dict[str, Any] = {
+            "max_chunk_size": chunking.max_chunk_size,
+            "min_chunk_size": chunking.min_chunk_size,
+            "ast_grep_enabled": True,
+            "nested_chunk_policy": chunking.nested_chunk_policy,
+            "split_oversized_nodes": chunking.split_oversized_nodes,
+        }
+        if chunking.max_chunk_tokens:
+            provider = self._components["embedding_provider"]
+            estimator = TokenEstimator.for_provider(provider)
+            config["max_chunk_tokens"] = token_budget(provider, chunking.max_chunk_tokens)
+            config["chars_per_token"] = dict(estimator.chars_per_token)
+        return config
+
+    def _create_chunking_executor(self) -> ChunkingExecutor | None:
+        """Create the parallel chunking executor, if enabled."""
+        chunking = self.config.chunking
+        if chunking.parallel_mode == "off":
+            return None
+        return ChunkingExecutor(
+            self._chunker_config(),
+            workers=chunking.parallel_workers,
+            mode=chunking.parallel_mode,
+            files_per_task=chunking.files_per_task,
+        )
+
+    def _workspace_root(self) -> Path:
+        """Root of the configured filesystem source, or the working directory."""
+        for source in self.config.data_sources.sources:
+            if source.get("type") == "filesystem" and source.get("enabled", True):
+                return Path(source.get("config", {}).get("root_path", ".")).resolve()
+        return Path.cwd()
+
+    def _index_dir(self, path: Path) -> Path:
+        """Directory holding index state for ``path``."""
+        root = path if path.is_dir() else path.parent
+        return self.config.indexing.index_dir or root / ".codeweaver" / "index"
+
+    def _open_embedding_store(self, path: Path) -> EmbeddingStore:
+        """Open the persistent embedding cache for ``path``.
+
+        The store is single-writer, so the one the auto-indexer uses is returned
+        when it lives in the same directory.
+        """
+        directory = self._index_dir(path) / "embeddings"
+        shared = self._components.get("embedding_store")
+        if shared is not None and shared.directory == directory:
+            return shared
+        return EmbeddingStore(directory, dtype=self.config.indexing.embedding_cache_dtype)
+
+    def _open_sparse_encoder(self, path: Path) -> BM25Encoder | None:
+        """Open the BM25 statistics of the collection, if it stores sparse vectors.
+
+        The backend's encoder is replaced so text queries are weighted with the
+        statistics of the indexed corpus; an encoder already loaded from the same
+        file is reused.
+        """
+        backend = self._components["backend"]
+        options = self.config.backend
+        sparse = options.enable_sparse_vectors or options.enable_hybrid_search
+        if not (sparse and hasattr(backend, "sparse_encoder")):
+            return None
+        collection = self.config.backend.collection_name
+        encoder_path = self._index_dir(path) / f"{collection}.sparse.npz"
+        current = backend.sparse_encoder
+        if isinstance(current, BM25Encoder) and current.path == encoder_path:
+            return current
+        encoder = BM25Encoder(encoder_path)
+        backend.sparse_encoder = encoder
+        return encoder
+
+    def _open_manifest(self, path: Path) -> FileManifest:
+        """Open the file manifest tracking what has been indexed under ``path``."""
+        collection = self.config.backend.collection_name
+        provider = self._components["embedding_provider"]
+        index_dir = self._index_dir(path)
+        # Chunking settings change chunk boundaries, so they invalidate the manifest too
+        chunking = hashlib.sha256(
+            json.dumps(self._chunker_config(), sort_keys=True).encode()
+        ).hexdigest()[:12]
+        return FileManifest(
+            index_dir / f"{collection}.manifest.sqlite3",
+            signature=f"{collection}:{provider.provider_name}:{provider.model_name}:{chunking}",
+        )
+
     def _register_tools(self) -> None:
         """Register MCP tools with FastMCP server."""
         logger.info("Registering MCP tools")
@@ -281,11 +539,31 @@ class CodeWeaverServer:
         rerank: bool = True,
     ) -> list[dict[str, Any]]:
         """Search code using plugin system components."""
+        search_filter = self._build_search_filters(file_filter, language_filter, chunk_type_filter)
+        search_cache = self._components.get("search_cache")
+        if not search_cache:
+            return await self._run_search(query, search_filter, limit, rerank=rerank)
+        return await search_cache.get_or_search(
+            self.config.backend.collection_name,
+            query,
+            lambda: self._run_search(query, search_filter, limit, rerank=rerank),
+            search_filter=search_filter,
+            limit=limit,
+            rerank=rerank,
+        )
+
+    async def _run_search(
+        self, query: str, search_filter: dict[str, Any] | None, limit: int, *, rerank: bool
+    ) -> list[dict[str, Any]]:
+        """Embed the query, search the collection and rerank the hits."""
         backend = self._components["backend"]
-        embedding_provider = self._components["embedding_provider"]
         reranking_provider = self._components["reranking_provider"]
-        query_vector = await embedding_provider.embed_query(query)
-        search_filter = self._build_search_filters(file_filter, language_filter, chunk_type_filter)
+        query_embedder = (
+            self._components.get("query_cache")
+            or self._components.get("query_batcher")
+            or self._components["embedding_provider"]
+        )
+        query_vector = await query_embedder.embed_query(query)
         search_results = await backend.search_vectors(
             collection_name=self.config.backend.collection_name,
             query_vector=query_vector,
@@ -526,13 +804,36 @@ class CodeWeaverServer:
     async def shutdown(self) -> None:
         """Gracefully shutdown the server."""
         logger.info("Shutting down CodeWeaver server")
+        if query_batcher := self._components.get("query_batcher"):
+            await query_batcher.close()
         if self.services_manager:
             await self.services_manager.shutdown()
+        if manifest := self._components.get("manifest"):
+            manifest.close()
+        if embedding_store := self._components.get("embedding_store"):
+            embedding_store.close()
+        await self._close_clients()
         await self.extensibility_manager.shutdown()
         self._components.clear()
         self._initialized = False
         logger.info("server shutdown complete")
 
+    async def _close_clients(self) -> None:
+        """Close the network clients held by the providers and the backend."""
+        closed: list[Any] = []
+        for name in ("embedding_provider", "reranking_provider", "backend"):
+            component = self._components.get(name)
+            close = getattr(component, "close", None)
+            if close is None or any(component is other for other in closed):
+                continue
+            closed.append(component)
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning("Error closing %s: %s", name, e)
+
 
 def create_server(
     config: "CodeWeaverConfig | None" = None,
@@ -5,8 +5,11 @@
 
 """Service layer for CodeWeaver - connecting middleware with factory patterns."""
 
+from codeweaver.services.chunking_executor import ChunkingExecutor
 from codeweaver.services.manager import ServicesManager
+from codeweaver.services.manifest import FileManifest, ManifestEntry
 from codeweaver.services.middleware_bridge import ServiceBridge, ServiceCoordinator
+from codeweaver.services.pipeline import IndexingPipeline, PipelineConfig, PipelineStats
 from codeweaver.services.providers import (
     BaseServiceProvider,
     BehavioralPatternLearningProvider,
@@ -31,6 +34,7 @@ from codeweaver.services.providers import (
     SuccessPatternDatabase,
     TokenBucket,
 )
+from codeweaver.services.query_cache import QueryEmbeddingCache, SearchResultCache
 
 
 __all__ = [
@@ -39,6 +43,7 @@ __all__ = [
     "CacheConfig",
     "CacheEntry",
     "CachingService",
+    "ChunkingExecutor",
     "ChunkingService",
     "ContextAdequacyOptimizationProvider",
     "ContextAdequacyPredictor",
@@ -48,11 +53,18 @@ __all__ = [
     "FastMCPLoggingProvider",
     "FastMCPRateLimitingProvider",
     "FastMCPTimingProvider",
+    "FileManifest",
     "FilteringService",
+    "IndexingPipeline",
     "LLMModelDetector",
+    "ManifestEntry",
+    "PipelineConfig",
+    "PipelineStats",
+    "QueryEmbeddingCache",
     "RateLimitConfig",
     "RateLimitingService",
     "SatisfactionSignalDetector",
+    "SearchResultCache",
     "ServiceBridge",
     "ServiceCoordinator",
     "ServicesManager",
@@ -0,0 +1,206 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""
+Parallel chunking executor for CodeWeaver.
+
+Tree-sitter parsing is CPU-bound and holds the GIL, so chunking inside the event
+loop caps indexing at a single core. The executor farms chunking out to a pool of
+worker processes (or threads), each holding its own ``ChunkingMiddleware``.
+
+Concurrent ``chunk_file`` calls are micro-batched: requests arriving within a short
+window are sent to a worker as one task to amortize IPC, and each caller is
+resolved as soon as its batch completes, so results stream back in completion
+order.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Literal, Self
+
+from codeweaver.cw_types import CodeChunk
+from codeweaver.middleware.chunking import ChunkingMiddleware
+
+
+logger = logging.getLogger(__name__)
+
+ExecutorMode = Literal["process", "thread"]
+
+# Chunker owned by a worker process, created by the pool initializer
+_worker_chunker: ChunkingMiddleware | None = None
+
+
+def _init_worker(config: dict[str, Any]) -> None:
+    """Create the chunker used by a worker process."""
+    global _worker_chunker
+    _worker_chunker = ChunkingMiddleware(config)
+
+
+def _chunk_batch(
+    batch: list[tuple[str, str]], chunker: ChunkingMiddleware | None = None
+) -> list[list[CodeChunk] | str]:
+    """Chunk a batch of files inside a worker.
+
+    Failures are returned as error messages rather than raised, so one bad file
+    does not fail the rest of its batch (and arbitrary exceptions need not be
+    picklable).
+    """
+    chunker = chunker or _worker_chunker
+    results: list[list[CodeChunk] | str] = []
+    for file_path, content in batch:
+        try:
+            results.append(chunker.chunk_file_sync(Path(file_path), content))
+        except Exception as e:
+            results.append(f"{type(e).__name__}: {e}")
+    return results
+
+
+class ChunkingExecutor:
+    """Chunk files on a pool of workers.
+
+    Exposes the middleware's ``chunk_file(file_path, content)`` interface, so it can
+    be used anywhere a chunker is accepted (e.g. by the indexing pipeline). Use it
+    as an async context manager, or call :meth:`start` and :meth:`shutdown`.
+    """
+
+    def __init__(
+        self,
+        config: dict[str, Any] | None = None,
+        *,
+        workers: int | None = None,
+        mode: ExecutorMode = "process",
+        files_per_task: int = 8,
+        batch_delay: float = 0.005,
+    ):
+        """Initialize the chunking executor.
+
+        Args:
+            config: ``ChunkingMiddleware`` configuration used by every worker
+            workers: Number of workers (defaults to the CPU count)
+            mode: ``"process"`` for a process pool, ``"thread"`` for a thread pool
+            files_per_task: Maximum files sent to a worker in one task
+            batch_delay: Seconds to wait for more files before sending a partial batch
+        """
+        self.config = config or {}
+        self.workers = workers or os.cpu_count() or 1
+        self.mode = mode
+        self.files_per_task = max(1, files_per_task)
+        self.batch_delay = batch_delay
+        self._pool: Executor | None = None
+        self._chunker: ChunkingMiddleware | None = None
+        self._pending: list[tuple[str, str, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Future] = set()
+
+    @property
+    def concurrency(self) -> int:
+        """Number of concurrent ``chunk_file`` calls needed to keep all workers busy."""
+        return self.workers * self.files_per_task * 2
+
+    async def __aenter__(self) -> Self:
+        """Start the worker pool."""
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Shut the worker pool down."""
+        await self.shutdown()
+
+    def start(self) -> None:
+        """Start the worker pool."""
+        if self._pool is not None:
+            return
+        if self.mode == "process":
+            # Spawned workers don't inherit the event loop or open sockets
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.config,),
+            )
+        else:
+            self._chunker = ChunkingMiddleware(self.config)
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="codeweaver-chunk"
+            )
+        logger.info(
+            "Chunking executor started: mode=%s, workers=%d, files_per_task=%d",
+            self.mode,
+            self.workers,
+            self.files_per_task,
+        )
+
+    async def shutdown(self) -> None:
+        """Finish in-flight batches and stop the worker pool."""
+        if self._pool is None:
+            return
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        pool, self._pool = self._pool, None
+        await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+        logger.info("Chunking executor stopped")
+
+    async def chunk_file(self, file_path: Path, content: str) -> list[CodeChunk]:
+        """Chunk a file on the worker pool.
+
+        Args:
+            file_path: Path to the file being chunked
+            content: File content to chunk
+
+        Returns:
+            List of CodeChunk objects representing chunks
+        """
+        if self._pool is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((str(file_path), content, future))
+        if len(self._pending) >= self.files_per_task:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Send pending files to the pool as one task."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        items = [(file_path, content) for file_path, content, _ in batch]
+        loop = asyncio.get_running_loop()
+        if self.mode == "process":
+            task = loop.run_in_executor(self._pool, _chunk_batch, items)
+        else:
+            task = loop.run_in_executor(self._pool, _chunk_batch, items, self._chunker)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda done: self._resolve(batch, done))
+
+    @staticmethod
+    def _resolve(batch: list[tuple[str, str, asyncio.Future]], done: asyncio.Future) -> None:
+        """Hand a finished batch's results to the waiting callers."""
+        futures = [future for _, _, future in batch]
+        if done.cancelled() or done.exception() is not None:
+            error = done.exception() if not done.cancelled() else asyncio.CancelledError()
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (file_path, _, future), result in zip(batch, done.result(), strict=True):
+            if future.done():
+                continue
+            if isinstance(result, str):
+                future.set_exception(RuntimeError(f"Chunking failed for {file_path}: {result}"))
+            else:
+                future.set_result(result)
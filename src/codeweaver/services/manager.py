@@ -14,6 +14,7 @@ import logging
 from datetime import UTC, datetime
 from typing import Any
 
+from codeweaver.backends.sparse import BM25Encoder
 from codeweaver.cw_types import (
     CodeWeaver,
     HealthStatus,
@@ -27,6 +28,8 @@ from codeweaver.cw_types import (
     ServiceType,
 )
 from codeweaver.factories.service_registry import ServiceRegistry
+from codeweaver.providers.embedding_store import EmbeddingStore
+from codeweaver.services.manifest import FileManifest
 from codeweaver.services.providers.chunking import ChunkingService
 from codeweaver.services.providers.file_filtering import FilteringService
 
@@ -55,6 +58,9 @@ class ServicesManager:
         self._middleware_services: dict[ServiceType, ServiceProvider] = {}
         self._middleware_registration_order: list[ServiceType] = []
 
+        # Storage handed to the auto-indexing service, kept to rewire it after a restart
+        self._auto_indexing_storage: dict[str, Any] | None = None
+
         # State management
         self._initialized = False
         self._shutdown_event = asyncio.Event()
@@ -74,6 +80,7 @@ class ServicesManager:
 
             # Create and initialize core services
             await self._create_core_services()
+            self._wire_auto_indexing()
 
             # Create optional services if enabled
             await self._create_optional_services()
@@ -176,9 +183,12 @@ class ServicesManager:
         service = self._services.get(ServiceType.ZERO_SHOT_OPTIMIZATION)
         return service or None
 
-    async def get_service(self, service_type: ServiceType) -> ServiceProvider | None:
+    async def get_service(self, service_type: ServiceType | str) -> ServiceProvider | None:
         """Get any service by type or string identifier."""
         # Handle string keys for special services like intent_bridge
+        if isinstance(service_type, str):
+            with contextlib.suppress(ValueError):
+                service_type = ServiceType.from_string(service_type)
         return self._services.get(service_type)
 
     def list_active_services(self) -> dict[ServiceType, ServiceProvider]:
@@ -334,9 +344,52 @@ class ServicesManager:
         # Recreate service
         service = await self._registry.create_service(service_type, config)
         self._services[service_type] = service
+        self._wire_auto_indexing()
 
         self._logger.info("Service restarted successfully: %s", service_type.value)
 
+    def configure_auto_indexing(
+        self,
+        *,
+        embedding_provider: Any,
+        backend: Any,
+        collection_name: str,
+        manifest: FileManifest | None = None,
+        embedding_store: EmbeddingStore | None = None,
+        sparse_encoder: BM25Encoder | None = None,
+    ) -> None:
+        """Set where the auto-indexing service stores the chunks it indexes.
+
+        Args:
+            embedding_provider: Provider embedding the chunk texts
+            backend: Vector backend the server searches
+            collection_name: Collection the chunks are written to
+            manifest: File manifest persisting what has been indexed
+            embedding_store: Persistent embedding cache shared with the indexing pipeline
+            sparse_encoder: BM25 encoder of the collection, for hybrid search
+        """
+        self._auto_indexing_storage = {
+            "embedding_provider": embedding_provider,
+            "backend": backend,
+            "collection_name": collection_name,
+            "manifest": manifest,
+            "embedding_store": embedding_store,
+            "sparse_encoder": sparse_encoder,
+        }
+        self._wire_auto_indexing()
+
+    def _wire_auto_indexing(self) -> None:
+        """Inject the chunking and filtering services and storage into auto-indexing."""
+        from codeweaver.services.providers.auto_indexing import AutoIndexingService
+
+        service = self._services.get(ServiceType.AUTO_INDEXING)
+        if not isinstance(service, AutoIndexingService):
+            return
+        service.chunking_service = self._services.get(ServiceType.CHUNKING)
+        service.filtering_service = self._services.get(ServiceType.FILTERING)
+        if self._auto_indexing_storage:
+            service.configure_storage(**self._auto_indexing_storage)
+
     async def _register_builtin_providers(self) -> None:
         """Register all built-in service providers including middleware providers."""
         try:
@@ -595,6 +648,7 @@ class ServicesManager:
         """Get configuration for a specific service type."""
         config_map = {
             # Core services
+            ServiceType.AUTO_INDEXING: self._config.auto_indexing,
             ServiceType.CHUNKING: self._config.chunking,
             ServiceType.FILTERING: self._config.filtering,
             # Middleware services
@@ -608,6 +662,11 @@ class ServicesManager:
             ServiceType.MONITORING: self._config.monitoring,
             ServiceType.METRICS: self._config.metrics,
             ServiceType.TELEMETRY: self._config.telemetry,
+            # Intent layer services
+            ServiceType.INTENT: self._config.intent,
+            ServiceType.IMPLICIT_LEARNING: self._config.implicit_learning,
+            ServiceType.CONTEXT_INTELLIGENCE: self._config.context_intelligence,
+            ServiceType.ZERO_SHOT_OPTIMIZATION: self._config.zero_shot_optimization,
         }
 
         return config_map.get(service_type)
@@ -0,0 +1,201 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""
+Persistent file manifest for incremental indexing.
+
+Tracks, for every indexed file, the (mtime, size, content hash) it had when it was
+last indexed and the vector point IDs its chunks produced. The indexing pipeline
+uses it to skip unchanged files and to remove stale points from the backend when a
+file changes or disappears.
+"""
+
+import json
+import logging
+import sqlite3
+
+from pathlib import Path
+from typing import Any
+
+from pydantic.dataclasses import dataclass
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    chunk_ids TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stale_chunks (
+    chunk_id
+);
+"""
+
+
+@dataclass
+class ManifestEntry:
+    """Indexed state of a single file."""
+
+    path: str
+    mtime_ns: int
+    size: int
+    content_hash: str
+    chunk_ids: list[str | int]
+
+    def matches_stat(self, stat: Any) -> bool:
+        """Check whether a stat result matches the recorded file state."""
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+
+class FileManifest:
+    """SQLite-backed manifest of indexed files.
+
+    Writes are grouped into a single transaction per indexing run: call
+    :meth:`commit` once the corresponding vectors are stored, or :meth:`rollback`
+    to discard the run's changes so the next run picks the files up again.
+    """
+
+    def __init__(self, path: Path, signature: str | None = None):
+        """Open (or create) a manifest.
+
+        Args:
+            path: Location of the manifest database file
+            signature: Identifies what the recorded chunk IDs belong to (collection,
+                embedding model, ...). A manifest written under a different signature
+                is cleared, forcing a full reindex.
+        """
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        if signature is not None:
+            self._check_signature(signature)
+        self._conn.commit()
+
+    def _check_signature(self, signature: str) -> None:
+        """Reset the manifest when it was written for a different index."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if row and row[0] != signature:
+            logger.info("Manifest signature changed (%s -> %s), resetting", row[0], signature)
+            # The points of the old index are still in the backend; keep their IDs
+            # until the next indexing run deletes them.
+            self._conn.execute(
+                "INSERT INTO stale_chunks (chunk_id) "
+                "SELECT value FROM files, json_each(files.chunk_ids)"
+            )
+            self._conn.execute("DELETE FROM files")
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)", (signature,)
+        )
+
+    def get(self, path: str) -> ManifestEntry | None:
+        """Get the recorded state of a file."""
+        row = self._conn.execute(
+            "SELECT path, mtime_ns, size, content_hash, chunk_ids FROM files WHERE path = ?",
+            (path,),
+        ).fetchone()
+        return self._to_entry(row) if row else None
+
+    def record(
+        self, path: str, mtime_ns: int, size: int, content_hash: str, chunk_ids: list[str | int]
+    ) -> None:
+        """Record the indexed state of a file."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (path, mtime_ns, size, content_hash, chunk_ids) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (path, mtime_ns, size, content_hash, json.dumps(chunk_ids)),
+        )
+
+    def touch(self, path: str, mtime_ns: int, size: int) -> None:
+        """Update the stat fields of a file whose content did not change."""
+        self._conn.execute(
+            "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?", (mtime_ns, size, path)
+        )
+
+    def remove(self, path: str) -> list[str | int]:
+        """Forget a file, returning the chunk IDs it had produced."""
+        entry = self.get(path)
+        if entry is None:
+            return []
+        self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        return entry.chunk_ids
+
+    def remove_missing(self, root: str, seen: set[str]) -> dict[str, list[str | int]]:
+        """Forget files under ``root`` that were not seen in the latest scan.
+
+        Args:
+            root: Directory prefix that was scanned
+            seen: Paths discovered during the scan
+
+        Returns:
+            Chunk IDs of each removed file, keyed by path
+        """
+        root_path = Path(root)
+        missing = [
+            path
+            for path in self.paths()
+            if path not in seen and Path(path).is_relative_to(root_path)
+        ]
+        return {path: self.remove(path) for path in missing}
+
+    def take_stale_chunk_ids(self) -> list[str | int]:
+        """Take the chunk IDs left behind by a signature reset.
+
+        IDs that are recorded again for a reindexed file are kept out, since point
+        IDs derive from chunk content. The queue is cleared as part of the current
+        transaction, so the IDs come back if the run is rolled back.
+        """
+        rows = self._conn.execute(
+            "SELECT DISTINCT chunk_id FROM stale_chunks WHERE chunk_id NOT IN "
+            "(SELECT value FROM files, json_each(files.chunk_ids))"
+        ).fetchall()
+        self._conn.execute("DELETE FROM stale_chunks")
+        return [row[0] for row in rows]
+
+    def entries(self) -> list[ManifestEntry]:
+        """List the recorded state of all files."""
+        rows = self._conn.execute(
+            "SELECT path, mtime_ns, size, content_hash, chunk_ids FROM files"
+        ).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def paths(self) -> list[str]:
+        """List all recorded file paths."""
+        return [row[0] for row in self._conn.execute("SELECT path FROM files")]
+
+    def __len__(self) -> int:
+        """Number of recorded files."""
+        return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def commit(self) -> None:
+        """Persist pending changes."""
+        self._conn.commit()
+
+    def rollback(self) -> None:
+        """Discard pending changes."""
+        self._conn.rollback()
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._conn.close()
+
+    def _to_entry(self, row: tuple[Any, ...]) -> ManifestEntry:
+        """Convert a database row to a manifest entry."""
+        path, mtime_ns, size, content_hash, chunk_ids = row
+        return ManifestEntry(
+            path=path,
+            mtime_ns=mtime_ns,
+            size=size,
+            content_hash=content_hash,
+            chunk_ids=json.loads(chunk_ids),
+        )
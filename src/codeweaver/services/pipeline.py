@@ -0,0 +1,423 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""
+Streaming indexing pipeline for CodeWeaver.
+
+Runs indexing as a set of concurrent stages (discover -> read/chunk -> embed -> upsert)
+joined by bounded queues. Only a fixed window of files, chunks and vectors is held in
+memory at any time, so peak memory depends on the window size rather than on the size
+of the indexed tree, and vectors reach the backend as soon as the first window fills.
+
+When given a :class:`~codeweaver.services.manifest.FileManifest`, the pipeline indexes
+incrementally: unchanged files are skipped and points belonging to changed or deleted
+files are removed from the backend. With an
+:class:`~codeweaver.providers.embedding_store.EmbeddingStore`, only chunk texts that
+were never embedded before are sent to the embedding provider. With a
+:class:`~codeweaver.backends.sparse.BM25Encoder`, each chunk also gets its BM25
+sparse vector, and the encoder's corpus statistics follow the chunks that are
+added and removed.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any
+
+from pydantic import Field
+from pydantic.dataclasses import dataclass
+
+from codeweaver.backends.sparse import BM25Encoder
+from codeweaver.cw_types import CodeChunk, VectorPoint
+from codeweaver.providers.embedding_store import EmbeddingNamespace, EmbeddingStore
+from codeweaver.services.manifest import FileManifest
+
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's output stream
+_DONE = object()
+
+
+@dataclass
+class PipelineConfig:
+    """Configuration for the streaming indexing pipeline."""
+
+    window_size: int = Field(default=64, ge=1)
+    max_concurrent_files: int = Field(default=10, ge=1)
+    flush_interval: float = Field(default=1.0, gt=0)
+    max_chunk_size: int = 1500
+    min_chunk_size: int = 50
+    delete_batch_size: int = Field(default=256, ge=1)
+
+
+@dataclass
+class PipelineStats:
+    """Statistics for a single pipeline run."""
+
+    files_discovered: int = 0
+    files_processed: int = 0
+    files_failed: int = 0
+    files_unchanged: int = 0
+    files_removed: int = 0
+    chunks_created: int = 0
+    embeddings_cached: int = 0
+    vectors_upserted: int = 0
+    vectors_deleted: int = 0
+    batches_upserted: int = 0
+    first_upsert_seconds: float | None = None
+    elapsed_seconds: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert statistics to a plain dictionary."""
+        return {
+            "files_discovered": self.files_discovered,
+            "files_processed": self.files_processed,
+            "files_failed": self.files_failed,
+            "files_unchanged": self.files_unchanged,
+            "files_removed": self.files_removed,
+            "chunks_created": self.chunks_created,
+            "embeddings_cached": self.embeddings_cached,
+            "vectors_upserted": self.vectors_upserted,
+            "vectors_deleted": self.vectors_deleted,
+            "batches_upserted": self.batches_upserted,
+            "first_upsert_seconds": self.first_upsert_seconds,
+            "elapsed_seconds": self.elapsed_seconds,
+        }
+
+
+class IndexingPipeline:
+    """Bounded-memory, staged indexing pipeline.
+
+    Each stage runs as its own task and hands work to the next one through an
+    ``asyncio.Queue`` whose capacity is derived from ``window_size``. A slow
+    stage therefore applies backpressure to everything upstream of it instead of
+    letting work pile up in memory.
+
+    Filtering and chunking accept either the service providers
+    (``discover_files_stream``/``chunk_content``) or the FastMCP middleware
+    (``find_files``/``chunk_file``). When neither is supplied, default middleware
+    instances are used.
+    """
+
+    def __init__(
+        self,
+        *,
+        embedding_provider: Any,
+        backend: Any,
+        collection_name: str,
+        chunking_service: Any | None = None,
+        filtering_service: Any | None = None,
+        config: PipelineConfig | None = None,
+        manifest: FileManifest | None = None,
+        embedding_store: EmbeddingStore | None = None,
+        sparse_encoder: BM25Encoder | None = None,
+    ):
+        """Initialize the indexing pipeline.
+
+        Args:
+            embedding_provider: Provider used to embed chunk content
+            backend: Vector backend receiving the upserts
+            collection_name: Target collection
+            chunking_service: Optional chunking service or middleware
+            filtering_service: Optional filtering service or middleware
+            config: Pipeline configuration
+            manifest: Optional file manifest enabling incremental indexing
+            embedding_store: Optional persistent per-text embedding cache
+            sparse_encoder: Optional BM25 encoder producing sparse vectors for hybrid search
+        """
+        self.embedding_provider = embedding_provider
+        self.backend = backend
+        self.collection_name = collection_name
+        self.config = config or PipelineConfig()
+        self.chunking_service = chunking_service or self._default_chunker()
+        self.filtering_service = filtering_service or self._default_filter()
+        self.manifest = manifest
+        self.embedding_store = embedding_store
+        self.sparse_encoder = sparse_encoder
+        self.stats = PipelineStats()
+        self._start_time = 0.0
+        self._seen_paths: set[str] = set()
+        self._stale_ids: list[str | int] = []
+
+    @property
+    def batch_size(self) -> int:
+        """Number of chunks embedded and upserted together."""
+        provider_limit = getattr(self.embedding_provider, "max_batch_size", None)
+        if provider_limit:
+            return max(1, min(self.config.window_size, provider_limit))
+        return self.config.window_size
+
+    def _default_chunker(self) -> Any:
+        """Create the chunking middleware used when no service is provided."""
+        from codeweaver.middleware.chunking import ChunkingMiddleware
+
+        return ChunkingMiddleware({
+            "max_chunk_size": self.config.max_chunk_size,
+            "min_chunk_size": self.config.min_chunk_size,
+            "ast_grep_enabled": True,
+        })
+
+    def _default_filter(self) -> Any:
+        """Create the filtering middleware used when no service is provided."""
+        from codeweaver.middleware.filtering import FileFilteringMiddleware
+
+        return FileFilteringMiddleware()
+
+    async def run(self, path: Path) -> PipelineStats:
+        """Index a file or directory tree.
+
+        Args:
+            path: File or directory to index
+
+        Returns:
+            Statistics for this run
+        """
+        if not await asyncio.to_thread(path.exists):
+            raise ValueError(f"Path does not exist: {path}")
+        path = await asyncio.to_thread(path.resolve)
+        self.stats = PipelineStats()
+        self._start_time = time.monotonic()
+        self._seen_paths = set()
+        self._stale_ids = []
+        window = self.config.window_size
+        # A pooled chunker needs enough files in flight to keep all of its workers busy
+        workers = max(
+            self.config.max_concurrent_files, getattr(self.chunking_service, "concurrency", 0)
+        )
+        path_queue: asyncio.Queue = asyncio.Queue(maxsize=window)
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=window)
+        vector_queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+        logger.info(
+            "Starting indexing pipeline for %s (window=%d, workers=%d)", path, window, workers
+        )
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._discover_stage(path, path_queue, workers))
+                group.create_task(self._chunk_stage(path_queue, chunk_queue, workers))
+                group.create_task(self._embed_stage(chunk_queue, vector_queue))
+                group.create_task(self._upsert_stage(vector_queue))
+            if self.manifest is not None:
+                await self._remove_stale_points(path)
+        except ExceptionGroup as eg:
+            self._rollback_manifest()
+            # A failed stage cancels the others; surface the original error
+            raise eg.exceptions[0] from eg
+        except BaseException:
+            self._rollback_manifest()
+            raise
+        if self.manifest is not None:
+            self.manifest.commit()
+        self.stats.elapsed_seconds = time.monotonic() - self._start_time
+        logger.info(
+            "Indexing pipeline complete: %d chunks from %d files in %.2fs "
+            "(%d unchanged, %d removed)",
+            self.stats.chunks_created,
+            self.stats.files_processed,
+            self.stats.elapsed_seconds,
+            self.stats.files_unchanged,
+            self.stats.files_removed,
+        )
+        return self.stats
+
+    async def iter_files(self, path: Path) -> AsyncGenerator[Path]:
+        """Yield the files to index under ``path``."""
+        if await asyncio.to_thread(path.is_file):
+            yield path
+            return
+        if hasattr(self.filtering_service, "discover_files_stream"):
+            async for file_path in self.filtering_service.discover_files_stream(path):
+                yield file_path
+        else:
+            for file_path in await self.filtering_service.find_files(path):
+                yield file_path
+
+    async def chunk_file(self, file_path: Path) -> list[CodeChunk]:
+        """Read and chunk a single file."""
+        content = await asyncio.to_thread(file_path.read_text, encoding="utf-8", errors="ignore")
+        return await self._chunk_content(file_path, content)
+
+    async def _chunk_content(self, file_path: Path, content: str) -> list[CodeChunk]:
+        """Chunk the content of a file with the configured chunker."""
+        if not content.strip():
+            logger.debug("Skipping empty file: %s", file_path)
+            return []
+        if hasattr(self.chunking_service, "chunk_content"):
+            return await self.chunking_service.chunk_content(content, file_path)
+        return await self.chunking_service.chunk_file(file_path, content)
+
+    async def _chunk_changed_file(self, file_path: Path) -> list[CodeChunk] | None:
+        """Chunk a file if it changed since it was last indexed.
+
+        Files whose stat fields or content hash match the manifest are skipped
+        (``None``). For changed files the new chunk IDs are recorded and IDs that
+        the file no longer produces are queued for deletion.
+        """
+        key = str(file_path)
+        stat = await asyncio.to_thread(file_path.stat)
+        entry = self.manifest.get(key)
+        if entry is not None and entry.matches_stat(stat):
+            return None
+        content = await asyncio.to_thread(file_path.read_text, encoding="utf-8", errors="ignore")
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        if entry is not None and entry.content_hash == content_hash:
+            self.manifest.touch(key, stat.st_mtime_ns, stat.st_size)
+            return None
+        chunks = await self._chunk_content(file_path, content)
+        chunk_ids = [self.point_id(chunk) for chunk in chunks]
+        self.manifest.record(key, stat.st_mtime_ns, stat.st_size, content_hash, chunk_ids)
+        if entry is not None:
+            self._stale_ids.extend(set(entry.chunk_ids) - set(chunk_ids))
+        return chunks
+
+    def point_id(self, chunk: CodeChunk) -> str:
+        """Get the vector point ID for a chunk."""
+        return chunk.point_id
+
+    def to_vector_point(
+        self,
+        chunk: CodeChunk,
+        embedding: list[float],
+        sparse_vector: dict[int, float] | None = None,
+    ) -> VectorPoint:
+        """Build the vector point stored for a chunk."""
+        return VectorPoint(
+            id=self.point_id(chunk),
+            vector=embedding,
+            payload=chunk.to_metadata(),
+            sparse_vector=sparse_vector or None,
+        )
+
+    async def _discover_stage(self, path: Path, out: asyncio.Queue, workers: int) -> None:
+        """Discover files and feed them to the chunking workers."""
+        index_dir = self.manifest.path.parent if self.manifest is not None else None
+        async for file_path in self.iter_files(path):
+            file_path = file_path.resolve()
+            if index_dir is not None and file_path.is_relative_to(index_dir):
+                continue
+            self.stats.files_discovered += 1
+            self._seen_paths.add(str(file_path))
+            await out.put(file_path)
+        for _ in range(workers):
+            await out.put(_DONE)
+
+    async def _chunk_stage(self, inbox: asyncio.Queue, out: asyncio.Queue, workers: int) -> None:
+        """Run the read/chunk workers and close the chunk stream when they finish."""
+        async with asyncio.TaskGroup() as group:
+            for _ in range(workers):
+                group.create_task(self._chunk_worker(inbox, out))
+        await out.put(_DONE)
+
+    async def _chunk_worker(self, inbox: asyncio.Queue, out: asyncio.Queue) -> None:
+        """Read and chunk files until the discovery stream ends."""
+        while (file_path := await inbox.get()) is not _DONE:
+            try:
+                if self.manifest is None:
+                    chunks = await self.chunk_file(file_path)
+                else:
+                    chunks = await self._chunk_changed_file(file_path)
+            except Exception as e:
+                self.stats.files_failed += 1
+                logger.warning("Failed to process file %s: %s", file_path, e)
+                continue
+            if chunks is None:
+                self.stats.files_unchanged += 1
+                continue
+            self.stats.files_processed += 1
+            self.stats.chunks_created += len(chunks)
+            for chunk in chunks:
+                await out.put(chunk)
+
+    async def _embed_stage(self, inbox: asyncio.Queue, out: asyncio.Queue) -> None:
+        """Group chunks into windows, embed each window and pass on vector points."""
+        batch: list[CodeChunk] = []
+        while True:
+            try:
+                item = await asyncio.wait_for(inbox.get(), timeout=self.config.flush_interval)
+            except TimeoutError:
+                # Upstream is slow; don't hold a partial window back
+                if batch:
+                    await out.put(await self.embed_chunks(batch))
+                    batch = []
+                continue
+            if item is _DONE:
+                break
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                await out.put(await self.embed_chunks(batch))
+                batch = []
+        if batch:
+            await out.put(await self.embed_chunks(batch))
+        await out.put(_DONE)
+
+    async def embed_chunks(self, batch: list[CodeChunk]) -> list[VectorPoint]:
+        """Embed a window of chunks into the vector points stored for them.
+
+        Cached texts are read from the embedding store, and the sparse encoder,
+        when set, adds the chunks to its corpus statistics.
+        """
+        texts = [chunk.content for chunk in batch]
+        if self.embedding_store is None:
+            embeddings = await self.embedding_provider.embed_documents(texts)
+        else:
+            hits = self.embedding_store.hits
+            embeddings = await self.embedding_store.embed(
+                EmbeddingNamespace.for_provider(self.embedding_provider),
+                texts,
+                self.embedding_provider.embed_documents,
+            )
+            self.stats.embeddings_cached += self.embedding_store.hits - hits
+        if self.sparse_encoder is None:
+            sparse_vectors = [None] * len(batch)
+        else:
+            sparse_vectors = self.sparse_encoder.add_documents(
+                [self.point_id(chunk) for chunk in batch], texts
+            )
+        return [
+            self.to_vector_point(chunk, embedding, sparse_vector)
+            for chunk, embedding, sparse_vector in zip(
+                batch, embeddings, sparse_vectors, strict=True
+            )
+        ]
+
+    async def _upsert_stage(self, inbox: asyncio.Queue) -> None:
+        """Upsert vector windows into the backend as they arrive."""
+        while (points := await inbox.get()) is not _DONE:
+            await self.backend.upsert_vectors(self.collection_name, points)
+            if self.stats.first_upsert_seconds is None:
+                self.stats.first_upsert_seconds = time.monotonic() - self._start_time
+            self.stats.batches_upserted += 1
+            self.stats.vectors_upserted += len(points)
+            logger.debug("Upserted window of %d vectors", len(points))
+
+    async def _remove_stale_points(self, path: Path) -> None:
+        """Delete points of changed and deleted files from the backend."""
+        stale_ids = [*self._stale_ids, *self.manifest.take_stale_chunk_ids()]
+        if await asyncio.to_thread(path.is_dir):
+            removed = self.manifest.remove_missing(str(path), self._seen_paths)
+            self.stats.files_removed = len(removed)
+            stale_ids.extend(chunk_id for ids in removed.values() for chunk_id in ids)
+        await self.delete_points(stale_ids)
+        if stale_ids:
+            logger.info("Removed %d stale vectors", len(stale_ids))
+
+    async def delete_points(self, point_ids: list[str | int]) -> None:
+        """Delete points from the backend and the sparse encoder's statistics."""
+        step = self.config.delete_batch_size
+        for start in range(0, len(point_ids), step):
+            batch = point_ids[start : start + step]
+            await self.backend.delete_vectors(self.collection_name, batch)
+            if self.sparse_encoder is not None:
+                self.sparse_encoder.remove_documents(batch)
+            self.stats.vectors_deleted += len(batch)
+
+    def _rollback_manifest(self) -> None:
+        """Discard manifest changes of a failed run."""
+        if self.manifest is not None:
+            self.manifest.rollback()
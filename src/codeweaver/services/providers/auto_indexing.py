@@ -6,112 +6,94 @@
 """Auto-indexing background service provider."""
 
 import asyncio
+import contextlib
+import functools
+import hashlib
 import logging
+import os
+import sqlite3
+import time
 
+from collections.abc import Sequence
 from pathlib import Path
-from typing import Any
+from stat import S_ISREG
+from typing import TYPE_CHECKING, Any
 
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 
 from codeweaver.cw_types import (
     AutoIndexingConfig,
     ChunkingService,
-    ContentItem,
+    CodeChunk,
     FilteringService,
     HealthStatus,
-    ServiceHealth,
     ServiceIntegrationError,
     ServiceType,
 )
+from codeweaver.services.pipeline import IndexingPipeline
 from codeweaver.services.providers.base_provider import BaseServiceProvider
 
 
+if TYPE_CHECKING:
+    from codeweaver.backends.base import VectorBackend
+    from codeweaver.backends.sparse import BM25Encoder
+    from codeweaver.providers.base import EmbeddingProvider
+    from codeweaver.providers.embedding_store import EmbeddingStore
+    from codeweaver.services.manifest import FileManifest
+
+
 class CodebaseChangeHandler(FileSystemEventHandler):
-    """File system event handler for codebase changes."""
+    """File system event handler for codebase changes.
+
+    Watchdog calls the handler on its observer thread, so events are handed to the
+    service's event loop with ``call_soon_threadsafe`` instead of touching asyncio
+    objects directly.
+    """
+
+    def __init__(
+        self,
+        auto_indexing_service: "AutoIndexingService",
+        loop: asyncio.AbstractEventLoop | None = None,
+    ):
+        """Initialize with reference to the auto-indexing service.
 
-    def __init__(self, auto_indexing_service: "AutoIndexingService"):
-        """Initialize with reference to the auto-indexing service."""
+        Args:
+            auto_indexing_service: Service receiving the changes
+            loop: Event loop the service runs on; defaults to the running loop
+        """
         super().__init__()
         self.service = auto_indexing_service
         self._logger = auto_indexing_service._logger
-        self._debounce_tasks: dict[str, asyncio.Task] = {}
-        self._background_tasks: set[asyncio.Task] = set()
+        self._loop = loop or asyncio.get_running_loop()
 
-    def on_modified(self, event: FileSystemEventHandler) -> None:
+    def on_modified(self, event: FileSystemEvent) -> None:
         """Handle file modification events."""
-        if event.is_directory:
-            return
-        file_path = Path(event.src_path)
-        if self._should_process_file(file_path):
-            self.create_and_store_task(file_path)
+        if not event.is_directory:
+            self._queue_change(event.src_path)
 
-    def on_created(self, event: FileSystemEventHandler) -> None:
+    def on_created(self, event: FileSystemEvent) -> None:
         """Handle file creation events."""
-        if event.is_directory:
-            return
-        file_path = Path(event.src_path)
-        if self._should_process_file(file_path):
-            self.create_and_store_task(file_path)
+        self._queue_change(event.src_path, is_directory=event.is_directory)
 
-    def create_and_store_task(self, file_path: FileSystemEventHandler) -> None:
-        """Create and store a debounced indexing task."""
-        task = asyncio.create_task(self._debounced_index_file(file_path))
-        self._background_tasks.add(task)
-        task.add_done_callback(self._background_tasks.discard)
-
-    def on_deleted(self, event: FileSystemEventHandler) -> None:
+    def on_deleted(self, event: FileSystemEvent) -> None:
         """Handle file deletion events."""
-        if event.is_directory:
-            return
-        file_path = Path(event.src_path)
-        if self._should_process_file(file_path):
-            task = asyncio.create_task(self._remove_from_index(file_path))
-            self._background_tasks.add(task)
-            task.add_done_callback(self._background_tasks.discard)
-
-    def _should_process_file(self, file_path: Path) -> bool:
-        """Check if file should be processed using FilteringService if available."""
-        # Use FilteringService if available for consistent filtering logic
-        if self.service.filtering_service:
-            return self.service.filtering_service.should_include_file(
-                file_path,
-                include_patterns=self.service._auto_indexing_config.watch_patterns,
-                exclude_patterns=self.service._auto_indexing_config.ignore_patterns,
-            )
+        self._queue_change(event.src_path, is_directory=event.is_directory)
 
-        # Fallback to custom logic if FilteringService is not available
-        return self._fallback_filtering(file_path)
+    def on_moved(self, event: FileSystemEvent) -> None:
+        """Handle moves and renames as a change at both ends."""
+        self._queue_change(event.src_path, is_directory=event.is_directory)
+        self._queue_change(event.dest_path, is_directory=event.is_directory)
 
-    def _fallback_filtering(self, file_path: Path) -> bool:
-        """Fallback filtering logic when FilteringService is unavailable."""
-        raw_path = str(file_path)
-        for pattern in self.service._auto_indexing_config.ignore_patterns:
-            if pattern in raw_path:
-                return False
-        return any(
-            file_path.match(pattern)
-            for pattern in self.service._auto_indexing_config.watch_patterns
+    def _queue_change(self, path: str | bytes, *, is_directory: bool = False) -> None:
+        """Pass a changed path to the service on its event loop."""
+        queue = functools.partial(
+            self.service.queue_change, Path(os.fsdecode(path)), is_directory=is_directory
         )
-
-    async def _debounced_index_file(self, file_path: Path):
-        """Index file with debouncing to avoid excessive processing."""
-        file_key = str(file_path)
-        if file_key in self._debounce_tasks:
-            self._debounce_tasks[file_key].cancel()
-
-        async def _delayed_index():
-            await asyncio.sleep(self.service._auto_indexing_config.debounce_delay)
-            await self.service._index_single_file(file_path)
-
-        self._debounce_tasks[file_key] = asyncio.create_task(_delayed_index())
-
-    async def _remove_from_index(self, file_path: Path):
-        """Remove file from index."""
         try:
-            await self.service._remove_file_from_index(file_path)
-        except Exception as e:
-            self._logger.warning("Failed to remove file from index %s: %s", file_path, e)
+            self._loop.call_soon_threadsafe(queue)
+        except RuntimeError:
+            self._logger.debug("Event loop closed, dropping change to %s", path)
 
 
 class AutoIndexingService(BaseServiceProvider):
@@ -135,21 +117,64 @@ class AutoIndexingService(BaseServiceProvider):
     - Framework developer control only
     """
 
-    def __init__(self, config: AutoIndexingConfig, logger: logging.Logger | None = None):
+    def __init__(
+        self,
+        service_type: ServiceType,
+        config: AutoIndexingConfig,
+        logger: logging.Logger | None = None,
+    ):
         """Initialize the auto-indexing service."""
-        super().__init__(ServiceType.AUTO_INDEXING, config, logger)
+        super().__init__(service_type, config, logger)
         self._auto_indexing_config = config
         self.observer: Observer | None = None
         self.watched_paths: set[str] = set()
         self.chunking_service: ChunkingService | None = None
         self.filtering_service: FilteringService | None = None
         self.backend_registry = None
-        self._indexing_queue: asyncio.Queue = asyncio.Queue(maxsize=config.indexing_queue_size)
+        # Where indexed chunks are stored; injected like the services above. Without
+        # them, files are chunked and tracked but nothing is embedded.
+        self.embedding_provider: EmbeddingProvider | None = None
+        self.backend: VectorBackend | None = None
+        self.collection_name: str | None = None
+        # Builds and deletes points the way the indexing pipeline does, so they
+        # carry sparse vectors and reuse cached embeddings
+        self._storage: IndexingPipeline | None = None
+        # Persists what is indexed so a restart only processes files that changed
+        self.manifest: FileManifest | None = None
+        # Each queue item is one unit of work: the loop time of its oldest change and
+        # the files to index together
+        self._indexing_queue: asyncio.Queue[tuple[float, list[Path]]] = asyncio.Queue(
+            maxsize=config.indexing_queue_size
+        )
+        # Change times of units that are being diffed, queued or indexed
+        self._outstanding_since: list[float] = []
         self._indexing_workers: list[asyncio.Task] = []
+        # Point IDs stored for each indexed file, used to replace or delete its chunks
+        self._file_point_ids: dict[str, list[str]] = {}
+        # (mtime_ns, size) of each indexed file when it was read, to skip unchanged files
+        self._indexed_stats: dict[str, tuple[int, int]] = {}
+        # Files a worker is indexing or removing; changes to them seen by another
+        # worker meanwhile are deferred and queued again once the first one is done
+        self._files_in_flight: set[Path] = set()
+        self._deferred_files: set[Path] = set()
+        # Changed paths waiting for the event stream to go quiet
+        self._pending_files: set[Path] = set()
+        self._pending_directories: set[Path] = set()
+        self._first_change_at = 0.0
+        self._last_change_at = 0.0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._background_tasks: set[asyncio.Task] = set()
         self._indexing_stats = {
             "files_indexed": 0,
             "files_failed": 0,
+            "files_removed": 0,
+            "change_batches": 0,
             "total_chunks_created": 0,
+            "embedding_batches": 0,
+            "vectors_upserted": 0,
+            "vectors_deleted": 0,
+            "indexing_seconds": 0.0,
+            "last_indexing_lag": None,
             "last_indexing_time": None,
         }
 
@@ -175,10 +200,14 @@ class AutoIndexingService(BaseServiceProvider):
         if self.observer and self.observer.is_alive():
             self.observer.stop()
             self.observer.join()
-        for worker in self._indexing_workers:
-            worker.cancel()
-        if self._indexing_workers:
-            await asyncio.gather(*self._indexing_workers, return_exceptions=True)
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        tasks = [*self._indexing_workers, *self._background_tasks]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
         self._logger.info(
             "Auto-indexing statistics: %d files indexed, %d failed, %d chunks created",
             self._indexing_stats["files_indexed"],
@@ -228,10 +257,14 @@ class AutoIndexingService(BaseServiceProvider):
             self._logger.info("Path already being monitored: %s", path)
             return
         self._logger.info("Starting monitoring for path: %s", path)
+        if not self.storage_configured:
+            self._logger.warning(
+                "No embedding provider or vector backend set; indexed files are only tracked"
+            )
         try:
             if self._auto_indexing_config.initial_scan_enabled:
                 await self._index_path_initial(path)
-            event_handler = CodebaseChangeHandler(self)
+            event_handler = CodebaseChangeHandler(self, asyncio.get_running_loop())
             self.observer.schedule(
                 event_handler, path, recursive=self._auto_indexing_config.recursive_monitoring
             )
@@ -295,29 +328,218 @@ class AutoIndexingService(BaseServiceProvider):
                 include_patterns=self._auto_indexing_config.watch_patterns,
                 exclude_patterns=self._auto_indexing_config.ignore_patterns,
             )
-            self._logger.info("Found %d files to index in %s", len(files), path)
-            for file_path in files:
-                try:
-                    await self._indexing_queue.put(file_path)
-                except asyncio.QueueFull:
-                    self._logger.warning("Indexing queue full, skipping file: %s", file_path)
-                    break
+            # Files indexed before a restart are diffed like changes, so unchanged
+            # files are skipped and files deleted in the meantime lose their points
+            await self._remove_reset_points()
+            candidates = set(files) | self._indexed_under(Path(path))
+            to_index, to_remove = await asyncio.to_thread(self._diff_changes, candidates)
+            await self._remove_files_from_index(to_remove)
+            self._logger.info(
+                "Found %d files in %s: %d to index, %d removed",
+                len(files),
+                path,
+                len(to_index),
+                len(to_remove),
+            )
+            batch_size = self._auto_indexing_config.indexing_batch_size
+            changed_at = asyncio.get_running_loop().time()
+            for start in range(0, len(to_index), batch_size):
+                self._outstanding_since.append(changed_at)
+                await self._indexing_queue.put((changed_at, to_index[start : start + batch_size]))
         except Exception:
             self._logger.exception("Failed to perform initial indexing of %s", path)
 
-    async def _index_single_file(self, file_path: Path) -> None:
-        """Index a single file."""
+    def queue_change(self, path: Path, *, is_directory: bool = False) -> None:
+        """Buffer a changed path until the stream of changes goes quiet.
+
+        Repeated events for a path collapse into one entry. The batch is flushed
+        ``debounce_delay`` seconds after the last event, or ``max_batch_delay``
+        seconds after the first one at the latest, so an event storm such as a
+        branch switch becomes a single diff and a single unit of indexing work.
+        Must be called on the service's event loop.
+
+        Args:
+            path: Changed file or directory
+            is_directory: Whether ``path`` is a directory
+        """
+        (self._pending_directories if is_directory else self._pending_files).add(path)
+        loop = asyncio.get_running_loop()
+        self._last_change_at = loop.time()
+        if self._flush_handle is None:
+            self._first_change_at = self._last_change_at
+            self._flush_handle = loop.call_later(
+                self._auto_indexing_config.debounce_delay, self._flush_when_quiet
+            )
+
+    def _flush_when_quiet(self) -> None:
+        """Flush pending changes once events have stopped or the batch is too old."""
+        loop = asyncio.get_running_loop()
+        flush_at = min(
+            self._last_change_at + self._auto_indexing_config.debounce_delay,
+            self._first_change_at + self._auto_indexing_config.max_batch_delay,
+        )
+        if (remaining := flush_at - loop.time()) > 0:
+            self._flush_handle = loop.call_later(remaining, self._flush_when_quiet)
+            return
+        self._flush_handle = None
+        files, self._pending_files = self._pending_files, set()
+        directories, self._pending_directories = self._pending_directories, set()
+        self._outstanding_since.append(self._first_change_at)
+        task = asyncio.create_task(self._flush_changes(files, directories, self._first_change_at))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _flush_changes(
+        self, files: set[Path], directories: set[Path], changed_at: float
+    ) -> None:
+        """Diff a batch of changed paths against the index and queue the work.
+
+        Args:
+            files: Files reported as changed
+            directories: Directories created, deleted or moved; their contents are
+                rediscovered and compared with what is indexed beneath them
+            changed_at: Loop time of the oldest change in the batch
+        """
+        queued = False
         try:
-            await self._indexing_queue.put(file_path)
-        except asyncio.QueueFull:
-            self._logger.warning("Indexing queue full, skipping file: %s", file_path)
+            candidates = set(files)
+            for directory in directories:
+                candidates.update(self._indexed_under(directory))
+                if self.filtering_service and directory.is_dir():
+                    candidates.update(
+                        await self.filtering_service.discover_files(
+                            directory,
+                            include_patterns=self._auto_indexing_config.watch_patterns,
+                            exclude_patterns=self._auto_indexing_config.ignore_patterns,
+                        )
+                    )
+            to_index, to_remove = await asyncio.to_thread(self._diff_changes, candidates)
+            await self._remove_files_from_index(to_remove)
+            if to_index:
+                await self._indexing_queue.put((changed_at, to_index))
+                queued = True
+            self._indexing_stats["change_batches"] += 1
+            self._logger.info(
+                "Processed %d changed paths: %d to index, %d removed",
+                len(candidates),
+                len(to_index),
+                len(to_remove),
+            )
+        except Exception:
+            self._logger.exception("Failed to process file system changes")
+        finally:
+            if not queued:
+                self._outstanding_since.remove(changed_at)
+
+    def _indexed_under(self, directory: Path) -> set[Path]:
+        """Indexed files beneath a directory."""
+        return {
+            file_path
+            for file_path in map(Path, self._file_point_ids)
+            if file_path.is_relative_to(directory)
+        }
+
+    def _diff_changes(self, candidates: set[Path]) -> tuple[list[Path], list[Path]]:
+        """Split changed paths into files to index and files to remove.
 
-    async def _remove_file_from_index(self, file_path: Path) -> None:
-        """Remove a file from the index."""
+        Files whose mtime and size match what was indexed are dropped, so events
+        that did not change anything (touches, a branch switch and back) cost a
+        stat each. Runs in a worker thread.
+
+        Args:
+            candidates: Paths that may have changed
+
+        Returns:
+            Files to (re)index and indexed files to remove
+        """
+        to_index: list[Path] = []
+        to_remove: list[Path] = []
+        for file_path in sorted(candidates):
+            key = str(file_path)
+            try:
+                stat = file_path.stat()
+            except OSError:
+                stat = None
+            if stat is None or not S_ISREG(stat.st_mode):
+                if key in self._file_point_ids:
+                    to_remove.append(file_path)
+            elif self._indexed_stats.get(key) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            elif self._should_process_file(file_path):
+                to_index.append(file_path)
+            elif key in self._file_point_ids:
+                to_remove.append(file_path)
+        return to_index, to_remove
+
+    def _should_process_file(self, file_path: Path) -> bool:
+        """Check if file should be processed using FilteringService if available."""
+        # Use FilteringService if available for consistent filtering logic
+        if self.filtering_service:
+            return self.filtering_service.should_include_file(
+                file_path,
+                include_patterns=self._auto_indexing_config.watch_patterns,
+                exclude_patterns=self._auto_indexing_config.ignore_patterns,
+            )
+
+        # Fallback to custom logic if FilteringService is not available
+        return self._fallback_filtering(file_path)
+
+    def _fallback_filtering(self, file_path: Path) -> bool:
+        """Fallback filtering logic when FilteringService is unavailable."""
+        raw_path = str(file_path)
+        for pattern in self._auto_indexing_config.ignore_patterns:
+            if pattern in raw_path:
+                return False
+        return any(
+            file_path.match(pattern) for pattern in self._auto_indexing_config.watch_patterns
+        )
+
+    async def _remove_files_from_index(self, file_paths: list[Path]) -> None:
+        """Remove files from the index, deleting all of their points in one call."""
+        file_paths = self._claim_files(file_paths)
+        if not file_paths:
+            return
+        point_ids = [
+            point_id
+            for file_path in file_paths
+            for point_id in self._file_point_ids.get(str(file_path), [])
+        ]
         try:
-            self._logger.debug("File removed from index: %s", file_path)
+            await self._delete_points(point_ids)
         except Exception as e:
-            self._logger.warning("Failed to remove file from index %s: %s", file_path, e)
+            self._logger.warning("Failed to remove %d files from index: %s", len(file_paths), e)
+        else:
+            for file_path in file_paths:
+                self._indexed_stats.pop(str(file_path), None)
+                self._file_point_ids.pop(str(file_path), None)
+            self._write_manifest(removed=file_paths)
+            self._save_sparse_encoder()
+            self._indexing_stats["files_removed"] += len(file_paths)
+            self._logger.debug(
+                "Removed %d files from index (%d points)", len(file_paths), len(point_ids)
+            )
+        finally:
+            self._release_files(file_paths)
+
+    def _claim_files(self, file_paths: list[Path]) -> list[Path]:
+        """Mark files as in flight, deferring those another worker is processing."""
+        claimed = []
+        for file_path in file_paths:
+            if file_path in self._files_in_flight:
+                self._deferred_files.add(file_path)
+            else:
+                self._files_in_flight.add(file_path)
+                claimed.append(file_path)
+        return claimed
+
+    def _release_files(self, file_paths: list[Path]) -> None:
+        """Release processed files and queue the changes deferred meanwhile again."""
+        for file_path in file_paths:
+            self._files_in_flight.discard(file_path)
+            if file_path in self._deferred_files:
+                self._deferred_files.discard(file_path)
+                # Diffed again, so it is skipped if the first worker saw the change
+                self.queue_change(file_path)
 
     async def _start_indexing_workers(self) -> None:
         """Start background indexing workers."""
@@ -332,18 +554,86 @@ class AutoIndexingService(BaseServiceProvider):
         self._logger.debug("Starting indexing worker: %s", worker_name)
         while True:
             try:
-                file_path = await asyncio.wait_for(self._indexing_queue.get(), timeout=30.0)
-                await self._process_file_for_indexing(file_path, worker_name)
+                changed_at, file_paths = await asyncio.wait_for(
+                    self._indexing_queue.get(), timeout=30.0
+                )
             except TimeoutError:
                 continue
             except asyncio.CancelledError:
                 self._logger.debug("Indexing worker %s cancelled", worker_name)
                 break
+            try:
+                await self._index_files(file_paths, worker_name)
+                self._indexing_stats["last_indexing_lag"] = (
+                    asyncio.get_running_loop().time() - changed_at
+                )
             except Exception:
                 self._logger.exception("Indexing worker %s error.", worker_name)
+            finally:
+                self._outstanding_since.remove(changed_at)
+
+    async def _index_files(self, file_paths: list[Path], worker_name: str) -> None:
+        """Index a unit of work, ``indexing_batch_size`` files at a time.
 
-    async def _process_file_for_indexing(self, file_path: Path, worker_name: str) -> None:
-        """Process a single file for indexing."""
+        The chunks of each group of files are pooled, embedded in batches of
+        :attr:`embedding_batch_size` and upserted batch by batch. Points the files
+        no longer produce are then deleted in a single call. Files another
+        worker is processing are left to it and queued again afterwards.
+        """
+        file_paths = self._claim_files(file_paths)
+        try:
+            await self._index_claimed_files(file_paths, worker_name)
+            self._save_sparse_encoder()
+        finally:
+            self._release_files(file_paths)
+
+    async def _index_claimed_files(self, file_paths: list[Path], worker_name: str) -> None:
+        """Index files claimed by a worker, one ``indexing_batch_size`` group at a time."""
+        step = self._auto_indexing_config.indexing_batch_size
+        for start in range(0, len(file_paths), step):
+            started = time.monotonic()
+            chunked = [
+                (file_path, *result)
+                for file_path in file_paths[start : start + step]
+                if (result := await self._chunk_file_for_indexing(file_path, worker_name))
+            ]
+            chunks = [chunk for *_, file_chunks in chunked for chunk in file_chunks]
+            stale_ids = {
+                point_id
+                for file_path, *_, file_chunks in chunked
+                for point_id in self._stale_point_ids(file_path, file_chunks)
+            }
+            try:
+                await self._store_chunks(chunks)
+                await self._delete_points(list(stale_ids))
+            except Exception as e:
+                self._indexing_stats["files_failed"] += len(chunked)
+                self._logger.warning(
+                    "Worker %s failed to store %d files: %s", worker_name, len(chunked), e
+                )
+                continue
+            for file_path, stat, _, file_chunks in chunked:
+                self._file_point_ids[str(file_path)] = [chunk.point_id for chunk in file_chunks]
+                self._indexed_stats[str(file_path)] = (stat.st_mtime_ns, stat.st_size)
+            self._write_manifest(indexed=chunked)
+            self._indexing_stats["files_indexed"] += len(chunked)
+            self._indexing_stats["total_chunks_created"] += len(chunks)
+            self._indexing_stats["indexing_seconds"] += time.monotonic() - started
+            self._indexing_stats["last_indexing_time"] = asyncio.get_running_loop().time()
+            self._logger.debug(
+                "Worker %s indexed %d files (%d chunks)", worker_name, len(chunked), len(chunks)
+            )
+
+    async def _chunk_file_for_indexing(
+        self, file_path: Path, worker_name: str
+    ) -> tuple[os.stat_result, str, list[CodeChunk]] | None:
+        """Read and chunk a file, or return None if it is skipped or fails.
+
+        Returns:
+            The file's stat result, the hash of its content and its chunks. Files
+            whose content hash matches the manifest are not chunked again; only
+            their recorded stat fields are updated and None is returned.
+        """
         try:
             # Use FilteringService metadata if available for enhanced file checking
             if self.filtering_service:
@@ -351,35 +641,47 @@ class AutoIndexingService(BaseServiceProvider):
                     metadata = await self.filtering_service.get_file_metadata(file_path)
                     if metadata.is_binary:
                         self._logger.debug("Skipping binary file: %s", file_path)
-                        return
+                        return None
                     if metadata.size > self._auto_indexing_config.max_file_size:
                         self._logger.debug(
                             "Skipping large file: %s (%d bytes)", file_path, metadata.size
                         )
-                        return
+                        return None
                 except Exception as e:
                     self._logger.warning("Failed to get file metadata for %s: %s", file_path, e)
                     # Continue with fallback logic
 
             # Fallback to basic size check
-            if file_path.stat().st_size > self._auto_indexing_config.max_file_size:
+            stat = await asyncio.to_thread(file_path.stat)
+            if stat.st_size > self._auto_indexing_config.max_file_size:
                 self._logger.debug("Skipping large file: %s", file_path)
-                return
+                return None
             content = await self._read_file_content(file_path)
+            content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            if self._content_unchanged(file_path, content_hash):
+                self._indexed_stats[str(file_path)] = (stat.st_mtime_ns, stat.st_size)
+                self._write_manifest(touched=[(file_path, stat)])
+                return None
             if not content.strip():
-                self._logger.debug("Skipping empty file: %s", file_path)
-                return
-            chunks = await self.chunking_service.chunk_content(content, str(file_path))
-            await self._store_chunks_via_backend(file_path, chunks)
-            self._indexing_stats["files_indexed"] += 1
-            self._indexing_stats["total_chunks_created"] += len(chunks)
-            self._indexing_stats["last_indexing_time"] = asyncio.get_event_loop().time()
-            self._logger.debug(
-                "Worker %s indexed file %s (%d chunks)", worker_name, file_path, len(chunks)
-            )
+                # An emptied file keeps no chunks, so its old points become stale
+                return stat, content_hash, []
+            chunks = await self.chunking_service.chunk_content(content, file_path)
         except Exception as e:
             self._indexing_stats["files_failed"] += 1
             self._logger.warning("Worker %s failed to index file %s: %s", worker_name, file_path, e)
+            return None
+        else:
+            return stat, content_hash, chunks
+
+    def _content_unchanged(self, file_path: Path, content_hash: str) -> bool:
+        """Whether an indexed file still has the content recorded in the manifest."""
+        if self.manifest is None or str(file_path) not in self._file_point_ids:
+            return False
+        try:
+            entry = self.manifest.get(str(file_path))
+        except sqlite3.Error:
+            return False
+        return entry is not None and entry.content_hash == content_hash
 
     async def _read_file_content(self, file_path: Path) -> str:
         """Read file content with error handling."""
@@ -390,45 +692,198 @@ class AutoIndexingService(BaseServiceProvider):
             with file_path.open("r", encoding="latin1") as f:
                 return f.read()
 
-    async def _store_chunks_via_backend(self, file_path: Path, chunks: list[ContentItem]) -> None:
-        """Store chunks using existing backend patterns."""
-        self._logger.debug("Storing %d chunks for file: %s", len(chunks), file_path)
+    def configure_storage(
+        self,
+        embedding_provider: "EmbeddingProvider",
+        backend: "VectorBackend",
+        collection_name: str,
+        manifest: "FileManifest | None" = None,
+        embedding_store: "EmbeddingStore | None" = None,
+        sparse_encoder: "BM25Encoder | None" = None,
+    ) -> None:
+        """Set where indexed chunks are embedded and stored.
+
+        Args:
+            embedding_provider: Provider embedding the chunk texts
+            backend: Vector backend the server searches
+            collection_name: Collection the chunks are written to
+            manifest: File manifest of the collection. What it records is loaded
+                as already indexed, and indexed or removed files are written
+                through to it. The caller owns and closes it.
+            embedding_store: Persistent embedding cache shared with the indexing
+                pipeline. The caller owns and closes it.
+            sparse_encoder: BM25 encoder of the collection; indexed and removed
+                chunks update its statistics, which are saved after each change
+        """
+        self.embedding_provider = embedding_provider
+        self.backend = backend
+        self.collection_name = collection_name
+        self.manifest = manifest
+        self._storage = IndexingPipeline(
+            embedding_provider=embedding_provider,
+            backend=backend,
+            collection_name=collection_name,
+            chunking_service=self.chunking_service,
+            filtering_service=self.filtering_service,
+            embedding_store=embedding_store,
+            sparse_encoder=sparse_encoder,
+        )
+        self.load_manifest()
+
+    def load_manifest(self) -> None:
+        """Replace the indexed file state with what the manifest records.
+
+        Also call this after another indexer, such as the indexing pipeline, has
+        written to the same manifest.
+        """
+        if self.manifest is None:
+            return
+        entries = self.manifest.entries()
+        self._file_point_ids = {entry.path: list(entry.chunk_ids) for entry in entries}
+        self._indexed_stats = {entry.path: (entry.mtime_ns, entry.size) for entry in entries}
+        self._logger.info("Loaded %d indexed files from the manifest", len(entries))
+
+    def _write_manifest(
+        self,
+        *,
+        indexed: Sequence[tuple[Path, os.stat_result, str, list[CodeChunk]]] = (),
+        touched: Sequence[tuple[Path, os.stat_result]] = (),
+        removed: Sequence[Path] = (),
+    ) -> None:
+        """Persist indexed, unchanged and removed files in one manifest transaction.
+
+        The manifest may be locked by a running indexing pipeline; a failed write
+        is logged, and the files are then reprocessed after a restart.
+        """
+        if self.manifest is None:
+            return
+        try:
+            for file_path, stat, content_hash, chunks in indexed:
+                self.manifest.record(
+                    str(file_path),
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    content_hash,
+                    [chunk.point_id for chunk in chunks],
+                )
+            for file_path, stat in touched:
+                self.manifest.touch(str(file_path), stat.st_mtime_ns, stat.st_size)
+            for file_path in removed:
+                self.manifest.remove(str(file_path))
+            self.manifest.commit()
+        except sqlite3.Error as e:
+            with contextlib.suppress(sqlite3.Error):
+                self.manifest.rollback()
+            self._logger.warning("Failed to update the file manifest: %s", e)
+
+    async def _remove_reset_points(self) -> None:
+        """Delete the points of files the manifest forgot when its signature changed."""
+        if self.manifest is None or not self.storage_configured:
+            return
+        try:
+            stale_ids = self.manifest.take_stale_chunk_ids()
+            await self._delete_points(stale_ids)
+            self.manifest.commit()
+            self._save_sparse_encoder()
+        except sqlite3.Error as e:
+            with contextlib.suppress(sqlite3.Error):
+                self.manifest.rollback()
+            self._logger.warning("Failed to remove points of the previous index: %s", e)
+
+    @property
+    def storage_configured(self) -> bool:
+        """Whether indexed chunks are embedded and written to a vector backend."""
+        return self._storage is not None and bool(
+            self.embedding_provider and self.backend and self.collection_name
+        )
+
+    @property
+    def embedding_batch_size(self) -> int:
+        """Number of chunks embedded and upserted together."""
+        limit = self._auto_indexing_config.embedding_batch_size
+        provider_limit = getattr(self.embedding_provider, "max_batch_size", None)
+        return max(1, min(limit, provider_limit)) if provider_limit else limit
+
+    def _stale_point_ids(self, file_path: Path, chunks: list[CodeChunk]) -> set[str]:
+        """Point IDs stored for a file that its new chunks no longer produce."""
+        previous_ids = self._file_point_ids.get(str(file_path), [])
+        return set(previous_ids) - {chunk.point_id for chunk in chunks}
+
+    async def _store_chunks(self, chunks: list[CodeChunk]) -> None:
+        """Embed chunks with one provider call per batch and upsert each batch."""
+        if not chunks or not self.storage_configured:
+            return
+        batch_size = self.embedding_batch_size
+        for start in range(0, len(chunks), batch_size):
+            points = await self._storage.embed_chunks(chunks[start : start + batch_size])
+            await self.backend.upsert_vectors(self.collection_name, points)
+            self._indexing_stats["embedding_batches"] += 1
+            self._indexing_stats["vectors_upserted"] += len(points)
+
+    async def _delete_points(self, point_ids: list[str]) -> None:
+        """Delete points from the backend in one call."""
+        if not point_ids or not self.storage_configured:
+            return
+        await self._storage.delete_points(point_ids)
+        self._indexing_stats["vectors_deleted"] += len(point_ids)
+
+    def _save_sparse_encoder(self) -> None:
+        """Persist the BM25 statistics after indexed chunks changed them."""
+        if self._storage is None or self._storage.sparse_encoder is None:
+            return
+        try:
+            self._storage.sparse_encoder.save()
+        except OSError as e:
+            self._logger.warning("Failed to save the sparse encoder: %s", e)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get throughput and lag metrics for background indexing.
+
+        Returns:
+            Counters, files and chunks indexed per second of indexing work, queue
+            depth, and the age of the oldest change not yet indexed
+        """
+        stats = self._indexing_stats
+        busy = stats["indexing_seconds"]
+        outstanding = list(self._outstanding_since)
+        if self._flush_handle is not None:
+            outstanding.append(self._first_change_at)
+        oldest = min(outstanding, default=None)
+        return {
+            "files_indexed": stats["files_indexed"],
+            "files_failed": stats["files_failed"],
+            "files_removed": stats["files_removed"],
+            "total_chunks_created": stats["total_chunks_created"],
+            "embedding_batches": stats["embedding_batches"],
+            "vectors_upserted": stats["vectors_upserted"],
+            "vectors_deleted": stats["vectors_deleted"],
+            "change_batches": stats["change_batches"],
+            "files_per_second": stats["files_indexed"] / busy if busy else 0.0,
+            "chunks_per_second": stats["total_chunks_created"] / busy if busy else 0.0,
+            "queue_depth": self._indexing_queue.qsize(),
+            "pending_changes": len(self._pending_files) + len(self._pending_directories),
+            "oldest_pending_change_seconds": (
+                asyncio.get_running_loop().time() - oldest if oldest is not None else 0.0
+            ),
+            "last_indexing_lag_seconds": stats["last_indexing_lag"],
+            "indexing_workers_active": len([w for w in self._indexing_workers if not w.done()]),
+            "observer_running": bool(self.observer and self.observer.is_alive()),
+        }
 
     async def _get_chunking_service(self) -> ChunkingService | None:
         """Get chunking service through dependency injection."""
-        # Service injection should be provided by the service manager during initialization
-        # This will be updated when the auto-indexing service is properly integrated
-        # with the ServicesManager dependency injection system
+        # Set by the services manager once the core services exist
         return self.chunking_service
 
     async def _get_filtering_service(self) -> FilteringService | None:
         """Get filtering service through dependency injection."""
-        # Service injection should be provided by the service manager during initialization
-        # This will be updated when the auto-indexing service is properly integrated
-        # with the ServicesManager dependency injection system
+        # Set by the services manager once the core services exist
         return self.filtering_service
 
     async def _get_backend_registry(self):
         """Get backend registry through dependency injection."""
         return
 
-    async def health_check(self) -> ServiceHealth:
-        """Enhanced health check with auto-indexing specific metrics."""
-        base_health = await super().health_check()
-        base_health.metadata = {
-            "watched_paths_count": len(self.watched_paths),
-            "watched_paths": list(self.watched_paths),
-            "files_indexed": self._indexing_stats["files_indexed"],
-            "files_failed": self._indexing_stats["files_failed"],
-            "total_chunks_created": self._indexing_stats["total_chunks_created"],
-            "indexing_workers_active": len([w for w in self._indexing_workers if not w.done()]),
-            "queue_size": self._indexing_queue.qsize(),
-            "observer_running": bool(self.observer and self.observer.is_alive()),
-            "chunking_service_available": bool(self.chunking_service),
-            "filtering_service_available": bool(self.filtering_service),
-        }
-        return base_health
-
     async def create_service_context(
         self, base_context: dict[str, Any] | None = None
     ) -> dict[str, Any]:
@@ -447,11 +902,13 @@ class AutoIndexingService(BaseServiceProvider):
         context.update({
             "capabilities": self.capabilities,
             "configuration": {
-                "auto_indexing_enabled": self._config.auto_indexing_enabled,
-                "watch_patterns": self._config.watch_patterns,
-                "debounce_delay": self._config.debounce_delay,
-                "max_workers": self._config.max_workers,
-                "batch_size": self._config.batch_size,
+                "enabled": self._auto_indexing_config.enabled,
+                "watch_patterns": self._auto_indexing_config.watch_patterns,
+                "debounce_delay": self._auto_indexing_config.debounce_delay,
+                "max_concurrent_indexing": self._auto_indexing_config.max_concurrent_indexing,
+                "indexing_batch_size": self._auto_indexing_config.indexing_batch_size,
+                "embedding_batch_size": self.embedding_batch_size,
+                "storage_configured": self.storage_configured,
             },
             "watched_paths": list(self.watched_paths),
         })
@@ -462,19 +919,11 @@ class AutoIndexingService(BaseServiceProvider):
             "health_status": health.status,
             "service_healthy": health.status.name == "HEALTHY",
             "last_error": health.last_error,
-            "metadata": health.metadata,
+            "chunking_service_available": bool(self.chunking_service),
+            "filtering_service_available": bool(self.filtering_service),
         })
 
         # Add runtime statistics
-        context.update({
-            "statistics": {
-                "files_indexed": self._indexing_stats["files_indexed"],
-                "files_failed": self._indexing_stats["files_failed"],
-                "total_chunks_created": self._indexing_stats["total_chunks_created"],
-                "indexing_workers_active": len([w for w in self._indexing_workers if not w.done()]),
-                "queue_size": self._indexing_queue.qsize(),
-                "observer_running": bool(self.observer and self.observer.is_alive()),
-            }
-        })
+        context.update({"statistics": self.get_metrics()})
 
         return context
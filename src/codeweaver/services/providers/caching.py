@@ -8,6 +8,11 @@ Caching service provider for CodeWeaver.
 
 Provides caching capabilities for expensive operations like embeddings
 with configurable TTL, LRU eviction, and memory management.
+
+:meth:`CachingService.get_or_compute` computes missing values at most once at a
+time per key: concurrent callers for the same key wait for the computation that
+is already in flight instead of starting their own. Hits, coalesced calls and the
+computation time that hits saved are tracked per namespace.
 """
 
 import asyncio
@@ -17,12 +22,13 @@ import json
 import logging
 import time
 
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 from pydantic.dataclasses import dataclass
 
-from codeweaver.cw_types import HealthStatus, ServiceCapabilities, ServiceHealth
+from codeweaver.cw_types import CacheServiceConfig, ServiceCapabilities, ServiceType
 from codeweaver.services.providers.base_provider import BaseServiceProvider
 
 
@@ -49,6 +55,7 @@ class CacheEntry:
     access_count: int = 0
     last_accessed: float = 0.0
     size_bytes: int = 0
+    compute_seconds: float = 0.0
 
     def __post_init__(self):
         """Initialize access metadata."""
@@ -68,30 +75,44 @@ class CacheEntry:
 class CachingService(BaseServiceProvider):
     """Caching service provider with LRU eviction and TTL support."""
 
-    def __init__(self, config: CacheConfig | None = None):
+    def __init__(
+        self,
+        service_type: ServiceType = ServiceType.CACHE,
+        config: CacheServiceConfig | None = None,
+    ):
         """Initialize caching service.
 
         Args:
+            service_type: Service type the provider is registered as
             config: Caching configuration
         """
-        super().__init__()
-        self.config = config or CacheConfig()
+        super().__init__(service_type, config or CacheServiceConfig())
+        self.cache_config = CacheConfig(
+            max_size=self._config.max_items,
+            default_ttl=self._config.default_ttl,
+            max_memory_mb=max(1, self._config.max_size // (1024 * 1024)),
+            cleanup_interval=self._config.cleanup_interval,
+        )
         self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
         self._lock = asyncio.Lock()
+        self._in_flight: dict[str, asyncio.Task] = {}
         self._hits = 0
         self._misses = 0
         self._evictions = 0
         self._total_size_bytes = 0
+        self._namespaces: defaultdict[str, dict[str, float]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "coalesced": 0, "seconds_saved": 0.0}
+        )
         self._cleanup_task: asyncio.Task | None = None
         logger.info("Initialized caching service")
 
-    async def initialize(self) -> None:
-        """Initialize the service."""
+    async def _initialize_provider(self) -> None:
+        """Start the periodic cleanup of expired entries."""
         self._cleanup_task = asyncio.create_task(self._cleanup_loop())
         logger.info("Caching service initialized")
 
-    async def shutdown(self) -> None:
-        """Shutdown the service."""
+    async def _shutdown_provider(self) -> None:
+        """Stop the cleanup task and drop all entries."""
         if self._cleanup_task:
             self._cleanup_task.cancel()
             with contextlib.suppress(asyncio.CancelledError):
@@ -101,6 +122,13 @@ class CachingService(BaseServiceProvider):
             self._total_size_bytes = 0
         logger.info("Caching service shutdown")
 
+    async def _check_health(self) -> bool:
+        """Healthy while the cleanup task runs and memory use is below 95%."""
+        if self._cleanup_task and self._cleanup_task.done():
+            return False
+        max_bytes = self.cache_config.max_memory_mb * 1024 * 1024
+        return self._total_size_bytes <= max_bytes * 0.95
+
     def _generate_cache_key(self, key_data: Any) -> str:
         """Generate a cache key from data."""
         if isinstance(key_data, str):
@@ -133,21 +161,9 @@ class CachingService(BaseServiceProvider):
         Returns:
             Cached value or None if not found/expired
         """
-        cache_key = self._generate_cache_key(key)
         async with self._lock:
-            entry = self._cache.get(cache_key)
-            if entry is None:
-                self._misses += 1
-                return None
-            if entry.is_expired():
-                del self._cache[cache_key]
-                self._total_size_bytes -= entry.size_bytes
-                self._misses += 1
-                return None
-            self._cache.move_to_end(cache_key)
-            entry.touch()
-            self._hits += 1
-            return entry.value
+            entry = self._lookup(self._generate_cache_key(key))
+            return None if entry is None else entry.value
 
     async def set(self, key: Any, value: Any, ttl: int | None = None) -> None:
         """Set value in cache.
@@ -157,20 +173,92 @@ class CachingService(BaseServiceProvider):
             value: Value to cache
             ttl: Time to live in seconds (uses default if None)
         """
+        async with self._lock:
+            await self._store(self._generate_cache_key(key), value, ttl)
+
+    async def get_or_compute(
+        self,
+        key: Any,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int | None = None,
+        *,
+        namespace: str = "default",
+    ) -> Any:
+        """Get a cached value, computing and caching it on a miss.
+
+        Concurrent misses for the same key share a single ``compute`` call. The
+        computation runs as its own task, so a caller that is cancelled does not
+        cancel it for the others.
+
+        Args:
+            key: Cache key
+            compute: Coroutine function producing the value
+            ttl: Time to live in seconds (uses default if None)
+            namespace: Name the hit/miss statistics are recorded under
+
+        Returns:
+            The cached or computed value
+        """
         cache_key = self._generate_cache_key(key)
-        effective_ttl = ttl or self.config.default_ttl
-        size_bytes = self._estimate_size(value)
+        stats = self._namespaces[namespace]
+        async with self._lock:
+            entry = self._lookup(cache_key)
+            if entry is not None:
+                stats["hits"] += 1
+                stats["seconds_saved"] += entry.compute_seconds
+                return entry.value
+            stats["misses"] += 1
+            task = self._in_flight.get(cache_key)
+            if task is None:
+                task = asyncio.create_task(self._compute(cache_key, compute, ttl))
+                self._in_flight[cache_key] = task
+                task.add_done_callback(lambda _: self._in_flight.pop(cache_key, None))
+            else:
+                stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    async def _compute(
+        self, cache_key: str, compute: Callable[[], Awaitable[Any]], ttl: int | None
+    ) -> Any:
+        """Compute a missing value and store it with its computation time."""
+        start_time = time.perf_counter()
+        value = await compute()
+        elapsed = time.perf_counter() - start_time
         async with self._lock:
-            if cache_key in self._cache:
-                old_entry = self._cache[cache_key]
-                self._total_size_bytes -= old_entry.size_bytes
-                del self._cache[cache_key]
-            await self._ensure_capacity(size_bytes)
-            entry = CacheEntry(
-                value=value, created_at=time.time(), ttl=effective_ttl, size_bytes=size_bytes
-            )
-            self._cache[cache_key] = entry
-            self._total_size_bytes += size_bytes
+            await self._store(cache_key, value, ttl, compute_seconds=elapsed)
+        return value
+
+    def _lookup(self, cache_key: str) -> CacheEntry | None:
+        """Find a live entry, counting the hit or miss. Caller holds the lock."""
+        entry = self._cache.get(cache_key)
+        if entry is not None and entry.is_expired():
+            del self._cache[cache_key]
+            self._total_size_bytes -= entry.size_bytes
+            entry = None
+        if entry is None:
+            self._misses += 1
+            return None
+        self._cache.move_to_end(cache_key)
+        entry.touch()
+        self._hits += 1
+        return entry
+
+    async def _store(
+        self, cache_key: str, value: Any, ttl: int | None, *, compute_seconds: float = 0.0
+    ) -> None:
+        """Insert or replace an entry. Caller holds the lock."""
+        size_bytes = self._estimate_size(value)
+        if old_entry := self._cache.pop(cache_key, None):
+            self._total_size_bytes -= old_entry.size_bytes
+        await self._ensure_capacity(size_bytes)
+        self._cache[cache_key] = CacheEntry(
+            value=value,
+            created_at=time.time(),
+            ttl=ttl or self.cache_config.default_ttl,
+            size_bytes=size_bytes,
+            compute_seconds=compute_seconds,
+        )
+        self._total_size_bytes += size_bytes
 
     async def delete(self, key: Any) -> bool:
         """Delete value from cache.
@@ -196,9 +284,9 @@ class CachingService(BaseServiceProvider):
 
     async def _ensure_capacity(self, new_size: int) -> None:
         """Ensure cache has capacity for new entry."""
-        max_size_bytes = self.config.max_memory_mb * 1024 * 1024
+        max_size_bytes = self.cache_config.max_memory_mb * 1024 * 1024
         while (
-            len(self._cache) >= self.config.max_size
+            len(self._cache) >= self.cache_config.max_size
             or self._total_size_bytes + new_size > max_size_bytes
         ) and self._cache:
             _oldest_key, oldest_entry = self._cache.popitem(last=False)
@@ -209,7 +297,7 @@ class CachingService(BaseServiceProvider):
         """Periodic cleanup of expired entries."""
         while True:
             try:
-                await asyncio.sleep(self.config.cleanup_interval)
+                await asyncio.sleep(self.cache_config.cleanup_interval)
                 await self._cleanup_expired()
             except asyncio.CancelledError:
                 break
@@ -231,6 +319,16 @@ class CachingService(BaseServiceProvider):
         """Get caching statistics."""
         total_requests = self._hits + self._misses
         hit_rate = self._hits / max(1, total_requests)
+        namespaces = {
+            name: {
+                "hits": stats["hits"],
+                "misses": stats["misses"],
+                "coalesced": stats["coalesced"],
+                "hit_rate": stats["hits"] / max(1, stats["hits"] + stats["misses"]),
+                "latency_saved_ms": stats["seconds_saved"] * 1000,
+            }
+            for name, stats in self._namespaces.items()
+        }
         return {
             "hits": self._hits,
             "misses": self._misses,
@@ -239,38 +337,19 @@ class CachingService(BaseServiceProvider):
             "total_entries": len(self._cache),
             "total_size_bytes": self._total_size_bytes,
             "total_size_mb": self._total_size_bytes / (1024 * 1024),
-            "max_size": self.config.max_size,
-            "max_memory_mb": self.config.max_memory_mb,
+            "max_size": self.cache_config.max_size,
+            "max_memory_mb": self.cache_config.max_memory_mb,
+            "calls_coalesced": sum(stats["coalesced"] for stats in namespaces.values()),
+            "latency_saved_ms": sum(stats["latency_saved_ms"] for stats in namespaces.values()),
+            "namespaces": namespaces,
         }
 
-    async def health_check(self) -> ServiceHealth:
-        """Check service health."""
-        try:
-            stats = self.get_statistics()
-            memory_usage_pct = stats["total_size_mb"] / self.config.max_memory_mb * 100
-            if memory_usage_pct > 95:
-                return ServiceHealth(
-                    status=HealthStatus.DEGRADED,
-                    message=f"High memory usage: {memory_usage_pct:.1f}%",
-                )
-            if self._cleanup_task and self._cleanup_task.done():
-                return ServiceHealth(status=HealthStatus.DEGRADED, message="Cleanup task stopped")
-        except Exception as e:
-            return ServiceHealth(
-                status=HealthStatus.UNHEALTHY, message=f"Cache health check failed: {e}"
-            )
-        else:
-            return ServiceHealth(
-                status=HealthStatus.HEALTHY,
-                message=f"Cache active: {stats['total_entries']} entries, {stats['hit_rate']:.2f} hit rate",
-            )
-
     def get_capabilities(self) -> ServiceCapabilities:
         """Get service capabilities."""
         return ServiceCapabilities(
             supports_streaming=False,
             supports_batching=True,
-            max_batch_size=self.config.max_size,
+            max_batch_size=self.cache_config.max_size,
             supports_async=True,
         )
 
@@ -292,10 +371,10 @@ class CachingService(BaseServiceProvider):
         context.update({
             "capabilities": self.get_capabilities(),
             "configuration": {
-                "max_size": self.config.max_size,
-                "max_memory_mb": self.config.max_memory_mb,
-                "cleanup_interval": self.config.cleanup_interval,
-                "default_ttl": self.config.default_ttl,
+                "max_size": self.cache_config.max_size,
+                "max_memory_mb": self.cache_config.max_memory_mb,
+                "cleanup_interval": self.cache_config.cleanup_interval,
+                "default_ttl": self.cache_config.default_ttl,
             },
         })
 
@@ -304,7 +383,7 @@ class CachingService(BaseServiceProvider):
         context.update({
             "health_status": health.status,
             "service_healthy": health.status.name == "HEALTHY",
-            "last_error": health.message if health.status.name != "HEALTHY" else None,
+            "last_error": health.last_error,
         })
 
         # Add runtime statistics
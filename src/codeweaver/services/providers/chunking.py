@@ -63,6 +63,10 @@ class ChunkingService(BaseServiceProvider, ChunkingService):
             "max_chunk_size": self._config.max_chunk_size,
             "min_chunk_size": self._config.min_chunk_size,
             "ast_grep_enabled": self._config.ast_grep_enabled,
+            "nested_chunk_policy": self._config.nested_chunk_policy,
+            "split_oversized_nodes": self._config.split_oversized_nodes,
+            "max_chunk_tokens": self._config.max_chunk_tokens,
+            "chars_per_token": self._config.chars_per_token,
         }
 
         self._middleware = ChunkingMiddleware(middleware_config)
@@ -122,14 +126,14 @@ class ChunkingService(BaseServiceProvider, ChunkingService):
             processing_time = time.time() - start_time
             self._update_stats(file_path, len(chunks), processing_time, success=True)
 
-            self.record_operation(True)
+            self.record_operation(success=True)
 
         except Exception as e:
             processing_time = time.time() - start_time
             self._update_stats(file_path, 0, processing_time, success=False)
 
             error_msg = f"Chunking failed: {e}"
-            self.record_operation(False, error_msg)
+            self.record_operation(success=False, error=error_msg)
             self._logger.exception("Chunking failed for %s")
 
             raise ChunkingError(file_path, str(e)) from e
@@ -5,9 +5,13 @@
 
 """FastMCP filtering service provider."""
 
+import asyncio
+import concurrent.futures
+import contextlib
+import threading
 import time
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable, Iterator
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -27,6 +31,71 @@ from codeweaver.middleware.filtering import FileFilteringMiddleware
 from codeweaver.services.providers.base_provider import BaseServiceProvider
 
 
+_END_OF_WALK = object()
+
+
+class _FileWalk:
+    """Directory walk run in a worker thread, handing paths over through a bounded queue.
+
+    The walker pauses while the queue is full and gives up as soon as :meth:`stop`
+    is called, so a slow or departed consumer holds it back instead of letting it
+    buffer the whole tree.
+    """
+
+    def __init__(
+        self, files: Iterator[Path], is_excluded: Callable[[Path], bool], buffer_size: int
+    ) -> None:
+        """Prepare a walk over ``files``; call :meth:`paths` from the event loop to run it."""
+        self._files = files
+        self._is_excluded = is_excluded
+        self._queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=buffer_size)
+        self._stop = threading.Event()
+        self._loop = asyncio.get_running_loop()
+        self.excluded = 0
+
+    async def paths(self) -> AsyncGenerator[Path]:
+        """Yield the walked paths, re-raising any error the walk hit."""
+        worker = self._loop.run_in_executor(None, self._walk)
+        while (item := await self._queue.get()) is not _END_OF_WALK:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await worker
+
+    def stop(self) -> None:
+        """Stop the walk at the next file."""
+        self._stop.set()
+
+    def _walk(self) -> None:
+        """Walk the files in the worker thread."""
+        try:
+            for file_path in self._files:
+                if self._stop.is_set():
+                    return
+                if self._is_excluded(file_path):
+                    self.excluded += 1
+                elif not self._put(file_path):
+                    return
+        except Exception as e:
+            self._put(e)
+        else:
+            self._put(_END_OF_WALK)
+
+    def _put(self, item: Any) -> bool:
+        """Block the worker until the queue accepts ``item`` or the walk stops."""
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(item), self._loop)
+        while not self._stop.is_set():
+            try:
+                future.result(timeout=0.1)
+            except concurrent.futures.TimeoutError:
+                continue
+            else:
+                return True
+        with contextlib.suppress(RuntimeError):
+            future.cancel()
+        return False
+
+
 class FilteringService(BaseServiceProvider, FileFilteringService):
     """FastMCP-based filtering service provider."""
 
@@ -101,13 +170,13 @@ class FilteringService(BaseServiceProvider, FileFilteringService):
                 ]
             scan_time = time.time() - start_time
             self._update_discovery_stats(len(files), 0, scan_time, success=True)
-            self.record_operation(True)
+            self.record_operation(success=True)
         except Exception as e:
             scan_time = time.time() - start_time
             self._update_discovery_stats(0, 0, scan_time, success=False)
             error_msg = f"File discovery failed: {e}"
-            self.record_operation(False, error_msg)
-            self._logger.exception("File discovery failed for %s")
+            self.record_operation(success=False, error=error_msg)
+            self._logger.exception("File discovery failed for %s", base_path)
             raise FilteringError(base_path, str(e)) from e
         else:
             return files
@@ -121,12 +190,44 @@ class FilteringService(BaseServiceProvider, FileFilteringService):
         *,
         follow_symlinks: bool = False,
     ) -> AsyncGenerator[Path]:
-        """Stream file discovery."""
-        files = await self.discover_files(
-            base_path, include_patterns, exclude_patterns, max_depth, follow_symlinks
+        """Stream file discovery.
+
+        The directory walk runs in a worker thread and hands paths over through a
+        bounded queue, so the first files are available while the walk is still
+        running and the walker pauses when the consumer falls behind. Closing or
+        cancelling the stream stops the walk.
+        """
+        if not self._middleware:
+            raise FilteringError(base_path, "Filtering service not initialized")
+        if not await asyncio.to_thread(base_path.exists):
+            raise DirectoryNotFoundError(base_path)
+        effective_include = include_patterns or list(self._include_patterns) or ["*"]
+        effective_exclude = exclude_patterns or list(self._exclude_patterns)
+        walk = _FileWalk(
+            self._middleware.iter_files(base_path, effective_include),
+            lambda path: (
+                bool(effective_exclude) and self._matches_exclude_patterns(path, effective_exclude)
+            ),
+            self._config.stream_buffer_size,
         )
-        for file_path in files:
-            yield file_path
+        start_time = time.time()
+        found = 0
+        try:
+            async for file_path in walk.paths():
+                found += 1
+                yield file_path
+        except Exception as e:
+            self._update_discovery_stats(0, 0, time.time() - start_time, success=False)
+            self.record_operation(success=False, error=f"File discovery failed: {e}")
+            self._logger.exception("Streaming file discovery failed for %s", base_path)
+            raise FilteringError(base_path, str(e)) from e
+        else:
+            self._update_discovery_stats(
+                found, walk.excluded, time.time() - start_time, success=True
+            )
+            self.record_operation(success=True)
+        finally:
+            walk.stop()
 
     def should_include_file(
         self,
@@ -20,7 +20,7 @@ from typing import Any
 from pydantic import Field
 from pydantic.dataclasses import dataclass
 
-from codeweaver.cw_types import HealthStatus, ServiceCapabilities, ServiceHealth
+from codeweaver.cw_types import RateLimitingServiceConfig, ServiceCapabilities, ServiceType
 from codeweaver.services.providers.base_provider import BaseServiceProvider
 
 
@@ -73,36 +73,62 @@ class TokenBucket:
 class RateLimitingService(BaseServiceProvider):
     """Rate limiting service provider."""
 
-    def __init__(self, config: RateLimitConfig | None = None):
+    def __init__(
+        self,
+        service_type: ServiceType = ServiceType.RATE_LIMITING,
+        config: RateLimitingServiceConfig | None = None,
+        limits: RateLimitConfig | None = None,
+    ):
         """Initialize rate limiting service.
 
         Args:
-            config: Rate limiting configuration
+            service_type: Service type the provider is registered as
+            config: Rate limiting service configuration
+            limits: Default and per-provider limits; derived from ``config`` when omitted
         """
-        super().__init__()
-        self.config = config or RateLimitConfig()
+        super().__init__(service_type, config or RateLimitingServiceConfig())
+        self.rate_limit_config = limits or RateLimitConfig(
+            requests_per_second=self._config.max_requests_per_second,
+            burst_capacity=self._config.burst_capacity,
+        )
         self._buckets: dict[str, TokenBucket] = {}
         self._locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
         self._total_requests = 0
         self._blocked_requests = 0
         self._total_wait_time = 0.0
+        self._create_buckets()
         logger.info("Initialized rate limiting service")
 
-    async def initialize(self) -> None:
-        """Initialize the service."""
-        self._create_bucket("default", self.config.requests_per_second, self.config.burst_capacity)
-        for provider, limits in self.config.provider_specific_limits.items():
-            rps = limits.get("requests_per_second", self.config.requests_per_second)
-            burst = limits.get("burst_capacity", self.config.burst_capacity)
-            self._create_bucket(provider, rps, int(burst))
+    async def _initialize_provider(self) -> None:
+        """Create the token buckets."""
+        self._create_buckets()
         logger.info("Rate limiting service initialized")
 
-    async def shutdown(self) -> None:
-        """Shutdown the service."""
+    async def _shutdown_provider(self) -> None:
+        """Drop the token buckets."""
         self._buckets.clear()
         self._locks.clear()
         logger.info("Rate limiting service shutdown")
 
+    async def _check_health(self) -> bool:
+        """Healthy while buckets exist and at most half of them are depleted."""
+        if not self._buckets:
+            return False
+        depleted = 0
+        for bucket in self._buckets.values():
+            bucket._refill()
+            depleted += bucket.tokens < bucket.capacity * 0.1
+        return depleted <= len(self._buckets) * 0.5
+
+    def _create_buckets(self) -> None:
+        """Create the default bucket and one bucket per provider-specific limit."""
+        limits = self.rate_limit_config
+        self._create_bucket("default", limits.requests_per_second, limits.burst_capacity)
+        for provider, provider_limits in limits.provider_specific_limits.items():
+            rps = provider_limits.get("requests_per_second", limits.requests_per_second)
+            burst = provider_limits.get("burst_capacity", limits.burst_capacity)
+            self._create_bucket(provider, rps, int(burst))
+
     def _create_bucket(self, key: str, requests_per_second: float, burst_capacity: int) -> None:
         """Create a token bucket for a specific key."""
         self._buckets[key] = TokenBucket(
@@ -137,6 +163,20 @@ class RateLimitingService(BaseServiceProvider):
                     logger.warning("Failed to acquire tokens for %s after waiting", provider)
                     raise TimeoutError(f"Rate limit exceeded for {provider}")
 
+    def max_concurrency(self, provider: str) -> int:
+        """Number of requests a provider may start at once without waiting.
+
+        This is the burst capacity of the provider's bucket.
+
+        Args:
+            provider: Provider name
+
+        Returns:
+            Maximum concurrent requests
+        """
+        bucket_key = provider if provider in self._buckets else "default"
+        return max(1, self._buckets[bucket_key].capacity)
+
     async def check_availability(self, provider: str, tokens: int = 1) -> bool:
         """Check if tokens are available without consuming them.
 
@@ -177,34 +217,6 @@ class RateLimitingService(BaseServiceProvider):
             "active_buckets": list(self._buckets.keys()),
         }
 
-    async def health_check(self) -> ServiceHealth:
-        """Check service health."""
-        try:
-            bucket_count = len(self._buckets)
-            if bucket_count == 0:
-                return ServiceHealth(
-                    status=HealthStatus.UNHEALTHY, message="No rate limiting buckets configured"
-                )
-            depleted_buckets = []
-            for key, bucket in self._buckets.items():
-                bucket._refill()
-                if bucket.tokens < bucket.capacity * 0.1:
-                    depleted_buckets.append(key)
-            if len(depleted_buckets) > len(self._buckets) * 0.5:
-                return ServiceHealth(
-                    status=HealthStatus.DEGRADED,
-                    message=f"Many buckets depleted: {depleted_buckets}",
-                )
-        except Exception as e:
-            return ServiceHealth(
-                status=HealthStatus.UNHEALTHY, message=f"Rate limiting health check failed: {e}"
-            )
-        else:
-            return ServiceHealth(
-                status=HealthStatus.HEALTHY,
-                message=f"Rate limiting active with {bucket_count} buckets",
-            )
-
     def get_capabilities(self) -> ServiceCapabilities:
         """Get service capabilities."""
         return ServiceCapabilities(
@@ -232,10 +244,9 @@ class RateLimitingService(BaseServiceProvider):
         context.update({
             "capabilities": self.get_capabilities(),
             "configuration": {
-                "rate_limit": self.config.rate_limit,
-                "time_window": self.config.time_window,
-                "bucket_size": self.config.bucket_size,
-                "cleanup_interval": self.config.cleanup_interval,
+                "requests_per_second": self.rate_limit_config.requests_per_second,
+                "burst_capacity": self.rate_limit_config.burst_capacity,
+                "provider_specific_limits": self.rate_limit_config.provider_specific_limits,
             },
         })
 
@@ -244,16 +255,10 @@ class RateLimitingService(BaseServiceProvider):
         context.update({
             "health_status": health.status,
             "service_healthy": health.status.name == "HEALTHY",
-            "last_error": health.message if health.status.name != "HEALTHY" else None,
+            "last_error": health.last_error,
         })
 
         # Add runtime statistics
-        context.update({
-            "statistics": {
-                "active_buckets": len(self._buckets),
-                "total_requests": sum(bucket.total_requests for bucket in self._buckets.values()),
-                "total_rejections": sum(bucket.rejections for bucket in self._buckets.values()),
-            }
-        })
+        context.update({"statistics": self.get_statistics()})
 
         return context
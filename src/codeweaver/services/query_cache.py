@@ -0,0 +1,216 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""
+Query embedding and search result caches.
+
+Agents tend to repeat the same queries within a session. Both caches live in a
+:class:`~codeweaver.services.providers.caching.CachingService`, with LRU eviction,
+and concurrent requests for the same entry share one computation.
+
+- :class:`QueryEmbeddingCache` caches query vectors per (provider, model,
+  dimension, normalized query), with a TTL.
+- :class:`SearchResultCache` caches search results per (collection, generation,
+  normalized query, filters, limit, rerank). Every write to a tracked backend
+  bumps the collection's generation, so results cached before an upsert or
+  delete are never served after it.
+"""
+
+import functools
+import logging
+import unicodedata
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from codeweaver.cw_types import CacheServiceConfig
+from codeweaver.providers.batching import QueryBatcher
+from codeweaver.providers.embedding_store import EmbeddingNamespace
+from codeweaver.services.providers.caching import CachingService
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAMESPACE = "query_embeddings"
+SEARCH_CACHE_NAMESPACE = "search_results"
+
+_WRITE_METHODS = (
+    "create_collection",
+    "delete_collection",
+    "delete_vectors",
+    "update_sparse_vectors",
+    "upsert_vectors",
+)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for caching.
+
+    Unicode compatibility forms are folded and whitespace runs collapsed. Case is
+    kept, since identifiers in code queries are case-sensitive.
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).split())
+
+
+class QueryEmbeddingCache:
+    """Caches query embeddings of one embedding provider."""
+
+    def __init__(
+        self,
+        provider: Any,
+        cache: CachingService | None = None,
+        *,
+        batcher: QueryBatcher | None = None,
+        max_items: int = 1024,
+        ttl_seconds: int = 3600,
+    ):
+        """Initialize the query embedding cache.
+
+        Args:
+            provider: Embedding provider used on a miss
+            cache: Caching service to store vectors in; a private one is created
+                when omitted
+            batcher: Micro-batcher that misses are embedded through
+            max_items: Maximum cached queries of a private cache
+            ttl_seconds: Time to live of cached query vectors
+        """
+        self.provider = provider
+        self.batcher = batcher
+        self.cache = cache or CachingService(
+            config=CacheServiceConfig(max_items=max_items, default_ttl=ttl_seconds)
+        )
+        self.ttl_seconds = ttl_seconds
+        self._namespace = EmbeddingNamespace.for_provider(provider, input_type="query")
+
+    def cache_key(self, query: str) -> list[Any]:
+        """Cache key of a query for this provider and model."""
+        namespace = self._namespace
+        return [
+            CACHE_NAMESPACE,
+            namespace.provider,
+            namespace.model,
+            namespace.dimension,
+            normalize_query(query),
+        ]
+
+    async def embed_query(self, query: str) -> list[float]:
+        """Get the embedding of a query, from the cache when possible.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Query embedding
+        """
+        text = normalize_query(query)
+        vector = await self.cache.get_or_compute(
+            self.cache_key(text),
+            lambda: (self.batcher or self.provider).embed_query(text),
+            ttl=self.ttl_seconds,
+            namespace=CACHE_NAMESPACE,
+        )
+        return list(vector)
+
+    def get_statistics(self) -> dict[str, Any]:
+        """Get hit rate and latency saved for query embeddings."""
+        return self.cache.get_statistics()["namespaces"].get(
+            CACHE_NAMESPACE,
+            {"hits": 0, "misses": 0, "coalesced": 0, "hit_rate": 0.0, "latency_saved_ms": 0.0},
+        )
+
+
+class SearchResultCache:
+    """Caches search results, invalidated by collection generation."""
+
+    def __init__(self, cache: CachingService | None = None, *, max_items: int = 256):
+        """Initialize the search result cache.
+
+        Args:
+            cache: Caching service to store results in; a private one is created
+                when omitted
+            max_items: Maximum cached searches of a private cache
+        """
+        self.cache = cache or CachingService(config=CacheServiceConfig(max_items=max_items))
+        self._generations: dict[str, int] = {}
+
+    def generation(self, collection_name: str) -> int:
+        """Current generation of a collection."""
+        return self._generations.get(collection_name, 0)
+
+    def invalidate(self, collection_name: str) -> None:
+        """Bump a collection's generation, retiring its cached results."""
+        self._generations[collection_name] = self.generation(collection_name) + 1
+
+    def track(self, backend: Any) -> Any:
+        """Invalidate a collection whenever the backend writes to it.
+
+        The backend's write methods are wrapped on the instance, so the backend
+        keeps its type and still satisfies the backend protocols.
+
+        Args:
+            backend: Vector backend to track
+
+        Returns:
+            The same backend
+        """
+        for name in _WRITE_METHODS:
+            if method := getattr(backend, name, None):
+                setattr(backend, name, self._invalidating(method))
+        return backend
+
+    def _invalidating(self, method: Callable[..., Awaitable[Any]]) -> Callable[..., Any]:
+        """Wrap a write method to bump the generation once the write is done."""
+
+        @functools.wraps(method)
+        async def write(*args: Any, **kwargs: Any) -> Any:
+            collection_name = args[0] if args else kwargs.get("collection_name", kwargs.get("name"))
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                self.invalidate(str(collection_name))
+
+        return write
+
+    async def get_or_search(
+        self,
+        collection_name: str,
+        query: str,
+        search: Callable[[], Awaitable[list[dict[str, Any]]]],
+        *,
+        search_filter: dict[str, Any] | None = None,
+        limit: int = 10,
+        rerank: bool = True,
+    ) -> list[dict[str, Any]]:
+        """Get cached results for a search, running it on a miss.
+
+        Args:
+            collection_name: Collection searched
+            query: Search query
+            search: Coroutine function running the search
+            search_filter: Filter conditions of the search
+            limit: Maximum number of results
+            rerank: Whether results are reranked
+
+        Returns:
+            Search results
+        """
+        key = [
+            SEARCH_CACHE_NAMESPACE,
+            collection_name,
+            self.generation(collection_name),
+            normalize_query(query),
+            search_filter,
+            limit,
+            rerank,
+        ]
+        results = await self.cache.get_or_compute(key, search, namespace=SEARCH_CACHE_NAMESPACE)
+        return [dict(result) for result in results]
+
+    def get_statistics(self) -> dict[str, Any]:
+        """Get hit rate and latency saved for searches."""
+        return self.cache.get_statistics()["namespaces"].get(
+            SEARCH_CACHE_NAMESPACE,
+            {"hits": 0, "misses": 0, "coalesced": 0, "hit_rate": 0.0, "latency_saved_ms": 0.0},
+        )
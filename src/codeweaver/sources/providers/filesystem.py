@@ -12,10 +12,13 @@ abstraction while maintaining full backward compatibility.
 
 import asyncio
 import contextlib
+import functools
 import logging
+import os
+import sqlite3
 
 from collections.abc import Callable
-from datetime import UTC, datetime
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
@@ -28,11 +31,40 @@ from codeweaver.cw_types import (
     SourceCapabilities,
     SourceProvider,
 )
+from codeweaver.middleware.filtering import FileFilteringMiddleware
 from codeweaver.sources.base import AbstractDataSource, SourceConfig, SourceWatcher
 
 
+try:
+    from watchdog.events import FileSystemEvent, FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    FileSystemEvent = Any
+    FileSystemEventHandler = object
+    Observer = None
 logger = logging.getLogger(__name__)
 
+# Watchdog event types that can change file content or existence. Directory
+# "modified" events only mean an entry was added or removed, which the entry's
+# own event already reports.
+_FILE_CHANGE_EVENTS = frozenset({"created", "modified", "deleted", "moved", "closed"})
+_DIRECTORY_CHANGE_EVENTS = frozenset({"created", "deleted", "moved"})
+
+_SNAPSHOT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
 
 class FileSystemSourceConfig(SourceConfig):
     """Configuration specific to file system data sources."""
@@ -48,6 +80,14 @@ class FileSystemSourceConfig(SourceConfig):
     file_extensions: list[str] = Field(
         default_factory=list, description="Specific file extensions to include"
     )
+    change_batch_window_ms: int = Field(
+        250, ge=0, le=5000, description="Window for coalescing change events into one batch"
+    )
+    snapshot_path: str | None = Field(
+        None,
+        description="SQLite database persisting the change watcher's mtime snapshot "
+        "(defaults to <root_path>/.codeweaver/index/<source_id>.watch.sqlite3)",
+    )
 
     @field_validator("root_path")
     @classmethod
@@ -63,8 +103,76 @@ class FileSystemSourceConfig(SourceConfig):
         return str(path.resolve())
 
 
+def _filtering_middleware(
+    config: FileSystemSourceConfig, extra_excluded_dirs: list[str] | None = None
+) -> FileFilteringMiddleware:
+    """Create the filtering middleware used when no FilteringService is available."""
+    return FileFilteringMiddleware({
+        "use_gitignore": config.use_gitignore,
+        "max_file_size": 10 * 1024 * 1024,
+        "excluded_dirs": [
+            "__pycache__",
+            ".git",
+            "node_modules",
+            ".pytest_cache",
+            *(extra_excluded_dirs or []),
+        ],
+        "included_extensions": config.file_extensions or None,
+        "additional_ignore_patterns": config.additional_ignore_patterns,
+    })
+
+
+def _stat_key(path: Path) -> tuple[int, int] | None:
+    """Modification time and size of a file, or None if it is gone."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _WatchdogEventHandler(FileSystemEventHandler):
+    """Forwards watchdog events from the observer thread to a watcher's event loop."""
+
+    def __init__(self, watcher: "FileSystemSourceWatcher", loop: asyncio.AbstractEventLoop):
+        """Initialize the handler.
+
+        Args:
+            watcher: Watcher receiving the events
+            loop: Event loop the watcher runs on
+        """
+        super().__init__()
+        self._watcher = watcher
+        self._loop = loop
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        """Queue the paths touched by a content-changing event."""
+        events = _DIRECTORY_CHANGE_EVENTS if event.is_directory else _FILE_CHANGE_EVENTS
+        if event.event_type not in events:
+            return
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        paths = [Path(os.fsdecode(path)) for path in paths if path]
+        queue = functools.partial(
+            self._watcher.queue_changes, paths, is_directory=event.is_directory
+        )
+        with contextlib.suppress(RuntimeError):
+            self._loop.call_soon_threadsafe(queue)
+
+
 class FileSystemSourceWatcher(SourceWatcher):
-    """File system specific watcher implementation."""
+    """File system specific watcher implementation.
+
+    Changes are picked up from filesystem notifications (inotify, FSEvents, ...)
+    through watchdog. Events arriving within ``change_batch_window_ms`` of each
+    other are coalesced into one batch, which is filtered with the same gitignore
+    and exclusion rules as discovery and diffed against an mtime snapshot. Every
+    ``change_check_interval_seconds`` the whole tree is reconciled against the
+    snapshot to catch dropped events. The snapshot is persisted in SQLite, one row
+    per file, and only the rows of changed files are written, so changes made
+    while nothing was watching are reported on start without rewriting the whole
+    snapshot on every save. Without watchdog the reconciliation alone keeps the
+    watcher working.
+    """
 
     def __init__(
         self,
@@ -84,17 +192,40 @@ class FileSystemSourceWatcher(SourceWatcher):
         super().__init__(source_id, callback)
         self.root_path = root_path
         self.config = config
+        self.snapshot_path = (
+            Path(config.snapshot_path)
+            if config.snapshot_path
+            else root_path / ".codeweaver" / "index" / f"{source_id}.watch.sqlite3"
+        )
+        self._filter = _filtering_middleware(config, extra_excluded_dirs=[".codeweaver"])
+        self._own_files = {
+            f"{self.snapshot_path}{suffix}" for suffix in ("", "-journal", "-wal", "-shm")
+        }
+        self._snapshot: dict[str, tuple[int, int]] = {}
+        self._snapshot_db: sqlite3.Connection | None = None
+        self._pending_files: set[Path] = set()
+        self._pending_directories: set[Path] = set()
+        self._changes_queued = asyncio.Event()
+        self._observer: Any = None
         self._watch_task: asyncio.Task | None = None
-        self._last_scan_time = datetime.now(UTC)
 
     async def start(self) -> bool:
         """Start watching for file system changes."""
         if self.is_active:
             return True
         try:
+            has_snapshot = await asyncio.to_thread(self._load_snapshot)
+            if not has_snapshot:
+                await asyncio.to_thread(self._scan_changes, set(), {self.root_path})
+                await asyncio.to_thread(self._mark_snapshot_complete)
             self.is_active = True
-            self._watch_task = asyncio.create_task(self._watch_loop())
-            logger.info("Started file system watching: %s", self.root_path)
+            self._observer = self._start_observer()
+            self._watch_task = asyncio.create_task(self._watch_loop(reconcile=has_snapshot))
+            logger.info(
+                "Started file system watching: %s (%s)",
+                self.root_path,
+                "event-driven" if self._observer else "reconciliation only",
+            )
         except Exception:
             logger.exception("Failed to start file system watching")
             self.is_active = False
@@ -108,11 +239,18 @@ class FileSystemSourceWatcher(SourceWatcher):
             return True
         try:
             self.is_active = False
+            if self._observer:
+                self._observer.stop()
+                await asyncio.to_thread(self._observer.join)
+                self._observer = None
             if self._watch_task:
                 self._watch_task.cancel()
                 with contextlib.suppress(asyncio.CancelledError):
                     await self._watch_task
                 self._watch_task = None
+            if self._snapshot_db:
+                self._snapshot_db.close()
+                self._snapshot_db = None
             logger.info("Stopped file system watching: %s", self.root_path)
         except Exception:
             logger.exception("Error stopping file system watching")
@@ -120,48 +258,232 @@ class FileSystemSourceWatcher(SourceWatcher):
         else:
             return True
 
-    async def _watch_loop(self) -> None:
-        """Main watching loop for detecting file changes."""
-        interval = getattr(self.config, "change_check_interval_seconds", 60)
+    def queue_changes(self, paths: list[Path], *, is_directory: bool = False) -> None:
+        """Add changed paths to the next batch.
+
+        Must be called on the watcher's event loop; the watchdog handler hops
+        over with ``call_soon_threadsafe``.
+
+        Args:
+            paths: Paths touched by a filesystem event
+            is_directory: Whether the paths are directories
+        """
+        for path in paths:
+            if self._is_excluded(path):
+                continue
+            (self._pending_directories if is_directory else self._pending_files).add(path)
+            self._changes_queued.set()
+
+    def _start_observer(self) -> Any:
+        """Start a watchdog observer on the root, if watchdog is available."""
+        if not WATCHDOG_AVAILABLE:
+            logger.warning("watchdog is not installed; falling back to periodic reconciliation")
+            return None
+        observer = Observer()
+        observer.schedule(
+            _WatchdogEventHandler(self, asyncio.get_running_loop()),
+            str(self.root_path),
+            recursive=self.config.recursive_discovery,
+        )
+        observer.daemon = True
+        observer.start()
+        return observer
+
+    async def _watch_loop(self, *, reconcile: bool = False) -> None:
+        """Flush coalesced event batches and reconcile periodically."""
+        loop = asyncio.get_running_loop()
+        interval = self.config.change_check_interval_seconds
+        next_reconcile = loop.time() if reconcile else loop.time() + interval
         while self.is_active:
             try:
-                await asyncio.sleep(interval)
-                if not self.is_active:
-                    break
-                changed_items = await self._detect_changes()
-                if changed_items:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(
+                        self._changes_queued.wait(), max(0.0, next_reconcile - loop.time())
+                    )
+                files: set[Path] = set()
+                directories: set[Path] = set()
+                if self._changes_queued.is_set():
+                    await asyncio.sleep(self.config.change_batch_window_ms / 1000)
+                    self._changes_queued.clear()
+                    files, self._pending_files = self._pending_files, set()
+                    directories, self._pending_directories = self._pending_directories, set()
+                if loop.time() >= next_reconcile:
+                    files, directories = set(), {self.root_path}
+                    next_reconcile = loop.time() + interval
+                if changed_items := await self._detect_changes(files, directories):
                     await self.notify_changes(changed_items)
             except asyncio.CancelledError:
                 break
             except Exception:
                 logger.exception("Error in file system watch loop")
-                await asyncio.sleep(interval)
 
-    async def _detect_changes(self) -> list[ContentItem]:
-        """Detect files that have changed since last scan."""
-        changed_items = []
-        current_time = datetime.now(UTC)
+    async def _detect_changes(self, files: set[Path], directories: set[Path]) -> list[ContentItem]:
+        """Diff files and directory trees against the snapshot and update it.
+
+        Args:
+            files: Individual files reported as changed
+            directories: Directories whose whole subtree is rescanned
+
+        Returns:
+            Content items for created, modified and deleted files
+        """
         try:
-            for file_path in self.root_path.rglob("*"):
-                if not file_path.is_file():
-                    continue
-                try:
-                    stat = file_path.stat()
-                    modified_time = datetime.fromtimestamp(stat.st_mtime)
-                    if modified_time > self._last_scan_time and (
-                        item := self._path_to_content_item(file_path, stat)
-                    ):
-                        changed_items.append(item)
-                except OSError:
-                    continue
-            self._last_scan_time = current_time
-            if changed_items:
-                logger.info("Detected %d changed files in %s", len(changed_items), self.root_path)
+            changed, deleted = await asyncio.to_thread(self._scan_changes, files, directories)
         except Exception:
             logger.exception("Error detecting file changes")
-        return changed_items
+            return []
+        if changed or deleted:
+            logger.info(
+                "Detected %d changed and %d deleted files in %s",
+                len(changed),
+                len(deleted),
+                self.root_path,
+            )
+        items = [self._deleted_content_item(Path(path)) for path in deleted]
+        for path, change_type in changed:
+            if item := self._path_to_content_item(Path(path), change_type=change_type):
+                items.append(item)
+        return items
+
+    def _scan_changes(
+        self, files: set[Path], directories: set[Path]
+    ) -> tuple[list[tuple[str, str]], list[str]]:
+        """Rescan the given scopes with the discovery filters. Runs in a worker thread.
 
-    def _path_to_content_item(self, file_path: Path, stat: Any = None) -> ContentItem | None:
+        Files are checked by listing their parent directory, which keeps gitignore
+        rules from enclosing directories in effect without walking the tree. Only the
+        snapshot rows of changed and deleted files are written.
+
+        Returns:
+            ``(path, "created" | "modified")`` pairs and deleted paths
+        """
+        candidates, current = self._collect_scope(files, directories)
+        changed, deleted = self._diff_snapshot(candidates, current)
+        self._persist_snapshot([path for path, _ in changed], deleted)
+        return changed, deleted
+
+    def _collect_scope(
+        self, files: set[Path], directories: set[Path]
+    ) -> tuple[set[str], dict[str, tuple[int, int]]]:
+        """Stat the files in the given scopes.
+
+        Returns:
+            The paths to compare (snapshot rows and files found in scope) and the
+            stat keys of the files that currently exist
+        """
+        current: dict[str, tuple[int, int]] = {}
+        candidates = {str(path) for path in files}
+        recursive = self.config.recursive_discovery
+        for directory in directories:
+            candidates.update(
+                path for path in self._snapshot if Path(path).is_relative_to(directory)
+            )
+            if not directory.is_dir():
+                continue
+            for path in self._filter.iter_files(directory, recursive=recursive):
+                if key := _stat_key(path):
+                    current[str(path)] = key
+        candidates.update(current)
+        candidates -= self._own_files
+        for parent in {path.parent for path in files} - directories:
+            if not parent.is_dir():
+                continue
+            for path in self._filter.iter_files(parent, recursive=False):
+                if str(path) in candidates and (key := _stat_key(path)):
+                    current[str(path)] = key
+        return candidates, current
+
+    def _diff_snapshot(
+        self, candidates: set[str], current: dict[str, tuple[int, int]]
+    ) -> tuple[list[tuple[str, str]], list[str]]:
+        """Compare candidates against the snapshot, updating it in memory.
+
+        Returns:
+            ``(path, "created" | "modified")`` pairs and deleted paths
+        """
+        changed: list[tuple[str, str]] = []
+        deleted: list[str] = []
+        for path in candidates:
+            previous = self._snapshot.get(path)
+            if (key := current.get(path)) is None:
+                if previous is not None:
+                    deleted.append(path)
+                    del self._snapshot[path]
+            elif key != previous:
+                changed.append((path, "modified" if previous else "created"))
+                self._snapshot[path] = key
+        return changed, deleted
+
+    def _is_excluded(self, path: Path) -> bool:
+        """Check whether an event path is outside the root or in an excluded directory."""
+        if str(path) in self._own_files:
+            return True
+        try:
+            relative = path.relative_to(self.root_path)
+        except ValueError:
+            return True
+        if not self.config.recursive_discovery and len(relative.parts) > 1:
+            return True
+        return any(part in self._filter.excluded_dirs for part in relative.parts)
+
+    def _load_snapshot(self) -> bool:
+        """Open the snapshot database and load it, returning whether it was complete.
+
+        A snapshot whose initial scan never finished is discarded and rebuilt.
+        """
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._snapshot_db = self._open_snapshot_db()
+        except sqlite3.DatabaseError:
+            logger.warning("Replacing unreadable watch snapshot %s", self.snapshot_path)
+            for path in self._own_files:
+                Path(path).unlink(missing_ok=True)
+            self._snapshot_db = self._open_snapshot_db()
+        db = self._snapshot_db
+        if db.execute("SELECT value FROM meta WHERE key = 'complete'").fetchone() is None:
+            db.execute("DELETE FROM files")
+            db.commit()
+            self._snapshot = {}
+            return False
+        self._snapshot = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in db.execute("SELECT path, mtime_ns, size FROM files")
+        }
+        return True
+
+    def _open_snapshot_db(self) -> sqlite3.Connection:
+        """Connect to the snapshot database, creating its tables."""
+        db = sqlite3.connect(str(self.snapshot_path), check_same_thread=False)
+        try:
+            db.executescript(_SNAPSHOT_SCHEMA)
+        except sqlite3.DatabaseError:
+            db.close()
+            raise
+        return db
+
+    def _mark_snapshot_complete(self) -> None:
+        """Record that the snapshot covers the whole tree."""
+        if self._snapshot_db is None:
+            return
+        self._snapshot_db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('complete', '1')"
+        )
+        self._snapshot_db.commit()
+
+    def _persist_snapshot(self, paths: list[str], deleted: list[str]) -> None:
+        """Write the snapshot rows of changed and deleted files in one transaction."""
+        if self._snapshot_db is None or not (paths or deleted):
+            return
+        with self._snapshot_db as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size) VALUES (?, ?, ?)",
+                [(path, *self._snapshot[path]) for path in paths],
+            )
+            db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in deleted])
+
+    def _path_to_content_item(
+        self, file_path: Path, stat: Any = None, change_type: str = "modified"
+    ) -> ContentItem | None:
         """Convert a file path to a ContentItem."""
         try:
             if stat is None:
@@ -178,6 +500,7 @@ class FileSystemSourceWatcher(SourceWatcher):
                     "file_extension": file_path.suffix,
                     "relative_path": str(file_path.relative_to(self.root_path)),
                     "parent_directory": str(file_path.parent),
+                    "change_type": change_type,
                 },
                 last_modified=datetime.fromtimestamp(stat.st_mtime),
                 size=stat.st_size,
@@ -186,6 +509,21 @@ class FileSystemSourceWatcher(SourceWatcher):
                 checksum=None,
             )
 
+    def _deleted_content_item(self, file_path: Path) -> ContentItem:
+        """Create a ContentItem reporting a deleted file."""
+        return ContentItem(
+            path=str(file_path),
+            content_type=ContentType.FILE,
+            metadata={
+                "file_extension": file_path.suffix,
+                "relative_path": str(file_path.relative_to(self.root_path)),
+                "parent_directory": str(file_path.parent),
+                "change_type": "deleted",
+            },
+            language=self._detect_language(file_path),
+            source_id=self.source_id,
+        )
+
     def _detect_language(self, file_path: Path) -> str | None:
         """Detect programming language from file extension."""
         suffix = file_path.suffix.lower()
@@ -708,16 +1046,7 @@ class FileSystemSource(AbstractDataSource):
         self, root_path: Path, config: FileSystemSourceConfig
     ) -> list[Path]:
         """Fallback file discovery when FilteringService is not available."""
-        from codeweaver.middleware.filtering import FileFilteringMiddleware
-
-        middleware_config = {
-            "use_gitignore": config.use_gitignore,
-            "max_file_size": 10 * 1024 * 1024,
-            "excluded_dirs": ["__pycache__", ".git", "node_modules", ".pytest_cache"],
-            "included_extensions": config.file_extensions or None,
-            "additional_ignore_patterns": config.additional_ignore_patterns,
-        }
-        middleware = FileFilteringMiddleware(middleware_config)
+        middleware = _filtering_middleware(config)
         patterns = config.file_extensions or ["*"]
         files = await middleware.find_files(
             base_path=root_path, patterns=patterns, recursive=config.recursive_discovery
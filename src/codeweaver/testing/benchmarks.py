@@ -24,7 +24,8 @@ from pydantic import BaseModel, Field
 from pydantic.dataclasses import dataclass
 
 from codeweaver.backends import VectorBackend
-from codeweaver.cw_types import DistanceMetric, VectorPoint
+from codeweaver.backends.fusion import fuse_results
+from codeweaver.cw_types import DistanceMetric, HybridStrategy, SearchResult, VectorPoint
 from codeweaver.providers import EmbeddingProvider, RerankProvider
 from codeweaver.sources import DataSource, SourceConfig
 
@@ -159,6 +160,108 @@ class BenchmarkSuite:
 
         return results
 
+    async def benchmark_search_recall(
+        self,
+        backend: VectorBackend,
+        reference: VectorBackend,
+        collection_name: str,
+        queries: list[list[float]],
+        k: int = 10,
+        search_kwargs: dict[str, Any] | None = None,
+    ) -> BenchmarkResult:
+        """Benchmark an approximate backend's latency and recall@k against an exact one.
+
+        Both backends must already hold the same points in ``collection_name``.
+
+        Args:
+            backend: Approximate backend to measure
+            reference: Exact backend providing the true neighbours
+            collection_name: Collection to search in both backends
+            queries: Query vectors
+            k: Number of neighbours compared per query
+            search_kwargs: Extra search options for ``backend`` (e.g. ``nprobe``)
+
+        Returns:
+            Latency statistics, with recall@k and p99 latency in the metadata
+        """
+        search_kwargs = search_kwargs or {}
+        durations = []
+        recalls = []
+        for query in queries:
+            start_time = time.perf_counter()
+            found = await backend.search_vectors(collection_name, query, limit=k, **search_kwargs)
+            durations.append((time.perf_counter() - start_time) * 1000)
+            expected = await reference.search_vectors(collection_name, query, limit=k)
+            if expected:
+                overlap = {r.id for r in found} & {r.id for r in expected}
+                recalls.append(len(overlap) / len(expected))
+
+        total_duration = sum(durations)
+        ordered = sorted(durations)
+        return BenchmarkResult(
+            benchmark_name=f"search_recall_at_{k}",
+            operation="search_vectors",
+            implementation_name=type(backend).__name__,
+            total_duration_ms=total_duration,
+            average_duration_ms=statistics.mean(durations),
+            median_duration_ms=statistics.median(durations),
+            min_duration_ms=ordered[0],
+            max_duration_ms=ordered[-1],
+            std_deviation_ms=statistics.stdev(durations) if len(durations) > 1 else 0.0,
+            operations_per_second=len(durations) / (total_duration / 1000)
+            if total_duration > 0
+            else 0.0,
+            iterations=len(durations),
+            test_data_size=len(queries),
+            metadata={
+                "k": k,
+                "recall_at_k": statistics.mean(recalls) if recalls else 0.0,
+                "p99_duration_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+                "reference_implementation": type(reference).__name__,
+                "search_kwargs": search_kwargs,
+            },
+        )
+
+    async def benchmark_fusion(
+        self,
+        k: int = 1000,
+        limit: int = 10,
+        overlap: float = 0.5,
+        strategies: list[HybridStrategy] | None = None,
+    ) -> list[BenchmarkResult]:
+        """Benchmark client-side fusion of two ranked lists of ``k`` results.
+
+        Args:
+            k: Results in each of the dense and sparse lists
+            limit: Fused results returned
+            overlap: Fraction of results present in both lists
+            strategies: Fusion strategies to measure (default: RRF, DBSF and linear)
+
+        Returns:
+            One result per strategy
+        """
+        strategies = strategies or [HybridStrategy.RRF, HybridStrategy.DBSF, HybridStrategy.LINEAR]
+        shared = int(k * overlap)
+        dense = [
+            SearchResult(id=f"doc-{i}", score=1.0 - i / k, payload={"rank": i}) for i in range(k)
+        ]
+        sparse = [
+            SearchResult(id=f"doc-{(i * 7) % shared if i < shared else k + i}", score=1.0 - i / k)
+            for i in range(k)
+        ]
+        results = []
+        for strategy in strategies:
+
+            async def fuse(s: HybridStrategy) -> list[SearchResult]:
+                return fuse_results(dense, sparse, strategy=s, limit=limit)
+
+            result = await self._benchmark_operation(
+                f"fusion_{strategy.value}_k{k}", "fuse_results", strategy, fuse, batch_size=2 * k
+            )
+            result.metadata |= {"k": k, "limit": limit, "overlap": overlap}
+            results.append(result)
+        return results
+
     async def benchmark_embedding_provider(
         self, provider: EmbeddingProvider, test_scenarios: list[dict[str, Any]] | None = None
     ) -> list[BenchmarkResult]:
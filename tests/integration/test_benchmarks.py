@@ -12,8 +12,12 @@ functionality across all protocol implementations.
 
 import asyncio
 
+import numpy as np
 import pytest
 
+from codeweaver.backends.providers.local import LocalVectorBackend
+from codeweaver.backends.providers.local_ivf import LocalIVFBackend
+from codeweaver.cw_types import VectorPoint
 from codeweaver.testing import (
     BenchmarkResult,
     BenchmarkSuite,
@@ -333,6 +337,41 @@ class TestBenchmarkScenarios:
         assert len(results) > 0
         assert any("small_batch" in r.benchmark_name for r in results)
 
+    async def test_local_ivf_search_recall(self, tmp_path) -> None:
+        """Test recall@10 of the IVF backend against exact local search."""
+        rng = np.random.default_rng(3)
+        centers = rng.normal(size=(40, 32))
+        data = centers[rng.integers(0, 40, 4000)] + 0.4 * rng.normal(size=(4000, 32))
+        points = [VectorPoint(id=i, vector=vector.tolist()) for i, vector in enumerate(data)]
+        approximate = LocalIVFBackend(tmp_path / "ivf", min_train_rows=1000)
+        exact = LocalVectorBackend(tmp_path / "exact")
+        for backend in (approximate, exact):
+            await backend.create_collection("bench", 32)
+            await backend.upsert_vectors("bench", points)
+        queries = (centers[rng.integers(0, 40, 50)] + 0.4 * rng.normal(size=(50, 32))).tolist()
+
+        suite = BenchmarkSuite()
+        result = await suite.benchmark_search_recall(
+            approximate, exact, "bench", queries, k=10, search_kwargs={"nprobe": 8}
+        )
+
+        assert result.iterations == 50
+        assert result.metadata["recall_at_k"] >= 0.9
+        assert result.metadata["p99_duration_ms"] >= result.median_duration_ms
+
+    async def test_fusion_benchmark_at_k_1000(self) -> None:
+        """Test the fusion micro-benchmark over two 1000-result lists."""
+        suite = BenchmarkSuite(warmup_iterations=1, benchmark_iterations=3)
+
+        results = await suite.benchmark_fusion(k=1000)
+
+        assert [r.benchmark_name for r in results] == [
+            "fusion_rrf_k1000",
+            "fusion_dbsf_k1000",
+            "fusion_linear_k1000",
+        ]
+        assert all(r.success_rate == 1.0 and r.items_per_second for r in results)
+
 
 @pytest.mark.benchmark
 @pytest.mark.performance
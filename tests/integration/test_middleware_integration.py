@@ -165,6 +165,74 @@ we get proper chunking behavior.
         finally:
             temp_path.unlink(missing_ok=True)
 
+    @pytest.mark.parametrize(
+        ("policy", "expected"),
+        [
+            ("outermost", [("class", 1), ("function", 10)]),
+            ("innermost", [("function", 2), ("function", 6), ("function", 10)]),
+            ("all", [("class", 1), ("function", 2), ("function", 6), ("function", 10)]),
+        ],
+    )
+    def test_nested_chunk_policy(self, policy: str, expected: list[tuple[str, int]]) -> None:
+        """Test nested AST matches are kept according to the configured policy."""
+        middleware = ChunkingMiddleware({"min_chunk_size": 20, "nested_chunk_policy": policy})
+        python_code = (
+            "class Calculator:\n"
+            "    def add(self, a, b):\n"
+            "        total = a + b\n"
+            "        return total\n"
+            "\n"
+            "    def multiply(self, a, b):\n"
+            "        return a * b\n"
+            "\n"
+            "\n"
+            "def helper(values):\n"
+            "    return [v for v in values if v]\n"
+        )
+
+        chunks = middleware.chunk_file_sync(Path("calc.py"), python_code)
+
+        assert [(c.chunk_type, c.start_line) for c in chunks] == expected
+        assert all(c.metadata["ast_grep_used"] for c in chunks)
+
+    def test_oversized_node_is_split(self) -> None:
+        """Test an oversized class is split into pieces headed by its signature."""
+        middleware = ChunkingMiddleware({"max_chunk_size": 400, "min_chunk_size": 20})
+        methods = "".join(
+            f"    def method_{i}(self, value):\n"
+            f"        scaled = value * {i}\n"
+            f"        return scaled + len(str(value))\n\n"
+            for i in range(20)
+        )
+        python_code = f"class Service:\n{methods}"
+
+        chunks = middleware.chunk_file_sync(Path("service.py"), python_code)
+
+        assert len(chunks) > 1
+        assert all(len(c.content) <= 400 for c in chunks)
+        assert all(c.content.startswith("class Service:\n") for c in chunks)
+        assert all(c.metadata.get("split") for c in chunks)
+        covered = "".join(c.content for c in chunks)
+        assert all(f"def method_{i}(" in covered for i in range(20))
+        assert [c.start_line for c in chunks] == sorted(c.start_line for c in chunks)
+
+    def test_oversized_node_split_disabled(self) -> None:
+        """Test oversized nodes are only searched for smaller matches when splitting is off."""
+        middleware = ChunkingMiddleware({
+            "max_chunk_size": 400,
+            "min_chunk_size": 20,
+            "split_oversized_nodes": False,
+        })
+        methods = "".join(
+            f"    def method_{i}(self, value):\n        return value * {i} + len(str(value))\n\n"
+            for i in range(20)
+        )
+
+        chunks = middleware.chunk_file_sync(Path("service.py"), f"class Service:\n{methods}")
+
+        assert len(chunks) == 20
+        assert {c.chunk_type for c in chunks} == {"function"}
+
     def test_get_supported_languages(self) -> None:
         # sourcery skip: extract-duplicate-method
         """Test getting supported languages information."""
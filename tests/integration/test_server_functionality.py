@@ -404,7 +404,7 @@ module.exports = { debounce, ApiClient };
             vector_points = []
             for chunk, embedding in zip(chunks, embeddings, strict=False):
                 vector_point = {
-                    "id": hash(chunk.unique_id) & ((1 << 63) - 1),
+                    "id": chunk.point_id,
                     "vector": embedding,
                     "payload": chunk.to_metadata(),
                 }
@@ -0,0 +1,111 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for change batching in the auto-indexing service."""
+
+import asyncio
+import threading
+
+from pathlib import Path
+
+import pytest
+
+from watchdog.events import (
+    DirMovedEvent,
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+)
+
+from codeweaver.cw_types import AutoIndexingConfig, ServiceType
+from codeweaver.services.providers.auto_indexing import AutoIndexingService, CodebaseChangeHandler
+
+
+def _service(**config) -> AutoIndexingService:
+    return AutoIndexingService(
+        ServiceType.AUTO_INDEXING,
+        AutoIndexingConfig(watch_patterns=["*.py"], debounce_delay=0.05, **config),
+    )
+
+
+def _mark_indexed(service: AutoIndexingService, path: Path) -> None:
+    stat = path.stat() if path.exists() else None
+    service._file_point_ids[str(path)] = ["point"]
+    if stat:
+        service._indexed_stats[str(path)] = (stat.st_mtime_ns, stat.st_size)
+
+
+def _dispatch_from_observer_thread(handler: CodebaseChangeHandler, events: list) -> None:
+    def dispatch() -> None:
+        for event in events:
+            handler.dispatch(event)
+
+    thread = threading.Thread(target=dispatch)
+    thread.start()
+    thread.join()
+
+
+@pytest.mark.unit
+class TestChangeBatching:
+    """Test the thread bridge, coalescing and diffing of change events."""
+
+    async def test_event_storm_becomes_one_unit_of_work(self, tmp_path: Path):
+        """Events from the observer thread collapse into one diffed batch."""
+        service = _service()
+        handler = CodebaseChangeHandler(service, asyncio.get_running_loop())
+        files = [tmp_path / f"module_{i}.py" for i in range(200)]
+        for path in files:
+            path.write_text("pass\n")
+        gone = tmp_path / "gone.py"
+        _mark_indexed(service, gone)
+        unchanged = files[0]
+        _mark_indexed(service, unchanged)
+
+        events = [FileDeletedEvent(str(gone))]
+        for _ in range(5):
+            events.extend(FileModifiedEvent(str(path)) for path in files)
+        events.append(FileCreatedEvent(str(tmp_path / "notes.txt")))
+        _dispatch_from_observer_thread(handler, events)
+        await asyncio.sleep(0.3)
+
+        assert service._indexing_queue.qsize() == 1
+        assert service._indexing_queue.get_nowait()[1] == sorted(files[1:])
+        assert str(gone) not in service._file_point_ids
+        assert service._indexing_stats["change_batches"] == 1
+
+    async def test_continuous_events_are_flushed_by_the_deadline(self, tmp_path: Path):
+        """A stream of events that never goes quiet is still flushed."""
+        service = _service(max_batch_delay=0.2)
+        path = tmp_path / "busy.py"
+        path.write_text("pass\n")
+
+        for _ in range(10):
+            service.queue_change(path)
+            await asyncio.sleep(0.04)
+
+        assert service._indexing_queue.get_nowait()[1] == [path]
+
+    async def test_directory_rename_is_diffed_against_the_index(self, tmp_path: Path):
+        """Files indexed under a moved directory are removed and its new contents queued."""
+        service = _service()
+        handler = CodebaseChangeHandler(service, asyncio.get_running_loop())
+        old, new = tmp_path / "old", tmp_path / "new"
+        old.mkdir()
+        (old / "a.py").write_text("pass\n")
+        _mark_indexed(service, old / "a.py")
+        old.rename(new)
+
+        _dispatch_from_observer_thread(
+            handler,
+            [
+                DirMovedEvent(str(old), str(new)),
+                FileMovedEvent(str(old / "a.py"), str(new / "a.py")),
+            ],
+        )
+        await asyncio.sleep(0.3)
+
+        assert service._indexing_queue.get_nowait()[1] == [new / "a.py"]
+        assert str(old / "a.py") not in service._file_point_ids
@@ -0,0 +1,342 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for the auto-indexing storage path."""
+
+import asyncio
+import os
+
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from codeweaver.backends.sparse import BM25Encoder
+from codeweaver.config import get_config
+from codeweaver.cw_types import AutoIndexingConfig, CodeChunk, FilteringServiceConfig, ServiceType
+from codeweaver.providers.embedding_store import EmbeddingStore
+from codeweaver.server import CodeWeaverServer
+from codeweaver.services import FileManifest
+from codeweaver.services.providers.auto_indexing import AutoIndexingService
+from codeweaver.services.providers.file_filtering import FilteringService
+from codeweaver.testing.mocks import MockEmbeddingProvider, MockVectorBackend
+
+
+COLLECTION = "auto-index-test"
+
+
+class LineChunker:
+    """Chunker producing one chunk per line."""
+
+    async def chunk_content(self, content: str, file_path: Path) -> list[CodeChunk]:
+        return [
+            CodeChunk.create_with_hash(
+                content=line,
+                file_path=str(file_path),
+                start_line=number,
+                end_line=number,
+                chunk_type="line",
+                language="python",
+            )
+            for number, line in enumerate(content.splitlines(), 1)
+        ]
+
+
+class GatedChunker(LineChunker):
+    """Line chunker whose first call waits until it is released."""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def chunk_content(self, content: str, file_path: Path) -> list[CodeChunk]:
+        if not self.started.is_set():
+            self.started.set()
+            await self.release.wait()
+        return await super().chunk_content(content, file_path)
+
+
+class RecordingProvider(MockEmbeddingProvider):
+    """Mock provider recording the size of each embedding call."""
+
+    def __init__(self):
+        super().__init__(dimension=16, latency_ms=0)
+        self.batch_sizes: list[int] = []
+
+    async def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.batch_sizes.append(len(texts))
+        return await super().embed_documents(texts)
+
+
+async def _auto_indexing(
+    backend: MockVectorBackend, manifest: FileManifest | None = None
+) -> AutoIndexingService:
+    auto_indexing = AutoIndexingService(
+        ServiceType.AUTO_INDEXING,
+        AutoIndexingConfig(
+            watch_patterns=["*.py"],
+            debounce_delay=0.05,
+            indexing_batch_size=20,
+            embedding_batch_size=8,
+            max_concurrent_indexing=1,
+        ),
+    )
+    auto_indexing.chunking_service = LineChunker()
+    if manifest is not None:
+        auto_indexing.filtering_service = FilteringService(
+            ServiceType.FILTERING, FilteringServiceConfig()
+        )
+        await auto_indexing.filtering_service.initialize()
+    auto_indexing.configure_storage(RecordingProvider(), backend, COLLECTION, manifest)
+    await auto_indexing.initialize()
+    return auto_indexing
+
+
+@pytest.fixture
+async def backend():
+    backend = MockVectorBackend(latency_ms=0)
+    await backend.create_collection(COLLECTION, dimension=16)
+    return backend
+
+
+@pytest.fixture
+async def service(backend):
+    auto_indexing = await _auto_indexing(backend)
+    yield auto_indexing
+    await auto_indexing.shutdown()
+
+
+def _write(path: Path, lines: int) -> Path:
+    path.write_text("".join(f"value_{path.stem}_{i} = {i}\n" for i in range(lines)))
+    return path
+
+
+async def _wait_until_idle(service: AutoIndexingService) -> None:
+    for _ in range(100):
+        await asyncio.sleep(0.02)
+        if service.get_metrics()["oldest_pending_change_seconds"] == 0.0:
+            return
+    raise AssertionError("indexing did not finish")
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+class TestAutoIndexingStorage:
+    """Test batched embedding, bulk upserts and deletes, and metrics."""
+
+    async def test_chunks_from_many_files_share_embedding_batches(self, service, tmp_path):
+        """Chunks are pooled across files and embedded in batches of the configured size."""
+        for i in range(12):
+            _write(tmp_path / f"module_{i}.py", 3)
+
+        for path in tmp_path.iterdir():
+            service.queue_change(path)
+        await _wait_until_idle(service)
+
+        assert service.embedding_provider.batch_sizes == [8, 8, 8, 8, 4]
+        assert len(service.backend.vectors[COLLECTION]) == 36
+        metrics = service.get_metrics()
+        assert metrics["files_indexed"] == 12
+        assert metrics["embedding_batches"] == 5
+        assert metrics["files_per_second"] > 0
+        assert metrics["last_indexing_lag_seconds"] >= 0.05
+
+    async def test_changed_and_deleted_files_replace_their_points(self, service, tmp_path):
+        """Stale points of a changed file and all points of a deleted file are removed."""
+        kept = _write(tmp_path / "kept.py", 4)
+        removed = _write(tmp_path / "removed.py", 2)
+        service.queue_change(kept)
+        service.queue_change(removed)
+        await _wait_until_idle(service)
+        assert len(service.backend.vectors[COLLECTION]) == 6
+
+        _write(kept, 1)
+        removed.unlink()
+        service.queue_change(kept)
+        service.queue_change(removed)
+        await _wait_until_idle(service)
+
+        assert len(service.backend.vectors[COLLECTION]) == 1
+        assert list(service._file_point_ids) == [str(kept)]
+        assert service.get_metrics()["vectors_deleted"] == 5
+
+    async def test_restart_processes_only_files_changed_while_stopped(self, backend, tmp_path):
+        """The manifest lets a restarted service skip unchanged files and drop deleted ones."""
+        source = tmp_path / "src"
+        source.mkdir()
+        kept = _write(source / "kept.py", 3)
+        touched = _write(source / "touched.py", 3)
+        edited = _write(source / "edited.py", 3)
+        deleted = _write(source / "deleted.py", 2)
+        manifest_path = tmp_path / "index" / "manifest.sqlite3"
+        manifest = FileManifest(manifest_path, signature="test")
+        first = await _auto_indexing(backend, manifest)
+        await first.start_monitoring(str(source))
+        await _wait_until_idle(first)
+        await first.shutdown()
+        manifest.close()
+        assert len(backend.vectors[COLLECTION]) == 11
+
+        _write(edited, 1)
+        deleted.unlink()
+        stat = touched.stat()
+        os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        manifest = FileManifest(manifest_path, signature="test")
+        second = await _auto_indexing(backend, manifest)
+        try:
+            await second.start_monitoring(str(source))
+            await _wait_until_idle(second)
+
+            assert second.embedding_provider.batch_sizes == [1]
+            assert len(backend.vectors[COLLECTION]) == 7
+            assert sorted(second._file_point_ids) == sorted(map(str, [kept, touched, edited]))
+            assert manifest.get(str(touched)).mtime_ns == touched.stat().st_mtime_ns
+            assert manifest.get(str(deleted)) is None
+        finally:
+            await second.shutdown()
+            manifest.close()
+
+    async def test_points_carry_sparse_vectors_and_cached_embeddings(self, backend, tmp_path):
+        """Indexed chunks go through the pipeline's embedding store and BM25 encoder."""
+        encoder = BM25Encoder(tmp_path / "index" / "collection.sparse.npz")
+        store = EmbeddingStore(tmp_path / "index" / "embeddings")
+        service = await _auto_indexing(backend)
+        service.configure_storage(
+            service.embedding_provider,
+            backend,
+            COLLECTION,
+            embedding_store=store,
+            sparse_encoder=encoder,
+        )
+        module = _write(tmp_path / "module.py", 3)
+        try:
+            service.queue_change(module)
+            await _wait_until_idle(service)
+            points = list(backend.vectors[COLLECTION].values())
+            assert len(points) == 3
+            assert all(point.sparse_vector for point in points)
+            assert encoder.document_count == 3
+            assert BM25Encoder(encoder.path).document_count == 3
+            assert store.get_statistics()["vectors"] == 3
+
+            module.unlink()
+            service.queue_change(module)
+            await _wait_until_idle(service)
+            assert encoder.document_count == 0
+            assert BM25Encoder(encoder.path).document_count == 0
+        finally:
+            await service.shutdown()
+            store.close()
+
+    async def test_file_in_two_units_is_indexed_once_at_a_time(self, service, tmp_path):
+        """A file changed while a worker indexes it is reindexed after that worker is done."""
+        service.chunking_service = GatedChunker()
+        module = _write(tmp_path / "module.py", 3)
+        first = asyncio.create_task(service._index_files([module], "worker-0"))
+        await service.chunking_service.started.wait()
+
+        _write(module, 2)
+        await service._index_files([module], "worker-1")
+        service.chunking_service.release.set()
+        await first
+        await _wait_until_idle(service)
+
+        stored = {
+            point.payload["content"] for point in service.backend.vectors[COLLECTION].values()
+        }
+        assert stored == set(module.read_text().splitlines())
+        assert len(service._file_point_ids[str(module)]) == 2
+
+    async def test_service_context_reports_lag(self, service, tmp_path):
+        """Pending changes show up as queue lag until they are indexed."""
+        service.queue_change(_write(tmp_path / "late.py", 1))
+        await asyncio.sleep(0.02)
+
+        context = await service.create_service_context()
+        metrics = context["statistics"]
+        assert context["configuration"]["embedding_batch_size"] == 8
+        assert metrics["pending_changes"] == 1
+        assert metrics["oldest_pending_change_seconds"] > 0
+        assert set(metrics) >= {"queue_depth", "chunks_per_second"}
+
+        await _wait_until_idle(service)
+        assert service.get_metrics()["pending_changes"] == 0
+
+
+@pytest.fixture
+async def server(tmp_path):
+    config = get_config().model_copy(deep=True)
+    config.backend.collection_name = COLLECTION
+    config.indexing.index_dir = tmp_path / "index"
+    config.chunking.parallel_mode = "off"
+    services = config.services
+    services.auto_indexing.watch_patterns = ["*.py"]
+    services.auto_indexing.debounce_delay = 0.05
+    services.telemetry.enabled = False
+    services.health_check_enabled = False
+    for intent_service in (
+        services.intent,
+        services.implicit_learning,
+        services.context_intelligence,
+        services.zero_shot_optimization,
+    ):
+        intent_service.enabled = False
+    backend = MockVectorBackend(latency_ms=0)
+    await backend.create_collection(COLLECTION, dimension=16)
+    manager = MagicMock(
+        initialize=AsyncMock(),
+        shutdown=AsyncMock(),
+        get_backend=AsyncMock(return_value=backend),
+        get_embedding_provider=AsyncMock(
+            return_value=MockEmbeddingProvider(dimension=16, latency_ms=0)
+        ),
+        get_reranking_provider=AsyncMock(return_value=None),
+        get_data_sources=AsyncMock(return_value=[]),
+    )
+    with patch("codeweaver.server.ExtensibilityManager", return_value=manager):
+        server = CodeWeaverServer(config=config)
+    await server.initialize()
+    yield server
+    await server.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+async def test_server_startup_wires_auto_indexing(server, tmp_path):
+    """After startup, background indexing writes to the collection the server searches."""
+    service = await server.services_manager.get_service("auto_indexing")
+    backend = server._components["backend"]
+
+    assert service.chunking_service is server.services_manager.get_chunking_service()
+    assert service.filtering_service is server.services_manager.get_filtering_service()
+    assert service.embedding_provider is server._components["embedding_provider"]
+    assert service.backend is backend
+    assert service.collection_name == COLLECTION
+    assert service.manifest is server._components["manifest"]
+
+    (tmp_path / "module.py").write_text(
+        "def total(values):\n    return sum(value * 2 for value in values if value)\n"
+    )
+    await service.start_monitoring(str(tmp_path))
+    await _wait_until_idle(service)
+
+    assert backend.vectors[COLLECTION]
+    assert service.get_metrics()["files_indexed"] == 1
+    assert service.manifest.paths() == [str(tmp_path / "module.py")]
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+async def test_server_shutdown_closes_provider_and_backend_clients(server):
+    """Shutdown releases the HTTP clients held by the provider and the backend."""
+    provider = server._components["embedding_provider"]
+    backend = server._components["backend"]
+    provider.close = AsyncMock()
+    backend.close = AsyncMock()
+
+    await server.shutdown()
+
+    provider.close.assert_awaited_once()
+    backend.close.assert_awaited_once()
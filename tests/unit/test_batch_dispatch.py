@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for concurrent batch dispatch."""
+
+import asyncio
+import time
+
+import pytest
+
+from codeweaver.providers import dispatch_batches
+from codeweaver.services import RateLimitConfig, RateLimitingService
+
+
+class TransientError(Exception):
+    """Error worth retrying."""
+
+
+class FakeEmbeddingAPI:
+    """Embeds a batch after a delay, failing chosen batches a number of times."""
+
+    def __init__(self, delay: float = 0.02, failures: dict[str, int] | None = None):
+        self.delay = delay
+        self.failures = failures or {}
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def embed(self, batch: list[str]) -> list[list[float]]:
+        self.calls.append(batch[0])
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures.get(batch[0], 0) > 0:
+                self.failures[batch[0]] -= 1
+                raise TransientError(batch[0])
+            return [[float(text.split()[-1])] for text in batch]
+        finally:
+            self.in_flight -= 1
+
+
+def _batches(count: int, size: int = 2) -> list[list[str]]:
+    return [[f"text {i * size + j}" for j in range(size)] for i in range(count)]
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+class TestDispatchBatches:
+    """Test ordering, bounded concurrency and per-batch retries."""
+
+    async def test_results_keep_input_order_with_bounded_concurrency(self):
+        """Batches overlap up to the limit and results come back in order."""
+        api = FakeEmbeddingAPI()
+        start = time.perf_counter()
+
+        vectors = await dispatch_batches(_batches(8), api.embed, max_concurrency=4)
+
+        assert vectors == [[float(i)] for i in range(16)]
+        assert api.peak_in_flight == 4
+        assert time.perf_counter() - start < 8 * api.delay
+
+    async def test_failed_batch_is_retried_on_its_own(self):
+        """Only the failing batch is sent again."""
+        api = FakeEmbeddingAPI(failures={"text 4": 2})
+
+        vectors = await dispatch_batches(
+            _batches(4), api.embed, max_retries=2, retry_delay=0.001, retry_on=(TransientError,)
+        )
+
+        assert vectors == [[float(i)] for i in range(8)]
+        assert sorted(api.calls) == ["text 0", "text 2", "text 4", "text 4", "text 4", "text 6"]
+
+    async def test_exhausted_or_unretryable_errors_are_raised(self):
+        """Errors outside retry_on, or past max_retries, fail the whole call."""
+        with pytest.raises(TransientError):
+            await dispatch_batches(
+                _batches(3),
+                FakeEmbeddingAPI(failures={"text 2": 5}).embed,
+                max_retries=1,
+                retry_delay=0.001,
+                retry_on=(TransientError,),
+            )
+        api = FakeEmbeddingAPI(failures={"text 0": 1})
+        with pytest.raises(TransientError):
+            await dispatch_batches(_batches(3), api.embed, retry_on=())
+        assert api.calls.count("text 0") == 1
+
+
+@pytest.mark.unit
+async def test_rate_limiter_bounds_concurrency():
+    """Concurrency follows the burst capacity of the provider's bucket."""
+    service = RateLimitingService(
+        limits=RateLimitConfig(
+            burst_capacity=20, provider_specific_limits={"openai": {"burst_capacity": 3}}
+        )
+    )
+    await service.initialize()
+    api = FakeEmbeddingAPI()
+
+    async def embed(batch: list[str]) -> list[list[float]]:
+        await service.acquire("openai")
+        return await api.embed(batch)
+
+    await dispatch_batches(_batches(6), embed, max_concurrency=service.max_concurrency("openai"))
+
+    assert service.max_concurrency("openai") == 3
+    assert service.max_concurrency("voyage_ai") == 20
+    assert api.peak_in_flight == 3
+    assert service.get_statistics()["total_requests"] == 6
+    await service.shutdown()
@@ -0,0 +1,89 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for the parallel chunking executor."""
+
+import asyncio
+
+from pathlib import Path
+
+import pytest
+
+from codeweaver.middleware.chunking import ChunkingMiddleware
+from codeweaver.services.chunking_executor import ChunkingExecutor
+
+
+CONFIG = {"max_chunk_size": 1500, "min_chunk_size": 20, "ast_grep_enabled": True}
+
+
+def _source(index: int) -> str:
+    """Python source with a couple of chunkable definitions."""
+    return (
+        f"class Widget{index}:\n"
+        f"    def render(self, value):\n"
+        f"        return value * {index} + len(str(value))\n\n\n"
+        f"def helper_{index}(items):\n"
+        f"    return [item for item in items if item > {index}]\n"
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+class TestChunkingExecutor:
+    """Test chunking on worker pools."""
+
+    @pytest.mark.parametrize("mode", ["thread", "process"])
+    async def test_matches_inline_chunking(self, mode):
+        """Pooled chunking produces the same chunks as the middleware."""
+        files = [(Path(f"/repo/module_{i}.py"), _source(i)) for i in range(6)]
+        middleware = ChunkingMiddleware(CONFIG)
+
+        async with ChunkingExecutor(CONFIG, workers=2, mode=mode, files_per_task=4) as executor:
+            results = await asyncio.gather(*(executor.chunk_file(p, c) for p, c in files))
+
+        for (file_path, content), chunks in zip(files, results, strict=True):
+            expected = middleware.chunk_file_sync(file_path, content)
+            assert [c.point_id for c in chunks] == [c.point_id for c in expected]
+
+    async def test_batches_concurrent_calls(self, monkeypatch):
+        """Concurrent calls are grouped into tasks of at most files_per_task files."""
+        from codeweaver.services import chunking_executor
+
+        batch_sizes = []
+        original = chunking_executor._chunk_batch
+
+        def recording_batch(batch, chunker=None):
+            batch_sizes.append(len(batch))
+            return original(batch, chunker)
+
+        monkeypatch.setattr(chunking_executor, "_chunk_batch", recording_batch)
+        async with ChunkingExecutor(CONFIG, workers=2, mode="thread", files_per_task=4) as executor:
+            await asyncio.gather(
+                *(executor.chunk_file(Path(f"/repo/m{i}.py"), _source(i)) for i in range(10))
+            )
+
+        assert sum(batch_sizes) == 10
+        assert max(batch_sizes) <= 4
+        assert len(batch_sizes) == 3
+
+    async def test_failure_is_isolated_to_one_file(self, monkeypatch):
+        """A file that fails to chunk does not fail the rest of its batch."""
+
+        def flaky(self, file_path, content):
+            if file_path.name == "bad.py":
+                raise ValueError("unparseable")
+            return []
+
+        monkeypatch.setattr(ChunkingMiddleware, "chunk_file_sync", flaky)
+        async with ChunkingExecutor(CONFIG, workers=1, mode="thread") as executor:
+            results = await asyncio.gather(
+                executor.chunk_file(Path("/repo/good.py"), "x = 1"),
+                executor.chunk_file(Path("/repo/bad.py"), "x = 1"),
+                return_exceptions=True,
+            )
+
+        assert results[0] == []
+        assert isinstance(results[1], RuntimeError)
+        assert "unparseable" in str(results[1])
@@ -0,0 +1,148 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for client-side search in the DocArray adapter."""
+
+from typing import Any
+
+import numpy as np
+import pytest
+
+from pydantic import BaseModel, ConfigDict
+
+from codeweaver.backends.providers.docarray.adapter import DocArrayHybridAdapter
+from codeweaver.backends.sparse import BM25Encoder
+from codeweaver.cw_types import (
+    FilterCondition,
+    FilterOperator,
+    QuantizationConfig,
+    QuantizationMode,
+    SearchFilter,
+)
+
+
+class CodeDoc(BaseModel):
+    """Minimal document schema."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    id: str
+    content: str = ""
+    embedding: Any = None
+    metadata: dict[str, Any] = {}
+
+
+class InMemoryDocIndex:
+    """Document index supporting lookups by ID and exhaustive dense search."""
+
+    def __init__(self, docs: list[CodeDoc]):
+        self.docs = {doc.id: doc for doc in docs}
+
+    def __getitem__(self, ids: list[str]) -> list[CodeDoc]:
+        return [self.docs[doc_id] for doc_id in ids if doc_id in self.docs]
+
+    def find(self, query: CodeDoc, search_field: str, limit: int) -> tuple[list, list]:
+        scored = sorted(
+            ((float(np.dot(doc.embedding, query.embedding)), doc) for doc in self.docs.values()),
+            key=lambda item: -item[0],
+        )[:limit]
+        return [doc for _, doc in scored], [score for score, _ in scored]
+
+
+class InMemoryAdapter(DocArrayHybridAdapter):
+    """Hybrid adapter over the in-memory index."""
+
+    def _get_vector_count(self) -> int:
+        return len(self.doc_index.docs)
+
+    def _supports_hybrid_search(self) -> bool:
+        return True
+
+    def _supports_sparse_vectors(self) -> bool:
+        return True
+
+
+PYTHON_ONLY = SearchFilter(
+    conditions=[FilterCondition(field="language", operator=FilterOperator.EQ, value="python")]
+)
+
+
+async def _adapter(encoder: BM25Encoder | None = None, **options: Any) -> InMemoryAdapter:
+    """Adapter over ten documents alternating between Python and Rust."""
+    docs = [
+        CodeDoc(
+            id=f"doc-{i}",
+            embedding=np.array([1.0, i / 10]),
+            metadata={"language": "python" if i % 2 else "rust"},
+        )
+        for i in range(10)
+    ]
+    adapter = InMemoryAdapter(InMemoryDocIndex(docs), CodeDoc, sparse_encoder=encoder)
+    await adapter.create_collection("code", dimension=2, **options)
+    return adapter
+
+
+@pytest.mark.unit
+class TestDocArrayHybridSearch:
+    """Test filtering and sparse index persistence of the fallback hybrid search."""
+
+    async def test_filter_applies_to_both_retrievals(self):
+        """Results rejected by the filter are dropped before fusion, in both legs."""
+        adapter = await _adapter()
+        # Sparse hits favour the Rust documents
+        adapter._sparse_index.add(
+            [f"doc-{i}" for i in range(10)], [{1: 10.0 - i} for i in range(10)]
+        )
+
+        results = await adapter.hybrid_search(
+            "code", [1.0, 0.0], {1: 1.0}, limit=3, search_filter=PYTHON_ONLY
+        )
+
+        assert len(results) == 3
+        assert {result.payload["language"] for result in results} == {"python"}
+        sparse = adapter._sparse_search({1: 1.0}, 2, PYTHON_ONLY)
+        assert [result.id for result in sparse] == ["doc-1", "doc-3"]
+
+    async def test_sparse_index_persists_next_to_the_encoder(self, tmp_path):
+        """The fallback sparse index is reopened with the encoder's statistics."""
+        encoder_path = tmp_path / "code.sparse.npz"
+        adapter = await _adapter(BM25Encoder(encoder_path))
+        adapter._sparse_index.add(["doc-1"], [{1: 1.0}])
+        await adapter.close()
+
+        reopened = await _adapter()
+        reopened.sparse_encoder = BM25Encoder(encoder_path)
+
+        assert [result.id for result in reopened._sparse_search({1: 1.0}, 5)] == ["doc-1"]
+
+
+@pytest.mark.unit
+class TestDocArrayQuantizedSearch:
+    """Test the client-side quantized search."""
+
+    async def test_codes_default_to_the_quantization_dir(self, tmp_path):
+        """Codes are persisted under the adapter's quantization directory."""
+        docs = InMemoryDocIndex([])
+        adapter = InMemoryAdapter(docs, CodeDoc)
+        adapter.quantization_dir = tmp_path / "quantized"
+        await adapter.create_collection(
+            "code", dimension=2, quantization=QuantizationConfig(mode=QuantizationMode.SCALAR)
+        )
+
+        assert adapter._quantized.path == tmp_path / "quantized" / "code"
+
+    async def test_filter_applies_to_quantized_candidates(self):
+        """Filtered quantized searches widen until enough candidates match."""
+        adapter = await _adapter(quantization=QuantizationConfig(mode=QuantizationMode.SCALAR))
+        docs = adapter.doc_index.docs
+        adapter._quantized.add(
+            list(docs), np.stack([doc.embedding for doc in docs.values()]).astype(np.float32)
+        )
+
+        results = await adapter.search_vectors(
+            "code", [1.0, 1.0], limit=3, search_filter=PYTHON_ONLY, oversampling=1.0
+        )
+
+        assert [result.id for result in results] == ["doc-9", "doc-7", "doc-5"]
@@ -0,0 +1,143 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for the persistent embedding store."""
+
+import pytest
+
+from codeweaver.providers.embedding_store import (
+    EmbeddingNamespace,
+    EmbeddingStore,
+    embed_with_cache,
+)
+
+
+NAMESPACE = EmbeddingNamespace(provider="mock", model="mock-model", dimension=4)
+
+
+class RecordingEmbedder:
+    """Embeds texts deterministically and records what it was asked for."""
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    async def __call__(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0, 0.5, -2.0] for text in texts]
+
+
+class DictCache:
+    """Minimal stand-in for the caching service's get/set interface."""
+
+    def __init__(self):
+        self.values: dict[str, object] = {}
+
+    async def get(self, key: dict) -> object | None:
+        return self.values.get(repr(sorted(key.items())))
+
+    async def set(self, key: dict, value: object, ttl: int | None = None) -> None:
+        self.values[repr(sorted(key.items()))] = value
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+class TestEmbeddingStore:
+    """Test per-text embedding caching."""
+
+    async def test_only_misses_are_embedded(self, tmp_path):
+        """Cached texts are served from the store and results keep their order."""
+        embedder = RecordingEmbedder()
+        store = EmbeddingStore(tmp_path)
+
+        await store.embed(NAMESPACE, ["a", "bb"], embedder)
+        result = await store.embed(NAMESPACE, ["ccc", "a", "ccc", "bb"], embedder)
+
+        assert embedder.calls == [["a", "bb"], ["ccc"]]
+        assert [vector[0] for vector in result] == [3.0, 1.0, 3.0, 2.0]
+        assert store.get_statistics()["hits"] == 2
+
+    async def test_survives_reopen(self, tmp_path):
+        """Re-embedding unchanged texts after a restart makes no calls."""
+        embedder = RecordingEmbedder()
+        store = EmbeddingStore(tmp_path)
+        first = await store.embed(NAMESPACE, ["def f(): pass", "x = 1"], embedder)
+        store.close()
+
+        reopened = EmbeddingStore(tmp_path)
+        second = await reopened.embed(NAMESPACE, ["x = 1", "def f(): pass"], embedder)
+        reopened.close()
+
+        assert len(embedder.calls) == 1
+        assert second == [first[1], first[0]]
+
+    async def test_namespaces_are_isolated(self, tmp_path):
+        """Embeddings from another model or input type are not reused."""
+        embedder = RecordingEmbedder()
+        store = EmbeddingStore(tmp_path)
+        query = EmbeddingNamespace(
+            provider="mock", model="mock-model", dimension=4, input_type="query"
+        )
+
+        await store.embed(NAMESPACE, ["text"], embedder)
+        await store.embed(query, ["text"], embedder)
+
+        assert len(embedder.calls) == 2
+
+    async def test_float16_storage(self, tmp_path):
+        """float16 vectors round-trip with half precision."""
+        store = EmbeddingStore(tmp_path, dtype="float16")
+        store.put_many(NAMESPACE, ["t"], [[0.1, 0.2, 0.3, 0.4]])
+
+        (vector,) = store.get_many(NAMESPACE, ["t"])
+
+        assert vector == pytest.approx([0.1, 0.2, 0.3, 0.4], abs=1e-3)
+        assert (tmp_path / f"{NAMESPACE.slug}.float16.vectors").stat().st_size == 8
+
+    async def test_ignores_index_entries_without_vectors(self, tmp_path):
+        """A truncated vector file does not yield partial vectors."""
+        store = EmbeddingStore(tmp_path)
+        store.put_many(NAMESPACE, ["a", "b"], [[1.0] * 4, [2.0] * 4])
+        store.close()
+        vectors = tmp_path / f"{NAMESPACE.slug}.float32.vectors"
+        vectors.write_bytes(vectors.read_bytes()[:20])
+
+        reopened = EmbeddingStore(tmp_path)
+
+        assert reopened.get_many(NAMESPACE, ["a", "b"]) == [[1.0] * 4, None]
+
+    async def test_appends_after_partial_records_stay_aligned(self, tmp_path):
+        """Stray bytes from an interrupted write do not shift later vectors."""
+        store = EmbeddingStore(tmp_path)
+        store.put_many(NAMESPACE, ["a"], [[1.0] * 4])
+        store.close()
+        vectors = tmp_path / f"{NAMESPACE.slug}.float32.vectors"
+        index = tmp_path / f"{NAMESPACE.slug}.float32.index"
+        with vectors.open("ab") as f:
+            f.write(b"\x01" * 6)
+        with index.open("ab") as f:
+            f.write(b"\x02" * 5)
+
+        reopened = EmbeddingStore(tmp_path)
+        reopened.put_many(NAMESPACE, ["b"], [[2.0] * 4])
+        reopened.close()
+        final = EmbeddingStore(tmp_path)
+
+        assert final.get_many(NAMESPACE, ["a", "b"]) == [[1.0] * 4, [2.0] * 4]
+        assert vectors.stat().st_size == 2 * 16
+        final.close()
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+async def test_caching_service_is_keyed_per_text():
+    """Without a store, the caching service is consulted for each text."""
+    embedder = RecordingEmbedder()
+    context = {"caching_service": DictCache()}
+
+    await embed_with_cache(["a", "b"], embedder, NAMESPACE, context)
+    result = await embed_with_cache(["b", "c"], embedder, NAMESPACE, context)
+
+    assert embedder.calls == [["a", "b"], ["c"]]
+    assert [vector[0] for vector in result] == [1.0, 1.0]
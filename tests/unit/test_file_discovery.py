@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for pruning file discovery in the filtering middleware."""
+
+from pathlib import Path
+
+import pytest
+
+from codeweaver.middleware.filtering import FileFilteringMiddleware, compile_globs
+
+
+FILES = {
+    "src/app.py": "print('app')\n",
+    "src/util.js": "export {}\n",
+    "src/bundle.min.js": "x\n",
+    "src/empty.py": "",
+    "src/big.py": "x" * 4096,
+    "src/nested/deep.py": "pass\n",
+    "node_modules/pkg/index.js": "module.exports = {}\n",
+    "src/build/generated.py": "pass\n",
+    "build.py": "pass\n",
+}
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    for name, content in FILES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return tmp_path
+
+
+def _relative(files: list[Path], root: Path) -> set[str]:
+    return {file.relative_to(root).as_posix() for file in files}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("use_gitignore", [True, False])
+class TestFindFiles:
+    """Test discovery with rignore and with the scandir walk."""
+
+    async def test_filters_are_applied(self, tree, use_gitignore):
+        """Excluded directories, ignore patterns, empty and oversized files are skipped."""
+        middleware = FileFilteringMiddleware({
+            "use_gitignore": use_gitignore,
+            "max_file_size": "1KB",
+            "additional_ignore_patterns": ["*.min.js"],
+        })
+
+        files = await middleware.find_files(tree)
+
+        assert _relative(files, tree) == {
+            "src/app.py",
+            "src/util.js",
+            "src/nested/deep.py",
+            "build.py",
+        }
+
+    async def test_patterns_extensions_and_depth(self, tree, use_gitignore):
+        """Include patterns match names or paths; recursive=False stays at the top."""
+        middleware = FileFilteringMiddleware({"use_gitignore": use_gitignore})
+
+        python_files = await middleware.find_files(tree / "src", ["*.py"])
+        top_level = await middleware.find_files(tree, recursive=False)
+
+        assert _relative(python_files, tree) == {"src/app.py", "src/big.py", "src/nested/deep.py"}
+        assert _relative(top_level, tree) == {"build.py"}
+
+        middleware.included_extensions = {".js"}
+        assert _relative(await middleware.find_files(tree / "src"), tree) == {
+            "src/util.js",
+            "src/bundle.min.js",
+        }
+
+
+@pytest.mark.unit
+def test_excluded_directories_are_not_walked(tree, monkeypatch):
+    """Nothing below an excluded directory is visited."""
+    visited = []
+    original = FileFilteringMiddleware._passes_name_filters
+
+    def record(self, path, include):
+        visited.append(path)
+        return original(self, path, include)
+
+    monkeypatch.setattr(FileFilteringMiddleware, "_passes_name_filters", record)
+    list(FileFilteringMiddleware().iter_files(tree))
+
+    assert visited
+    assert not [path for path in visited if "node_modules" in path.parts]
+
+
+@pytest.mark.unit
+def test_compile_globs_matches_any_pattern():
+    """Globs compile to one expression with fnmatch semantics."""
+    regex = compile_globs(("*.py", "docs/*.md"))
+
+    assert regex.match("parser.py")
+    assert regex.match("docs/index.md")
+    assert not regex.match("parser.pyc")
+    assert compile_globs(()) is None
@@ -0,0 +1,146 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for the event-driven file system source watcher."""
+
+import asyncio
+import os
+import sqlite3
+
+from pathlib import Path
+
+import pytest
+
+from codeweaver.cw_types import ContentItem
+from codeweaver.sources.providers import filesystem
+from codeweaver.sources.providers.filesystem import FileSystemSourceConfig, FileSystemSourceWatcher
+
+
+class ChangeRecorder:
+    """Collects the batches a watcher reports."""
+
+    def __init__(self):
+        self.batches: list[dict[str, str]] = []
+        self._received = asyncio.Event()
+
+    async def __call__(self, items: list[ContentItem]) -> None:
+        self.batches.append({
+            item.metadata["relative_path"]: item.metadata["change_type"] for item in items
+        })
+        self._received.set()
+
+    async def next_batch(self, timeout: float = 3.0) -> dict[str, str]:
+        await asyncio.wait_for(self._received.wait(), timeout)
+        self._received.clear()
+        return self.batches[-1]
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text("*.log\n")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("print('app')\n")
+    (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+    return tmp_path
+
+
+def _watcher(repo: Path, recorder: ChangeRecorder, **config) -> FileSystemSourceWatcher:
+    config = FileSystemSourceConfig(
+        root_path=str(repo), enable_change_watching=True, change_batch_window_ms=100, **config
+    )
+    return FileSystemSourceWatcher("fs-test", recorder, Path(config.root_path), config)
+
+
+def _touch(path: Path, content: str) -> None:
+    path.write_text(content)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.mark.unit
+class TestFileSystemSourceWatcher:
+    """Test event batching, filtering and snapshot reconciliation."""
+
+    async def test_events_are_filtered_and_coalesced(self, repo: Path):
+        """A burst of writes becomes one batch without ignored or excluded files."""
+        recorder = ChangeRecorder()
+        watcher = _watcher(repo, recorder)
+        assert await watcher.start()
+        try:
+            for i in range(5):
+                _touch(repo / "src" / "app.py", f"print({i})\n")
+            (repo / "src" / "new.py").write_text("pass\n")
+            (repo / "debug.log").write_text("noise\n")
+            (repo / "node_modules" / "pkg" / "index.js").write_text("x\n")
+
+            assert await recorder.next_batch() == {
+                "src/app.py": "modified",
+                "src/new.py": "created",
+            }
+
+            (repo / "src" / "new.py").unlink()
+            assert await recorder.next_batch() == {"src/new.py": "deleted"}
+        finally:
+            await watcher.stop()
+        assert len(recorder.batches) == 2
+
+    async def test_changes_while_stopped_are_reported_on_start(self, repo: Path):
+        """The persisted snapshot lets a new watcher catch up on missed changes."""
+        first = _watcher(repo, ChangeRecorder())
+        assert await first.start()
+        await first.stop()
+        assert first.snapshot_path.exists()
+
+        _touch(repo / "src" / "app.py", "print('changed')\n")
+        (repo / "README.md").write_text("# readme\n")
+        recorder = ChangeRecorder()
+        second = _watcher(repo, recorder)
+        assert await second.start()
+        try:
+            assert await recorder.next_batch() == {"src/app.py": "modified", "README.md": "created"}
+        finally:
+            await second.stop()
+
+    async def test_change_batches_write_only_their_snapshot_rows(self, repo: Path):
+        """Each batch persists the rows of its files instead of the whole snapshot."""
+        for i in range(50):
+            (repo / "src" / f"module_{i}.py").write_text("pass\n")
+        recorder = ChangeRecorder()
+        watcher = _watcher(repo, recorder)
+        assert await watcher.start()
+        written: list[tuple[list[str], list[str]]] = []
+        persist = watcher._persist_snapshot
+
+        def record(paths: list[str], deleted: list[str]) -> None:
+            written.append((paths, deleted))
+            persist(paths, deleted)
+
+        watcher._persist_snapshot = record
+        try:
+            _touch(repo / "src" / "module_7.py", "print(7)\n")
+            assert await recorder.next_batch() == {"src/module_7.py": "modified"}
+        finally:
+            await watcher.stop()
+
+        assert written == [([str(repo / "src" / "module_7.py")], [])]
+        with sqlite3.connect(watcher.snapshot_path) as db:
+            rows = dict(db.execute("SELECT path, mtime_ns FROM files"))
+        assert len(rows) == 51
+        assert rows[str(repo / "src" / "module_7.py")] == (
+            (repo / "src" / "module_7.py").stat().st_mtime_ns
+        )
+
+    async def test_reconciliation_works_without_watchdog(self, repo: Path, monkeypatch):
+        """Periodic reconciliation picks up changes when no events arrive."""
+        monkeypatch.setattr(filesystem, "WATCHDOG_AVAILABLE", False)
+        recorder = ChangeRecorder()
+        watcher = _watcher(repo, recorder, change_check_interval_seconds=1)
+        assert await watcher.start()
+        try:
+            (repo / "src" / "later.py").write_text("pass\n")
+            assert await recorder.next_batch() == {"src/later.py": "created"}
+        finally:
+            await watcher.stop()
@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for streaming file discovery in the filtering service."""
+
+import asyncio
+import itertools
+import threading
+
+from pathlib import Path
+
+import pytest
+
+from codeweaver.cw_types import FilteringError, FilteringServiceConfig, ServiceType
+from codeweaver.services.providers.file_filtering import FilteringService
+
+
+async def _service(**config) -> FilteringService:
+    service = FilteringService(ServiceType.FILTERING, FilteringServiceConfig(**config))
+    await service.initialize()
+    return service
+
+
+@pytest.mark.unit
+class TestDiscoverFilesStream:
+    """Test incremental delivery, backpressure and cancellation."""
+
+    async def test_stream_matches_discover_files(self, tmp_path: Path):
+        """The stream yields the same files as the list API and records stats."""
+        for name in ["a.py", "b.py", "pkg/c.py", "pkg/notes.txt", "node_modules/d.js"]:
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).write_text("content\n")
+        service = await _service(exclude_patterns=["*.txt"])
+
+        streamed = [path async for path in service.discover_files_stream(tmp_path)]
+
+        assert sorted(streamed) == sorted(await service.discover_files(tmp_path))
+        assert {path.name for path in streamed} == {"a.py", "b.py", "c.py"}
+        stats = await service.get_filtering_stats()
+        assert stats.total_files_included == 6
+        assert stats.total_directories_scanned == 2
+
+    async def test_first_file_arrives_before_the_walk_ends(self, tmp_path: Path, monkeypatch):
+        """Consumers see files while the walker is still running."""
+        service = await _service()
+        release = threading.Event()
+
+        def slow_walk(base_path, patterns=None, *, recursive=True):
+            yield base_path / "first.py"
+            release.wait(timeout=5)
+            yield base_path / "second.py"
+
+        monkeypatch.setattr(service._middleware, "iter_files", slow_walk)
+        stream = service.discover_files_stream(tmp_path)
+
+        first = await asyncio.wait_for(anext(stream), timeout=1)
+        release.set()
+
+        assert first.name == "first.py"
+        assert [path.name async for path in stream] == ["second.py"]
+
+    async def test_closing_the_stream_stops_a_blocked_walker(self, tmp_path: Path, monkeypatch):
+        """The walker stalls on a full buffer and exits once the stream is closed."""
+        service = await _service(stream_buffer_size=2)
+        produced = itertools.count()
+        finished = threading.Event()
+
+        def endless_walk(base_path, patterns=None, *, recursive=True):
+            try:
+                while True:
+                    yield base_path / f"file_{next(produced)}.py"
+            finally:
+                finished.set()
+
+        monkeypatch.setattr(service._middleware, "iter_files", endless_walk)
+        stream = service.discover_files_stream(tmp_path)
+        await anext(stream)
+        await asyncio.sleep(0.05)
+        await stream.aclose()
+
+        assert await asyncio.to_thread(finished.wait, 2)
+        assert next(produced) <= 5
+
+    async def test_walk_errors_are_raised_to_the_consumer(self, tmp_path: Path, monkeypatch):
+        """Errors in the walker thread surface as filtering errors."""
+        service = await _service()
+
+        def broken_walk(base_path, patterns=None, *, recursive=True):
+            yield base_path / "ok.py"
+            raise PermissionError("denied")
+
+        monkeypatch.setattr(service._middleware, "iter_files", broken_walk)
+
+        with pytest.raises(FilteringError):
+            _ = [path async for path in service.discover_files_stream(tmp_path)]
+        assert (await service.get_filtering_stats()).error_count == 1
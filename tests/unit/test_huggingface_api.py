@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for the batched HuggingFace Inference API client."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from codeweaver.providers.providers.huggingface import HuggingFaceInferenceClient, TransientAPIError
+
+
+class InferenceAPI:
+    """In-process Inference API answering with one vector per input."""
+
+    def __init__(self, responses: list[httpx.Response] | None = None, delay: float = 0.0):
+        self.responses = responses or []
+        self.delay = delay
+        self.requests: list[list[str]] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        inputs = json.loads(request.content)["inputs"]
+        self.requests.append(inputs)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if self.responses:
+            return self.responses.pop(0)
+        return httpx.Response(200, json=[[float(text.split()[-1]), 0.0] for text in inputs])
+
+
+def _client(api: InferenceAPI, **kwargs) -> HuggingFaceInferenceClient:
+    return HuggingFaceInferenceClient(
+        "sentence-transformers/all-mpnet-base-v2",
+        "hf_token",
+        retry_delay=0.001,
+        transport=httpx.MockTransport(api),
+        **kwargs,
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+class TestHuggingFaceInferenceClient:
+    """Test batching, pooling and retries of the Inference API client."""
+
+    async def test_texts_are_sent_in_concurrent_batches(self):
+        """Inputs go out as lists, a bounded number at a time, and come back in order."""
+        api = InferenceAPI(delay=0.01)
+        client = _client(api, batch_size=4, max_concurrent_requests=3)
+        texts = [f"text {i}" for i in range(20)]
+
+        vectors = await client.embed(texts)
+        await client.aclose()
+
+        assert vectors == [[float(i), 0.0] for i in range(20)]
+        assert [len(batch) for batch in api.requests] == [4] * 5
+        assert api.peak_in_flight == 3
+
+    async def test_model_loading_and_rate_limits_are_retried(self):
+        """503 and 429 responses are retried; the batch eventually succeeds."""
+        api = InferenceAPI(
+            responses=[
+                httpx.Response(503, json={"error": "loading", "estimated_time": 0.01}),
+                httpx.Response(429, headers={"Retry-After": "0"}, text="slow down"),
+            ]
+        )
+        client = _client(api)
+
+        assert await client.embed(["text 7"]) == [[7.0, 0.0]]
+        assert len(api.requests) == 3
+        await client.aclose()
+
+    async def test_persistent_or_client_errors_are_raised(self):
+        """Retries are bounded, and other HTTP errors are not retried."""
+        loading = [httpx.Response(503, json={"estimated_time": 0}) for _ in range(3)]
+        client = _client(InferenceAPI(responses=loading), max_retries=2)
+        with pytest.raises(TransientAPIError):
+            await client.embed(["text 1"])
+
+        api = InferenceAPI(responses=[httpx.Response(401, text="unauthorized")])
+        client = _client(api)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.embed(["text 1"])
+        assert len(api.requests) == 1
+
+    async def test_token_level_output_uses_first_token(self):
+        """Models returning per-token vectors yield their first token's vector."""
+        tokens = [[[1.0, 2.0], [3.0, 4.0]], [[5.0, 6.0], [7.0, 8.0]]]
+        client = _client(InferenceAPI(responses=[httpx.Response(200, json=tokens)]))
+
+        assert await client.embed(["a", "b"]) == [[1.0, 2.0], [5.0, 6.0]]
@@ -0,0 +1,130 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for client-side hybrid result fusion."""
+
+import asyncio
+
+import pytest
+
+from codeweaver.backends.fusion import fuse_results, fused_search
+from codeweaver.backends.sparse import SparseIndex
+from codeweaver.cw_types import HybridStrategy, SearchResult
+
+
+def _ranked(*ids: str, scores: list[float] | None = None) -> list[SearchResult]:
+    scores = scores or [1.0 - rank / 10 for rank in range(len(ids))]
+    return [
+        SearchResult(id=point_id, score=score, payload={"id": point_id})
+        for point_id, score in zip(ids, scores, strict=True)
+    ]
+
+
+@pytest.mark.unit
+class TestFuseResults:
+    """Test the fusion strategies."""
+
+    @pytest.mark.parametrize(
+        "strategy", [HybridStrategy.RRF, HybridStrategy.DBSF, HybridStrategy.LINEAR]
+    )
+    def test_results_found_by_both_retrievals_rank_first(self, strategy):
+        """A hit ranked well in both lists beats hits found by only one."""
+        dense = _ranked("a", "b", "c", "d")
+        sparse = _ranked("e", "b", "f", "g")
+
+        fused = fuse_results(dense, sparse, strategy=strategy, limit=3)
+
+        assert fused[0].id == "b"
+        assert len(fused) == 3
+        assert all(0.0 <= result.score <= 1.0 for result in fused)
+        assert fused[0].backend_metadata["dense_rank"] == 2
+        assert fused[0].backend_metadata["sparse_rank"] == 2
+
+    @pytest.mark.parametrize(
+        "strategy", [HybridStrategy.RRF, HybridStrategy.DBSF, HybridStrategy.CONVEX]
+    )
+    def test_alpha_weighs_the_lists(self, strategy):
+        """alpha=1 keeps the dense ranking, alpha=0 the sparse ranking."""
+        dense = _ranked("a", "b", "c")
+        sparse = _ranked("c", "b", "a")
+
+        dense_only = fuse_results(dense, sparse, strategy=strategy, alpha=1.0)
+        sparse_only = fuse_results(dense, sparse, strategy=strategy, alpha=0.0)
+
+        assert [r.id for r in dense_only] == ["a", "b", "c"]
+        assert sparse_only[0].id == "c"
+
+    def test_linear_blend_uses_normalized_scores(self):
+        """Scores are min-max normalized per list before blending."""
+        dense = _ranked("a", "b", scores=[0.9, 0.8])
+        sparse = _ranked("b", "a", scores=[0.3, 0.1])
+
+        fused = fuse_results(dense, sparse, strategy="linear", alpha=0.25)
+
+        assert [r.id for r in fused] == ["b", "a"]
+        assert fused[0].score == pytest.approx(0.75)
+        assert fused[0].payload == {"id": "b"}
+
+    def test_invalid_options_are_rejected(self):
+        """Unknown strategies and out-of-range alphas raise ValueError."""
+        with pytest.raises(ValueError, match="Unsupported fusion strategy"):
+            fuse_results([], [], strategy=HybridStrategy.OTHER)
+        with pytest.raises(ValueError, match="alpha"):
+            fuse_results([], [], alpha=1.5)
+
+    async def test_retrievals_run_concurrently(self):
+        """Both retrievals are in flight at the same time."""
+        started = asyncio.Event()
+
+        async def dense():
+            started.set()
+            return _ranked("a")
+
+        async def sparse():
+            await asyncio.wait_for(started.wait(), timeout=1)
+            return _ranked("b")
+
+        fused = await fused_search(sparse(), dense(), limit=5)
+
+        assert {result.id for result in fused} == {"a", "b"}
+
+
+@pytest.mark.unit
+def test_sparse_index_search_add_and_remove():
+    """The inverted index scores dot products and follows replacements and deletes."""
+    index = SparseIndex()
+    index.add(["a", "b", "c"], [{1: 1.0, 2: 0.5}, {2: 2.0}, None])
+
+    assert index.search({1: 1.0, 2: 1.0}, limit=5) == [("b", 2.0), ("a", 1.5)]
+
+    index.add(["b"], [{3: 1.0}])
+    index.remove(["a"])
+
+    assert len(index) == 1
+    assert index.search({1: 1.0, 2: 1.0}, limit=5) == []
+    assert index.search({3: 2.0}, limit=5) == [("b", 2.0)]
+
+
+@pytest.mark.unit
+def test_sparse_index_journal_is_replayed_on_open(tmp_path):
+    """A journaled index reopens with its documents, dropping a partial last record."""
+    path = tmp_path / "collection.sparse.index.jsonl"
+    index = SparseIndex(path)
+    index.add(["a", "b"], [{1: 1.0}, {1: 0.5, 2: 1.0}])
+    index.remove(["a"])
+    index.add(["c"], [{2: 3.0}])
+    index.close()
+    with path.open("a", encoding="utf-8") as journal:
+        journal.write('{"add": {"d": {"1"')
+
+    reopened = SparseIndex(path)
+    reopened.add(["e"], [{1: 2.0}])
+    reopened.close()
+
+    assert SparseIndex(path).search({1: 1.0, 2: 1.0}, limit=5) == [
+        ("c", 3.0),
+        ("e", 2.0),
+        ("b", 1.5),
+    ]
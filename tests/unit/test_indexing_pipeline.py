@@ -0,0 +1,263 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for the streaming indexing pipeline."""
+
+import os
+import subprocess
+import sys
+
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from codeweaver.cw_types import CodeChunk
+from codeweaver.services.manifest import FileManifest
+from codeweaver.services.pipeline import IndexingPipeline, PipelineConfig
+from codeweaver.testing.mocks import MockEmbeddingProvider, MockVectorBackend
+
+
+COLLECTION = "pipeline-test"
+
+
+def _write_tree(root: Path, file_count: int) -> None:
+    """Write a small tree of python files."""
+    for i in range(file_count):
+        (root / f"module_{i}.py").write_text(
+            f"def function_{i}(value):\n    result = value * {i}\n    return result + {i}\n"
+        )
+
+
+class StubChunker:
+    """Chunker producing one chunk per file, failing on request."""
+
+    def __init__(self, fail_on: str | None = None):
+        self.fail_on = fail_on
+
+    async def chunk_file(self, file_path: Path, content: str) -> list[CodeChunk]:
+        if self.fail_on and file_path.name == self.fail_on:
+            raise RuntimeError("boom")
+        return [
+            CodeChunk.create_with_hash(
+                content=content,
+                file_path=str(file_path),
+                start_line=1,
+                end_line=3,
+                chunk_type="function",
+                language="python",
+            )
+        ]
+
+
+@pytest.fixture
+async def backend():
+    """Mock backend with the test collection created."""
+    mock_backend = MockVectorBackend(latency_ms=0)
+    await mock_backend.create_collection(COLLECTION, dimension=16)
+    return mock_backend
+
+
+def _incremental_pipeline(root: Path, backend: MockVectorBackend) -> IndexingPipeline:
+    """Pipeline using a manifest stored under ``root``."""
+    return IndexingPipeline(
+        embedding_provider=MockEmbeddingProvider(dimension=16, latency_ms=0),
+        backend=backend,
+        collection_name=COLLECTION,
+        chunking_service=StubChunker(),
+        manifest=FileManifest(root / ".codeweaver" / "index" / "manifest.sqlite3"),
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.indexing
+@pytest.mark.mock_only
+class TestIndexingPipeline:
+    """Test the discover -> chunk -> embed -> upsert pipeline."""
+
+    async def test_indexes_tree_in_windows(self, tmp_path, backend):
+        """Chunks are embedded and upserted in window-sized batches."""
+        _write_tree(tmp_path, 10)
+        pipeline = IndexingPipeline(
+            embedding_provider=MockEmbeddingProvider(dimension=16, latency_ms=0),
+            backend=backend,
+            collection_name=COLLECTION,
+            chunking_service=StubChunker(),
+            config=PipelineConfig(window_size=3, max_concurrent_files=2),
+        )
+
+        stats = await pipeline.run(tmp_path)
+
+        assert stats.files_discovered == 10
+        assert stats.files_processed == 10
+        assert stats.chunks_created == 10
+        assert stats.vectors_upserted == 10
+        assert stats.batches_upserted == 4
+        assert stats.first_upsert_seconds is not None
+        assert len(backend.vectors[COLLECTION]) == 10
+
+    async def test_failed_files_do_not_stop_the_run(self, tmp_path, backend):
+        """A file that fails to chunk is counted and skipped."""
+        _write_tree(tmp_path, 4)
+        pipeline = IndexingPipeline(
+            embedding_provider=MockEmbeddingProvider(dimension=16, latency_ms=0),
+            backend=backend,
+            collection_name=COLLECTION,
+            chunking_service=StubChunker(fail_on="module_2.py"),
+            config=PipelineConfig(window_size=8),
+        )
+
+        stats = await pipeline.run(tmp_path)
+
+        assert stats.files_failed == 1
+        assert stats.vectors_upserted == 3
+
+    async def test_window_is_capped_by_provider_batch_size(self, backend):
+        """The embedding window never exceeds the provider's batch limit."""
+        provider = MockEmbeddingProvider(dimension=16, latency_ms=0)
+        pipeline = IndexingPipeline(
+            embedding_provider=provider,
+            backend=backend,
+            collection_name=COLLECTION,
+            config=PipelineConfig(window_size=1000),
+        )
+
+        assert pipeline.batch_size == provider.max_batch_size
+
+    async def test_full_reindex_overwrites_points(self, tmp_path, backend):
+        """Re-indexing without a manifest upserts onto the same point IDs."""
+        _write_tree(tmp_path, 4)
+        for _ in range(2):
+            await IndexingPipeline(
+                embedding_provider=MockEmbeddingProvider(dimension=16, latency_ms=0),
+                backend=backend,
+                collection_name=COLLECTION,
+                chunking_service=StubChunker(),
+            ).run(tmp_path)
+
+        assert len(backend.vectors[COLLECTION]) == 4
+
+    async def test_backend_error_propagates(self, tmp_path):
+        """A failing stage aborts the run with the original error."""
+        _write_tree(tmp_path, 2)
+        failing_backend = AsyncMock()
+        failing_backend.upsert_vectors.side_effect = RuntimeError("backend down")
+        pipeline = IndexingPipeline(
+            embedding_provider=MockEmbeddingProvider(dimension=16, latency_ms=0),
+            backend=failing_backend,
+            collection_name=COLLECTION,
+            chunking_service=StubChunker(),
+        )
+
+        with pytest.raises(RuntimeError, match="backend down"):
+            await pipeline.run(tmp_path)
+
+
+@pytest.mark.unit
+@pytest.mark.indexing
+@pytest.mark.mock_only
+class TestIncrementalIndexing:
+    """Test manifest-driven incremental reindexing."""
+
+    async def test_noop_reindex_skips_all_files(self, tmp_path, backend):
+        """A second run over an unchanged tree embeds nothing."""
+        _write_tree(tmp_path, 5)
+        await _incremental_pipeline(tmp_path, backend).run(tmp_path)
+
+        stats = await _incremental_pipeline(tmp_path, backend).run(tmp_path)
+
+        assert stats.files_unchanged == 5
+        assert stats.vectors_upserted == 0
+        assert stats.vectors_deleted == 0
+        assert len(backend.vectors[COLLECTION]) == 5
+
+    async def test_changed_file_replaces_its_points(self, tmp_path, backend):
+        """Only the modified file is re-embedded and its old point is removed."""
+        _write_tree(tmp_path, 3)
+        await _incremental_pipeline(tmp_path, backend).run(tmp_path)
+        (tmp_path / "module_1.py").write_text("def changed():\n    return 'a different body'\n")
+
+        stats = await _incremental_pipeline(tmp_path, backend).run(tmp_path)
+
+        assert stats.files_processed == 1
+        assert stats.files_unchanged == 2
+        assert stats.vectors_upserted == 1
+        assert stats.vectors_deleted == 1
+        assert len(backend.vectors[COLLECTION]) == 3
+
+    async def test_deleted_file_points_are_removed(self, tmp_path, backend):
+        """Files missing from the tree have their points deleted."""
+        _write_tree(tmp_path, 3)
+        await _incremental_pipeline(tmp_path, backend).run(tmp_path)
+        (tmp_path / "module_0.py").unlink()
+
+        stats = await _incremental_pipeline(tmp_path, backend).run(tmp_path)
+
+        assert stats.files_removed == 1
+        assert stats.vectors_deleted == 1
+        assert len(backend.vectors[COLLECTION]) == 2
+
+    async def test_signature_change_removes_old_points(self, tmp_path, backend):
+        """Points recorded under a previous signature are deleted on the next run."""
+        _write_tree(tmp_path, 3)
+        manifest_path = tmp_path / ".codeweaver" / "index" / "manifest.sqlite3"
+        pipeline = _incremental_pipeline(tmp_path, backend)
+        pipeline.manifest = FileManifest(manifest_path, signature="model-a")
+        await pipeline.run(tmp_path)
+        (tmp_path / "module_1.py").write_text("def changed():\n    return 'a different body'\n")
+        old_ids = set(backend.vectors[COLLECTION])
+
+        pipeline = _incremental_pipeline(tmp_path, backend)
+        pipeline.manifest = FileManifest(manifest_path, signature="model-b")
+        stats = await pipeline.run(tmp_path)
+
+        assert stats.files_processed == 3
+        assert stats.vectors_deleted == 1
+        assert len(backend.vectors[COLLECTION]) == 3
+        assert len(old_ids & set(backend.vectors[COLLECTION])) == 2
+        assert pipeline.manifest.take_stale_chunk_ids() == []
+
+    async def test_failed_run_is_not_recorded(self, tmp_path, backend):
+        """A run that fails to store its vectors leaves the manifest untouched."""
+        _write_tree(tmp_path, 2)
+        failing_backend = AsyncMock()
+        failing_backend.upsert_vectors.side_effect = RuntimeError("backend down")
+        with pytest.raises(RuntimeError):
+            await _incremental_pipeline(tmp_path, failing_backend).run(tmp_path)
+
+        stats = await _incremental_pipeline(tmp_path, backend).run(tmp_path)
+
+        assert stats.files_unchanged == 0
+        assert stats.vectors_upserted == 2
+
+
+@pytest.mark.unit
+@pytest.mark.indexing
+def test_point_ids_are_stable_across_processes():
+    """Chunk point IDs do not depend on the interpreter's hash seed."""
+    chunk = CodeChunk.create_with_hash(
+        content="def f():\n    return 1\n",
+        file_path="/repo/f.py",
+        start_line=1,
+        end_line=2,
+        chunk_type="function",
+        language="python",
+    )
+    script = (
+        "from codeweaver.cw_types.content import chunk_point_id;"
+        f"print(chunk_point_id('/repo/f.py', 1, 2, {chunk.hash!r}))"
+    )
+    ids = {
+        subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONHASHSEED": seed},
+        ).stdout.strip()
+        for seed in ("1", "2")
+    }
+
+    assert ids == {chunk.point_id}
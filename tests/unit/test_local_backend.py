@@ -0,0 +1,212 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for the embedded NumPy vector backend."""
+
+import numpy as np
+import pytest
+
+from codeweaver.backends.base_config import BackendConfig
+from codeweaver.backends.factory import BackendFactory
+from codeweaver.backends.providers.local import LocalVectorBackend, _LocalCollection
+from codeweaver.cw_types import (
+    BackendCollectionNotFoundError,
+    DistanceMetric,
+    FilterCondition,
+    ProviderKind,
+    SearchFilter,
+    VectorPoint,
+)
+
+
+def _points(vectors: np.ndarray, start: int = 0) -> list[VectorPoint]:
+    return [
+        VectorPoint(
+            id=start + i,
+            vector=vector.tolist(),
+            payload={"file_path": f"src/mod_{(start + i) % 3}.py", "line": start + i},
+        )
+        for i, vector in enumerate(vectors)
+    ]
+
+
+@pytest.fixture
+def vectors() -> np.ndarray:
+    return np.random.default_rng(7).normal(size=(200, 16)).astype(np.float32)
+
+
+def _exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> list[int]:
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:k].tolist()
+
+
+@pytest.mark.unit
+class TestLocalVectorBackend:
+    """Test the local backend against the VectorBackend protocol."""
+
+    async def test_search_matches_exact_ranking(self, tmp_path, vectors):
+        """Top-k results match a brute-force cosine ranking, across blocks."""
+        backend = LocalVectorBackend(tmp_path, search_block_rows=64)
+        await backend.create_collection("code", 16)
+        await backend.upsert_vectors("code", _points(vectors))
+
+        query = vectors[5] + 0.1
+        results = await backend.search_vectors("code", query.tolist(), limit=10)
+
+        assert [r.id for r in results] == _exact_top_k(vectors, query, 10)
+        assert all(0.0 <= r.score <= 1.0 for r in results)
+        assert results[0].payload["line"] == results[0].id
+
+    async def test_persists_across_instances(self, tmp_path, vectors):
+        """A new backend instance sees the same collection without reloading it."""
+        backend = LocalVectorBackend(tmp_path, dtype="float16")
+        await backend.create_collection("code", 16)
+        await backend.upsert_vectors("code", _points(vectors))
+        await backend.close()
+
+        reopened = LocalVectorBackend(tmp_path)
+        results = await reopened.search_vectors("code", vectors[42].tolist(), limit=1)
+        info = await reopened.get_collection_info("code")
+
+        assert results[0].id == 42
+        assert info.points_count == 200
+        assert info.backend_info["dtype"] == "float16"
+        assert await reopened.list_collections() == ["code"]
+
+    async def test_upsert_overwrites_existing_ids(self, tmp_path, vectors):
+        """Re-upserting an ID replaces its vector and payload in place."""
+        backend = LocalVectorBackend(tmp_path)
+        await backend.create_collection("code", 16)
+        await backend.upsert_vectors("code", _points(vectors[:10]))
+
+        await backend.upsert_vectors(
+            "code", [VectorPoint(id=3, vector=vectors[150].tolist(), payload={"line": -1})]
+        )
+        results = await backend.search_vectors("code", vectors[150].tolist(), limit=1)
+        info = await backend.get_collection_info("code")
+
+        assert results[0].id == 3
+        assert results[0].payload == {"line": -1}
+        assert info.backend_info["rows"] == 10
+
+    async def test_filters(self, tmp_path, vectors):
+        """Payload filters restrict the candidate rows."""
+        backend = LocalVectorBackend(tmp_path)
+        await backend.create_collection("code", 16)
+        await backend.upsert_vectors("code", _points(vectors))
+
+        only_mod_1 = SearchFilter(
+            conditions=[FilterCondition(field="file_path", operator="eq", value="src/mod_1.py")]
+        )
+        late_not_mod_1 = SearchFilter(
+            conditions=[FilterCondition(field="line", operator="ge", value=150)],
+            must_not=[only_mod_1],
+        )
+        first = await backend.search_vectors(
+            "code", vectors[0].tolist(), limit=20, search_filter=only_mod_1
+        )
+        second = await backend.search_vectors(
+            "code", vectors[0].tolist(), limit=100, search_filter=late_not_mod_1
+        )
+
+        assert len(first) == 20
+        assert all(r.payload["file_path"] == "src/mod_1.py" for r in first)
+        assert len(second) == 33
+        assert all(r.id >= 150 and r.id % 3 != 1 for r in second)
+
+    async def test_deletes_tombstone_and_compact(self, tmp_path, vectors):
+        """Deleted points disappear from search; compaction reclaims their rows."""
+        backend = LocalVectorBackend(tmp_path, compaction_threshold=0.5)
+        await backend.create_collection("code", 16)
+        await backend.upsert_vectors("code", _points(vectors))
+
+        await backend.delete_vectors("code", list(range(80)))
+        info = await backend.get_collection_info("code")
+        assert info.points_count == 120
+        assert info.backend_info["rows"] == 200
+
+        await backend.delete_vectors("code", list(range(80, 120)))
+        info = await backend.get_collection_info("code")
+        results = await backend.search_vectors("code", vectors[130].tolist(), limit=5)
+
+        assert info.backend_info["rows"] == 80
+        assert results[0].id == 130
+        assert {r.id for r in results}.isdisjoint(range(120))
+        expected = _exact_top_k(vectors[120:], vectors[130], 5)
+        assert [r.id for r in results] == [i + 120 for i in expected]
+
+    async def test_reopen_drops_partial_appends(self, tmp_path):
+        """Rows left by an interrupted append do not shift the rows appended later."""
+        backend = LocalVectorBackend(tmp_path)
+        await backend.create_collection("code", 2)
+        await backend.upsert_vectors("code", [VectorPoint(id="a", vector=[1.0, 0.0])])
+        await backend.close()
+        with (tmp_path / "code" / "vectors.bin").open("ab") as handle:
+            handle.write(np.asarray([0.0, 1.0], dtype=np.float32).tobytes())
+
+        reopened = LocalVectorBackend(tmp_path)
+        await reopened.upsert_vectors("code", [VectorPoint(id="b", vector=[1.0, 0.0])])
+        results = await reopened.search_vectors("code", [1.0, 0.0], limit=2)
+
+        assert {r.id: r.score for r in results} == {"a": 1.0, "b": 1.0}
+        assert (tmp_path / "code" / "vectors.bin").stat().st_size == 2 * 2 * 4
+
+    async def test_interrupted_compaction_is_finished_on_open(self, tmp_path, vectors, monkeypatch):
+        """A crash after the row renumbering commits is completed by the next open."""
+        backend = LocalVectorBackend(tmp_path, compaction_threshold=1.0)
+        await backend.create_collection("code", 16)
+        await backend.upsert_vectors("code", _points(vectors))
+        await backend.delete_vectors("code", list(range(100)))
+
+        def crash(self):
+            raise RuntimeError("crashed before swapping files")
+
+        monkeypatch.setattr(_LocalCollection, "_finish_compaction", crash)
+        with pytest.raises(RuntimeError):
+            await backend.compact("code")
+        monkeypatch.undo()
+        backend._collections["code"].db.close()
+
+        reopened = LocalVectorBackend(tmp_path)
+        results = await reopened.search_vectors("code", vectors[150].tolist(), limit=1)
+        info = await reopened.get_collection_info("code")
+
+        assert results[0].id == 150
+        assert results[0].score == pytest.approx(1.0)
+        assert info.backend_info["rows"] == 100
+        assert not list((tmp_path / "code").glob("*.compact"))
+
+    @pytest.mark.parametrize(
+        "metric", [DistanceMetric.EUCLIDEAN, DistanceMetric.DOT_PRODUCT, DistanceMetric.MANHATTAN]
+    )
+    async def test_other_metrics(self, tmp_path, vectors, metric):
+        """Each metric returns full results; distance metrics rank the query point first."""
+        backend = LocalVectorBackend(tmp_path)
+        await backend.create_collection("code", 16, distance_metric=metric)
+        await backend.upsert_vectors("code", _points(vectors))
+
+        results = await backend.search_vectors("code", vectors[17].tolist(), limit=3)
+
+        if metric != DistanceMetric.DOT_PRODUCT:
+            assert results[0].id == 17
+        assert len(results) == 3
+
+    async def test_missing_collection(self, tmp_path):
+        """Unknown collections raise the not-found error."""
+        backend = LocalVectorBackend(tmp_path)
+
+        with pytest.raises(BackendCollectionNotFoundError):
+            await backend.get_collection_info("missing")
+
+    def test_registered_in_factory(self, tmp_path):
+        """The backend is created through the factory with provider options."""
+        config = BackendConfig(
+            provider="local", kind=ProviderKind.COMBINED, provider_options={"path": str(tmp_path)}
+        )
+
+        backend = BackendFactory.create_backend(config)
+
+        assert isinstance(backend, LocalVectorBackend)
+        assert backend.path == tmp_path
@@ -0,0 +1,232 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for the IVF local backend."""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from codeweaver.backends.base_config import BackendConfig
+from codeweaver.backends.factory import BackendFactory
+from codeweaver.backends.providers.local_ivf import LocalIVFBackend, _IVFCollection
+from codeweaver.cw_types import (
+    DistanceMetric,
+    FilterCondition,
+    IndexType,
+    ProviderKind,
+    SearchFilter,
+    VectorPoint,
+)
+
+
+def _clustered(count: int, seed: int = 11) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(30, 24))
+    vectors = centers[rng.integers(0, 30, count)] + 0.3 * rng.normal(size=(count, 24))
+    queries = centers[rng.integers(0, 30, 20)] + 0.3 * rng.normal(size=(20, 24))
+    return vectors.astype(np.float32), queries.astype(np.float32)
+
+
+def _points(vectors: np.ndarray, start: int = 0) -> list[VectorPoint]:
+    return [
+        VectorPoint(id=start + i, vector=vector.tolist(), payload={"shard": (start + i) % 4})
+        for i, vector in enumerate(vectors)
+    ]
+
+
+def _exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int, metric: DistanceMetric) -> set:
+    if metric == DistanceMetric.EUCLIDEAN:
+        return set(np.argsort(((vectors - query) ** 2).sum(axis=1))[:k].tolist())
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return set(np.argsort(-(normalized @ query))[:k].tolist())
+
+
+async def _recall(backend, vectors, queries, metric=DistanceMetric.COSINE, **kwargs) -> float:
+    hits = 0
+    for query in queries:
+        results = await backend.search_vectors("code", query.tolist(), limit=10, **kwargs)
+        hits += len({r.id for r in results} & _exact_top_k(vectors, query, 10, metric))
+    return hits / (10 * len(queries))
+
+
+@pytest.mark.unit
+class TestLocalIVFBackend:
+    """Test IVF training, incremental maintenance and search."""
+
+    @pytest.mark.parametrize("metric", [DistanceMetric.COSINE, DistanceMetric.EUCLIDEAN])
+    async def test_recall_after_training(self, tmp_path, metric):
+        """Once trained, approximate search finds nearly all exact neighbours."""
+        vectors, queries = _clustered(3000)
+        backend = LocalIVFBackend(tmp_path, min_train_rows=1000, nprobe=6)
+        await backend.create_collection("code", 24, distance_metric=metric)
+        await backend.upsert_vectors("code", _points(vectors))
+
+        info = await backend.get_collection_info("code")
+
+        assert info.index_type == IndexType.IVF_FLAT
+        assert info.backend_info["ivf_trained"]
+        assert info.backend_info["ivf_nlist"] > 6
+        assert await _recall(backend, vectors, queries, metric) >= 0.9
+
+    async def test_untrained_collections_search_exactly(self, tmp_path):
+        """Below the training threshold, results are exact."""
+        vectors, queries = _clustered(500)
+        backend = LocalIVFBackend(tmp_path, min_train_rows=1000)
+        await backend.create_collection("code", 24)
+        await backend.upsert_vectors("code", _points(vectors))
+
+        assert not (await backend.get_collection_info("code")).backend_info["ivf_trained"]
+        assert await _recall(backend, vectors, queries) == 1.0
+
+    async def test_incremental_inserts_use_tail_then_regroup(self, tmp_path):
+        """Rows added after training are searchable at once and later folded into lists."""
+        vectors, queries = _clustered(3000)
+        backend = LocalIVFBackend(tmp_path, min_train_rows=1000, max_tail_rows=600, nprobe=6)
+        await backend.create_collection("code", 24)
+        await backend.upsert_vectors("code", _points(vectors[:1200]))
+
+        await backend.upsert_vectors("code", _points(vectors[1200:1700], start=1200))
+        assert (await backend.get_collection_info("code")).backend_info["ivf_tail_rows"] == 500
+        assert (await backend.search_vectors("code", vectors[1500].tolist(), limit=1))[0].id == 1500
+
+        await backend.upsert_vectors("code", _points(vectors[1700:2000], start=1700))
+        info = await backend.get_collection_info("code")
+
+        assert info.backend_info["ivf_tail_rows"] == 0
+        assert await _recall(backend, vectors[:2000], queries) >= 0.9
+
+    async def test_grows_number_of_lists_by_retraining(self, tmp_path):
+        """Growing past the retrain factor retrains with more lists."""
+        vectors, _ = _clustered(6000)
+        backend = LocalIVFBackend(tmp_path, min_train_rows=1000, retrain_factor=2)
+        await backend.create_collection("code", 24)
+        await backend.upsert_vectors("code", _points(vectors[:1000]))
+        nlist = (await backend.get_collection_info("code")).backend_info["ivf_nlist"]
+
+        await backend.upsert_vectors("code", _points(vectors[1000:], start=1000))
+
+        assert (await backend.get_collection_info("code")).backend_info["ivf_nlist"] > nlist
+
+    async def test_index_persists_across_instances(self, tmp_path):
+        """A reopened backend reuses the stored index."""
+        vectors, queries = _clustered(2000)
+        backend = LocalIVFBackend(tmp_path, min_train_rows=1000, nprobe=6)
+        await backend.create_collection("code", 24)
+        await backend.upsert_vectors("code", _points(vectors))
+        before = (await backend.get_collection_info("code")).backend_info
+        await backend.close()
+
+        reopened = LocalIVFBackend(tmp_path, nprobe=6)
+        after = (await reopened.get_collection_info("code")).backend_info
+
+        assert after["ivf_nlist"] == before["ivf_nlist"]
+        assert await _recall(reopened, vectors, queries) >= 0.9
+
+    async def test_updates_deletes_and_compaction(self, tmp_path):
+        """Updated points move rows; compaction keeps the index consistent."""
+        vectors, _ = _clustered(2000)
+        backend = LocalIVFBackend(tmp_path, min_train_rows=1000, compaction_threshold=0.9)
+        await backend.create_collection("code", 24)
+        await backend.upsert_vectors("code", _points(vectors))
+
+        await backend.upsert_vectors(
+            "code", [VectorPoint(id=5, vector=vectors[1999].tolist(), payload={"moved": True})]
+        )
+        await backend.delete_vectors("code", list(range(1000, 1999)))
+        reclaimed = await backend.compact("code")
+        results = await backend.search_vectors("code", vectors[1999].tolist(), limit=2)
+        info = await backend.get_collection_info("code")
+
+        assert reclaimed == 1000
+        assert info.points_count == 1001
+        assert {r.id for r in results} == {5, 1999}
+        assert (await backend.search_vectors("code", vectors[42].tolist(), limit=1))[0].id == 42
+
+    async def test_training_runs_outside_the_collection_lock(self, tmp_path, monkeypatch):
+        """Searches and upserts proceed while the quantizer is fitted."""
+        vectors, _ = _clustered(1300)
+        fitting, release = threading.Event(), threading.Event()
+        fit = _IVFCollection.fit
+
+        def blocking_fit(collection, job):
+            fitting.set()
+            release.wait(10)
+            return fit(collection, job)
+
+        monkeypatch.setattr(_IVFCollection, "fit", blocking_fit)
+        backend = LocalIVFBackend(tmp_path, min_train_rows=1000, nprobe=4)
+        await backend.create_collection("code", 24)
+        training = asyncio.create_task(backend.upsert_vectors("code", _points(vectors[:1200])))
+        assert await asyncio.to_thread(fitting.wait, 10)
+
+        found = await asyncio.wait_for(
+            backend.search_vectors("code", vectors[7].tolist(), limit=1), timeout=5
+        )
+        await backend.upsert_vectors("code", _points(vectors[1200:], start=1200))
+        release.set()
+        await training
+
+        collection = backend._collection("code")
+        assert found[0].id == 7
+        assert collection.trained
+        assert len(collection._assignments()) == 1300
+        assert (await backend.search_vectors("code", vectors[1250].tolist(), limit=1))[0].id == 1250
+
+    async def test_training_an_empty_collection_is_a_no_op(self, tmp_path):
+        """Training without live rows leaves the collection untrained."""
+        vectors, _ = _clustered(10)
+        backend = LocalIVFBackend(tmp_path)
+        await backend.create_collection("code", 24)
+        await backend.train("code")
+        await backend.upsert_vectors("code", _points(vectors))
+        await backend.delete_vectors("code", list(range(10)))
+        await backend.train("code")
+
+        assert not (await backend.get_collection_info("code")).backend_info["ivf_trained"]
+
+    async def test_updates_trigger_compaction(self, tmp_path):
+        """Rows left behind by updates count toward the compaction threshold."""
+        vectors, _ = _clustered(100)
+        backend = LocalIVFBackend(tmp_path, compaction_threshold=0.3)
+        await backend.create_collection("code", 24)
+        await backend.upsert_vectors("code", _points(vectors))
+
+        await backend.upsert_vectors("code", _points(vectors[::-1][:50]))
+
+        assert backend._collection("code").rows == 100
+
+    async def test_filters_and_nprobe_override(self, tmp_path):
+        """Filters apply to candidates, and probing every list gives exact results."""
+        vectors, queries = _clustered(2000)
+        backend = LocalIVFBackend(tmp_path, min_train_rows=1000, nprobe=1)
+        await backend.create_collection("code", 24)
+        await backend.upsert_vectors("code", _points(vectors))
+        shard_two = SearchFilter(
+            conditions=[FilterCondition(field="shard", operator="eq", value=2)]
+        )
+
+        filtered = await backend.search_vectors(
+            "code", queries[0].tolist(), limit=5, search_filter=shard_two
+        )
+
+        assert filtered
+        assert all(r.payload["shard"] == 2 for r in filtered)
+        assert await _recall(backend, vectors, queries, nprobe=10_000) == 1.0
+
+    def test_registered_in_factory(self, tmp_path):
+        """The backend is created through the factory with its index options."""
+        config = BackendConfig(
+            provider="local_ivf",
+            kind=ProviderKind.COMBINED,
+            provider_options={"path": str(tmp_path), "nprobe": 4},
+        )
+
+        backend = BackendFactory.create_backend(config)
+
+        assert isinstance(backend, LocalIVFBackend)
+        assert backend.nprobe == 4
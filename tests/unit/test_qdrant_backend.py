@@ -0,0 +1,149 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for the Qdrant backend client modes, using local in-memory Qdrant."""
+
+import asyncio
+
+import pytest
+
+from codeweaver.backends.providers.qdrant import QdrantHybridBackend
+from codeweaver.cw_types import BackendError, VectorPoint
+
+
+pytestmark = pytest.mark.filterwarnings("ignore::DeprecationWarning")
+
+
+def _points(count: int) -> list[VectorPoint]:
+    return [
+        VectorPoint(id=i, vector=[1.0, float(i), 0.0, 0.0], payload={"index": i})
+        for i in range(count)
+    ]
+
+
+@pytest.mark.unit
+class TestQdrantClientModes:
+    """Test the async and threaded sync client modes."""
+
+    @pytest.mark.parametrize("mode", ["async", "sync"])
+    async def test_round_trip(self, mode):
+        """Both modes create, upsert, search and describe collections."""
+        backend = QdrantHybridBackend(url=None, location=":memory:", client_mode=mode)
+        await backend.create_collection("code", 4)
+
+        await backend.upsert_vectors("code", _points(10))
+        results = await backend.search_vectors("code", [1.0, 2.5, 0.1, 0.0], limit=3)
+        info = await backend.get_collection_info("code")
+
+        assert [r.id for r in results] == [3, 2, 4]
+        assert info.points_count == 10
+        assert await backend.health_check()
+        await backend.close()
+
+    async def test_upserts_are_batched_and_bounded(self):
+        """Large upserts are split into batches sent concurrently up to the parallelism limit."""
+        backend = QdrantHybridBackend(
+            url=None, location=":memory:", upsert_parallelism=2, upsert_batch_size=4
+        )
+        await backend.create_collection("code", 4)
+        upsert = backend.client.upsert
+        sizes: list[int] = []
+        active = peak = 0
+
+        async def tracking_upsert(**kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            sizes.append(len(kwargs["points"]))
+            await asyncio.sleep(0.01)
+            active -= 1
+            return await upsert(**kwargs)
+
+        backend.client.upsert = tracking_upsert
+        await backend.upsert_vectors("code", _points(18))
+
+        assert sizes == [4, 4, 4, 4, 2]
+        assert peak == 2
+        assert (await backend.get_collection_info("code")).points_count == 18
+        await backend.close()
+
+    async def test_only_failed_batches_are_retried(self):
+        """A failing batch is retried on its own and throughput is recorded."""
+        backend = QdrantHybridBackend(
+            url=None, location=":memory:", upsert_batch_size=5, retry_backoff=0
+        )
+        await backend.create_collection("code", 4)
+        upsert = backend.client.upsert
+        sent: list[int] = []
+        failed = False
+
+        async def flaky_upsert(**kwargs):
+            nonlocal failed
+            first_id = kwargs["points"][0].id
+            sent.append(first_id)
+            if first_id == 5 and not failed:
+                failed = True
+                raise ConnectionError("connection reset")
+            return await upsert(**kwargs)
+
+        backend.client.upsert = flaky_upsert
+        await backend.upsert_vectors("code", _points(15))
+
+        assert sorted(sent) == [0, 5, 5, 10]
+        assert backend.upsert_stats["retries"] == 1
+        assert backend.upsert_stats["points"] == 15
+        assert backend.upsert_stats["points_per_second"] > 0
+        assert (await backend.get_collection_info("code")).points_count == 15
+        await backend.close()
+
+    async def test_fire_and_forget_with_barrier(self):
+        """With upsert_wait disabled, only the final batch waits, after all others."""
+        backend = QdrantHybridBackend(
+            url=None, location=":memory:", upsert_batch_size=4, upsert_wait=False
+        )
+        await backend.create_collection("code", 4)
+        upsert = backend.client.upsert
+        calls: list[tuple[int, bool]] = []
+
+        async def recording_upsert(**kwargs):
+            calls.append((kwargs["points"][0].id, kwargs["wait"]))
+            return await upsert(**kwargs)
+
+        backend.client.upsert = recording_upsert
+        await backend.upsert_vectors("code", _points(10))
+
+        assert calls[-1] == (8, True)
+        assert sorted(calls[:-1]) == [(0, False), (4, False)]
+        await backend.close()
+
+    async def test_exhausted_retries_raise(self):
+        """A batch that keeps failing surfaces as a backend error."""
+        backend = QdrantHybridBackend(
+            url=None, location=":memory:", upsert_retries=1, retry_backoff=0
+        )
+        await backend.create_collection("code", 4)
+
+        async def failing_upsert(**kwargs):
+            raise ConnectionError("connection refused")
+
+        backend.client.upsert = failing_upsert
+
+        with pytest.raises(BackendError):
+            await backend.upsert_vectors("code", _points(3))
+        await backend.close()
+
+    async def test_call_timeout(self):
+        """Calls exceeding the timeout fail with a backend error."""
+        backend = QdrantHybridBackend(url=None, location=":memory:", timeout=0.05)
+        await backend.create_collection("code", 4)
+
+        async def slow_search(**kwargs):
+            await asyncio.sleep(1)
+
+        backend.client.search = slow_search
+
+        with pytest.raises(BackendError):
+            await backend.search_vectors("code", [1.0, 0.0, 0.0, 0.0])
+        await backend.close()
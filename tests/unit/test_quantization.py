@@ -0,0 +1,211 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for vector quantization."""
+
+import numpy as np
+import pytest
+
+from codeweaver.backends.providers.local import LocalVectorBackend
+from codeweaver.backends.providers.qdrant import QdrantHybridBackend
+from codeweaver.backends.quantization import (
+    ProductQuantizer,
+    QuantizedIndex,
+    exact_scores,
+    prepare_vectors,
+    resolve_quantization,
+)
+from codeweaver.cw_types import (
+    BackendUnsupportedOperationError,
+    DistanceMetric,
+    QuantizationConfig,
+    QuantizationMode,
+    VectorPoint,
+)
+
+
+pytestmark = pytest.mark.filterwarnings("ignore::DeprecationWarning")
+
+
+@pytest.fixture
+def data() -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(5)
+    centers = rng.normal(size=(40, 64))
+    vectors = centers[rng.integers(0, 40, 5000)] + 0.6 * rng.normal(size=(5000, 64))
+    queries = centers[rng.integers(0, 40, 20)] + 0.6 * rng.normal(size=(20, 64))
+    return vectors.astype(np.float32), queries.astype(np.float32)
+
+
+def _candidate_recall(index: QuantizedIndex, vectors, queries, metric, candidates: int) -> float:
+    prepared = prepare_vectors(vectors, metric)
+    hits = 0
+    for query in queries:
+        exact = np.argsort(-exact_scores(prepared, prepare_vectors(query, metric), metric))[:10]
+        found = {point_id for point_id, _ in index.search(query, candidates)}
+        hits += len(found & set(exact.tolist()))
+    return hits / (10 * len(queries))
+
+
+@pytest.mark.unit
+class TestQuantizedIndex:
+    """Test client-side scalar and product quantization."""
+
+    @pytest.mark.parametrize("metric", [DistanceMetric.COSINE, DistanceMetric.EUCLIDEAN])
+    @pytest.mark.parametrize(
+        ("mode", "bytes_per_vector", "candidates"),
+        [(QuantizationMode.SCALAR, 64, 20), (QuantizationMode.PRODUCT, 16, 60)],
+    )
+    def test_candidates_cover_exact_neighbours(
+        self, data, metric, mode, bytes_per_vector, candidates
+    ):
+        """Oversampled candidates from the codes contain the exact top 10."""
+        vectors, queries = data
+        index = QuantizedIndex(64, metric, QuantizationConfig(mode=mode), min_train_rows=2000)
+        for start in range(0, len(vectors), 1000):
+            index.add(list(range(start, start + 1000)), vectors[start : start + 1000])
+
+        stats = index.statistics()
+
+        assert stats["quantized_vectors"] == 5000
+        assert stats["bytes_per_vector"] == bytes_per_vector
+        assert _candidate_recall(index, vectors, queries, metric, candidates) >= 0.9
+
+    def test_exact_until_trained(self, data):
+        """Vectors are scanned at full precision until the quantizer is trained."""
+        vectors, queries = data
+        index = QuantizedIndex(
+            64, DistanceMetric.COSINE, QuantizationConfig(mode="product"), min_train_rows=2000
+        )
+        index.add(list(range(500)), vectors[:500])
+
+        assert not index.trained
+        assert _candidate_recall(index, vectors[:500], queries, DistanceMetric.COSINE, 10) == 1.0
+
+    def test_persists_replacements_and_removals(self, tmp_path, data):
+        """Codes, replaced IDs and removals survive reopening the index."""
+        vectors, _ = data
+        config = QuantizationConfig(mode="scalar")
+        index = QuantizedIndex(64, DistanceMetric.COSINE, config, tmp_path, min_train_rows=100)
+        index.add([f"p{i}" for i in range(300)], vectors[:300])
+        index.add(["p7"], vectors[4000:4001])
+        index.remove(["p8", "missing"])
+
+        reopened = QuantizedIndex(64, DistanceMetric.COSINE, config, tmp_path)
+
+        assert len(reopened) == 299
+        assert reopened.search(vectors[4000], 1)[0][0] == "p7"
+        assert "p8" not in {point_id for point_id, _ in reopened.search(vectors[8], 300)}
+
+    def test_persists_removals_before_training(self, tmp_path, data):
+        """Removing untrained vectors is saved, down to an empty pending set."""
+        vectors, _ = data
+        config = QuantizationConfig(mode="scalar")
+        index = QuantizedIndex(64, DistanceMetric.COSINE, config, tmp_path)
+        index.add(["a", "b"], vectors[:2])
+        index.remove(["a"])
+
+        assert len(QuantizedIndex(64, DistanceMetric.COSINE, config, tmp_path)) == 1
+
+        index.remove(["b"])
+
+        assert len(QuantizedIndex(64, DistanceMetric.COSINE, config, tmp_path)) == 0
+        assert not (tmp_path / "pending.npz").exists()
+
+    def test_compacts_removed_codes(self, tmp_path, data):
+        """Removing most vectors rewrites the codes without them."""
+        vectors, _ = data
+        config = QuantizationConfig(mode="scalar")
+        index = QuantizedIndex(64, DistanceMetric.COSINE, config, tmp_path, min_train_rows=100)
+        index.add(list(range(3000)), vectors[:3000])
+        index.remove(list(range(2000)))
+
+        reopened = QuantizedIndex(64, DistanceMetric.COSINE, config, tmp_path)
+
+        assert (tmp_path / "codes.bin").stat().st_size == 1000 * 64
+        assert len(reopened) == 1000
+        assert reopened.search(vectors[2500], 1)[0][0] == 2500
+
+    def test_small_batches_grow_capacity_geometrically(self, data):
+        """Appending in small batches reallocates the codes a logarithmic number of times."""
+        vectors, _ = data
+        config = QuantizationConfig(mode="scalar")
+        index = QuantizedIndex(64, DistanceMetric.COSINE, config, min_train_rows=100)
+        index.add(list(range(100)), vectors[:100])
+        buffers = [index._code_rows]
+        for start in range(100, 5000, 10):
+            index.add(list(range(start, start + 10)), vectors[start : start + 10])
+            if index._code_rows is not buffers[-1]:
+                buffers.append(index._code_rows)
+
+        assert len(buffers) <= 4
+        assert len(index) == 5000
+        assert index.search(vectors[4321], 1)[0][0] == 4321
+
+    def test_product_subvectors_divide_dimension(self):
+        """Product quantization picks subvectors that evenly split the dimension."""
+        assert ProductQuantizer.subvector_count(1024, 16) == 256
+        assert ProductQuantizer.subvector_count(1024, 64) == 64
+        assert ProductQuantizer.subvector_count(384, 32) == 48
+        assert ProductQuantizer.subvector_count(100, 16) == 25
+
+    def test_resolve_quantization(self):
+        """Configs can be given as modes, names or dicts."""
+        assert resolve_quantization(None).mode == QuantizationMode.NONE
+        assert resolve_quantization("scalar").mode == QuantizationMode.SCALAR
+        assert resolve_quantization({"mode": "product", "compression": 32}).compression == 32
+
+
+@pytest.mark.unit
+class TestBackendQuantization:
+    """Test quantization through the VectorBackend protocol."""
+
+    @pytest.mark.parametrize("mode", ["scalar", "product"])
+    async def test_qdrant_creates_quantized_collections(self, mode):
+        """Quantized Qdrant collections keep originals on disk and searches rescore."""
+        backend = QdrantHybridBackend(url=None, location=":memory:", quantization=mode)
+        create_collection = backend.client.create_collection
+        search = backend.client.search
+        calls: dict[str, dict] = {}
+
+        async def recording_create(**kwargs):
+            calls["create"] = kwargs
+            return await create_collection(**kwargs)
+
+        async def recording_search(**kwargs):
+            calls["search"] = kwargs
+            return await search(**kwargs)
+
+        backend.client.create_collection = recording_create
+        backend.client.search = recording_search
+        await backend.create_collection("code", 4)
+        await backend.upsert_vectors(
+            "code", [VectorPoint(id=i, vector=[1.0, float(i), 0.0, 0.5]) for i in range(10)]
+        )
+        results = await backend.search_vectors(
+            "code", [1.0, 2.5, 0.1, 0.5], limit=3, oversampling=3
+        )
+
+        quantization_config = calls["create"]["quantization_config"]
+        assert backend._convert_quantization(quantization_config) == QuantizationMode(mode)
+        assert calls["create"]["vectors_config"]["dense"].on_disk
+        assert calls["search"]["search_params"].quantization.rescore
+        assert calls["search"]["search_params"].quantization.oversampling == 3
+        assert [r.id for r in results] == [3, 2, 4]
+        await backend.close()
+
+    async def test_qdrant_unquantized_by_default(self):
+        """Without a quantization setting, collections store full-precision vectors."""
+        backend = QdrantHybridBackend(url=None, location=":memory:")
+        await backend.create_collection("code", 4)
+
+        assert (await backend.get_collection_info("code")).quantization == QuantizationMode.NONE
+        await backend.close()
+
+    async def test_local_backend_rejects_quantization(self, tmp_path):
+        """The local backend refuses quantized collections instead of ignoring the setting."""
+        backend = LocalVectorBackend(tmp_path)
+
+        with pytest.raises(BackendUnsupportedOperationError):
+            await backend.create_collection("code", 4, quantization="scalar")
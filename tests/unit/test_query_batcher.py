@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for micro-batched query embedding."""
+
+import asyncio
+
+import pytest
+
+from codeweaver.providers import QueryBatcher
+from codeweaver.services import QueryEmbeddingCache
+from codeweaver.testing.mocks import MockEmbeddingProvider
+
+
+class BatchingProvider(MockEmbeddingProvider):
+    """Mock provider recording each batched query call."""
+
+    def __init__(self, **kwargs):
+        super().__init__(dimension=8, **kwargs)
+        self.batches: list[list[str]] = []
+        self.fail = False
+
+    async def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(texts)
+        await self._simulate_latency()
+        if self.fail:
+            raise RuntimeError("service unavailable")
+        return [self._generate_mock_embedding(text, 0) for text in texts]
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+class TestQueryBatcher:
+    """Test batching, fan-out and error propagation."""
+
+    async def test_lone_query_is_sent_immediately(self):
+        """An idle batcher does not hold a query back for the window."""
+        provider = BatchingProvider(latency_ms=0)
+        batcher = QueryBatcher(provider, max_wait_ms=10_000)
+
+        vector = await asyncio.wait_for(batcher.embed_query("parse config"), timeout=1)
+
+        assert vector == await provider.embed_query("parse config")
+        assert provider.batches == [["parse config"]]
+
+    async def test_queries_arriving_during_a_call_share_the_next_one(self):
+        """Concurrent queries are fanned back out to their own callers."""
+        provider = BatchingProvider(latency_ms=20)
+        batcher = QueryBatcher(provider, max_wait_ms=50)
+        queries = ["first", "alpha", "beta", "alpha", "gamma"]
+
+        vectors = await asyncio.gather(*(batcher.embed_query(query) for query in queries))
+
+        assert provider.batches == [["first"], ["alpha", "beta", "gamma"]]
+        assert vectors[1] == vectors[3] != vectors[2]
+        assert vectors[4] == provider._generate_mock_embedding("gamma", 0)
+        assert batcher.get_statistics()["batches"] == 2
+
+    async def test_batches_respect_the_size_limit(self):
+        """Full batches are sent without waiting for the window."""
+        provider = BatchingProvider(latency_ms=20)
+        batcher = QueryBatcher(provider, max_wait_ms=10_000, max_batch_size=2)
+
+        await asyncio.wait_for(
+            asyncio.gather(*(batcher.embed_query(f"query {i}") for i in range(5))), timeout=1
+        )
+
+        assert [len(batch) for batch in provider.batches] == [1, 2, 2]
+
+    async def test_failures_reach_every_caller_in_the_batch(self):
+        """A failed batch call raises in each waiting caller."""
+        provider = BatchingProvider(latency_ms=0)
+        provider.fail = True
+        batcher = QueryBatcher(provider)
+
+        results = await asyncio.gather(
+            batcher.embed_query("a"), batcher.embed_query("b"), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def test_cache_misses_go_through_the_batcher(self):
+        """The query embedding cache embeds misses with the batcher."""
+        provider = BatchingProvider(latency_ms=10)
+        cache = QueryEmbeddingCache(provider, batcher=QueryBatcher(provider))
+
+        await asyncio.gather(*(cache.embed_query(query) for query in ["a", "b", "c", "a"]))
+
+        assert sorted(text for batch in provider.batches for text in batch) == ["a", "b", "c"]
+        assert provider._call_count == 0
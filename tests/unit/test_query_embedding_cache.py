@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for the query embedding cache."""
+
+import asyncio
+import time
+
+import pytest
+
+from codeweaver.cw_types import CacheServiceConfig
+from codeweaver.services import CachingService, QueryEmbeddingCache
+from codeweaver.services.query_cache import CACHE_NAMESPACE, normalize_query
+from codeweaver.testing.mocks import MockEmbeddingProvider
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+class TestQueryEmbeddingCache:
+    """Test caching and coalescing of query embeddings."""
+
+    async def test_concurrent_identical_queries_share_one_call(self):
+        """Concurrent misses for the same query make a single provider call."""
+        provider = MockEmbeddingProvider(latency_ms=20)
+        cache = QueryEmbeddingCache(provider)
+
+        vectors = await asyncio.gather(*(cache.embed_query("parse config") for _ in range(5)))
+
+        assert provider._call_count == 1
+        assert all(vector == vectors[0] for vector in vectors)
+        assert cache.get_statistics()["coalesced"] == 4
+
+    async def test_normalized_queries_hit_and_save_latency(self):
+        """Whitespace variants hit the cache; hits report the latency they saved."""
+        provider = MockEmbeddingProvider(latency_ms=10)
+        cache = QueryEmbeddingCache(provider)
+
+        first = await cache.embed_query("parse  config\n")
+        second = await cache.embed_query(" parse config")
+
+        assert first == second
+        assert provider._call_count == 1
+        stats = cache.cache.get_statistics()["namespaces"][CACHE_NAMESPACE]
+        assert stats["hit_rate"] == 0.5
+        assert stats["latency_saved_ms"] > 0
+        assert normalize_query("Parse　Config") == "Parse Config"
+
+    async def test_entries_expire(self, monkeypatch):
+        """Vectors are recomputed after their TTL."""
+        provider = MockEmbeddingProvider(latency_ms=0)
+        cache = QueryEmbeddingCache(provider, ttl_seconds=60)
+        await cache.embed_query("parse config")
+
+        expired = time.time() + 61
+        monkeypatch.setattr(time, "time", lambda: expired)
+        await cache.embed_query("parse config")
+
+        assert provider._call_count == 2
+
+    async def test_providers_and_models_do_not_share_entries(self):
+        """A shared cache service keys vectors by provider and model."""
+        service = CachingService(config=CacheServiceConfig(max_items=10))
+        small = MockEmbeddingProvider(model_name="small", latency_ms=0)
+        large = MockEmbeddingProvider(model_name="large", latency_ms=0)
+
+        await QueryEmbeddingCache(small, service).embed_query("parse config")
+        await QueryEmbeddingCache(large, service).embed_query("parse config")
+
+        assert small._call_count == large._call_count == 1
+        assert service.get_statistics()["total_entries"] == 2
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Cancelling one waiter leaves the shared computation running."""
+        provider = MockEmbeddingProvider(latency_ms=20)
+        cache = QueryEmbeddingCache(provider)
+        first = asyncio.create_task(cache.embed_query("parse config"))
+        second = asyncio.create_task(cache.embed_query("parse config"))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        vector = await second
+
+        assert len(vector) == provider.dimension
+        assert provider._call_count == 1
@@ -0,0 +1,97 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for the generation-keyed search result cache."""
+
+import pytest
+
+from codeweaver.backends.base import VectorBackend
+from codeweaver.backends.providers.local import LocalVectorBackend
+from codeweaver.cw_types import VectorPoint
+from codeweaver.services import SearchResultCache
+from codeweaver.testing.mocks import MockVectorBackend
+
+
+class CountingSearch:
+    """Search stub returning the backend's point IDs and counting its runs."""
+
+    def __init__(self, backend: MockVectorBackend, collection_name: str = "code"):
+        self.backend = backend
+        self.collection_name = collection_name
+        self.runs = 0
+
+    async def __call__(self) -> list[dict]:
+        self.runs += 1
+        return [{"id": point_id} for point_id in self.backend.vectors[self.collection_name]]
+
+
+async def _backend(cache: SearchResultCache, *collections: str) -> MockVectorBackend:
+    backend = cache.track(MockVectorBackend(latency_ms=0))
+    for name in collections:
+        await backend.create_collection(name, dimension=2)
+        await backend.upsert_vectors(name, [VectorPoint(id="a", vector=[1.0, 0.0])])
+    return backend
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+class TestSearchResultCache:
+    """Test caching and generation-based invalidation of search results."""
+
+    async def test_repeated_searches_are_served_from_cache(self):
+        """Identical searches, up to whitespace, run once."""
+        cache = SearchResultCache()
+        search = CountingSearch(await _backend(cache, "code"))
+
+        first = await cache.get_or_search("code", "parse config", search, limit=5)
+        second = await cache.get_or_search("code", " parse  config ", search, limit=5)
+
+        assert first == second == [{"id": "a"}]
+        assert search.runs == 1
+        assert cache.get_statistics()["hits"] == 1
+
+    async def test_writes_invalidate_exactly(self):
+        """An upsert or delete makes the next search see the new contents."""
+        cache = SearchResultCache()
+        backend = await _backend(cache, "code")
+        search = CountingSearch(backend)
+        await cache.get_or_search("code", "parse config", search)
+
+        await backend.upsert_vectors("code", [VectorPoint(id="b", vector=[0.0, 1.0])])
+        after_upsert = await cache.get_or_search("code", "parse config", search)
+        await backend.delete_vectors(collection_name="code", ids=["a"])
+        after_delete = await cache.get_or_search("code", "parse config", search)
+
+        assert after_upsert == [{"id": "a"}, {"id": "b"}]
+        assert after_delete == [{"id": "b"}]
+        assert search.runs == 3
+
+    async def test_other_collections_and_options_are_separate(self):
+        """Writes only invalidate their collection; filters and limits are part of the key."""
+        cache = SearchResultCache()
+        backend = await _backend(cache, "code", "docs")
+        search = CountingSearch(backend)
+        await cache.get_or_search("code", "parse config", search)
+
+        await backend.upsert_vectors("docs", [VectorPoint(id="b", vector=[0.0, 1.0])])
+        await cache.get_or_search("code", "parse config", search)
+        filtered = {"conditions": [{"field": "language", "operator": "eq", "value": "python"}]}
+        await cache.get_or_search("code", "parse config", search, search_filter=filtered)
+        await cache.get_or_search("code", "parse config", search, limit=20)
+        await cache.get_or_search("code", "parse config", search, rerank=False)
+
+        assert search.runs == 4
+        assert cache.generation("docs") == 3
+
+    async def test_tracked_backend_keeps_its_protocol(self, tmp_path):
+        """Tracking wraps methods in place rather than proxying the backend."""
+        cache = SearchResultCache()
+        backend = cache.track(LocalVectorBackend(tmp_path))
+
+        await backend.create_collection("code", dimension=2)
+
+        assert isinstance(backend, LocalVectorBackend)
+        assert isinstance(backend, VectorBackend)
+        assert cache.generation("code") == 1
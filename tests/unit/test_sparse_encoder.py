@@ -0,0 +1,218 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for the code-aware BM25 sparse encoder."""
+
+import os
+import subprocess
+import sys
+
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from codeweaver.backends.providers.qdrant import QdrantHybridBackend
+from codeweaver.backends.sparse import BM25Encoder, token_id, tokenize
+from codeweaver.config import get_config
+from codeweaver.cw_types import CodeChunk, VectorPoint
+from codeweaver.server import CodeWeaverServer
+from codeweaver.services.manifest import FileManifest
+from codeweaver.services.pipeline import IndexingPipeline
+from codeweaver.testing.mocks import MockEmbeddingProvider, MockVectorBackend
+
+
+DOCUMENTS = {
+    "parser": "def parseHttpRequest(raw_bytes):\n    return HttpRequest.from_bytes(raw_bytes)\n",
+    "cache": "class LRUCache:\n    def get(self, key):\n        return self._store.get(key)\n",
+    "writer": "def write_response(stream, response):\n    stream.write(response.body)\n",
+}
+
+
+def _score(query: dict[int, float], document: dict[int, float]) -> float:
+    return sum(weight * document.get(term, 0.0) for term, weight in query.items())
+
+
+@pytest.mark.unit
+class TestTokenizer:
+    """Test code-aware tokenization."""
+
+    def test_identifiers_are_split_into_words(self):
+        """camelCase, PascalCase acronyms and snake_case all yield their words."""
+        assert tokenize("parseHTTPRequest") == ["parsehttprequest", "parse", "http", "request"]
+        assert tokenize("max_retry_count") == ["max_retry_count", "max", "retry", "count"]
+        assert tokenize("i = j + x1") == ["x1"]
+
+    def test_token_ids_are_stable_across_processes(self):
+        """Token IDs do not depend on the interpreter's hash seed."""
+        script = "from codeweaver.backends.sparse import token_id; print(token_id('request'))"
+        env = {**os.environ, "PYTHONHASHSEED": "123"}
+        output = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", script],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+        assert int(output.stdout.strip()) == token_id("request")
+
+
+@pytest.mark.unit
+class TestBM25Encoder:
+    """Test corpus statistics and BM25 weighting."""
+
+    def test_query_ranks_matching_document_first(self):
+        """Word parts of an identifier retrieve the chunk that defines it."""
+        encoder = BM25Encoder()
+        vectors = dict(
+            zip(
+                DOCUMENTS,
+                encoder.add_documents(list(DOCUMENTS), list(DOCUMENTS.values())),
+                strict=True,
+            )
+        )
+        query = encoder.encode_query("http request parsing")
+
+        ranked = sorted(vectors, key=lambda name: _score(query, vectors[name]), reverse=True)
+
+        assert ranked[0] == "parser"
+        assert _score(query, vectors["cache"]) == 0.0
+
+    def test_rare_tokens_weigh_more(self):
+        """IDF favours tokens that few documents contain."""
+        encoder = BM25Encoder()
+        encoder.add_documents(list(DOCUMENTS), list(DOCUMENTS.values()))
+        query = encoder.encode_query("return cache")
+
+        assert query[token_id("cache")] > query[token_id("return")]
+
+    def test_readding_and_removing_documents(self):
+        """Re-adding an ID replaces it; removing it undoes its contribution."""
+        encoder = BM25Encoder()
+        encoder.add_documents(["a", "b"], ["alpha beta", "alpha gamma"])
+        encoder.add_documents(["a"], ["alpha beta"])
+
+        assert encoder.document_count == 2
+        assert encoder.document_frequency("alpha") == 2
+
+        assert encoder.remove_documents(["a", "missing"]) == 1
+        assert encoder.document_frequency("beta") == 0
+        assert encoder.average_length == 2.0
+
+    def test_statistics_round_trip(self, tmp_path):
+        """Saved statistics produce the same query weights after reloading."""
+        path = tmp_path / "code.sparse.npz"
+        encoder = BM25Encoder(path)
+        encoder.add_documents(list(DOCUMENTS), list(DOCUMENTS.values()))
+        encoder.save()
+
+        reloaded = BM25Encoder(path)
+
+        assert reloaded.statistics() == encoder.statistics()
+        assert reloaded.encode_query("write http response") == encoder.encode_query(
+            "write http response"
+        )
+
+
+class StubChunker:
+    """Chunker producing one chunk per file."""
+
+    async def chunk_file(self, file_path: Path, content: str) -> list[CodeChunk]:
+        return [
+            CodeChunk.create_with_hash(
+                content=content,
+                file_path=str(file_path),
+                start_line=1,
+                end_line=3,
+                chunk_type="function",
+                language="python",
+            )
+        ]
+
+
+@pytest.mark.unit
+@pytest.mark.indexing
+@pytest.mark.mock_only
+async def test_pipeline_keeps_statistics_in_step_with_the_index(tmp_path):
+    """Chunks get sparse vectors, and replaced chunks leave the statistics."""
+    for name, content in DOCUMENTS.items():
+        (tmp_path / f"{name}.py").write_text(content)
+    backend = MockVectorBackend(latency_ms=0)
+    await backend.create_collection("code", dimension=16)
+    encoder = BM25Encoder()
+
+    async def run() -> None:
+        await IndexingPipeline(
+            embedding_provider=MockEmbeddingProvider(dimension=16, latency_ms=0),
+            backend=backend,
+            collection_name="code",
+            chunking_service=StubChunker(),
+            manifest=FileManifest(tmp_path / ".codeweaver" / "index" / "manifest.sqlite3"),
+            sparse_encoder=encoder,
+        ).run(tmp_path)
+
+    await run()
+    assert all(point.sparse_vector for point in backend.vectors["code"].values())
+    assert encoder.document_frequency("http") == 1
+
+    (tmp_path / "parser.py").write_text("def parse_json(text):\n    return loads(text)\n")
+    await run()
+
+    assert encoder.document_count == 3
+    assert encoder.document_frequency("http") == 0
+    assert encoder.document_frequency("json") == 1
+
+
+@pytest.mark.unit
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+async def test_qdrant_hybrid_search_with_text_query():
+    """Text queries are encoded with the backend's BM25 statistics."""
+    encoder = BM25Encoder()
+    backend = QdrantHybridBackend(url=None, location=":memory:", sparse_encoder=encoder)
+    await backend.create_collection("code", 4)
+    sparse_vectors = encoder.add_documents(list(DOCUMENTS), list(DOCUMENTS.values()))
+    points = [
+        VectorPoint(id=index, vector=[1.0, 0.0, 0.0, 0.0], sparse_vector=sparse_vector)
+        for index, sparse_vector in enumerate(sparse_vectors)
+    ]
+    await backend.upsert_vectors("code", points)
+
+    results = await backend.hybrid_search("code", [0.0, 1.0, 0.0, 0.0], "LRU cache", limit=3)
+    info = await backend.get_collection_info("code")
+
+    assert results[0].id == 1
+    assert info.supports_sparse_vectors
+    await backend.close()
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+async def test_server_loads_statistics_at_startup(tmp_path):
+    """Saved statistics weight text queries before anything is reindexed."""
+    saved = BM25Encoder(tmp_path / "code.sparse.npz")
+    saved.add_documents(list(DOCUMENTS), list(DOCUMENTS.values()))
+    saved.save()
+    config = get_config().model_copy(deep=True)
+    config.backend.collection_name = "code"
+    config.backend.enable_hybrid_search = True
+    config.indexing.index_dir = tmp_path
+    backend = MockVectorBackend(latency_ms=0)
+    backend.sparse_encoder = BM25Encoder()
+    manager = MagicMock(
+        get_backend=AsyncMock(return_value=backend),
+        get_embedding_provider=AsyncMock(
+            return_value=MockEmbeddingProvider(dimension=16, latency_ms=0)
+        ),
+        get_reranking_provider=AsyncMock(return_value=None),
+        get_data_sources=AsyncMock(return_value=[]),
+    )
+    with patch("codeweaver.server.ExtensibilityManager", return_value=manager):
+        server = CodeWeaverServer(config=config)
+
+    await server._initialize_components()
+
+    assert backend.sparse_encoder.document_count == 3
+    assert backend.sparse_encoder.document_frequency("http") == 1
+    assert server._open_sparse_encoder(tmp_path) is backend.sparse_encoder
@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2025 Knitli Inc.
+# SPDX-FileContributor: Adam Poulemanos <adam@knit.li>
+#
+# SPDX-License-Identifier: MIT OR Apache-2.0
+
+"""Unit tests for token estimation and token-aware chunk sizing."""
+
+from pathlib import Path
+
+import pytest
+
+from codeweaver.middleware.chunking import ChunkingMiddleware
+from codeweaver.providers.tokenization import DEFAULT_CHARS_PER_TOKEN, TokenEstimator, token_budget
+from codeweaver.testing.mocks import MockEmbeddingProvider
+
+
+class CountingProvider(MockEmbeddingProvider):
+    """Mock provider exposing an exact token counter (4 chars per token)."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.count_calls = 0
+
+    def count_tokens(self, text: str) -> int:
+        self.count_calls += 1
+        return max(1, len(text) // 4)
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+class TestTokenEstimator:
+    """Test chars-per-token estimation."""
+
+    def test_defaults_without_tokenizer(self):
+        """Without a tokenizer the default ratios are used."""
+        estimator = TokenEstimator()
+
+        assert estimator.ratio("python") == DEFAULT_CHARS_PER_TOKEN["python"]
+        assert estimator.ratio("cobol") == DEFAULT_CHARS_PER_TOKEN["default"]
+        assert estimator.chars_for(100, "python") == int(100 * DEFAULT_CHARS_PER_TOKEN["python"])
+
+    def test_calibrates_with_tokenizer(self):
+        """A tokenizer calibrates every language ratio."""
+        estimator = TokenEstimator(lambda text: max(1, len(text) // 4))
+
+        assert estimator.ratio("python") == pytest.approx(4.0, rel=0.05)
+        assert estimator.ratio("rust") == pytest.approx(4.0, rel=0.05)
+        assert estimator.estimate("x" * 400) == 100
+
+    def test_cached_per_provider(self):
+        """Calibration runs once per provider and model."""
+        provider = CountingProvider(model_name="counting-model-a")
+
+        first = TokenEstimator.for_provider(provider)
+        calls = provider.count_calls
+        second = TokenEstimator.for_provider(provider)
+        other = TokenEstimator.for_provider(CountingProvider(model_name="counting-model-b"))
+
+        assert first is second
+        assert provider.count_calls == calls
+        assert other is not first
+
+    def test_budget_capped_by_input_limit(self):
+        """The token budget never exceeds the provider's input limit."""
+        provider = MockEmbeddingProvider()
+
+        assert token_budget(provider, 256) == 256
+        assert token_budget(provider, 50_000) == provider.max_input_length
+
+
+@pytest.mark.unit
+@pytest.mark.mock_only
+def test_chunks_are_sized_by_token_budget():
+    """With a token budget, chunk size follows the language's chars-per-token ratio."""
+    methods = "".join(
+        f"    def method_{i}(self, value):\n        return value * {i} + len(str(value))\n\n"
+        for i in range(40)
+    )
+    source = f"class Service:\n{methods}"
+    middleware = ChunkingMiddleware({
+        "min_chunk_size": 20,
+        "max_chunk_tokens": 100,
+        "chars_per_token": {"python": 3.0, "default": 3.0},
+    })
+
+    chunks = middleware.chunk_file_sync(Path("service.py"), source)
+
+    assert middleware.max_chunk_size_for("python") == 300
+    assert len(chunks) > 1
+    assert all(len(chunk.content) <= 300 for chunk in chunks)
+    # Chunks are packed toward the budget rather than one per method
+    assert len(chunks) < 40